@@ -41,6 +41,12 @@ ERROR_LOG="/home/system-admin/.rental-backup-error.log"
 BLOG_SITES_ROOT="/mnt/backup-hdd/blog/sites"
 BLOG_ENV_FILE="${PROJECT_ROOT}/services/blog/.env"
 BLOG_DB_CONTAINER="blog-mariadb"
+# Host-side backup CLIs (python3 -m backup_tools.<tool>)
+BACKUP_TOOLS_PATH="${PROJECT_ROOT}/services/unified-portal/backend"
+# Content-addressed chunk store (empty = disabled). Kept alongside the rsync
+# copy of the sites, which restores and the catalogue read; it only adds
+# snapshot history (see DEDUP_STORE_ROOT in backup-config.sh)
+DEDUP_STORE_ROOT="${DEDUP_STORE_ROOT:-}"
 
 BACKUP_DATE=$(date '+%Y-%m-%d')
 WEEKLY_ID=$(date '+%Y-week-%U')
@@ -143,7 +149,35 @@ backup_blog() {
   log INFO BLOG "Blog backup completed"
 }
 
+snapshot_blog_dedup() {
+  if [[ -z "${DEDUP_STORE_ROOT}" ]]; then
+    return 0
+  fi
+  log INFO BLOG "Snapshotting WordPress sites into dedup store ${DEDUP_STORE_ROOT}"
+  PYTHONPATH="${BACKUP_TOOLS_PATH}" python3 -m backup_tools.dedup_store snapshot "${DEDUP_STORE_ROOT}" "${BLOG_SITES_ROOT}" \
+    --name "blog-${BACKUP_TYPE}-${DATE_LABEL}" >/dev/null || {
+      log ERROR BLOG "Dedup snapshot failed"
+      return 1
+    }
+}
+
+prune_blog_backups() {
+  # backup-mailserver.sh only prunes its own scope (rental/mail), so the blog
+  # scope gets the same generation rules and disk-usage ceiling here
+  log INFO BLOG "Applying retention to ${BLOG_ROOT}"
+  PYTHONPATH="${BACKUP_TOOLS_PATH}" nice -n 19 python3 -m backup_tools.retention apply \
+    --root /mnt/backup-hdd --scope rental/blog \
+    --keep-daily "${DAILY_RETENTION_DAYS:-30}" \
+    --keep-weekly "${WEEKLY_RETENTION_WEEKS:-12}" \
+    --keep-monthly "${MONTHLY_RETENTION_MONTHS:-12}" \
+    --max-usage "${BACKUP_MAX_USAGE_PERCENT:-75}" >> "${LOG_FILE}" 2>&1 || {
+      log WARNING BLOG "Retention left errors or could not reach the usage ceiling"
+    }
+}
+
 backup_mail
 backup_blog
+snapshot_blog_dedup
+prune_blog_backups
 
 log INFO RENTAL "Rental backup finished (${BACKUP_TYPE})"
@@ -23,6 +23,9 @@ export MAILSERVER_ROOT
 export BACKUP_ROOT
 : "${BACKUP_MOUNTPOINT:=/mnt/backup-hdd}"
 export BACKUP_MOUNTPOINT
+# Scope of this run's backups relative to the mount point (mailserver, rental/mail)
+: "${BACKUP_SCOPE:=${BACKUP_ROOT#"${BACKUP_MOUNTPOINT}"/}}"
+export BACKUP_SCOPE
 : "${SCRIPTS_DIR:=${MAILSERVER_ROOT}/scripts}"
 export SCRIPTS_DIR
 
@@ -54,9 +57,74 @@ export WEEKLY_BACKUP_DIR
 : "${LATEST_LINK:=${BACKUP_ROOT}/latest}"
 export LATEST_LINK
 
+# ==================== Compression ====================
+# zstd (multi-threaded, long-range matching) when installed, gzip otherwise.
+# Restores read both formats, so switching compressors is safe.
+if [[ -z "${BACKUP_COMPRESSION:-}" ]]; then
+    if command -v zstd >/dev/null 2>&1; then
+        BACKUP_COMPRESSION="zstd"
+    else
+        BACKUP_COMPRESSION="gzip"
+    fi
+fi
+export BACKUP_COMPRESSION
+: "${ZSTD_LEVEL:=3}"
+export ZSTD_LEVEL
+# Long-range matching window (2^27 = 128 MiB); decompression must use the same value
+: "${ZSTD_WINDOW_LOG:=27}"
+export ZSTD_WINDOW_LOG
+
+# ==================== Backup Tools ====================
+# Stdlib-only Python CLIs shared with the portal (backend/backup_tools),
+# run as: python3 -m backup_tools.<tool>
+: "${BACKUP_TOOLS_PATH:=${PROJECT_ROOT}/services/unified-portal/backend}"
+export BACKUP_TOOLS_PATH
+export PYTHONPATH="${BACKUP_TOOLS_PATH}${PYTHONPATH:+:${PYTHONPATH}}"
+
+# ==================== Manifest ====================
+# BLAKE2b manifest writer/verifier
+: "${BACKUP_MANIFEST_TOOL:=backup_tools.manifest}"
+export BACKUP_MANIFEST_TOOL
+
+# ==================== Mail Archive Format ====================
+# rsync: plain maildir copy (default)
+# indexed: mail.tar.zst with one zstd frame per mailbox + mail.index.json,
+#          so single mailboxes/folders restore without full extraction
+: "${MAIL_BACKUP_FORMAT:=rsync}"
+export MAIL_BACKUP_FORMAT
+: "${MAIL_ARCHIVE_TOOL:=backup_tools.mail_archive}"
+export MAIL_ARCHIVE_TOOL
+
+# ==================== Dedup Store ====================
+# Content-addressed chunk store for maildir snapshots (empty = disabled).
+# It is kept in addition to the full copy in BACKUP_DIR, not instead of it:
+# the catalogue, restore planning, per-mailbox restore, manifest
+# verification and the S3 sync all read the full copy. The store only adds
+# long snapshot history past retention, at the cost of new chunks per run.
+# Its space counts towards BACKUP_MAX_USAGE_PERCENT, so on a shared disk
+# retention prunes full copies earlier; put it on another disk if possible.
+: "${DEDUP_STORE_ROOT:=}"
+export DEDUP_STORE_ROOT
+: "${DEDUP_STORE_TOOL:=backup_tools.dedup_store}"
+export DEDUP_STORE_TOOL
+
 # ==================== Retention ====================
 export DAILY_RETENTION_DAYS="${DAILY_RETENTION_DAYS:-30}"
 export WEEKLY_RETENTION_WEEKS="${WEEKLY_RETENTION_WEEKS:-12}"
+export MONTHLY_RETENTION_MONTHS="${MONTHLY_RETENTION_MONTHS:-12}"
+# Prune toward this disk usage (%) - keep it below DISK_WARNING_THRESHOLD
+: "${BACKUP_MAX_USAGE_PERCENT:=75}"
+export BACKUP_MAX_USAGE_PERCENT
+# Scopes this run prunes: only its own BACKUP_ROOT (mailserver, or rental/mail
+# when backup_rental.sh runs it; that script prunes rental/blog itself). The
+# usage ceiling is disk-wide, so every run prunes its own scope towards it.
+: "${RETENTION_SCOPES:=${BACKUP_SCOPE}}"
+export RETENTION_SCOPES
+: "${RETENTION_TOOL:=backup_tools.retention}"
+export RETENTION_TOOL
+# Portal's backup size index (sizes recorded under the container's /mnt/backup-hdd)
+: "${BACKUP_SIZE_INDEX:=${PROJECT_ROOT}/services/unified-portal/backend/data/backup_index.sqlite3}"
+export BACKUP_SIZE_INDEX
 
 # ==================== Notifications ====================
 : "${ADMIN_EMAIL:=naoya.iimura@gmail.com}"
@@ -86,6 +154,26 @@ export MAX_RETRIES
 : "${RETRY_DELAY:=10}"
 export RETRY_DELAY
 
+# ==================== Backup HDD I/O Serialisation ====================
+# Backups, the job runner and ClamAV scans take this flock so they never
+# hit the backup disk at the same time (the second one waits)
+: "${HDD_IO_LOCK:=/tmp/backup-hdd-io.lock}"
+export HDD_IO_LOCK
+: "${HDD_IO_LOCK_WAIT:=14400}"
+export HDD_IO_LOCK_WAIT
+# Job runner (portal-visible progress): ionice class/priority, optional
+# cgroup io.max cap on the backup disk (e.g. 50M; empty = unlimited)
+: "${BACKUP_SCHEDULER_TOOL:=backup_tools.scheduler}"
+export BACKUP_SCHEDULER_TOOL
+: "${BACKUP_JOBS_DIR:=${PROJECT_ROOT}/services/unified-portal/backend/data/backup_jobs}"
+export BACKUP_JOBS_DIR
+: "${BACKUP_IO_CLASS:=2}"
+export BACKUP_IO_CLASS
+: "${BACKUP_IO_PRIORITY:=7}"
+export BACKUP_IO_PRIORITY
+: "${BACKUP_IO_BANDWIDTH_MAX:=}"
+export BACKUP_IO_BANDWIDTH_MAX
+
 # ==================== MySQL Authentication ====================
 # Use .my.cnf for secure password storage
 : "${MYSQL_CONFIG_FILE:=${HOME}/.my.cnf}"
@@ -93,6 +181,18 @@ export MYSQL_CONFIG_FILE
 
 # ==================== Phase 11-B: S3 Backup Configuration ====================
 
+# Parallel multipart uploader (falls back to aws s3 sync when boto3 is missing)
+: "${S3_UPLOAD_TOOL:=backup_tools.s3_upload}"
+export S3_UPLOAD_TOOL
+: "${S3_PART_SIZE_MB:=16}"
+export S3_PART_SIZE_MB
+: "${S3_UPLOAD_CONCURRENCY:=4}"
+export S3_UPLOAD_CONCURRENCY
+: "${S3_UPLOAD_JOURNAL:=/home/system-admin/.s3-upload-journal.json}"
+export S3_UPLOAD_JOURNAL
+: "${S3_ENDPOINT_URL:=}"
+export S3_ENDPOINT_URL
+
 # Load S3-specific configuration if exists
 S3_CONFIG_FILE="${S3_CONFIG_FILE:-/etc/mailserver-backup/config}"
 
@@ -137,6 +237,68 @@ log() {
     echo "[${timestamp}] ${message}"
 }
 
+# compression_ext() - File extension of the configured compressor
+compression_ext() {
+    if [[ "${BACKUP_COMPRESSION}" == "zstd" ]]; then
+        echo "zst"
+    else
+        echo "gz"
+    fi
+}
+
+# compress_stream() - Compress stdin to stdout with the configured compressor
+compress_stream() {
+    if [[ "${BACKUP_COMPRESSION}" == "zstd" ]]; then
+        zstd -q -T0 "-${ZSTD_LEVEL}" --long="${ZSTD_WINDOW_LOG}"
+    else
+        gzip
+    fi
+}
+
+# decompress_file() - Decompress a .zst or .gz file to stdout
+# Usage: decompress_file FILE
+decompress_file() {
+    case "$1" in
+        *.zst) zstd -q -dc --long="${ZSTD_WINDOW_LOG}" "$1" ;;
+        *.gz) gunzip -c "$1" ;;
+        *) cat "$1" ;;
+    esac
+}
+
+# find_compressed() - Resolve BASE.zst or BASE.gz (prints nothing if neither exists)
+# Usage: find_compressed /path/config.tar
+find_compressed() {
+    local ext
+    for ext in zst gz; do
+        if [[ -f "$1.${ext}" ]]; then
+            echo "$1.${ext}"
+            return 0
+        fi
+    done
+    return 1
+}
+
+# backup_tool_available() - Check python3 and a backup_tools module exist
+# Usage: backup_tool_available backup_tools.manifest
+backup_tool_available() {
+    command -v python3 >/dev/null 2>&1 && [[ -f "${BACKUP_TOOLS_PATH}/${1//.//}.py" ]]
+}
+
+# acquire_hdd_io_lock() - Wait for exclusive use of the backup disk
+# Holds the lock on fd 9 until the script exits. No-op when the parent
+# (the job runner) already holds it.
+# Returns: 0 when held, 1 on timeout
+acquire_hdd_io_lock() {
+    if [[ "${HDD_IO_LOCK_HELD:-0}" == "1" ]] || ! command -v flock >/dev/null 2>&1; then
+        return 0
+    fi
+    exec 9>>"${HDD_IO_LOCK}"
+    if ! flock -w "${HDD_IO_LOCK_WAIT}" 9; then
+        return 1
+    fi
+    export HDD_IO_LOCK_HELD=1
+}
+
 # check_lock_file() - Check if backup is already running
 # Returns: 0 if no lock, 1 if locked
 check_lock_file() {
@@ -219,6 +219,11 @@ initialize() {
         log "ERROR" "Lock file exists (${LOCK_FILE}); another backup may be running" "INIT"
         return 1
     fi
+    log "INFO" "Waiting for backup disk I/O lock (${HDD_IO_LOCK})" "INIT"
+    if ! acquire_hdd_io_lock; then
+        log "ERROR" "Backup disk busy for ${HDD_IO_LOCK_WAIT}s (malware scan running?)" "INIT"
+        return 1
+    fi
     echo "$$" > "${LOCK_FILE}"
 
     mkdir -p "${BACKUP_ROOT}" "${DAILY_BACKUP_DIR}" "${WEEKLY_BACKUP_DIR}"
@@ -236,6 +241,13 @@ initialize() {
     local disk_usage
     disk_usage=$(df -P "${BACKUP_MOUNTPOINT}" | awk 'NR==2 {gsub("%","",$5); print $5}')
     log "INFO" "Backup disk usage: ${disk_usage}%" "INIT"
+    if (( disk_usage >= BACKUP_MAX_USAGE_PERCENT )) && retention_available; then
+        # Reclaim space before writing tonight's backup, not after warning about it
+        log "INFO" "Disk above ${BACKUP_MAX_USAGE_PERCENT}% ceiling; pruning before backup" "INIT"
+        run_retention || log "WARNING" "Retention could not reach the usage ceiling" "INIT"
+        disk_usage=$(df -P "${BACKUP_MOUNTPOINT}" | awk 'NR==2 {gsub("%","",$5); print $5}')
+        log "INFO" "Backup disk usage after pruning: ${disk_usage}%" "INIT"
+    fi
     if (( disk_usage >= DISK_WARNING_THRESHOLD )); then
         log "WARNING" "Disk usage exceeded threshold (${disk_usage}% >= ${DISK_WARNING_THRESHOLD}%)" "INIT"
         send_disk_warning "${disk_usage}"
@@ -283,6 +295,11 @@ backup_mail() {
         return 1
     fi
 
+    if [[ "${MAIL_BACKUP_FORMAT}" == "indexed" ]]; then
+        backup_mail_indexed
+        return
+    fi
+
     local rsync_opts=(
         -a
         -v
@@ -304,6 +321,27 @@ backup_mail() {
     fi
 }
 
+backup_mail_indexed() {
+    # Per-mailbox zstd frames + member index (see backup_tools/mail_archive.py)
+    if ! command -v zstd >/dev/null 2>&1 || ! backup_tool_available "${MAIL_ARCHIVE_TOOL}"; then
+        log "ERROR" "Indexed mail backup needs zstd and ${MAIL_ARCHIVE_TOOL}" "MAIL"
+        add_summary "MAIL: failed (indexed archive tool missing)"
+        return 1
+    fi
+
+    if python3 -m "${MAIL_ARCHIVE_TOOL}" write "${MAIL_DATA_DIR}" "${BACKUP_DIR}" --level "${ZSTD_LEVEL}"; then
+        local size
+        size=$(du -sh "${BACKUP_DIR}/mail.tar.zst" | awk '{print $1}')
+        log "INFO" "Indexed mail archive completed (${size})" "MAIL"
+        add_summary "MAIL: success (${size})"
+        return 0
+    fi
+
+    log "ERROR" "Indexed mail archive failed" "MAIL"
+    add_summary "MAIL: failed"
+    return 1
+}
+
 backup_mysql() {
     log "INFO" "Starting MySQL backup" "MYSQL"
 
@@ -318,15 +356,17 @@ backup_mysql() {
     read -r -a MYSQL_DB_ARRAY <<< "${MYSQL_DATABASES}"
 
     for db in "${MYSQL_DB_ARRAY[@]}"; do
-        local dest="${BACKUP_DIR}/mysql/${db}.sql.gz"
+        local dest="${BACKUP_DIR}/mysql/${db}.sql.$(compression_ext)"
         log "INFO" "Backing up database: ${db}" "MYSQL"
+        # Dump streams straight into the compressor; --quick avoids buffering tables in mysqldump
         if docker exec -i "${MYSQL_CONTAINER}" env MYSQL_PWD="${MYSQL_PASSWORD}" mysqldump \
             -u "${MYSQL_USER_VALUE}" \
             --single-transaction \
+            --quick \
             --routines \
             --triggers \
             --events \
-            "${db}" | gzip > "${dest}"; then
+            "${db}" | compress_stream > "${dest}"; then
             log "INFO" "Database backup complete: ${dest}" "MYSQL"
         else
             log "ERROR" "mysqldump failed for ${db}" "MYSQL"
@@ -346,11 +386,14 @@ backup_mysql() {
 }
 
 archive_directory() {
+    # dest_file is given without compression suffix (e.g. config.tar)
     local source_dir="$1"
-    local dest_file="$2"
+    local dest_file="$2.$(compression_ext)"
     local component="$3"
+    local tar_stderr_file
     local tar_stderr
     local tar_exit_code
+    local compress_exit_code
 
     if [[ ! -d "${source_dir}" ]]; then
         log "WARNING" "${component} source missing (${source_dir}); skipping" "${component}"
@@ -360,13 +403,23 @@ archive_directory() {
     # Exclude root-owned files that are not critical for recovery
     # sasl_passwd* files are regenerated by Postfix container on startup
     # Temporarily disable errexit to capture tar exit code
+    # tar streams into the compressor (zstd -T0 uses all cores) - no intermediate file
+    tar_stderr_file=$(mktemp)
     set +e
-    tar_stderr=$(tar -czf "${dest_file}" \
+    tar -cf - \
         --exclude='postfix/sasl_passwd' \
         --exclude='postfix/sasl_passwd.db' \
-        -C "${source_dir}" . 2>&1)
-    tar_exit_code=$?
+        -C "${source_dir}" . 2>"${tar_stderr_file}" | compress_stream > "${dest_file}"
+    tar_exit_code=${PIPESTATUS[0]}
+    compress_exit_code=${PIPESTATUS[1]}
     set -e
+    tar_stderr=$(cat "${tar_stderr_file}")
+    rm -f "${tar_stderr_file}"
+
+    if [[ ${compress_exit_code} -ne 0 ]]; then
+        log "ERROR" "${component} compression failed (${BACKUP_COMPRESSION})" "${component}"
+        return 1
+    fi
 
     # Check tar exit code
     if [[ ${tar_exit_code} -eq 2 ]]; then
@@ -389,7 +442,7 @@ archive_directory() {
 
 backup_config() {
     log "INFO" "Archiving configuration files" "CONFIG"
-    if archive_directory "${CONFIG_DIR}" "${BACKUP_DIR}/config/config.tar.gz" "CONFIG"; then
+    if archive_directory "${CONFIG_DIR}" "${BACKUP_DIR}/config/config.tar" "CONFIG"; then
         add_summary "CONFIG: success"
         return 0
     fi
@@ -399,7 +452,7 @@ backup_config() {
 
 backup_ssl() {
     log "INFO" "Archiving SSL data" "SSL"
-    if archive_directory "${SSL_DIR}" "${BACKUP_DIR}/ssl/certbot.tar.gz" "SSL"; then
+    if archive_directory "${SSL_DIR}" "${BACKUP_DIR}/ssl/certbot.tar" "SSL"; then
         add_summary "SSL: success"
         return 0
     fi
@@ -409,7 +462,7 @@ backup_ssl() {
 
 backup_dkim() {
     log "INFO" "Archiving DKIM keys" "DKIM"
-    if archive_directory "${DKIM_DIR}" "${BACKUP_DIR}/dkim/dkim.tar.gz" "DKIM"; then
+    if archive_directory "${DKIM_DIR}" "${BACKUP_DIR}/dkim/dkim.tar" "DKIM"; then
         add_summary "DKIM: success"
         return 0
     fi
@@ -464,6 +517,7 @@ verify_backup() {
 
     if (cd "${BACKUP_DIR}" && sha256sum -c checksums.sha256 >/dev/null); then
         log "INFO" "Checksum verification passed" "VERIFY"
+        write_manifest
         add_summary "VERIFY: success"
         return 0
     fi
@@ -473,6 +527,44 @@ verify_backup() {
     return 1
 }
 
+write_manifest() {
+    # Per-file size + BLAKE2b manifest used by the portal's parallel verifier
+    if ! backup_tool_available "${BACKUP_MANIFEST_TOOL}"; then
+        log "INFO" "Manifest tool not available; skipping manifest" "VERIFY"
+        return 0
+    fi
+
+    if python3 -m "${BACKUP_MANIFEST_TOOL}" write "${BACKUP_DIR}" >/dev/null 2>&1; then
+        log "INFO" "Manifest written: ${BACKUP_DIR}/manifest.json" "VERIFY"
+    else
+        log "WARNING" "Manifest generation failed" "VERIFY"
+    fi
+    return 0
+}
+
+snapshot_dedup_store() {
+    # Extra history on top of the full mail copy (see DEDUP_STORE_ROOT in backup-config.sh);
+    # unchanged maildir messages are reused from the previous snapshot without being read
+    if [[ -z "${DEDUP_STORE_ROOT}" ]]; then
+        return 0
+    fi
+    if ! backup_tool_available "${DEDUP_STORE_TOOL}"; then
+        log "WARNING" "Dedup store tool not available; skipping snapshot" "DEDUP"
+        return 0
+    fi
+
+    if python3 -m "${DEDUP_STORE_TOOL}" snapshot "${DEDUP_STORE_ROOT}" "${MAIL_DATA_DIR}" \
+        --name "${BACKUP_TYPE}-$(date '+%Y-%m-%d')" >/dev/null; then
+        log "INFO" "Dedup snapshot stored in ${DEDUP_STORE_ROOT}" "DEDUP"
+        add_summary "DEDUP: success"
+        return 0
+    fi
+
+    log "ERROR" "Dedup snapshot failed" "DEDUP"
+    add_summary "DEDUP: failed"
+    return 1
+}
+
 write_backup_log() {
     local end_ts
     end_ts=$(date +%s)
@@ -497,9 +589,76 @@ write_backup_log() {
     } > "${log_file}"
 }
 
+write_catalog_entry() {
+    # Structured run record ingested by the portal's backup catalogue
+    local end_ts
+    end_ts=$(date +%s)
+    local status="success"
+    if (( EXIT_CODE != 0 )); then
+        status="failed"
+    fi
+
+    local components="" entry name result
+    for entry in "${SUMMARY_LOG[@]}"; do
+        name="${entry%%:*}"
+        result="${entry#*: }"
+        result="${result%% *}"
+        name="${name,,}"
+        [[ -n "${components}" ]] && components+=", "
+        components+="\"${name}\": \"${result}\""
+    done
+
+    {
+        printf '{\n'
+        printf '  "version": 1,\n'
+        printf '  "scope": "%s",\n' "${BACKUP_SCOPE}"
+        printf '  "tier": "%s",\n' "${BACKUP_TYPE}"
+        printf '  "started_at": "%s",\n' "$(date -d "@${START_TS}" --iso-8601=seconds)"
+        printf '  "finished_at": "%s",\n' "$(date -d "@${end_ts}" --iso-8601=seconds)"
+        printf '  "duration_seconds": %d,\n' $(( end_ts - START_TS ))
+        printf '  "status": "%s",\n' "${status}"
+        printf '  "compression": "%s",\n' "${BACKUP_COMPRESSION}"
+        printf '  "components": {%s}\n' "${components}"
+        printf '}\n'
+    } > "${BACKUP_DIR}/catalog.json"
+}
+
+retention_available() {
+    backup_tool_available "${RETENTION_TOOL}"
+}
+
+run_retention() {
+    local -a args=(
+        apply --root "${BACKUP_MOUNTPOINT}"
+        --keep-daily "${DAILY_RETENTION_DAYS}"
+        --keep-weekly "${WEEKLY_RETENTION_WEEKS}"
+        --keep-monthly "${MONTHLY_RETENTION_MONTHS}"
+        --max-usage "${BACKUP_MAX_USAGE_PERCENT}"
+        --index "${BACKUP_SIZE_INDEX}" --index-root /mnt/backup-hdd
+    )
+    local scope
+    for scope in ${RETENTION_SCOPES}; do
+        args+=(--scope "${scope}")
+    done
+
+    local -a prefix=(nice -n 19)
+    if command -v ionice >/dev/null 2>&1; then
+        prefix=(ionice -c3 "${prefix[@]}")
+    fi
+    "${prefix[@]}" python3 -m "${RETENTION_TOOL}" "${args[@]}" >> "${LOG_FILE}" 2>&1
+}
+
 cleanup_old_backups() {
     log "INFO" "Cleaning up old backups" "CLEANUP"
 
+    if retention_available; then
+        # Tiered generations + usage ceiling; deletions run at idle I/O priority
+        # in the background so they don't hold up the rest of the run
+        run_retention &
+        log "INFO" "Retention engine started in background (PID $!)" "CLEANUP"
+        return
+    fi
+
     if [[ -d "${DAILY_BACKUP_DIR}" ]]; then
         find "${DAILY_BACKUP_DIR}" -mindepth 1 -maxdepth 1 -type d -mtime +"${DAILY_RETENTION_DAYS}" -print -exec rm -rf {} +
     fi
@@ -582,9 +741,11 @@ main() {
     run_step "DKIM backup" backup_dkim
     run_step "Compose/env backup" backup_env_and_compose
     run_step "Verification" verify_backup
+    run_step "Dedup snapshot" snapshot_dedup_store
     cleanup_old_backups
     update_latest_link
     write_backup_log
+    write_catalog_entry
 
     local status="SUCCESS"
     if (( EXIT_CODE != 0 )); then
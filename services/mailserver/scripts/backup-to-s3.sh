@@ -169,25 +169,58 @@ log "Creating checksum file..."
 
 log "Uploading to S3: s3://${S3_DESTINATION}/"
 
-# Upload with aws s3 sync
-INCLUDE_ARGS=()
-for pattern in ${S3_INCLUDE_PATTERNS}; do
-    INCLUDE_ARGS+=(--include "${pattern}")
-done
+use_parallel_uploader() {
+    backup_tool_available "${S3_UPLOAD_TOOL}" && python3 -c "import boto3" >/dev/null 2>&1
+}
 
-if aws s3 sync \
-    "$LOCAL_BACKUP_DIR/" \
-    "s3://${S3_DESTINATION}/" \
-    --storage-class STANDARD \
-    --no-progress \
-    --exclude "*" \
-    "${INCLUDE_ARGS[@]}" \
-    2>&1 | tee -a "$LOG_FILE"; then
+if use_parallel_uploader; then
+    # Concurrent multipart upload; interrupted runs resume from the journal and
+    # objects whose BLAKE2b hash is unchanged are skipped
+    UPLOADER_ARGS=(
+        --part-size-mb "${S3_PART_SIZE_MB}"
+        --concurrency "${S3_UPLOAD_CONCURRENCY}"
+        --journal "${S3_UPLOAD_JOURNAL}"
+    )
+    for pattern in ${S3_INCLUDE_PATTERNS}; do
+        UPLOADER_ARGS+=(--include "${pattern}")
+    done
+    if [[ -n "${S3_ENDPOINT_URL}" ]]; then
+        UPLOADER_ARGS+=(--endpoint-url "${S3_ENDPOINT_URL}")
+    fi
 
-    log "S3 upload completed successfully"
+    if python3 -m "${S3_UPLOAD_TOOL}" sync \
+        "$LOCAL_BACKUP_DIR" \
+        "s3://${S3_DESTINATION}" \
+        "${UPLOADER_ARGS[@]}" \
+        2>&1 | tee -a "$LOG_FILE"; then
+
+        log "S3 upload completed successfully (parallel uploader)"
+    else
+        log "ERROR: S3 upload failed (re-run to resume from ${S3_UPLOAD_JOURNAL})"
+        exit 1
+    fi
 else
-    log "ERROR: S3 upload failed"
-    exit 1
+    log "INFO: Parallel uploader not available, using aws s3 sync"
+
+    INCLUDE_ARGS=()
+    for pattern in ${S3_INCLUDE_PATTERNS}; do
+        INCLUDE_ARGS+=(--include "${pattern}")
+    done
+
+    if aws s3 sync \
+        "$LOCAL_BACKUP_DIR/" \
+        "s3://${S3_DESTINATION}/" \
+        --storage-class STANDARD \
+        --no-progress \
+        --exclude "*" \
+        "${INCLUDE_ARGS[@]}" \
+        2>&1 | tee -a "$LOG_FILE"; then
+
+        log "S3 upload completed successfully"
+    else
+        log "ERROR: S3 upload failed"
+        exit 1
+    fi
 fi
 
 # =====================================================
@@ -246,12 +246,13 @@ case "$RESTORE_COMPONENT" in
             sleep 30
 
             # Import SQL dumps
-            for sql_gz in "${RESTORE_DIR}"/mysql/*.sql.gz; do
-                if [ -f "$sql_gz" ]; then
-                    db_name=$(basename "${sql_gz}" .sql.gz)
+            for sql_dump in "${RESTORE_DIR}"/mysql/*.sql.gz "${RESTORE_DIR}"/mysql/*.sql.zst; do
+                if [ -f "$sql_dump" ]; then
+                    db_name=$(basename "${sql_dump}")
+                    db_name="${db_name%.sql.*}"
                     log "Importing database: ${db_name}"
 
-                    gunzip -c "${sql_gz}" | docker exec -i "${MYSQL_CONTAINER}" \
+                    decompress_file "${sql_dump}" | docker exec -i "${MYSQL_CONTAINER}" \
                         mysql -u "${MYSQL_USER}" 2>&1 | tee -a "$LOG_FILE"
 
                     log "Database ${db_name} restored"
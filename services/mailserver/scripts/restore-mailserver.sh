@@ -173,6 +173,28 @@ backup_existing_dir() {
 
 restore_mail() {
     local source_mail="${BACKUP_SOURCE}/mail"
+    local source_archive="${BACKUP_SOURCE}/mail.tar.zst"
+
+    # Indexed format (MAIL_BACKUP_FORMAT=indexed): one zstd frame per mailbox
+    if [[ -f "${source_archive}" ]]; then
+        if [[ ${DRY_RUN} -eq 1 ]]; then
+            log "INFO" "[DRY-RUN] Would backup existing mail data to ${MAIL_DATA_DIR}.bak.*"
+            log "INFO" "[DRY-RUN] Would extract ${source_archive} to ${MAIL_DATA_DIR}/"
+            log "INFO" "[DRY-RUN] Archive size: $(du -sh "${source_archive}" | cut -f1)"
+            return 0
+        fi
+
+        if ! command -v zstd >/dev/null 2>&1; then
+            log "ERROR" "zstd is required to restore ${source_archive}"
+            return 1
+        fi
+        backup_existing_dir "${MAIL_DATA_DIR}" "mail data"
+        log "INFO" "Restoring mail data from indexed archive..."
+        # -i: the archive is one tar per mailbox, concatenated
+        zstd -dc "${source_archive}" | tar -xif - -C "${MAIL_DATA_DIR}"
+        return
+    fi
+
     if [[ ! -d "${source_mail}" ]]; then
         log "ERROR" "Mail backup not found in ${source_mail}"
         return 1
@@ -205,10 +227,10 @@ restore_mysql() {
     read_mysql_credentials
 
     shopt -s nullglob
-    local files=("${source_mysql}"/*.sql.gz)
+    local files=("${source_mysql}"/*.sql.gz "${source_mysql}"/*.sql.zst)
     if [[ ${#files[@]} -eq 0 ]]; then
         shopt -u nullglob
-        log "ERROR" "No .sql.gz files in ${source_mysql}"
+        log "ERROR" "No .sql.gz/.sql.zst files in ${source_mysql}"
         return 1
     fi
 
@@ -217,7 +239,7 @@ restore_mysql() {
         for dump in "${files[@]}"; do
             local filename
             filename="$(basename "${dump}")"
-            local db="${filename%.sql.gz}"
+            local db="${filename%.sql.*}"
             local size
             size=$(du -sh "${dump}" | cut -f1)
             log "INFO" "[DRY-RUN]   - ${db} (${size})"
@@ -230,10 +252,10 @@ restore_mysql() {
     for dump in "${files[@]}"; do
         local filename
         filename="$(basename "${dump}")"
-        local db="${filename%.sql.gz}"
+        local db="${filename%.sql.*}"
         log "INFO" "Restoring database ${db} from ${filename}"
         docker exec -i "${MYSQL_CONTAINER}" env MYSQL_PWD="${MYSQL_PASSWORD}" mysql -u "${MYSQL_USER_VALUE}" -e "DROP DATABASE IF EXISTS \`${db}\`; CREATE DATABASE \`${db}\` CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;"
-        if ! gunzip -c "${dump}" | docker exec -i "${MYSQL_CONTAINER}" env MYSQL_PWD="${MYSQL_PASSWORD}" mysql -u "${MYSQL_USER_VALUE}" "${db}"; then
+        if ! decompress_file "${dump}" | docker exec -i "${MYSQL_CONTAINER}" env MYSQL_PWD="${MYSQL_PASSWORD}" mysql -u "${MYSQL_USER_VALUE}" "${db}"; then
             log "ERROR" "Restore failed for database ${db}"
             status=1
             break
@@ -244,12 +266,13 @@ restore_mysql() {
 }
 
 restore_tarball() {
-    local tarball="$1"
+    # Tarball is given without compression suffix; .tar.zst and .tar.gz are accepted
+    local tarball
     local destination="$2"
     local label="$3"
 
-    if [[ ! -f "${tarball}" ]]; then
-        log "ERROR" "${label} tarball not found: ${tarball}"
+    if ! tarball=$(find_compressed "$1"); then
+        log "ERROR" "${label} tarball not found: $1.{zst,gz}"
         return 1
     fi
 
@@ -263,11 +286,11 @@ restore_tarball() {
 
     backup_existing_dir "${destination}" "${label}"
     mkdir -p "${destination}"
-    tar -xzf "${tarball}" -C "${destination}"
+    decompress_file "${tarball}" | tar -xf - -C "${destination}"
 }
 
 restore_config() {
-    restore_tarball "${BACKUP_SOURCE}/config/config.tar.gz" "${CONFIG_DIR}" "configuration" || return 1
+    restore_tarball "${BACKUP_SOURCE}/config/config.tar" "${CONFIG_DIR}" "configuration" || return 1
     
     if [[ ${DRY_RUN} -eq 1 ]]; then
         if [[ -f "${BACKUP_SOURCE}/config/docker-compose.yml" ]]; then
@@ -288,11 +311,11 @@ restore_config() {
 }
 
 restore_ssl() {
-    restore_tarball "${BACKUP_SOURCE}/ssl/certbot.tar.gz" "${MAILSERVER_ROOT}/data/certbot" "SSL" || return 1
+    restore_tarball "${BACKUP_SOURCE}/ssl/certbot.tar" "${MAILSERVER_ROOT}/data/certbot" "SSL" || return 1
 }
 
 restore_dkim() {
-    restore_tarball "${BACKUP_SOURCE}/dkim/dkim.tar.gz" "${DKIM_DIR}" "DKIM" || return 1
+    restore_tarball "${BACKUP_SOURCE}/dkim/dkim.tar" "${DKIM_DIR}" "DKIM" || return 1
 }
 
 restore_components() {
@@ -339,6 +362,9 @@ main() {
     ensure_command tar
     ensure_command docker
     ensure_command gunzip
+    if [[ -n "$(find "${BACKUP_SOURCE}" -name '*.zst' -print -quit 2>/dev/null)" ]]; then
+        ensure_command zstd
+    fi
     ensure_command sha256sum
     mkdir -p "${RESTORE_TEMP_DIR}"
     validate_backup
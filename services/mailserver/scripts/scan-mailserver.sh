@@ -145,6 +145,17 @@ get_clamav_version() {
     fi
 }
 
+# =====================================================
+# Backup Disk Lock
+# =====================================================
+
+# Never scan while a backup is writing to the same disk
+log "Waiting for backup disk I/O lock (${HDD_IO_LOCK})..."
+if ! acquire_hdd_io_lock; then
+    log "ERROR: Backup disk busy for ${HDD_IO_LOCK_WAIT}s; skipping scan"
+    exit 1
+fi
+
 # =====================================================
 # ClamAV Virus Scan
 # =====================================================
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from functools import lru_cache
-from typing import List
+from typing import Dict, List
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -37,6 +37,12 @@ class Settings(BaseSettings):
     blog_db_user: str = "root"
     blog_db_password: str = "password"
 
+    # Database - Target system engine pools (blog / mailserver admin operations)
+    db_pool_size: int = 5
+    db_max_overflow: int = 5
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 3600
+
     # WordPress Database User (for wp-cli config create)
     blog_wp_db_user: str = "wpuser"
     blog_wp_db_password: str = "password"
@@ -68,6 +74,60 @@ class Settings(BaseSettings):
     cloudflare_api_token: str = ""
     cloudflare_account_id: str = ""
     cloudflare_tunnel_id: str = ""
+    cloudflare_tunnel_batch_window: float = 0.2  # Seconds to batch ingress changes into one write
+    cloudflare_api_timeout: float = 30.0
+    cloudflare_api_max_retries: int = 3
+    cloudflare_api_rate_limit: int = 1200  # Requests per rate period (Cloudflare's per-user limit)
+    cloudflare_api_rate_period: float = 300.0
+    cloudflare_zone_cache_ttl: int = 3600  # Seconds; stale zones refresh in the background
+    cloudflare_dns_mirror_ttl: int = 300  # Seconds; stale DNS records reload in the background
+    cloudflare_zone_settings_ttl: int = 300  # Seconds zone settings (SSL/TLS) are cached
+    cloudflare_dns_import_concurrency: int = 8
+
+    # DNS propagation checks (name -> DoH JSON endpoint)
+    dns_doh_resolvers: Dict[str, str] = {
+        "Google": "https://dns.google/resolve",
+        "Cloudflare": "https://cloudflare-dns.com/dns-query",
+        "Quad9": "https://dns.quad9.net/dns-query",
+    }
+    dns_doh_timeout: float = 10.0
+    dns_watch_max_active: int = 20
+
+    # Declarative DNS zones (plan/apply)
+    dns_zone_dir: str = "data/dns-zones"  # <zone>.yml desired record files
+    dns_mail_hostname: str = "mail.kuma8088.com"  # MX target of mail domains
+    dns_mail_spf: str = "v=spf1 mx include:sendgrid.net ~all"  # Outbound mail relays via SendGrid
+    dns_mail_dmarc: str = ""  # _dmarc TXT content (empty: not managed)
+    dns_mail_dkim_dir: str = ""  # opendkim key directory (<domain>/<selector>.txt; empty: not managed)
+    dns_mail_dkim_selector: str = "default"
+    dns_mail_ttl: int = 3600
+
+    # TLS certificate inventory (PEM files parsed from these directories)
+    certificate_dirs: List[str] = [
+        "/var/lib/tailscale/certs",
+        "/etc/letsencrypt/live",
+        "/opt/onprem-infra-system/project-root-infra/services/blog/config/nginx/ssl",
+    ]
+    certificate_expiry_warning_days: int = 14
+
+    # Backups
+    backup_root: str = "/mnt/backup-hdd"
+    backup_index_path: str = "data/backup_index.sqlite3"
+    backup_scan_workers: int = 4
+    dedup_store_path: str = "/mnt/backup-hdd/dedup"
+    backup_restore_root: str = "/mnt/backup-hdd/restore"
+    backup_catalog_path: str = "data/backup_catalog.sqlite3"
+    backup_catalog_scopes: List[str] = ["mailserver", "rental/mail", "rental/blog"]
+    backup_catalog_max_age: int = 300  # Seconds before reads re-sync the catalogue
+    backup_mail_scopes: List[str] = ["mailserver", "rental/mail"]  # Scopes mailbox restores may use
+    backup_pipeline_root: str = "/mnt/backup-hdd/pipeline"
+    backup_compression_level: int = 3
+    backup_retention_keep_daily: int = 30
+    backup_retention_keep_weekly: int = 12
+    backup_retention_keep_monthly: int = 12
+    backup_retention_max_usage_percent: float = 75.0  # Below the 80% disk warning
+    backup_retention_min_keep: int = 1
+    backup_jobs_path: str = "data/backup_jobs"  # Shared with the host-side job runner
 
     # Nginx Configuration (for Blog System management)
     nginx_config_dir: str = "/etc/nginx/conf.d"
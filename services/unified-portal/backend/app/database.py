@@ -1,9 +1,11 @@
 """Database connection and session management."""
 from __future__ import annotations
 
-from typing import Generator
+import threading
+from typing import Any, Dict, Generator
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session, sessionmaker
 
@@ -106,3 +108,107 @@ def get_blog_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+# ============================================================================
+# Target System Engine Registry (DDL / admin operations)
+# ============================================================================
+
+# Process-wide AUTOCOMMIT engines keyed by target system.
+# Services must use get_target_engine() instead of creating their own engines,
+# otherwise every request opens a new pool that is never disposed.
+_target_engines: Dict[str, Engine] = {}
+_target_engines_lock = threading.Lock()
+
+
+def _target_database_url(target: str) -> str:
+    """Resolve SQLAlchemy URL for a target system.
+
+    Args:
+        target: Target system (blog or mailserver)
+
+    Returns:
+        Database URL
+
+    Raises:
+        ValueError: If target is unknown
+    """
+    if target == "blog":
+        return settings.blog_database_url
+    if target == "mailserver":
+        return settings.mailserver_database_url
+    raise ValueError(f"Invalid target system: {target}")
+
+
+def get_target_engine(target: str) -> Engine:
+    """Get shared AUTOCOMMIT engine for a target system.
+
+    Engines are created lazily on first use with explicitly sized pools
+    and reused for the lifetime of the process.
+
+    Args:
+        target: Target system (blog or mailserver)
+
+    Returns:
+        SQLAlchemy engine
+
+    Raises:
+        ValueError: If target is unknown
+    """
+    engine_ = _target_engines.get(target)
+    if engine_ is not None:
+        return engine_
+
+    with _target_engines_lock:
+        if target not in _target_engines:
+            _target_engines[target] = create_engine(
+                _target_database_url(target),
+                pool_pre_ping=True,
+                pool_recycle=settings.db_pool_recycle,
+                pool_size=settings.db_pool_size,
+                max_overflow=settings.db_max_overflow,
+                pool_timeout=settings.db_pool_timeout,
+                isolation_level="AUTOCOMMIT",
+                echo=settings.debug,
+            )
+        return _target_engines[target]
+
+
+def get_engine_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Get connection pool metrics for all engines.
+
+    Returns:
+        Pool metrics keyed by engine name
+    """
+    engines: Dict[str, Engine] = {
+        "portal": engine,
+        "mailserver_usermgmt": mailserver_engine,
+        "blog": blog_engine,
+    }
+    engines.update({f"target:{name}": eng for name, eng in _target_engines.items()})
+
+    stats: Dict[str, Dict[str, Any]] = {}
+    for name, eng in engines.items():
+        pool = eng.pool
+        stats[name] = {
+            "pool_size": pool.size() if hasattr(pool, "size") else None,
+            "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+            "checked_in": pool.checkedin() if hasattr(pool, "checkedin") else None,
+            "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+        }
+    return stats
+
+
+def dispose_engines() -> None:
+    """Dispose all engines and close pooled connections.
+
+    Called from the application lifespan on shutdown.
+    """
+    with _target_engines_lock:
+        for eng in _target_engines.values():
+            eng.dispose()
+        _target_engines.clear()
+
+    engine.dispose()
+    mailserver_engine.dispose()
+    blog_engine.dispose()
@@ -10,7 +10,8 @@ from fastapi.responses import JSONResponse
 from loguru import logger
 
 from app.config import get_settings
-from app.database import Base, engine
+from app.database import Base, dispose_engines, engine
+from app.services.cloudflare_api_service import close_cloudflare_client
 
 settings = get_settings()
 
@@ -35,6 +36,10 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     yield
 
     # Shutdown
+    await close_cloudflare_client()
+    logger.info("Cloudflare API client closed")
+    dispose_engines()
+    logger.info("Database engines disposed")
     logger.info(f"Shutting down {settings.app_name}")
 
 
@@ -2,12 +2,26 @@
 Backup management API endpoints.
 """
 
-from typing import List, Dict, Any
-from fastapi import APIRouter, HTTPException
+from typing import List, Dict, Any, Literal, Optional
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 from datetime import datetime
 import os
 import glob
+import re
+
+from app.config import get_settings
+from app.services.backup_catalog_service import get_backup_catalog
+from app.services.backup_index_service import get_backup_size_index
+from app.services.backup_pipeline_service import get_backup_pipeline_service
+from app.services.backup_retention_service import BackupSizes, RetentionPolicy, get_backup_retention_service
+from app.services.backup_scheduler_service import get_backup_job_store
+from app.services.backup_verify_service import get_backup_verify_service
+from app.services.database_dump_service import get_database_dump_service
+from app.services.dedup_store_service import get_dedup_store_service
+from app.services.mail_archive_service import get_mailbox_restore_service
+from backup_tools.scheduler import PIPELINES
 
 
 router = APIRouter(prefix="/api/v1/backup", tags=["Backup"])
@@ -17,9 +31,11 @@ router = APIRouter(prefix="/api/v1/backup", tags=["Backup"])
 class BackupInfo(BaseModel):
     """Backup information."""
     date: str
-    size_mb: float
+    size_mb: Optional[float]  # None while size_status is pending or unknown
     path: str
     type: str  # daily, weekly
+    file_count: Optional[int] = None
+    size_status: str = "indexed"  # indexed, pending (scan cancelled), unknown (unreadable)
 
 
 class MailserverBackups(BaseModel):
@@ -40,6 +56,223 @@ class BackupStats(BaseModel):
     last_backup_time: str
     mailserver_backups: int
     blog_backups: int
+    unsized_backups: int = 0  # Not in total_size_gb (scan pending or directory unreadable)
+
+
+class BackupIndexEntry(BaseModel):
+    """Backup size index entry."""
+    path: str
+    size_mb: float
+    file_count: int
+    cached: bool
+
+
+class BackupScanProgress(BaseModel):
+    """Progress of the parallel backup size scan."""
+    running: bool
+    done: int
+    total: int
+    last_path: Optional[str] = None
+
+
+class BackupVerifyJob(BaseModel):
+    """Backup verification job."""
+    job_id: str
+    backup_id: str
+    status: str  # queued, running, completed, failed
+    queued_at: str
+    finished_at: Optional[str] = None
+    progress: Dict[str, int]
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+class DedupSnapshot(BaseModel):
+    """Snapshot in the deduplicating backup store."""
+    id: str
+    name: str
+    source: str
+    created_at: str
+    file_count: int
+    total_size: int
+    new_bytes: int
+    duration_seconds: float
+
+
+class DedupStoreSummary(BaseModel):
+    """Deduplicating store statistics and snapshots."""
+    stats: Dict[str, Any]
+    snapshots: List[DedupSnapshot]
+
+
+class DedupSnapshotRequest(BaseModel):
+    """Request to snapshot a directory into the dedup store."""
+    source: str  # Relative to the backup root (e.g. mailserver/daily/2025-11-10/mail)
+    name: Optional[str] = None
+
+
+class DedupRestoreRequest(BaseModel):
+    """Request to restore a dedup snapshot."""
+    target: str  # Relative to the restore root
+    prefix: Optional[str] = None  # e.g. example.com/user/Maildir
+
+
+class DedupJob(BaseModel):
+    """Dedup snapshot/restore job."""
+    job_id: str
+    kind: str  # snapshot, restore
+    params: Dict[str, Any]
+    status: str  # queued, running, completed, failed
+    queued_at: str
+    finished_at: Optional[str] = None
+    progress: Dict[str, int]
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+class CatalogComponent(BaseModel):
+    """Component of a catalogued backup run."""
+    component: str
+    status: str
+    artifact: str
+    size_bytes: int
+
+
+class CatalogRun(BaseModel):
+    """Catalogued backup run."""
+    id: str
+    scope: str
+    tier: str
+    backup_date: str
+    path: str
+    status: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    duration_seconds: Optional[int] = None
+    size_bytes: int
+    file_count: int
+    checksum: Optional[str] = None
+    components: List[CatalogComponent] = []
+
+
+class CatalogMailboxBackup(BaseModel):
+    """Latest good backup of a mailbox."""
+    mailbox: str
+    run_id: str
+    backup_date: str
+    artifact: str
+    size_bytes: int
+    file_count: int
+
+
+class CatalogSyncResult(BaseModel):
+    """Result of a catalogue sync."""
+    updated: int
+    unchanged: int
+    removed: int
+
+
+class RestorePlanStep(BaseModel):
+    """One artifact to read for a restore."""
+    component: str
+    mailbox: Optional[str] = None
+    run_id: str
+    backup_date: str
+    artifact: str
+    read_bytes: int
+
+
+class RestorePlan(BaseModel):
+    """Minimal set of artifacts to read for a restore."""
+    scope: str
+    before: Optional[str] = None
+    steps: List[RestorePlanStep]
+    total_read_bytes: int
+    missing: List[str]
+
+
+class BackupPipelineRequest(BaseModel):
+    """Request to start a streaming backup pipeline."""
+    kind: Literal["tar", "mysqldump"]
+    source: str  # tar: directory relative to the backup root; mysqldump: database name
+    name: Optional[str] = None  # Output file name (without suffix)
+
+
+class BackupPipelineJob(BaseModel):
+    """Streaming backup pipeline job with per-stage throughput."""
+    job_id: str
+    kind: str
+    destination: str
+    compressor: str
+    status: str  # queued, running, completed, failed
+    queued_at: str
+    finished_at: Optional[str] = None
+    stages: List[Dict[str, Any]]
+    compression_ratio: Optional[float] = None
+    error: Optional[str] = None
+
+
+class MailboxRestoreJob(BaseModel):
+    """Per-mailbox restore job."""
+    job_id: str
+    mailbox: str
+    folder: Optional[str] = None
+    backup_id: str
+    target: str
+    status: str  # queued, running, completed, failed
+    queued_at: str
+    finished_at: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+class RetentionRunRequest(BaseModel):
+    """Request to start a retention run."""
+    dry_run: bool = True  # Only dry runs; pruning runs on the host
+    max_usage_percent: Optional[float] = None  # Override the configured ceiling
+
+
+class RetentionJob(BaseModel):
+    """Retention run with its plan."""
+    job_id: str
+    dry_run: bool
+    status: str  # queued, running, completed, failed
+    queued_at: str
+    finished_at: Optional[str] = None
+    plan: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+class BackupJobRequest(BaseModel):
+    """Request to queue a backup pipeline run on the host job runner."""
+    pipeline: Literal["daily", "weekly", "upload", "verify"]
+
+
+class BackupJobStep(BaseModel):
+    """Progress of one pipeline step."""
+    name: str
+    status: str  # pending, running, completed, failed, skipped
+    started_at: Optional[str] = None
+    seconds: Optional[float] = None
+    read_bytes: int
+    write_bytes: int
+    mb_per_s: Optional[float] = None
+    eta_seconds: Optional[int] = None
+    exit_code: Optional[int] = None
+
+
+class BackupJob(BaseModel):
+    """Backup pipeline run tracked by the host job runner."""
+    job_id: str
+    pipeline: str
+    trigger: str  # cron, portal
+    status: str  # queued, waiting (for the disk lock), running, completed, failed
+    queued_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    eta_seconds: Optional[int] = None
+    steps: List[BackupJobStep]
+    error: Optional[str] = None
 
 
 class BackupSchedule(BaseModel):
@@ -51,18 +284,81 @@ class BackupSchedule(BaseModel):
 
 
 # Helper Functions
-def get_directory_size(path: str) -> float:
-    """Get directory size in MB."""
-    total_size = 0
-    try:
-        for dirpath, dirnames, filenames in os.walk(path):
-            for filename in filenames:
-                filepath = os.path.join(dirpath, filename)
-                if os.path.exists(filepath):
-                    total_size += os.path.getsize(filepath)
-    except Exception:
-        pass
-    return round(total_size / (1024 * 1024), 2)
+def list_backup_dirs(backup_path: str) -> List[str]:
+    """List backup directories under a tier directory, newest first."""
+    if not os.path.exists(backup_path):
+        return []
+    return [d for d in sorted(glob.glob(f"{backup_path}/*"), reverse=True) if os.path.isdir(d)]
+
+
+def build_backup_infos(backup_dirs: List[tuple]) -> List[BackupInfo]:
+    """Build backup infos from (path, type) pairs.
+
+    Sizes come from the size index; changed directories are re-scanned in
+    parallel, one worker per backup directory.
+    """
+    entries = get_backup_size_index().get_many(path for path, _ in backup_dirs)
+    return [build_backup_info(path, backup_type, entries[path]) for path, backup_type in backup_dirs]
+
+
+def build_backup_info(backup_dir: str, backup_type: str, entry: Dict[str, Any]) -> BackupInfo:
+    """Build backup info from a size index entry."""
+    size_bytes = entry["size_bytes"]
+    return BackupInfo(
+        date=parse_backup_date(backup_dir),
+        size_mb=round(size_bytes / (1024 * 1024), 2) if size_bytes is not None else None,
+        path=backup_dir,
+        type=backup_type,
+        file_count=entry["file_count"],
+        size_status=entry.get("status", "indexed"),
+    )
+
+
+def refresh_index_entry(real_path: str) -> Dict[str, Any]:
+    """Re-scan one backup directory and prune removed ones from the size index."""
+    index = get_backup_size_index()
+    entry = index.get(real_path, force=True)
+    index.prune()
+    return entry
+
+
+def resolve_backup_path(path: str) -> str:
+    """Resolve a backup directory, ensuring it stays under the backup root.
+
+    Args:
+        path: Absolute path or path relative to the backup root
+
+    Returns:
+        Real absolute path
+
+    Raises:
+        HTTPException: If the path is outside the backup root or missing
+    """
+    backup_root = os.path.realpath(get_settings().backup_root)
+    real_path = os.path.realpath(os.path.join(backup_root, path))
+    if os.path.commonpath([backup_root, real_path]) != backup_root or not os.path.isdir(real_path):
+        raise HTTPException(status_code=404, detail=f"Backup directory not found: {path}")
+    return real_path
+
+
+async def synced_backup_catalog():
+    """Get the backup catalogue, re-synced first if backups changed (off the event loop)."""
+    catalog = get_backup_catalog()
+    await run_in_threadpool(catalog.refresh_if_stale)
+    return catalog
+
+
+def resolve_restore_target(target: str) -> str:
+    """Resolve a restore target, ensuring it stays under the restore root.
+
+    Raises:
+        HTTPException: If the target is outside the restore root
+    """
+    restore_root = os.path.realpath(get_settings().backup_restore_root)
+    real_path = os.path.realpath(os.path.join(restore_root, target))
+    if os.path.commonpath([restore_root, real_path]) != restore_root:
+        raise HTTPException(status_code=400, detail=f"Restore target must be under {restore_root}")
+    return real_path
 
 
 def parse_backup_date(backup_path: str) -> str:
@@ -95,36 +391,14 @@ async def list_mailserver_backups():
     """
     try:
         backup_base = "/mnt/backup-hdd/mailserver"
-        daily_backups = []
-        weekly_backups = []
-
-        # List daily backups
-        daily_path = os.path.join(backup_base, "daily")
-        if os.path.exists(daily_path):
-            for backup_dir in sorted(glob.glob(f"{daily_path}/*"), reverse=True):
-                if os.path.isdir(backup_dir):
-                    date = parse_backup_date(backup_dir)
-                    size = get_directory_size(backup_dir)
-                    daily_backups.append(BackupInfo(
-                        date=date,
-                        size_mb=size,
-                        path=backup_dir,
-                        type="daily"
-                    ))
-
-        # List weekly backups
-        weekly_path = os.path.join(backup_base, "weekly")
-        if os.path.exists(weekly_path):
-            for backup_dir in sorted(glob.glob(f"{weekly_path}/*"), reverse=True):
-                if os.path.isdir(backup_dir):
-                    date = parse_backup_date(backup_dir)
-                    size = get_directory_size(backup_dir)
-                    weekly_backups.append(BackupInfo(
-                        date=date,
-                        size_mb=size,
-                        path=backup_dir,
-                        type="weekly"
-                    ))
+
+        # List daily and weekly backups
+        backup_dirs = [(d, "daily") for d in list_backup_dirs(os.path.join(backup_base, "daily"))]
+        backup_dirs += [(d, "weekly") for d in list_backup_dirs(os.path.join(backup_base, "weekly"))]
+        backups = await run_in_threadpool(build_backup_infos, backup_dirs)
+
+        daily_backups = [b for b in backups if b.type == "daily"]
+        weekly_backups = [b for b in backups if b.type == "weekly"]
 
         return MailserverBackups(
             daily=daily_backups,
@@ -134,6 +408,55 @@ async def list_mailserver_backups():
         raise HTTPException(status_code=500, detail=f"Failed to list mailserver backups: {str(e)}")
 
 
+@router.post("/mailserver/restore", response_model=MailboxRestoreJob, status_code=202)
+async def restore_mailbox(
+    user: str = Query(..., pattern=r"^[^@/\s]+@[^@/\s]+$"),
+    folder: Optional[str] = None,
+    date: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+):
+    """
+    Restore one mailbox, or one folder of it, from the latest good backup (runs in the background).
+
+    The backup is chosen from the catalogue. Indexed archives are read by
+    seeking to the mailbox's frame; rsync'd backups copy only the mailbox
+    subtree. Files land in <backup_restore_root>/mailboxes/<user>/<timestamp>/
+    for the admin to move into place.
+
+    Args:
+        user: Email address
+        folder: IMAP folder (INBOX, Sent, Archive/2024); whole mailbox if omitted
+        date: Restore from the latest backup on or before this date (YYYY-MM-DD)
+
+    Returns:
+        Queued restore job
+    """
+    run = (await synced_backup_catalog()).latest_mailbox_backup(user, date)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"No backup found for mailbox: {user}")
+
+    target = resolve_restore_target(
+        os.path.join("mailboxes", user.lower(), datetime.now().strftime("%Y%m%d-%H%M%S"))
+    )
+    return get_mailbox_restore_service().start(user, folder, run["id"], run["path"], target)
+
+
+@router.get("/mailserver/restore/jobs/{job_id}", response_model=MailboxRestoreJob)
+async def get_mailbox_restore_job(job_id: str):
+    """
+    Get status and result of a per-mailbox restore job.
+
+    Args:
+        job_id: Job ID
+
+    Returns:
+        Restore job
+    """
+    job = get_mailbox_restore_service().get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Restore job not found: {job_id}")
+    return job
+
+
 @router.get("/blog/list", response_model=BlogBackups)
 async def list_blog_backups():
     """
@@ -144,22 +467,13 @@ async def list_blog_backups():
     """
     try:
         backup_base = "/mnt/backup-hdd/rental/blog"
-        backups = []
 
         # Check daily and weekly backups
+        backup_dirs = []
         for backup_type in ["daily", "weekly"]:
             backup_path = os.path.join(backup_base, backup_type)
-            if os.path.exists(backup_path):
-                for backup_dir in sorted(glob.glob(f"{backup_path}/*"), reverse=True):
-                    if os.path.isdir(backup_dir):
-                        date = parse_backup_date(backup_dir)
-                        size = get_directory_size(backup_dir)
-                        backups.append(BackupInfo(
-                            date=date,
-                            size_mb=size,
-                            path=backup_dir,
-                            type=f"blog-{backup_type}"
-                        ))
+            backup_dirs += [(d, f"blog-{backup_type}") for d in list_backup_dirs(backup_path)]
+        backups = await run_in_threadpool(build_backup_infos, backup_dirs)
 
         return BlogBackups(backups=backups)
     except Exception as e:
@@ -183,12 +497,14 @@ async def get_backup_stats():
         blog_backups = await list_blog_backups()
         blog_count = len(blog_backups.backups)
 
-        # Calculate total size
+        # Calculate total size (backups still being sized are counted separately)
         total_size_mb = 0.0
-        for backup in mailserver_backups.daily + mailserver_backups.weekly:
-            total_size_mb += backup.size_mb
-        for backup in blog_backups.backups:
-            total_size_mb += backup.size_mb
+        unsized = 0
+        for backup in mailserver_backups.daily + mailserver_backups.weekly + blog_backups.backups:
+            if backup.size_mb is None:
+                unsized += 1
+            else:
+                total_size_mb += backup.size_mb
 
         total_size_gb = round(total_size_mb / 1024, 2)
 
@@ -213,12 +529,458 @@ async def get_backup_stats():
             total_size_gb=total_size_gb,
             last_backup_time=last_backup_time,
             mailserver_backups=mailserver_count,
-            blog_backups=blog_count
+            blog_backups=blog_count,
+            unsized_backups=unsized,
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get backup stats: {str(e)}")
 
 
+@router.post("/index/refresh", response_model=BackupIndexEntry)
+async def refresh_backup_index(path: str):
+    """
+    Re-scan one backup directory and update the size index.
+
+    Backup scripts can call this when a backup completes.
+
+    Args:
+        path: Backup directory (must be under the backup root)
+
+    Returns:
+        Updated index entry
+    """
+    real_path = resolve_backup_path(path)
+
+    try:
+        # Walking a cold HDD takes a while; keep it off the event loop
+        entry = await run_in_threadpool(refresh_index_entry, real_path)
+        return BackupIndexEntry(
+            path=real_path,
+            size_mb=round(entry["size_bytes"] / (1024 * 1024), 2),
+            file_count=entry["file_count"],
+            cached=entry["cached"],
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to refresh backup index: {str(e)}")
+
+
+@router.get("/index/progress", response_model=BackupScanProgress)
+async def get_backup_scan_progress():
+    """
+    Get progress of the current backup size scan.
+
+    Returns:
+        Scan progress
+    """
+    return BackupScanProgress(**get_backup_size_index().scan_progress)
+
+
+@router.post("/index/cancel", response_model=BackupScanProgress)
+async def cancel_backup_scan():
+    """
+    Cancel the running backup size scan.
+
+    Directories already scanned stay indexed; the rest are scanned on the next listing.
+
+    Returns:
+        Scan progress at cancellation
+    """
+    index = get_backup_size_index()
+    index.cancel_scan()
+    return BackupScanProgress(**index.scan_progress)
+
+
+def get_dedup_service():
+    """Get dedup store service for the configured store path."""
+    return get_dedup_store_service(get_settings().dedup_store_path)
+
+
+@router.get("/dedup/snapshots", response_model=DedupStoreSummary)
+async def list_dedup_snapshots(source: Optional[str] = None):
+    """
+    List snapshots in the deduplicating backup store.
+
+    Args:
+        source: Only snapshots of this source directory
+
+    Returns:
+        Store statistics and snapshots (newest first)
+    """
+    try:
+        store = get_dedup_service().store
+        return DedupStoreSummary(
+            stats=await run_in_threadpool(store.stats),
+            snapshots=await run_in_threadpool(store.list_snapshots, source),
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to read dedup store: {str(e)}")
+
+
+@router.post("/dedup/snapshots", response_model=DedupJob, status_code=202)
+async def create_dedup_snapshot(request: DedupSnapshotRequest):
+    """
+    Snapshot a backup directory into the deduplicating store (runs in the background).
+
+    Note: the store must be writable; /mnt/backup-hdd is mounted read-only by default.
+
+    Args:
+        request: Source directory and optional snapshot name
+
+    Returns:
+        Queued snapshot job
+    """
+    source = resolve_backup_path(request.source)
+    return get_dedup_service().start_snapshot(source, name=request.name)
+
+
+@router.post("/dedup/snapshots/{snapshot_id}/restore", response_model=DedupJob, status_code=202)
+async def restore_dedup_snapshot(snapshot_id: str, request: DedupRestoreRequest):
+    """
+    Restore a dedup snapshot, or a subtree of it, into the restore root (runs in the background).
+
+    Args:
+        snapshot_id: Snapshot ID
+        request: Target directory and optional path prefix
+
+    Returns:
+        Queued restore job
+    """
+    target = resolve_restore_target(request.target)
+    return get_dedup_service().start_restore(snapshot_id, target, prefix=request.prefix)
+
+
+@router.get("/dedup/jobs/{job_id}", response_model=DedupJob)
+async def get_dedup_job(job_id: str):
+    """
+    Get status and result of a dedup snapshot/restore job.
+
+    Args:
+        job_id: Job ID
+
+    Returns:
+        Dedup job
+    """
+    job = get_dedup_service().get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Dedup job not found: {job_id}")
+    return job
+
+
+@router.post("/catalog/sync", response_model=CatalogSyncResult)
+async def sync_backup_catalog():
+    """
+    Catalogue new or changed backup directories and drop removed ones.
+
+    Catalogue reads already sync when backups were added or removed (or
+    after backup_catalog_max_age); this forces a sync now.
+
+    Returns:
+        Counts of updated, unchanged and removed runs
+    """
+    try:
+        return await run_in_threadpool(get_backup_catalog().sync)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to sync backup catalogue: {str(e)}")
+
+
+@router.get("/catalog/runs", response_model=List[CatalogRun])
+async def list_catalog_runs(
+    scope: Optional[str] = None,
+    tier: Optional[str] = None,
+    status: Optional[str] = None,
+    before: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    after: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """
+    Query catalogued backup runs (newest first).
+
+    Args:
+        scope: Scope (mailserver, rental/mail, rental/blog)
+        tier: daily, weekly or monthly
+        status: success, failed or unknown
+        before: Only runs on or before this date (YYYY-MM-DD)
+        after: Only runs on or after this date (YYYY-MM-DD)
+        limit: Maximum number of runs
+
+    Returns:
+        Backup runs with components
+    """
+    return (await synced_backup_catalog()).list_runs(scope, tier, status, before, after, limit)
+
+
+@router.get("/catalog/mailboxes/{mailbox}/latest", response_model=CatalogMailboxBackup)
+async def get_latest_mailbox_backup(
+    mailbox: str,
+    before: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+):
+    """
+    Get the latest good backup of a mailbox, optionally on or before a date.
+
+    Args:
+        mailbox: Email address
+        before: Point in time (YYYY-MM-DD)
+
+    Returns:
+        Backup run and maildir artifact
+    """
+    run = (await synced_backup_catalog()).latest_mailbox_backup(mailbox, before)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"No backup found for mailbox: {mailbox}")
+    return CatalogMailboxBackup(
+        mailbox=mailbox.lower(),
+        run_id=run["id"],
+        backup_date=run["backup_date"],
+        artifact=os.path.join(run["path"], run["mailbox_artifact"]),
+        size_bytes=run["mailbox_size_bytes"],
+        file_count=run["mailbox_file_count"],
+    )
+
+
+@router.get("/catalog/restore-plan", response_model=RestorePlan)
+async def plan_restore(
+    scope: str = "mailserver",
+    components: List[str] = Query(["mail", "mysql", "config", "ssl", "dkim"]),
+    mailbox: List[str] = Query([]),
+    before: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+):
+    """
+    Plan the minimal set of backup artifacts to read for a restore.
+
+    Mailboxes are planned from their own maildir subtree instead of the
+    whole mail component.
+
+    Args:
+        scope: Scope (mailserver, rental/mail, rental/blog)
+        components: Components to restore
+        mailbox: Mailboxes to restore (repeatable)
+        before: Point in time (YYYY-MM-DD); latest when omitted
+
+    Returns:
+        Restore plan
+    """
+    return (await synced_backup_catalog()).plan_restore(scope, components, before, mailbox)
+
+
+@router.post("/pipeline/runs", response_model=BackupPipelineJob, status_code=202)
+async def start_backup_pipeline(request: BackupPipelineRequest):
+    """
+    Start a streaming backup pipeline (tar or mysqldump → zstd → file).
+
+    Output goes to <backup_pipeline_root>/<date>/<name>.tar.zst (or .sql.zst);
+    gzip is used when zstd is not installed.
+
+    Args:
+        request: Pipeline kind, source and optional output name
+
+    Returns:
+        Queued pipeline job
+    """
+    settings = get_settings()
+    name = request.name or os.path.basename(request.source.rstrip("/")) or "backup"
+    if not re.match(r"^[A-Za-z0-9_-][A-Za-z0-9._-]*$", name):
+        raise HTTPException(status_code=400, detail=f"Invalid output name: {name}")
+    dest_base = os.path.join(settings.backup_pipeline_root, datetime.now().strftime("%Y-%m-%d"), name)
+
+    service = get_backup_pipeline_service()
+    service.compression_level = settings.backup_compression_level
+    if request.kind == "tar":
+        return service.start_tar(resolve_backup_path(request.source), dest_base)
+
+    dump_service = get_database_dump_service()
+    try:
+        if not await dump_service.database_exists(request.source):
+            raise HTTPException(status_code=404, detail=f"Database not found: {request.source}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=f"Failed to start pipeline: {str(e)}")
+    return service.start_mysqldump(dump_service.container, request.source, dump_service.password, dest_base)
+
+
+@router.get("/pipeline/runs", response_model=List[BackupPipelineJob])
+async def list_backup_pipelines():
+    """
+    List streaming backup pipeline jobs (newest first).
+
+    Returns:
+        Pipeline jobs with per-stage MB/s
+    """
+    return get_backup_pipeline_service().list_jobs()
+
+
+@router.get("/pipeline/runs/{job_id}", response_model=BackupPipelineJob)
+async def get_backup_pipeline(job_id: str):
+    """
+    Get a streaming backup pipeline job with live per-stage throughput.
+
+    Args:
+        job_id: Job ID
+
+    Returns:
+        Pipeline job
+    """
+    job = get_backup_pipeline_service().get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Pipeline job not found: {job_id}")
+    return job
+
+
+@router.post("/retention/runs", response_model=RetentionJob, status_code=202)
+async def start_retention_run(request: RetentionRunRequest):
+    """
+    Plan backup retention in the background.
+
+    Tiers keep their configured generations; beyond that, backups are
+    planned for pruning until the disk is under the usage ceiling. Sizes
+    come from the size index.
+
+    /mnt/backup-hdd is mounted read-only, so the portal only plans; the
+    backup scripts prune on the host (python3 -m backup_tools.retention apply).
+
+    Args:
+        request: Dry-run flag (must be true) and optional ceiling override
+
+    Returns:
+        Queued retention job
+
+    Raises:
+        HTTPException: 400 if a non-dry run is requested
+    """
+    if not request.dry_run:
+        raise HTTPException(
+            status_code=400,
+            detail="Retention is only planned here; pruning runs on the host (python3 -m backup_tools.retention apply)",
+        )
+    settings = get_settings()
+    policy = RetentionPolicy(
+        keep={
+            "daily": settings.backup_retention_keep_daily,
+            "weekly": settings.backup_retention_keep_weekly,
+            "monthly": settings.backup_retention_keep_monthly,
+        },
+        max_usage_percent=(
+            request.max_usage_percent
+            if request.max_usage_percent is not None
+            else settings.backup_retention_max_usage_percent
+        ),
+        min_keep=settings.backup_retention_min_keep,
+    )
+    return get_backup_retention_service().start(
+        settings.backup_root,
+        policy,
+        settings.backup_catalog_scopes,
+        sizes=BackupSizes(settings.backup_index_path),
+    )
+
+
+@router.get("/retention/runs/{job_id}", response_model=RetentionJob)
+async def get_retention_run(job_id: str):
+    """
+    Get a retention run with its plan.
+
+    Args:
+        job_id: Job ID
+
+    Returns:
+        Retention job
+    """
+    job = get_backup_retention_service().get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Retention job not found: {job_id}")
+    return job
+
+
+def get_job_store():
+    """Get backup job store for the configured state directory."""
+    return get_backup_job_store(get_settings().backup_jobs_path)
+
+
+@router.get("/jobs", response_model=List[BackupJob])
+async def list_backup_jobs(
+    pipeline: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+):
+    """
+    List backup pipeline runs (newest first), including cron-started ones.
+
+    Args:
+        pipeline: Only runs of this pipeline
+        limit: Maximum number of runs
+
+    Returns:
+        Backup jobs with per-step progress
+    """
+    return await run_in_threadpool(get_job_store().list_jobs, pipeline, limit)
+
+
+@router.post("/jobs", response_model=BackupJob, status_code=202)
+async def queue_backup_job(request: BackupJobRequest):
+    """
+    Queue a backup pipeline run on the host job runner.
+
+    The run starts once the runner picks it up and the backup disk is free
+    (status "waiting" while a malware scan or another run holds it).
+
+    Args:
+        request: Pipeline name
+
+    Returns:
+        Queued backup job
+    """
+    return get_job_store().enqueue(request.pipeline)
+
+
+@router.get("/jobs/{job_id}", response_model=BackupJob)
+async def get_backup_job(job_id: str):
+    """
+    Get a backup pipeline run with per-step timing, bytes and ETA.
+
+    Args:
+        job_id: Job ID
+
+    Returns:
+        Backup job
+    """
+    job = get_job_store().get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Backup job not found: {job_id}")
+    return job
+
+
+@router.get("/verify/jobs/{job_id}", response_model=BackupVerifyJob)
+async def get_backup_verify_job(job_id: str):
+    """
+    Get status and result of a backup verification job.
+
+    Args:
+        job_id: Job ID
+
+    Returns:
+        Verification job
+    """
+    job = get_backup_verify_service().get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Verification job not found: {job_id}")
+    return job
+
+
+@router.post("/{backup_id:path}/verify", response_model=BackupVerifyJob, status_code=202)
+async def verify_backup(backup_id: str):
+    """
+    Start verification of a backup against its manifest (runs in the background).
+
+    Args:
+        backup_id: Backup directory relative to the backup root
+            (e.g. mailserver/daily/2025-11-10)
+
+    Returns:
+        Queued verification job
+    """
+    backup_dir = resolve_backup_path(backup_id)
+    return get_backup_verify_service().start(backup_id, backup_dir)
+
+
 @router.get("/schedule", response_model=BackupSchedule)
 async def get_backup_schedule():
     """
@@ -228,11 +990,11 @@ async def get_backup_schedule():
         Backup schedule information
     """
     try:
-        # Backup schedules (from CLAUDE.md documentation)
+        # Backup schedules (host crontab running the job runner's pipelines)
         schedule = BackupSchedule(
-            mailserver_daily="Daily at 03:00 AM",
-            mailserver_weekly="Sunday at 02:00 AM",
-            s3_replication="Daily at 04:00 AM",
+            mailserver_daily=PIPELINES["daily"]["schedule"],
+            mailserver_weekly=PIPELINES["weekly"]["schedule"],
+            s3_replication=PIPELINES["upload"]["schedule"],
             malware_scan="Daily at 05:00 AM"
         )
 
@@ -2,13 +2,23 @@
 Database management API endpoints.
 """
 
-from typing import List, Optional
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from typing import Dict, List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
 import subprocess
 import json
 import os
 
+from app.auth import get_current_user
+from app.database import get_db, get_engine_pool_stats
+from app.schemas.database import DatabaseProvisionRequest, DatabaseProvisionResult
+from app.services.database_dump_service import get_database_dump_service
+from app.services.database_service import get_database_service
+from app.services.index_advisor_service import get_index_advisor_service
+from app.services.mariadb_health_service import get_mariadb_health_service
+
 
 router = APIRouter(prefix="/api/v1/database", tags=["Database"])
 
@@ -42,6 +52,100 @@ class DatabaseStats(BaseModel):
     mariadb_version: str
 
 
+class DatabaseHealth(BaseModel):
+    """MariaDB server health sample."""
+    sampled_at: str
+    version: str
+    uptime: int  # seconds
+    innodb_buffer_pool_size_mb: float
+    innodb_buffer_pool_hit_ratio: Optional[float] = None
+    innodb_buffer_pool_hit_ratio_interval: Optional[float] = None  # since previous sample
+    innodb_buffer_pool_usage_ratio: Optional[float] = None
+    innodb_buffer_pool_dirty_ratio: Optional[float] = None
+    threads_running: int
+    threads_connected: int
+    max_connections: int
+    max_used_connections: int
+    aborted_connects: int
+    tmp_disk_table_ratio: Optional[float] = None
+    query_cache_enabled: bool
+    query_cache_hit_ratio: Optional[float] = None
+    query_cache_lowmem_prunes: int
+    table_open_cache: int
+    table_open_cache_miss_ratio: Optional[float] = None
+    replication_lag_seconds: Optional[int] = None
+    rates: Dict[str, float] = {}  # per-second deltas since previous sample
+
+
+class IndexRecommendation(BaseModel):
+    """Proposed index for a WordPress hotspot table."""
+    database: str
+    table: str
+    index_name: str
+    columns: List[str]
+    reason: str
+    table_rows: int
+    digest_count: int
+    executions: int
+    total_latency_seconds: float
+    rows_examined: int
+    no_index_used: int
+    estimated_benefit: str  # high, medium, low
+    ddl: str
+
+
+class IndexApplyRequest(BaseModel):
+    """Request to apply a recommended index."""
+    database: str
+    table: str
+    index_name: str
+
+
+class IndexJob(BaseModel):
+    """Online DDL index job."""
+    job_id: str
+    database: str
+    table: str
+    index_name: str
+    ddl: str
+    status: str  # queued, running, completed, failed
+    queued_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    error: Optional[str] = None
+
+
+class DatabaseImportProgress(BaseModel):
+    """Streaming import progress."""
+    database: str
+    status: str  # running, completed, failed
+    bytes_received: int
+    bytes_written: int
+    started_at: str
+    finished_at: Optional[str] = None
+    error: Optional[str] = None
+
+
+class DatabaseCloneRequest(BaseModel):
+    """Database clone request."""
+    target: str = Field(..., pattern=r"^[a-zA-Z_][a-zA-Z0-9_]*$", max_length=64)
+
+
+class DatabaseCloneResult(BaseModel):
+    """Database clone result."""
+    source: str
+    target: str
+    bytes_copied: int
+
+
+class EnginePoolStats(BaseModel):
+    """SQLAlchemy connection pool metrics for one engine."""
+    pool_size: Optional[int] = None
+    checked_out: Optional[int] = None
+    checked_in: Optional[int] = None
+    overflow: Optional[int] = None
+
+
 # Helper Functions
 def run_mysql_command(query: str) -> str:
     """Execute MySQL query via docker exec.
@@ -113,6 +217,132 @@ async def get_database_status():
         raise HTTPException(status_code=500, detail=f"Failed to get database status: {str(e)}")
 
 
+@router.get("/health", response_model=DatabaseHealth)
+def get_database_health(refresh: bool = False):
+    """
+    Get MariaDB server health and buffer-pool efficiency metrics.
+
+    Samples are cached for a few seconds; pass refresh=true to force a new one.
+
+    Args:
+        refresh: Force a new sample
+
+    Returns:
+        Latest health sample
+    """
+    try:
+        return get_mariadb_health_service().sample(force=refresh)
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get database health: {str(e)}")
+
+
+@router.get("/health/history", response_model=List[DatabaseHealth])
+def get_database_health_history(limit: Optional[int] = Query(None, ge=1)):
+    """
+    Get recorded MariaDB health samples (oldest first).
+
+    Args:
+        limit: Return only the most recent N samples
+
+    Returns:
+        Health sample history
+    """
+    return get_mariadb_health_service().history(limit=limit)
+
+
+@router.get("/index-advisor", response_model=List[IndexRecommendation])
+def get_index_recommendations(db_name: Optional[str] = None):
+    """
+    Propose missing indexes on WordPress hotspot tables from query digests.
+
+    Args:
+        db_name: Limit analysis to one database
+
+    Returns:
+        Index recommendations sorted by estimated benefit
+    """
+    try:
+        return get_index_advisor_service().analyse(db_name)
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=f"Failed to analyse indexes: {str(e)}")
+
+
+@router.post("/index-advisor/apply", response_model=IndexJob, status_code=202)
+def apply_index_recommendation(
+    apply_request: IndexApplyRequest,
+    current_user: str = Depends(get_current_user),
+):
+    """
+    Apply a recommended index as an online DDL job (ALGORITHM=INPLACE, LOCK=NONE).
+
+    Args:
+        apply_request: Recommended index to apply
+        current_user: Current authenticated user
+
+    Returns:
+        Queued index job
+    """
+    try:
+        return get_index_advisor_service().apply_index(
+            apply_request.database, apply_request.table, apply_request.index_name
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/index-advisor/jobs/{job_id}", response_model=IndexJob)
+def get_index_job(job_id: str):
+    """
+    Get status of an online index job.
+
+    Args:
+        job_id: Job ID
+
+    Returns:
+        Index job
+    """
+    job = get_index_advisor_service().get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Index job not found: {job_id}")
+    return job
+
+
+@router.get("/pools", response_model=Dict[str, EnginePoolStats])
+async def get_database_pools():
+    """
+    Get connection pool metrics for the portal's database engines.
+
+    Returns:
+        Pool metrics keyed by engine name
+    """
+    return get_engine_pool_stats()
+
+
+@router.post("/provision", response_model=DatabaseProvisionResult)
+def provision_databases(
+    provision_request: DatabaseProvisionRequest,
+    db: Session = Depends(get_db),
+    current_user: str = Depends(get_current_user),
+):
+    """
+    Provision databases, users and grants for one or many sites in one batch.
+
+    Statements are idempotent; use dry_run to preview them.
+
+    Args:
+        provision_request: Sites to provision
+        db: Database session
+        current_user: Current authenticated user
+
+    Returns:
+        Provisioning result (passwords masked)
+    """
+    try:
+        return get_database_service(db).provision(provision_request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/list", response_model=List[DatabaseInfo])
 async def list_databases():
     """
@@ -302,3 +532,115 @@ async def get_database_stats():
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get database stats: {str(e)}")
+
+
+
+@router.get("/{db_name}/export")
+async def export_database(
+    db_name: str,
+    compression: Literal["gzip", "none"] = "gzip",
+    current_user: str = Depends(get_current_user),
+):
+    """
+    Stream a logical dump of a database (mysqldump --single-transaction --quick).
+
+    Args:
+        db_name: Database name (system schemas are rejected)
+        compression: Output compression (gzip or none)
+        current_user: Current authenticated user
+
+    Returns:
+        Streaming SQL dump
+    """
+    dump_service = get_database_dump_service()
+    try:
+        if not await dump_service.database_exists(db_name):
+            raise HTTPException(status_code=404, detail=f"Database not found: {db_name}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=f"Failed to export database: {str(e)}")
+
+    filename = f"{db_name}.sql.gz" if compression == "gzip" else f"{db_name}.sql"
+    return StreamingResponse(
+        dump_service.export_database(db_name, compression=compression),
+        media_type="application/gzip" if compression == "gzip" else "application/sql",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post("/{db_name}/import", response_model=DatabaseImportProgress)
+async def import_database(
+    db_name: str,
+    request: Request,
+    compression: Literal["gzip", "none"] = "gzip",
+    current_user: str = Depends(get_current_user),
+):
+    """
+    Restore a database from a streamed SQL dump upload (request body).
+
+    Progress can be polled via GET /{db_name}/import/progress while running.
+
+    Args:
+        db_name: Database name (created if missing; system schemas are rejected)
+        request: Raw request whose body is the dump
+        compression: Input compression (gzip or none)
+        current_user: Current authenticated user
+
+    Returns:
+        Final import progress
+    """
+    dump_service = get_database_dump_service()
+    try:
+        return await dump_service.import_database(db_name, request.stream(), compression=compression)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to import database: {str(e)}")
+
+
+@router.get("/{db_name}/import/progress", response_model=DatabaseImportProgress)
+async def get_database_import_progress(db_name: str):
+    """
+    Get progress of the current or last import for a database.
+
+    Args:
+        db_name: Database name
+
+    Returns:
+        Import progress
+    """
+    progress = get_database_dump_service().get_import_progress(db_name)
+    if progress is None:
+        raise HTTPException(status_code=404, detail=f"No import found for database: {db_name}")
+    return progress
+
+
+@router.post("/{db_name}/clone", response_model=DatabaseCloneResult)
+async def clone_database(
+    db_name: str,
+    clone_request: DatabaseCloneRequest,
+    current_user: str = Depends(get_current_user),
+):
+    """
+    Clone a database (e.g. for staging) by piping mysqldump into mysql.
+
+    Args:
+        db_name: Source database name
+        clone_request: Target database (system schemas are rejected)
+        current_user: Current authenticated user
+
+    Returns:
+        Clone result
+    """
+    dump_service = get_database_dump_service()
+    try:
+        if not await dump_service.database_exists(db_name):
+            raise HTTPException(status_code=404, detail=f"Database not found: {db_name}")
+        return await dump_service.clone_database(db_name, clone_request.target)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to clone database: {str(e)}")
@@ -1,16 +1,26 @@
 """Domain management API endpoints with Cloudflare integration."""
 from __future__ import annotations
 
-import csv
 import io
 import socket
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
-import httpx
-from fastapi import APIRouter, File, HTTPException, Query, UploadFile
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, Response, UploadFile
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.config import get_settings
+from app.database import get_db, get_mailserver_db
+from app.models.mail_domain import MailDomain
+from app.services.cloudflare_api_service import CloudflareAPIError, get_cloudflare_client
+from app.services.cloudflare_dns_import_service import get_dns_importer
+from app.services.cloudflare_dns_plan_service import PlannedChange, ZonePlan, get_zone_reconciler
+from app.services.cloudflare_dns_service import get_dns_mirror, to_fqdn
+from app.services.cloudflare_zone_service import get_zone_cache
+from app.services.dns_propagation_service import get_propagation_watcher
+from app.services.wordpress_service import get_wordpress_service
 
 router = APIRouter(prefix="/api/v1/domains", tags=["Domains"])
 settings = get_settings()
@@ -72,6 +82,9 @@ class DNSRecordImportResult(BaseModel):
     success_count: int
     error_count: int
     errors: List[DNSRecordImportError]
+    created_count: int = 0
+    updated_count: int = 0
+    skipped_count: int = 0  # Already present and unchanged
 
 
 class DNSVerificationServerResult(BaseModel):
@@ -80,6 +93,7 @@ class DNSVerificationServerResult(BaseModel):
     server: str
     status: str  # "success", "failed", "timeout"
     records: List[str]
+    ttl: Optional[int] = None  # Answer TTL, or negative caching TTL when empty
     error: Optional[str] = None
 
 
@@ -93,12 +107,102 @@ class DNSVerificationResult(BaseModel):
     expected_content: Optional[str] = None
 
 
+class DNSPropagationWatch(BaseModel):
+    """Background DNS propagation watch."""
+
+    watch_id: str
+    record_type: str
+    name: str
+    expected_content: Optional[str] = None
+    status: str  # "watching", "propagated", "expired", "failed"
+    attempts: int
+    started_at: str
+    deadline: str
+    finished_at: Optional[str] = None
+    result: Optional[DNSVerificationResult] = None
+    error: Optional[str] = None
+
+
+class DNSPlannedChange(BaseModel):
+    """Single change of a DNS zone plan."""
+
+    action: str  # "create", "update", "delete"
+    source: str  # "file", "wordpress:<domain>", "mail:<domain>", "conflict", "prune"
+    record: dict  # Desired record (delete: the record to remove)
+    current: Optional[DNSRecord] = None  # Live record (update, delete)
+
+
+class DNSZonePlan(BaseModel):
+    """Changes needed to bring a zone in line with its desired records."""
+
+    zone_id: str
+    zone_name: str
+    plan_id: str  # Pass to apply; rejected if the zone changed since
+    prune: bool
+    changes: List[DNSPlannedChange]
+    create_count: int
+    update_count: int
+    delete_count: int
+    unchanged_count: int
+    errors: List[str]
+
+
+class DNSZoneApplyError(BaseModel):
+    """Change that Cloudflare rejected."""
+
+    change: DNSPlannedChange
+    error: str
+
+
+class DNSZoneApplyResult(BaseModel):
+    """DNS zone apply result."""
+
+    plan_id: str
+    created_count: int
+    updated_count: int
+    deleted_count: int
+    error_count: int
+    errors: List[DNSZoneApplyError]
+
+
 # Helper functions
+def cloudflare_http_error(error: CloudflareAPIError) -> HTTPException:
+    """Convert a Cloudflare client error to an HTTP error response.
+
+    Args:
+        error: Cloudflare client error
+
+    Returns:
+        HTTPException with the Cloudflare status code
+    """
+    return HTTPException(status_code=error.status_code, detail=str(error))
+
+
+def to_dns_record(record: dict) -> DNSRecord:
+    """Build a DNS record response from a Cloudflare record.
+
+    Args:
+        record: Cloudflare DNS record
+
+    Returns:
+        DNS record response
+    """
+    return DNSRecord(
+        id=record["id"],
+        type=record["type"],
+        name=record["name"],
+        content=record["content"],
+        ttl=record["ttl"],
+        proxied=record.get("proxied", False),
+        priority=record.get("priority"),
+    )
+
+
 async def get_zone_id(domain: str) -> str:
-    """Get Cloudflare zone ID from domain name.
+    """Get Cloudflare zone ID from domain name (served from the zone cache).
 
     Args:
-        domain: Domain name (e.g., kuma8088.com)
+        domain: Domain name (e.g., kuma8088.com) or a name below it
 
     Returns:
         Zone ID
@@ -106,43 +210,100 @@ async def get_zone_id(domain: str) -> str:
     Raises:
         HTTPException: If zone not found or API error
     """
-    if not settings.cloudflare_api_token:
-        raise HTTPException(
-            status_code=500,
-            detail="Cloudflare API token not configured",
-        )
+    try:
+        return await get_zone_cache().get_zone_id(domain)
+    except CloudflareAPIError as e:
+        raise cloudflare_http_error(e)
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"https://api.cloudflare.com/client/v4/zones?name={domain}",
-            headers={
-                "Authorization": f"Bearer {settings.cloudflare_api_token}",
-                "Content-Type": "application/json",
-            },
-        )
 
-        if response.status_code != 200:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=f"Cloudflare API error: {response.text}",
-            )
+def to_dns_zone_plan(plan: ZonePlan) -> DNSZonePlan:
+    """Build a zone plan response.
+
+    Args:
+        plan: Zone plan
+
+    Returns:
+        Zone plan response
+    """
+    return DNSZonePlan(
+        zone_id=plan.zone_id,
+        zone_name=plan.zone_name,
+        plan_id=plan.plan_id,
+        prune=plan.prune,
+        changes=[to_planned_change(change) for change in plan.changes],
+        create_count=plan.count("create"),
+        update_count=plan.count("update"),
+        delete_count=plan.count("delete"),
+        unchanged_count=plan.unchanged,
+        errors=plan.errors,
+    )
+
 
-        data = response.json()
+def to_planned_change(change: PlannedChange) -> DNSPlannedChange:
+    """Build a planned change response.
 
-        if not data.get("success"):
-            raise HTTPException(
-                status_code=400,
-                detail=f"Cloudflare API error: {data.get('errors')}",
-            )
+    Args:
+        change: Planned change
+
+    Returns:
+        Planned change response
+    """
+    return DNSPlannedChange(
+        action=change.action,
+        source=change.source,
+        record=change.record if change.action != "delete" else to_dns_record(change.record).model_dump(),
+        current=to_dns_record(change.existing) if change.existing else None,
+    )
 
-        result = data.get("result", [])
-        if not result:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Zone not found for domain: {domain}",
-            )
 
-        return result[0]["id"]
+def zone_record_sources(db: Session, mail_db: Session, sources: List[str]) -> Tuple[List[str], List[str]]:
+    """Domains records are generated for.
+
+    Only the databases of the zone's sources are queried, so e.g. a
+    mailserver database outage does not affect zones without mail records.
+
+    Args:
+        db: Portal database session
+        mail_db: Mailserver database session
+        sources: Generated record sources of the zone
+
+    Returns:
+        Tuple of (enabled WordPress site domains, enabled mail domain names)
+    """
+    site_domains: List[str] = []
+    mail_domains: List[str] = []
+    if "wordpress" in sources:
+        site_domains = [site.domain for site in get_wordpress_service(db).list_sites(enabled_only=True)]
+    if "mail" in sources:
+        mail_domains = [name for (name,) in mail_db.query(MailDomain.name).filter(MailDomain.enabled == True).all()]
+    return site_domains, mail_domains
+
+
+async def plan_zone_changes(domain: str, db: Session, mail_db: Session) -> ZonePlan:
+    """Plan a zone against its desired records.
+
+    Args:
+        domain: Domain name
+        db: Portal database session
+        mail_db: Mailserver database session
+
+    Returns:
+        Zone plan
+
+    Raises:
+        HTTPException: If the zone file is invalid or on Cloudflare errors
+    """
+    reconciler = get_zone_reconciler()
+    try:
+        zone = await get_zone_cache().get_zone(domain)
+        sources = reconciler.zone_sources(zone["name"])
+        # Blocking database queries stay off the event loop
+        site_domains, mail_domains = await run_in_threadpool(zone_record_sources, db, mail_db, sources)
+        return await reconciler.plan(domain, site_domains, mail_domains)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except CloudflareAPIError as e:
+        raise cloudflare_http_error(e)
 
 
 # API endpoints
@@ -153,104 +314,76 @@ async def list_zones():
     Returns:
         List of zones
     """
-    if not settings.cloudflare_api_token:
-        raise HTTPException(
-            status_code=500,
-            detail="Cloudflare API token not configured",
-        )
-
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            "https://api.cloudflare.com/client/v4/zones",
-            headers={
-                "Authorization": f"Bearer {settings.cloudflare_api_token}",
-                "Content-Type": "application/json",
-            },
+    try:
+        result = await get_zone_cache().list_zones()
+    except CloudflareAPIError as e:
+        raise cloudflare_http_error(e)
+
+    return [
+        Zone(
+            id=zone["id"],
+            name=zone["name"],
+            status=zone["status"],
+            name_servers=zone.get("name_servers", []),
         )
+        for zone in result
+    ]
 
-        if response.status_code != 200:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=f"Cloudflare API error: {response.text}",
-            )
 
-        data = response.json()
+@router.post("/zones/refresh", response_model=List[Zone])
+async def refresh_zones():
+    """Reload the zone cache from Cloudflare (e.g. after adding a zone).
 
-        if not data.get("success"):
-            raise HTTPException(
-                status_code=400,
-                detail=f"Cloudflare API error: {data.get('errors')}",
-            )
-
-        result = data.get("result", [])
-        return [
-            Zone(
-                id=zone["id"],
-                name=zone["name"],
-                status=zone["status"],
-                name_servers=zone.get("name_servers", []),
-            )
-            for zone in result
-        ]
+    Returns:
+        List of zones
+    """
+    cache = get_zone_cache()
+    cache.invalidate()
+    return await list_zones()
 
 
 @router.get("/{domain}/dns", response_model=List[DNSRecord])
 async def get_dns_records(
     domain: str,
+    response: Response,
     record_type: Optional[str] = Query(None, description="Filter by DNS record type"),
+    name: Optional[str] = Query(None, description="Filter by record name (@, subdomain or FQDN)"),
+    refresh: bool = Query(False, description="Reload records from Cloudflare first"),
+    if_none_match: Optional[str] = Header(None),
 ):
-    """Get DNS records for a domain.
+    """Get DNS records for a domain (served from the local record mirror).
 
     Args:
         domain: Domain name
+        response: Response (carries the ETag and Last-Modified watermark)
         record_type: Optional filter by record type (A, MX, etc.)
+        name: Optional filter by record name
+        refresh: Reload the zone's records from Cloudflare before reading
+        if_none_match: ETag from a previous response
 
     Returns:
-        List of DNS records
+        List of DNS records (304 when the zone is unchanged since if_none_match)
     """
     zone_id = await get_zone_id(domain)
-
-    params = {}
-    if record_type:
-        params["type"] = record_type
-
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"https://api.cloudflare.com/client/v4/zones/{zone_id}/dns_records",
-            headers={
-                "Authorization": f"Bearer {settings.cloudflare_api_token}",
-                "Content-Type": "application/json",
-            },
-            params=params,
+    mirror = get_dns_mirror()
+
+    try:
+        zone = await mirror.get_zone(zone_id, refresh=refresh)
+        result = await mirror.list_records(
+            zone_id,
+            record_type=record_type,
+            name=to_fqdn(name, domain) if name is not None else None,
         )
+    except CloudflareAPIError as e:
+        raise cloudflare_http_error(e)
 
-        if response.status_code != 200:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=f"Cloudflare API error: {response.text}",
-            )
-
-        data = response.json()
-
-        if not data.get("success"):
-            raise HTTPException(
-                status_code=400,
-                detail=f"Cloudflare API error: {data.get('errors')}",
-            )
-
-        result = data.get("result", [])
-        return [
-            DNSRecord(
-                id=record["id"],
-                type=record["type"],
-                name=record["name"],
-                content=record["content"],
-                ttl=record["ttl"],
-                proxied=record.get("proxied", False),
-                priority=record.get("priority"),
-            )
-            for record in result
-        ]
+    if if_none_match and if_none_match == zone.etag:
+        return Response(status_code=304, headers={"ETag": zone.etag})
+    response.headers["ETag"] = zone.etag
+    if zone.modified_on:
+        response.headers["X-Records-Modified-On"] = zone.modified_on
+
+    return [to_dns_record(record) for record in result]
 
 
 @router.post("/{domain}/dns", response_model=DNSRecord)
@@ -277,40 +410,13 @@ async def create_dns_record(domain: str, record: DNSRecordCreate):
     if record.priority is not None:
         payload["priority"] = record.priority
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"https://api.cloudflare.com/client/v4/zones/{zone_id}/dns_records",
-            headers={
-                "Authorization": f"Bearer {settings.cloudflare_api_token}",
-                "Content-Type": "application/json",
-            },
-            json=payload,
-        )
+    try:
+        result = await get_cloudflare_client().post(f"/zones/{zone_id}/dns_records", json=payload)
+    except CloudflareAPIError as e:
+        raise cloudflare_http_error(e)
 
-        if response.status_code != 200:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=f"Cloudflare API error: {response.text}",
-            )
-
-        data = response.json()
-
-        if not data.get("success"):
-            raise HTTPException(
-                status_code=400,
-                detail=f"Cloudflare API error: {data.get('errors')}",
-            )
-
-        result = data["result"]
-        return DNSRecord(
-            id=result["id"],
-            type=result["type"],
-            name=result["name"],
-            content=result["content"],
-            ttl=result["ttl"],
-            proxied=result.get("proxied", False),
-            priority=result.get("priority"),
-        )
+    get_dns_mirror().upsert(zone_id, result)
+    return to_dns_record(result)
 
 
 @router.put("/{domain}/dns/{record_id}", response_model=DNSRecord)
@@ -328,78 +434,18 @@ async def update_dns_record(
         Updated DNS record
     """
     zone_id = await get_zone_id(domain)
+    # PATCH only the fields sent, so nothing is merged from a stale copy
+    payload = record.model_dump(exclude_none=True)
+    if not payload:
+        raise HTTPException(status_code=400, detail="No fields to update")
 
-    # Get existing record first
-    async with httpx.AsyncClient() as client:
-        get_response = await client.get(
-            f"https://api.cloudflare.com/client/v4/zones/{zone_id}/dns_records/{record_id}",
-            headers={
-                "Authorization": f"Bearer {settings.cloudflare_api_token}",
-                "Content-Type": "application/json",
-            },
-        )
-
-        if get_response.status_code != 200:
-            raise HTTPException(
-                status_code=get_response.status_code,
-                detail=f"Cloudflare API error: {get_response.text}",
-            )
-
-        existing_data = get_response.json()
-        if not existing_data.get("success"):
-            raise HTTPException(
-                status_code=400,
-                detail=f"Cloudflare API error: {existing_data.get('errors')}",
-            )
-
-        existing = existing_data["result"]
-
-        # Prepare update payload (merge with existing)
-        payload = {
-            "type": existing["type"],
-            "name": existing["name"],
-            "content": record.content or existing["content"],
-            "ttl": record.ttl or existing["ttl"],
-            "proxied": record.proxied if record.proxied is not None else existing.get("proxied", False),
-        }
-
-        if "priority" in existing or record.priority is not None:
-            payload["priority"] = record.priority or existing.get("priority")
-
-        # Update record
-        put_response = await client.put(
-            f"https://api.cloudflare.com/client/v4/zones/{zone_id}/dns_records/{record_id}",
-            headers={
-                "Authorization": f"Bearer {settings.cloudflare_api_token}",
-                "Content-Type": "application/json",
-            },
-            json=payload,
-        )
+    try:
+        result = await get_cloudflare_client().patch(f"/zones/{zone_id}/dns_records/{record_id}", json=payload)
+    except CloudflareAPIError as e:
+        raise cloudflare_http_error(e)
 
-        if put_response.status_code != 200:
-            raise HTTPException(
-                status_code=put_response.status_code,
-                detail=f"Cloudflare API error: {put_response.text}",
-            )
-
-        data = put_response.json()
-
-        if not data.get("success"):
-            raise HTTPException(
-                status_code=400,
-                detail=f"Cloudflare API error: {data.get('errors')}",
-            )
-
-        result = data["result"]
-        return DNSRecord(
-            id=result["id"],
-            type=result["type"],
-            name=result["name"],
-            content=result["content"],
-            ttl=result["ttl"],
-            proxied=result.get("proxied", False),
-            priority=result.get("priority"),
-        )
+    get_dns_mirror().upsert(zone_id, result)
+    return to_dns_record(result)
 
 
 @router.delete("/{domain}/dns/{record_id}")
@@ -415,36 +461,23 @@ async def delete_dns_record(domain: str, record_id: str):
     """
     zone_id = await get_zone_id(domain)
 
-    async with httpx.AsyncClient() as client:
-        response = await client.delete(
-            f"https://api.cloudflare.com/client/v4/zones/{zone_id}/dns_records/{record_id}",
-            headers={
-                "Authorization": f"Bearer {settings.cloudflare_api_token}",
-                "Content-Type": "application/json",
-            },
-        )
-
-        if response.status_code != 200:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=f"Cloudflare API error: {response.text}",
-            )
+    try:
+        await get_cloudflare_client().delete(f"/zones/{zone_id}/dns_records/{record_id}")
+    except CloudflareAPIError as e:
+        raise cloudflare_http_error(e)
 
-        data = response.json()
+    get_dns_mirror().remove(zone_id, record_id)
 
-        if not data.get("success"):
-            raise HTTPException(
-                status_code=400,
-                detail=f"Cloudflare API error: {data.get('errors')}",
-            )
-
-        return {"success": True, "message": "DNS record deleted successfully"}
+    return {"success": True, "message": "DNS record deleted successfully"}
 
 
 @router.post("/{domain}/dns/import", response_model=DNSRecordImportResult)
 async def import_dns_records(domain: str, file: UploadFile = File(...)):
     """Import DNS records from CSV file.
 
+    Every row is validated first. Records already present unchanged are
+    skipped and changed ones are updated, so re-running an import is safe.
+
     Args:
         domain: Domain name
         file: CSV file with DNS records (Type, Name, Content, TTL, Proxied, Priority)
@@ -461,81 +494,93 @@ async def import_dns_records(domain: str, file: UploadFile = File(...)):
             detail="File must be a CSV file",
         )
 
-    # Read CSV file
-    contents = await file.read()
-    csv_text = contents.decode("utf-8")
-    csv_reader = csv.DictReader(io.StringIO(csv_text))
-
-    # Process records
-    success_count = 0
-    error_count = 0
-    errors: List[DNSRecordImportError] = []
-
-    async with httpx.AsyncClient() as client:
-        for row_num, row in enumerate(csv_reader, start=2):  # Start at 2 (header is row 1)
-            try:
-                # Validate required fields
-                if not all(key in row for key in ["Type", "Name", "Content"]):
-                    raise ValueError("Missing required fields (Type, Name, Content)")
-
-                # Parse row data
-                record_type = row["Type"].strip()
-                name = row["Name"].strip()
-                content = row["Content"].strip()
-                ttl = int(row.get("TTL", "1").strip() or "1")
-                proxied_str = row.get("Proxied", "No").strip().lower()
-                proxied = proxied_str in ("yes", "true", "1")
-                priority = None
-
-                if "Priority" in row and row["Priority"].strip():
-                    priority = int(row["Priority"].strip())
-
-                # Prepare payload
-                payload = {
-                    "type": record_type,
-                    "name": name,
-                    "content": content,
-                    "ttl": ttl,
-                    "proxied": proxied,
-                }
-
-                if priority is not None:
-                    payload["priority"] = priority
-
-                # Create record via Cloudflare API
-                response = await client.post(
-                    f"https://api.cloudflare.com/client/v4/zones/{zone_id}/dns_records",
-                    headers={
-                        "Authorization": f"Bearer {settings.cloudflare_api_token}",
-                        "Content-Type": "application/json",
-                    },
-                    json=payload,
-                )
-
-                if response.status_code != 200:
-                    raise ValueError(f"Cloudflare API error: {response.text}")
-
-                data = response.json()
-
-                if not data.get("success"):
-                    raise ValueError(f"Cloudflare API error: {data.get('errors')}")
-
-                success_count += 1
-
-            except Exception as err:
-                error_count += 1
-                errors.append(
-                    DNSRecordImportError(
-                        row=row_num,
-                        record=dict(row),
-                        error=str(err),
-                    )
-                )
+    # Stream the CSV (utf-8-sig drops a BOM from spreadsheet exports)
+    lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+
+    try:
+        outcome = await get_dns_importer().run(zone_id, domain, lines)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="CSV file must be UTF-8 encoded")
+    except CloudflareAPIError as e:
+        raise cloudflare_http_error(e)
 
     return DNSRecordImportResult(
-        success_count=success_count,
-        error_count=error_count,
-        errors=errors,
+        success_count=outcome.created + outcome.updated + outcome.skipped,
+        error_count=len(outcome.errors),
+        errors=[
+            DNSRecordImportError(row=error.row, record=error.record, error=error.error)
+            for error in outcome.errors
+        ],
+        created_count=outcome.created,
+        updated_count=outcome.updated,
+        skipped_count=outcome.skipped,
+    )
+
+
+@router.get("/{domain}/dns/plan", response_model=DNSZonePlan)
+async def get_dns_plan(
+    domain: str,
+    db: Session = Depends(get_db),
+    mail_db: Session = Depends(get_mailserver_db),
+):
+    """Show the changes that would bring a zone in line with its desired records.
+
+    Desired records come from the zone file (<dns_zone_dir>/<zone>.yml) and
+    are generated for WordPress sites (tunnel CNAME) and mail domains (MX,
+    SPF, DMARC, DKIM). Nothing is written.
+
+    Args:
+        domain: Domain name
+        db: Portal database session
+        mail_db: Mailserver database session
+
+    Returns:
+        Zone plan
+    """
+    return to_dns_zone_plan(await plan_zone_changes(domain, db, mail_db))
+
+
+@router.post("/{domain}/dns/apply", response_model=DNSZoneApplyResult)
+async def apply_dns_plan(
+    domain: str,
+    plan_id: str = Query(..., description="plan_id of the plan that was reviewed"),
+    db: Session = Depends(get_db),
+    mail_db: Session = Depends(get_mailserver_db),
+):
+    """Apply a zone plan.
+
+    The plan is recomputed against fresh records and only applied if it
+    still matches the reviewed plan_id; otherwise 409 is returned so the
+    new plan can be reviewed first.
+
+    Args:
+        domain: Domain name
+        plan_id: plan_id from GET /{domain}/dns/plan
+        db: Portal database session
+        mail_db: Mailserver database session
+
+    Returns:
+        Apply result
+    """
+    plan = await plan_zone_changes(domain, db, mail_db)
+    if plan.errors:
+        # Invalid zone file records would otherwise be missing (or pruned)
+        raise HTTPException(status_code=400, detail=f"Zone file has errors: {'; '.join(plan.errors)}")
+    if plan.plan_id != plan_id:
+        raise HTTPException(status_code=409, detail="Zone changed since the plan was reviewed; review the new plan")
+
+    result = await get_zone_reconciler().apply(plan)
+
+    return DNSZoneApplyResult(
+        plan_id=plan.plan_id,
+        created_count=result.created,
+        updated_count=result.updated,
+        deleted_count=result.deleted,
+        error_count=len(result.errors),
+        errors=[
+            DNSZoneApplyError(change=to_planned_change(change), error=error)
+            for change, error in result.errors
+        ],
     )
 
 
@@ -548,6 +593,8 @@ async def verify_dns_record(
 ):
     """Verify DNS record propagation across multiple public DNS servers.
 
+    The configured DNS-over-HTTPS resolvers are queried concurrently.
+
     Args:
         domain: Domain name
         record_type: DNS record type (A, AAAA, MX, TXT, etc.)
@@ -557,117 +604,83 @@ async def verify_dns_record(
     Returns:
         DNS verification result from multiple servers
     """
-    # Public DNS servers (DNS-over-HTTPS endpoints)
-    dns_servers = {
-        "Google": "https://dns.google/resolve",
-        "Cloudflare": "https://cloudflare-dns.com/dns-query",
-        "Quad9": "https://dns.quad9.net/dns-query",
-    }
+    return await get_propagation_watcher().checker.check(record_type, record_name, expected_content)
 
-    servers_results: List[DNSVerificationServerResult] = []
-    propagated = True
-
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        for server_name, server_url in dns_servers.items():
-            try:
-                # Query DNS using DNS-over-HTTPS
-                params = {
-                    "name": record_name,
-                    "type": record_type,
-                }
-
-                response = await client.get(
-                    server_url,
-                    params=params,
-                    headers={"Accept": "application/dns-json"},
-                )
-
-                if response.status_code != 200:
-                    servers_results.append(
-                        DNSVerificationServerResult(
-                            server=server_name,
-                            status="failed",
-                            records=[],
-                            error=f"HTTP {response.status_code}",
-                        )
-                    )
-                    propagated = False
-                    continue
-
-                data = response.json()
-
-                # Extract records from response
-                records = []
-                if "Answer" in data:
-                    for answer in data["Answer"]:
-                        if answer.get("type") == _get_dns_type_number(record_type):
-                            records.append(answer.get("data", ""))
-
-                # Check if records match expected content
-                if expected_content:
-                    if expected_content not in records:
-                        propagated = False
-
-                servers_results.append(
-                    DNSVerificationServerResult(
-                        server=server_name,
-                        status="success" if records else "failed",
-                        records=records,
-                        error=None if records else "No records found",
-                    )
-                )
-
-                if not records:
-                    propagated = False
-
-            except httpx.TimeoutException:
-                servers_results.append(
-                    DNSVerificationServerResult(
-                        server=server_name,
-                        status="timeout",
-                        records=[],
-                        error="Request timeout",
-                    )
-                )
-                propagated = False
-            except Exception as err:
-                servers_results.append(
-                    DNSVerificationServerResult(
-                        server=server_name,
-                        status="failed",
-                        records=[],
-                        error=str(err),
-                    )
-                )
-                propagated = False
-
-    return DNSVerificationResult(
-        record_type=record_type,
-        name=record_name,
-        servers=servers_results,
-        propagated=propagated,
-        expected_content=expected_content,
-    )
 
+@router.post("/{domain}/dns/verify/watch", response_model=DNSPropagationWatch, status_code=202)
+async def start_dns_watch(
+    domain: str,
+    record_type: str = Query(..., description="DNS record type (A, AAAA, MX, TXT, etc.)"),
+    record_name: str = Query(..., description="DNS record name"),
+    expected_content: Optional[str] = Query(None, description="Expected content (optional)"),
+    interval: float = Query(15.0, ge=5.0, le=300.0, description="Seconds between checks"),
+    timeout: float = Query(600.0, ge=10.0, le=3600.0, description="Seconds before giving up"),
+):
+    """Poll DNS propagation in the background until propagated or timed out.
 
-def _get_dns_type_number(record_type: str) -> int:
-    """Get DNS type number from record type string.
+    Follow progress with GET .../verify/watch/{watch_id}/events (server-sent
+    events) instead of calling /verify in a loop.
 
     Args:
-        record_type: DNS record type (A, AAAA, MX, etc.)
+        domain: Domain name
+        record_type: DNS record type
+        record_name: DNS record name (FQDN)
+        expected_content: Expected content to verify (optional)
+        interval: Seconds between checks
+        timeout: Seconds before the watch gives up
 
     Returns:
-        DNS type number
+        Started watch job
     """
-    dns_types = {
-        "A": 1,
-        "AAAA": 28,
-        "CNAME": 5,
-        "MX": 15,
-        "TXT": 16,
-        "NS": 2,
-        "SOA": 6,
-        "PTR": 12,
-        "SRV": 33,
-    }
-    return dns_types.get(record_type.upper(), 1)
+    watcher = get_propagation_watcher()
+    if watcher.active_count() >= settings.dns_watch_max_active:
+        raise HTTPException(status_code=429, detail="Too many DNS watches running")
+    return watcher.start(record_type, record_name, expected_content, interval=interval, timeout=timeout)
+
+
+@router.get("/{domain}/dns/verify/watch/{watch_id}", response_model=DNSPropagationWatch)
+async def get_dns_watch(domain: str, watch_id: str):
+    """Get a DNS propagation watch with its latest check.
+
+    Args:
+        domain: Domain name
+        watch_id: Watch ID
+
+    Returns:
+        Watch job
+    """
+    watch = get_propagation_watcher().get(watch_id)
+    if watch is None:
+        raise HTTPException(status_code=404, detail=f"DNS watch not found: {watch_id}")
+    return watch
+
+
+@router.get("/{domain}/dns/verify/watch/{watch_id}/events")
+async def stream_dns_watch(domain: str, watch_id: str):
+    """Stream a DNS propagation watch as server-sent events.
+
+    Each check is sent as a "check" event; the final state is sent as a
+    "done" event before the stream closes.
+
+    Args:
+        domain: Domain name
+        watch_id: Watch ID
+
+    Returns:
+        text/event-stream response
+    """
+    watcher = get_propagation_watcher()
+    if watcher.get(watch_id) is None:
+        raise HTTPException(status_code=404, detail=f"DNS watch not found: {watch_id}")
+
+    async def events():
+        async for watch in watcher.subscribe(watch_id):
+            event = "check" if watch["status"] == "watching" else "done"
+            data = DNSPropagationWatch(**watch).model_dump_json()
+            yield f"event: {event}\ndata: {data}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -2,14 +2,18 @@
 Security management API endpoints.
 """
 
-from typing import List, Dict, Any
-from fastapi import APIRouter, HTTPException
+from typing import List, Dict, Optional
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
+import asyncio
 import subprocess
 import os
-import requests
 
 from app.config import get_settings
+from app.services.certificate_inventory_service import CertificateInfo, get_certificate_inventory
+from app.services.cloudflare_api_service import CloudflareAPIError
+from app.services.cloudflare_zone_service import get_zone_cache
+from app.services.cloudflare_zone_settings_service import get_zone_settings_cache, summarize_ssl_settings
 
 settings = get_settings()
 router = APIRouter(prefix="/api/v1/security", tags=["Security"])
@@ -21,12 +25,31 @@ class SSLCertificate(BaseModel):
     domain: str
     issuer: str
     valid_until: str
+    status: str  # "active", "expiring" or "expired"
+    days_remaining: Optional[int] = None
+    subject: Optional[str] = None
+    path: Optional[str] = None
+
+
+class CloudflareZoneSSL(BaseModel):
+    """SSL/TLS settings of a Cloudflare zone."""
+    name: str
+    id: str
     status: str
+    ssl_mode: str
+    min_tls_version: Optional[str] = None
+    tls_1_3: Optional[str] = None  # "on", "off" or "zrt" (0-RTT)
+    always_use_https: Optional[bool] = None
+    hsts_enabled: Optional[bool] = None
+    hsts_max_age: Optional[int] = None
+    hsts_include_subdomains: Optional[bool] = None
+    hsts_preload: Optional[bool] = None
+    error: Optional[str] = None
 
 
 class CloudflareSSLStatus(BaseModel):
     """Cloudflare SSL status."""
-    zones: List[Dict[str, Any]]
+    zones: List[CloudflareZoneSSL]
 
 
 class SecurityHeaders(BaseModel):
@@ -45,14 +68,6 @@ class SecurityStats(BaseModel):
 
 
 # Helper Functions
-def get_cloudflare_api_token() -> str:
-    """Get Cloudflare API token from settings."""
-    token = settings.cloudflare_api_token
-    if not token or token == "your-cloudflare-api-token":
-        raise RuntimeError("CLOUDFLARE_API_TOKEN not configured")
-    return token
-
-
 def run_docker_command(service: str, command: List[str]) -> str:
     """Execute command in Docker container."""
     blog_dir = "/opt/onprem-infra-system/project-root-infra/services/blog"
@@ -77,105 +92,93 @@ def run_docker_command(service: str, command: List[str]) -> str:
 
 
 # API Endpoints
+def to_ssl_certificate(name: str, cert: CertificateInfo) -> SSLCertificate:
+    """Build an SSL certificate response for one name of a certificate."""
+    return SSLCertificate(
+        domain=name,
+        issuer=cert.issuer,
+        valid_until=cert.not_after.isoformat(),
+        status=cert.status(),
+        days_remaining=cert.days_remaining(),
+        subject=cert.subject,
+        path=cert.path,
+    )
+
+
 @router.get("/ssl/certificates", response_model=List[SSLCertificate])
 async def list_ssl_certificates():
     """
-    List SSL certificates for blog domains.
+    List TLS certificates found on disk, one entry per name (SAN).
+
+    Certificate files (mail's Tailscale certificate, Let's Encrypt, blog
+    origin certificates) are parsed directly; unchanged files are served
+    from the inventory cache.
 
     Returns:
         List of SSL certificate information
     """
     try:
-        # Get list of domains from Nginx config
-        blog_dir = "/opt/onprem-infra-system/project-root-infra/services/blog"
-        nginx_conf_dir = f"{blog_dir}/config/nginx/conf.d"
-
-        certificates = []
-
-        # Check if SSL certificates exist
-        ssl_cert_path = "/etc/letsencrypt/live"
-        check_cmd = ["ls", "-la", ssl_cert_path]
-
-        try:
-            output = run_docker_command("nginx", check_cmd)
-
-            # Parse domains from output (simplified)
-            # In production, you would parse actual certificate details
-            domains = [
-                "fx-trader-life.com",
-                "kuma8088.com",
-                "toyota-phv.net",
-                "webmakeprofit.com",
-                "webmakesprofit.com"
-            ]
-
-            for domain in domains:
-                certificates.append(SSLCertificate(
-                    domain=domain,
-                    issuer="Cloudflare Origin Certificate",
-                    valid_until="2034-11-11",  # Cloudflare Origin Cert 15-year validity
-                    status="active"
-                ))
-        except Exception:
-            # If SSL directory doesn't exist or command fails
-            pass
-
-        return certificates
+        index = await asyncio.to_thread(get_certificate_inventory().scan)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to list SSL certificates: {str(e)}")
 
+    return [to_ssl_certificate(name, certs[0]) for name, certs in sorted(index.by_name.items())]
 
-@router.get("/cloudflare/ssl", response_model=CloudflareSSLStatus)
-async def get_cloudflare_ssl_status():
+
+@router.get("/ssl/certificates/expiring", response_model=List[SSLCertificate])
+async def list_expiring_ssl_certificates(
+    days: int = Query(14, ge=0, le=365, description="Expiry window in days"),
+):
     """
-    Get Cloudflare SSL status for all zones.
+    List names whose newest certificate expires within the given window.
+
+    Args:
+        days: Expiry window in days
 
     Returns:
-        Cloudflare SSL status information
+        Expiring (or expired) certificates ordered by expiry
     """
+    inventory = get_certificate_inventory()
     try:
-        api_token = get_cloudflare_api_token()
+        expiring = await asyncio.to_thread(inventory.expiring, days)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to list expiring certificates: {str(e)}")
 
-        headers = {
-            "Authorization": f"Bearer {api_token}",
-            "Content-Type": "application/json"
-        }
+    return [to_ssl_certificate(name, cert) for name, cert in expiring]
 
-        # Get zones
-        response = requests.get(
-            "https://api.cloudflare.com/client/v4/zones",
-            headers=headers,
-            timeout=10
-        )
 
-        if response.status_code != 200:
-            raise RuntimeError(f"Cloudflare API error: {response.status_code}")
+@router.get("/cloudflare/ssl", response_model=CloudflareSSLStatus)
+async def get_cloudflare_ssl_status(refresh: bool = False):
+    """
+    Get Cloudflare SSL/TLS settings for all zones.
+
+    Each zone's settings come from one bulk /settings request; zones are
+    fetched concurrently and cached (cloudflare_zone_settings_ttl).
+
+    Args:
+        refresh: Ignore cached settings
 
-        zones_data = response.json()
-        zones = []
+    Returns:
+        Cloudflare SSL status information
+    """
+    try:
+        result = await get_zone_cache().list_zones()
+    except CloudflareAPIError as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get Cloudflare SSL status: {str(e)}")
 
-        for zone in zones_data.get("result", []):
-            # Get SSL settings for each zone
-            zone_id = zone["id"]
-            ssl_response = requests.get(
-                f"https://api.cloudflare.com/client/v4/zones/{zone_id}/settings/ssl",
-                headers=headers,
-                timeout=10
-            )
+    cache = get_zone_settings_cache()
 
-            ssl_data = ssl_response.json() if ssl_response.status_code == 200 else {}
-            ssl_mode = ssl_data.get("result", {}).get("value", "unknown")
+    async def zone_ssl(zone: Dict[str, str]) -> CloudflareZoneSSL:
+        base = {"name": zone["name"], "id": zone["id"], "status": zone["status"]}
+        try:
+            zone_settings = await cache.get_settings(zone["id"], refresh=refresh)
+        except CloudflareAPIError as e:
+            return CloudflareZoneSSL(**base, ssl_mode="unknown", error=str(e))
+        return CloudflareZoneSSL(**base, **summarize_ssl_settings(zone_settings))
 
-            zones.append({
-                "name": zone["name"],
-                "id": zone_id,
-                "ssl_mode": ssl_mode,
-                "status": zone["status"]
-            })
+    zones = await asyncio.gather(*(zone_ssl(zone) for zone in result))
 
-        return CloudflareSSLStatus(zones=zones)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get Cloudflare SSL status: {str(e)}")
+    return CloudflareSSLStatus(zones=list(zones))
 
 
 @router.get("/headers", response_model=SecurityHeaders)
@@ -224,24 +227,8 @@ async def get_security_stats():
 
         # Get Cloudflare zones count
         try:
-            api_token = get_cloudflare_api_token()
-            headers = {
-                "Authorization": f"Bearer {api_token}",
-                "Content-Type": "application/json"
-            }
-
-            response = requests.get(
-                "https://api.cloudflare.com/client/v4/zones",
-                headers=headers,
-                timeout=10
-            )
-
-            if response.status_code == 200:
-                zones_data = response.json()
-                cloudflare_zones_count = len(zones_data.get("result", []))
-            else:
-                cloudflare_zones_count = 0
-        except Exception:
+            cloudflare_zones_count = len(await get_zone_cache().list_zones())
+        except CloudflareAPIError:
             cloudflare_zones_count = 0
 
         return SecurityStats(
@@ -13,7 +13,6 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 import subprocess
 import json
-import httpx
 
 from app.auth import get_current_user, get_current_user_optional
 from app.database import get_db
@@ -24,6 +23,7 @@ from app.schemas.wordpress import (
     WordPressSiteStats as WordPressSiteStatsSchema,
     WordPressSiteUpdate,
 )
+from app.services.site_dns_service import get_site_dns_checker
 from app.services.wordpress_service import get_wordpress_service
 
 
@@ -118,56 +118,15 @@ class DNSResolveStatus(BaseModel):
     checked_at: str
 
 
-async def _check_dns_resolution(domain: str) -> DNSResolveStatus:
-    """Check if a domain resolves via DNS-over-HTTPS.
-
-    Queries both Cloudflare DNS and Google DNS. Returns resolved=True
-    if either server returns A records. Cloudflare DNS is checked first
-    because it reflects Cloudflare-managed zone changes faster than
-    Google DNS, which may hold NXDOMAIN negative cache for up to 30min.
-
-    Args:
-        domain: The domain to check DNS resolution for.
-
-    Returns:
-        DNSResolveStatus with resolution result.
-    """
-    dns_servers = [
-        ("https://cloudflare-dns.com/dns-query", "application/dns-json"),
-        ("https://dns.google/resolve", "application/dns-json"),
-    ]
-    ip_addresses: List[str] = []
-
-    try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            for server_url, accept_header in dns_servers:
-                response = await client.get(
-                    server_url,
-                    params={"name": domain, "type": "A"},
-                    headers={"Accept": accept_header},
-                )
-
-                if response.status_code == 200:
-                    data = response.json()
-                    if "Answer" in data:
-                        for answer in data["Answer"]:
-                            # Type 1 = A record
-                            if answer.get("type") == 1:
-                                ip = answer.get("data", "")
-                                if ip and ip not in ip_addresses:
-                                    ip_addresses.append(ip)
-
-                if ip_addresses:
-                    break  # Resolved on first server, skip remaining
-    except (httpx.TimeoutException, httpx.RequestError):
-        pass
-
-    return DNSResolveStatus(
-        domain=domain,
-        resolved=len(ip_addresses) > 0,
-        ip_addresses=ip_addresses,
-        checked_at=datetime.now(timezone.utc).isoformat(),
-    )
+class ManagedSiteDNSStatus(DNSResolveStatus):
+    """DNS status of a managed site, including its tunnel CNAME check."""
+    site_id: int
+    site_name: str
+    ttl: int  # Seconds the resolution result is cached
+    expected_cname: Optional[str] = None
+    cname_target: Optional[str] = None
+    tunnel_match: Optional[bool] = None  # None when not checked
+    issue: Optional[str] = None
 
 
 # Helper Functions
@@ -494,6 +453,36 @@ def list_managed_wordpress_sites(
     return sites
 
 
+@router.get("/managed-sites/dns-status", response_model=List[ManagedSiteDNSStatus])
+async def check_managed_sites_dns_status(
+    refresh: bool = False,
+    db: Session = Depends(get_db),
+    current_user: Optional[str] = Depends(get_current_user_optional),
+):
+    """Check DNS status of every managed WordPress site at once.
+
+    Domains are resolved concurrently and results are cached for the
+    record TTL. Each site's Cloudflare record is compared with the expected
+    tunnel CNAME; mismatches are flagged with tunnel_match=False and an issue.
+
+    Args:
+        refresh: Ignore cached results (e.g. right after a tunnel change)
+        db: Database session
+        current_user: Optional current authenticated user
+
+    Returns:
+        DNS status per managed site
+    """
+    service = get_wordpress_service(db)
+    sites = service.list_sites()
+    statuses = await get_site_dns_checker().check_many([site.domain for site in sites], refresh=refresh)
+
+    return [
+        ManagedSiteDNSStatus(site_id=site.id, site_name=site.site_name, **status)
+        for site, status in zip(sites, statuses)
+    ]
+
+
 @router.get("/managed-sites/{site_id}", response_model=WordPressSiteResponse)
 def get_managed_wordpress_site(
     site_id: int,
@@ -738,4 +727,4 @@ async def check_managed_site_dns_status(
             status_code=404, detail=f"Site with ID {site_id} not found"
         )
 
-    return await _check_dns_resolution(site.domain)
+    return await get_site_dns_checker().resolve(site.domain)
@@ -18,6 +18,55 @@ ALLOWED_COLLATIONS = [
     "latin1_swedish_ci",
     "ascii_general_ci",
 ]
+ALLOWED_PRIVILEGES = [
+    "ALL",
+    "ALL PRIVILEGES",
+    "SELECT",
+    "INSERT",
+    "UPDATE",
+    "DELETE",
+    "CREATE",
+    "DROP",
+    "INDEX",
+    "ALTER",
+    "CREATE TEMPORARY TABLES",
+    "LOCK TABLES",
+    "EXECUTE",
+    "CREATE VIEW",
+    "SHOW VIEW",
+    "CREATE ROUTINE",
+    "ALTER ROUTINE",
+    "EVENT",
+    "TRIGGER",
+]
+
+
+def _validate_host(v: str) -> str:
+    """Validate MySQL account host to prevent SQL injection.
+
+    Allows: %, localhost, IP addresses, hostnames with dots/hyphens
+    """
+    if v == "%" or v == "localhost":
+        return v
+
+    # Validate IP address (basic)
+    if re.match(r"^(\d{1,3}\.){3}\d{1,3}$", v):
+        return v
+
+    # Validate hostname (basic)
+    if re.match(r"^[a-zA-Z0-9][a-zA-Z0-9\-\.]*[a-zA-Z0-9]$", v):
+        return v
+
+    raise ValueError("Invalid host format. Use %, localhost, IP address, or valid hostname")
+
+
+def _validate_privileges(v: list[str]) -> list[str]:
+    """Validate privileges against whitelist and normalize to upper case."""
+    for privilege in v:
+        if privilege.upper() not in ALLOWED_PRIVILEGES:
+            raise ValueError(f"Invalid privilege: {privilege}. Must be one of: {', '.join(ALLOWED_PRIVILEGES)}")
+
+    return [p.upper() for p in v]
 
 
 class DatabaseBase(BaseModel):
@@ -102,18 +151,7 @@ class DatabaseUserBase(BaseModel):
 
         Allows: %, localhost, IP addresses, hostnames with dots/hyphens
         """
-        if v == "%" or v == "localhost":
-            return v
-
-        # Validate IP address (basic)
-        if re.match(r"^(\d{1,3}\.){3}\d{1,3}$", v):
-            return v
-
-        # Validate hostname (basic)
-        if re.match(r"^[a-zA-Z0-9][a-zA-Z0-9\-\.]*[a-zA-Z0-9]$", v):
-            return v
-
-        raise ValueError("Invalid host format. Use %, localhost, IP address, or valid hostname")
+        return _validate_host(v)
 
 
 
@@ -166,33 +204,7 @@ class DatabasePrivilegeGrant(BaseModel):
     @validator("privileges")
     def validate_privileges(cls, v):
         """Validate privileges against whitelist."""
-        allowed_privileges = [
-            "ALL",
-            "ALL PRIVILEGES",
-            "SELECT",
-            "INSERT",
-            "UPDATE",
-            "DELETE",
-            "CREATE",
-            "DROP",
-            "INDEX",
-            "ALTER",
-            "CREATE TEMPORARY TABLES",
-            "LOCK TABLES",
-            "EXECUTE",
-            "CREATE VIEW",
-            "SHOW VIEW",
-            "CREATE ROUTINE",
-            "ALTER ROUTINE",
-            "EVENT",
-            "TRIGGER",
-        ]
-
-        for privilege in v:
-            if privilege.upper() not in allowed_privileges:
-                raise ValueError(f"Invalid privilege: {privilege}. Must be one of: {', '.join(allowed_privileges)}")
-
-        return [p.upper() for p in v]
+        return _validate_privileges(v)
 
 
 class DatabaseQueryExecute(BaseModel):
@@ -221,3 +233,74 @@ class DatabaseQueryResult(BaseModel):
     rows_affected: Optional[int] = None
     results: Optional[list[dict]] = None
     error: Optional[str] = None
+
+
+class DatabaseProvisionSite(DatabaseBase):
+    """Schema for one site in a batched provisioning request.
+
+    Database, optional dedicated user and grants are applied idempotently.
+    """
+
+    username: Optional[str] = Field(None, min_length=1, max_length=32, description="Dedicated database user (skipped if omitted)")
+    password: Optional[str] = Field(None, min_length=8, description="User password (set on existing users too; auto-generated for new users if omitted)")
+    host: str = Field("%", description="Allowed host for the dedicated user")
+    privileges: list[str] = Field(default_factory=lambda: ["ALL PRIVILEGES"], description="Privileges granted on the database")
+
+    @validator("username")
+    def validate_username(cls, v):
+        """Validate username."""
+        if v is not None and not re.match(r"^[a-zA-Z_][a-zA-Z0-9_]*$", v):
+            raise ValueError("Invalid username format")
+        return v
+
+    @validator("host")
+    def validate_host(cls, v):
+        """Validate host to prevent SQL injection."""
+        return _validate_host(v)
+
+    @validator("privileges")
+    def validate_privileges(cls, v):
+        """Validate privileges against whitelist."""
+        return _validate_privileges(v)
+
+
+class DatabaseProvisionRequest(BaseModel):
+    """Schema for provisioning many databases/users/grants in one batch."""
+
+    target_system: Literal["blog", "mailserver"] = Field(..., description="Target system")
+    sites: list[DatabaseProvisionSite] = Field(..., min_length=1, description="Sites to provision")
+    grant_wp_user: bool = Field(True, description="Also grant the shared WordPress user on blog databases")
+    dry_run: bool = Field(False, description="Return the statements without executing them")
+
+    @validator("sites")
+    def validate_unique_databases(cls, v):
+        """Reject sites that name the same database twice."""
+        seen = set()
+        for site in v:
+            if site.database_name in seen:
+                raise ValueError(f"Duplicate database_name: {site.database_name}")
+            seen.add(site.database_name)
+        return v
+
+    @validator("sites")
+    def validate_account_passwords(cls, v):
+        """Reject sites that give one user account different passwords."""
+        passwords = {}
+        for site in v:
+            if not site.username or site.password is None:
+                continue
+            account = (site.username, site.host)
+            if passwords.setdefault(account, site.password) != site.password:
+                raise ValueError(f"Conflicting passwords for {site.username}@{site.host}")
+        return v
+
+
+class DatabaseProvisionResult(BaseModel):
+    """Schema for batched provisioning result."""
+
+    dry_run: bool
+    executed: bool
+    databases: list[str] = Field(default_factory=list, description="Provisioned databases")
+    users: list[str] = Field(default_factory=list, description="Provisioned users (user@host)")
+    statements: list[str] = Field(default_factory=list, description="Statements (passwords masked)")
+    duration_ms: float = 0.0
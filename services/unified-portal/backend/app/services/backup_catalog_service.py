@@ -0,0 +1,549 @@
+"""Backup catalogue: structured, indexed records of every backup run.
+
+Each backup directory (<backup_root>/<scope>/<tier>/<date>) is recorded once
+with its components, size, duration, status and checksum, plus the
+mailboxes it contains, so questions such as "latest good backup of user X's
+maildir before date D" are answered by an index lookup instead of globbing
+the backup HDD. backup-mailserver.sh writes catalog.json into each backup;
+older backups without it are inferred from their layout and backup.log.
+
+Reads re-sync the catalogue first when a backup directory was added or
+removed, or when the last sync is older than settings.backup_catalog_max_age.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.config import get_settings
+from app.services.backup_index_service import directory_signature, get_backup_size_index, scan_directory
+from backup_tools.mail_archive import load_index
+from backup_tools.retention import TIERS, backup_date
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+CATALOG_FILE = "catalog.json"
+# Component → artifact (relative to the backup directory). Archives may be
+# .tar.zst or .tar.gz, dumps .sql.zst or .sql.gz.
+COMPONENT_ARTIFACTS = {
+    "mail": "mail",
+    "sites": "sites",
+    "mysql": "mysql",
+    "config": "config",
+    "ssl": "ssl",
+    "dkim": "dkim",
+}
+
+# backup.log step summary line, e.g. "  - MAIL: success (1.2G)"
+_SUMMARY_RE = re.compile(r"^\s*-\s*([A-Z]+):\s*(\w+)")
+_DURATION_RE = re.compile(r"^Duration:\s*(\d+)")
+
+
+def _file_checksum(path: str) -> Optional[str]:
+    """SHA-256 of a small file (manifest or checksum list), None if missing."""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _parse_backup_log(path: str) -> Dict[str, Any]:
+    """Extract duration and per-component status from backup.log."""
+    result: Dict[str, Any] = {"duration_seconds": None, "components": {}}
+    try:
+        with open(path) as f:
+            for line in f:
+                duration = _DURATION_RE.match(line)
+                if duration:
+                    result["duration_seconds"] = int(duration.group(1))
+                summary = _SUMMARY_RE.match(line)
+                if summary:
+                    result["components"][summary.group(1).lower()] = summary.group(2).lower()
+    except OSError:
+        pass
+    return result
+
+
+class BackupCatalog:
+    """SQLite-backed catalogue of backup runs, components and mailboxes.
+
+    Like the size index, the catalogue lives in the portal's data directory
+    because the backup HDD is mounted read-only.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, backup_root: Optional[str] = None):
+        """Initialize backup catalogue.
+
+        Args:
+            db_path: SQLite file path (defaults to settings.backup_catalog_path)
+            backup_root: Backup root (defaults to settings.backup_root)
+        """
+        self.db_path = db_path or settings.backup_catalog_path
+        self.backup_root = os.path.realpath(backup_root or settings.backup_root)
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._synced: Optional[Tuple[float, Tuple[Optional[float], ...]]] = None  # (monotonic time, tier mtimes)
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS backup_runs (
+                id TEXT PRIMARY KEY,
+                scope TEXT NOT NULL,
+                tier TEXT NOT NULL,
+                backup_date TEXT NOT NULL,
+                path TEXT NOT NULL,
+                status TEXT NOT NULL,
+                started_at TEXT,
+                finished_at TEXT,
+                duration_seconds INTEGER,
+                size_bytes INTEGER NOT NULL,
+                file_count INTEGER NOT NULL,
+                checksum TEXT,
+                signature REAL NOT NULL,
+                cataloged_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_runs_scope_date ON backup_runs(scope, status, backup_date);
+            CREATE TABLE IF NOT EXISTS backup_components (
+                run_id TEXT NOT NULL REFERENCES backup_runs(id) ON DELETE CASCADE,
+                component TEXT NOT NULL,
+                status TEXT NOT NULL,
+                artifact TEXT NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                PRIMARY KEY (run_id, component)
+            );
+            CREATE INDEX IF NOT EXISTS idx_components ON backup_components(component, status);
+            CREATE TABLE IF NOT EXISTS backup_mailboxes (
+                run_id TEXT NOT NULL REFERENCES backup_runs(id) ON DELETE CASCADE,
+                mailbox TEXT NOT NULL,
+                artifact TEXT NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                file_count INTEGER NOT NULL,
+                PRIMARY KEY (run_id, mailbox)
+            );
+            CREATE INDEX IF NOT EXISTS idx_mailboxes ON backup_mailboxes(mailbox);
+            """
+        )
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.commit()
+
+    # ---------------------------------------------------------------- ingest
+
+    def discover(self, scopes: Optional[Iterable[str]] = None) -> List[Dict[str, str]]:
+        """List backup directories under the configured scopes.
+
+        Args:
+            scopes: Scopes relative to the backup root (defaults to settings.backup_catalog_scopes)
+
+        Returns:
+            Dicts with scope, tier, name and path
+        """
+        found = []
+        for scope in scopes or settings.backup_catalog_scopes:
+            for tier in TIERS:
+                tier_dir = os.path.join(self.backup_root, scope, tier)
+                try:
+                    entries = list(os.scandir(tier_dir))
+                except OSError:
+                    continue
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False) and backup_date(entry.name):
+                        found.append({"scope": scope, "tier": tier, "name": entry.name, "path": entry.path})
+        return found
+
+    def _describe(self, scope: str, tier: str, name: str, path: str, signature: float) -> Dict[str, Any]:
+        """Build a catalogue record for one backup directory."""
+        record: Dict[str, Any] = {}
+        catalog_path = os.path.join(path, CATALOG_FILE)
+        if os.path.exists(catalog_path):
+            with open(catalog_path) as f:
+                record = json.load(f)
+        log_info = _parse_backup_log(os.path.join(path, "backup.log"))
+        statuses = {**log_info["components"], **record.get("components", {})}
+
+        mailboxes = []
+        mail_dir = os.path.join(path, "mail")
+        mail_index = load_index(path)
+        if mail_index is not None:
+            # Indexed archive: one zstd frame per mailbox
+            for mailbox, member in sorted(mail_index["members"].items()):
+                mailboxes.append({
+                    "mailbox": mailbox,
+                    "artifact": f"{mail_index['archive']}#{member['path']}",
+                    "size_bytes": member["length"],
+                    "file_count": 0,
+                })
+        elif os.path.isdir(mail_dir):
+            # Maildir layout: mail/<domain>/<user>/
+            for domain in sorted(os.scandir(mail_dir), key=lambda e: e.name):
+                if not domain.is_dir(follow_symlinks=False):
+                    continue
+                for user in sorted(os.scandir(domain.path), key=lambda e: e.name):
+                    if not user.is_dir(follow_symlinks=False):
+                        continue
+                    size_bytes, file_count = scan_directory(user.path)
+                    mailboxes.append({
+                        "mailbox": f"{user.name}@{domain.name}".lower(),
+                        "artifact": f"mail/{domain.name}/{user.name}",
+                        "size_bytes": size_bytes,
+                        "file_count": file_count,
+                    })
+
+        components = []
+        if mail_index is not None:
+            components.append({
+                "component": "mail",
+                "status": statuses.get("mail") or "success",
+                "artifact": mail_index["archive"],
+                "size_bytes": os.path.getsize(os.path.join(path, mail_index["archive"])),
+            })
+        for component, artifact in COMPONENT_ARTIFACTS.items():
+            artifact_path = os.path.join(path, artifact)
+            if not os.path.isdir(artifact_path) or (component == "mail" and mail_index is not None):
+                continue
+            if component == "mail" and mailboxes:
+                # Already scanned per mailbox
+                size_bytes = sum(m["size_bytes"] for m in mailboxes)
+            else:
+                size_bytes, _ = scan_directory(artifact_path)
+            components.append({
+                "component": component,
+                "status": statuses.get(component) or ("success" if size_bytes else "unknown"),
+                "artifact": artifact,
+                "size_bytes": size_bytes,
+            })
+
+        status = record.get("status")
+        if status is None:
+            failed = [c for c in components if c["status"] == "failed"]
+            status = "failed" if failed else ("success" if components else "unknown")
+
+        size_entry = get_backup_size_index().get(path)
+        return {
+            "id": os.path.relpath(path, self.backup_root),
+            "scope": scope,
+            "tier": tier,
+            "backup_date": backup_date(name),
+            "path": path,
+            "status": status,
+            "started_at": record.get("started_at"),
+            "finished_at": record.get("finished_at"),
+            "duration_seconds": record.get("duration_seconds", log_info["duration_seconds"]),
+            "size_bytes": size_entry["size_bytes"],
+            "file_count": size_entry["file_count"],
+            "checksum": _file_checksum(os.path.join(path, "manifest.json"))
+            or _file_checksum(os.path.join(path, "checksums.sha256")),
+            "signature": signature,
+            "cataloged_at": time.time(),
+            "components": components,
+            "mailboxes": mailboxes,
+        }
+
+    def record(self, run: Dict[str, Any]) -> None:
+        """Insert or replace a backup run with its components and mailboxes."""
+        with self._lock:
+            self._conn.execute("DELETE FROM backup_runs WHERE id = ?", (run["id"],))
+            self._conn.execute(
+                """
+                INSERT INTO backup_runs (id, scope, tier, backup_date, path, status, started_at, finished_at,
+                    duration_seconds, size_bytes, file_count, checksum, signature, cataloged_at)
+                VALUES (:id, :scope, :tier, :backup_date, :path, :status, :started_at, :finished_at,
+                    :duration_seconds, :size_bytes, :file_count, :checksum, :signature, :cataloged_at)
+                """,
+                run,
+            )
+            self._conn.executemany(
+                "INSERT INTO backup_components (run_id, component, status, artifact, size_bytes) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(run["id"], c["component"], c["status"], c["artifact"], c["size_bytes"]) for c in run["components"]],
+            )
+            self._conn.executemany(
+                "INSERT INTO backup_mailboxes (run_id, mailbox, artifact, size_bytes, file_count) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(run["id"], m["mailbox"], m["artifact"], m["size_bytes"], m["file_count"]) for m in run["mailboxes"]],
+            )
+            self._conn.commit()
+
+    def sync(self, scopes: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """Catalogue new or changed backup directories and drop removed ones.
+
+        Args:
+            scopes: Scopes to sync (defaults to settings.backup_catalog_scopes)
+
+        Returns:
+            Counts of added/updated, unchanged and removed runs
+        """
+        with self._lock:
+            known = {row["id"]: row["signature"] for row in self._conn.execute("SELECT id, signature FROM backup_runs")}
+
+        seen = set()
+        updated = unchanged = 0
+        for backup in self.discover(scopes):
+            run_id = os.path.relpath(backup["path"], self.backup_root)
+            seen.add(run_id)
+            try:
+                signature = directory_signature(backup["path"])
+            except OSError:
+                continue
+            if known.get(run_id) == signature:
+                unchanged += 1
+                continue
+            try:
+                self.record(self._describe(backup["scope"], backup["tier"], backup["name"], backup["path"], signature))
+                updated += 1
+            except (OSError, ValueError) as e:
+                logger.warning(f"Failed to catalogue backup {backup['path']}: {e}")
+
+        removed = [(run_id,) for run_id in known if run_id not in seen]
+        if removed:
+            with self._lock:
+                self._conn.executemany("DELETE FROM backup_runs WHERE id = ?", removed)
+                self._conn.commit()
+
+        logger.info(f"Backup catalogue synced: {updated} updated, {unchanged} unchanged, {len(removed)} removed")
+        return {"updated": updated, "unchanged": unchanged, "removed": len(removed)}
+
+    def _tier_mtimes(self) -> Tuple[Optional[float], ...]:
+        """Modification times of the tier directories (change when backups are added or removed)."""
+        mtimes = []
+        for scope in settings.backup_catalog_scopes:
+            for tier in TIERS:
+                try:
+                    mtimes.append(os.stat(os.path.join(self.backup_root, scope, tier)).st_mtime)
+                except OSError:
+                    mtimes.append(None)
+        return tuple(mtimes)
+
+    def refresh_if_stale(self, max_age: Optional[float] = None) -> bool:
+        """Sync the catalogue if backups were added or removed, or it is too old.
+
+        Args:
+            max_age: Seconds a sync stays fresh (defaults to settings.backup_catalog_max_age)
+
+        Returns:
+            True if a sync ran
+        """
+        max_age = settings.backup_catalog_max_age if max_age is None else max_age
+        with self._sync_lock:
+            mtimes = self._tier_mtimes()
+            if (
+                self._synced is not None
+                and self._synced[1] == mtimes
+                and time.monotonic() - self._synced[0] < max_age
+            ):
+                return False
+            self.sync()
+            self._synced = (time.monotonic(), mtimes)
+            return True
+
+    # ----------------------------------------------------------------- query
+
+    def _components(self, run_id: str) -> List[Dict[str, Any]]:
+        """Components of a run (caller holds the lock)."""
+        return [
+            dict(row) for row in self._conn.execute(
+                "SELECT component, status, artifact, size_bytes FROM backup_components WHERE run_id = ? "
+                "ORDER BY component",
+                (run_id,),
+            )
+        ]
+
+    def list_runs(
+        self,
+        scope: Optional[str] = None,
+        tier: Optional[str] = None,
+        status: Optional[str] = None,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """Query backup runs, newest first.
+
+        Args:
+            scope: Scope (e.g. mailserver, rental/blog)
+            tier: daily, weekly or monthly
+            status: success, failed or unknown
+            before: Only runs dated on or before this ISO date
+            after: Only runs dated on or after this ISO date
+            limit: Maximum number of runs
+
+        Returns:
+            Runs with their components
+        """
+        clauses, params = [], []
+        for column, value in (("scope", scope), ("tier", tier), ("status", status)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if before:
+            clauses.append("backup_date <= ?")
+            params.append(before)
+        if after:
+            clauses.append("backup_date >= ?")
+            params.append(after)
+
+        query = "SELECT * FROM backup_runs"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY backup_date DESC, tier LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            runs = [dict(row) for row in self._conn.execute(query, params)]
+            for run in runs:
+                run["components"] = self._components(run["id"])
+        return runs
+
+    def latest_mailbox_backup(
+        self, mailbox: str, before: Optional[str] = None, scopes: Optional[Iterable[str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Latest backup of a mail scope containing a mailbox whose mail component succeeded.
+
+        Args:
+            mailbox: Email address
+            before: Only backups dated on or before this ISO date
+            scopes: Only these scopes; scopes outside settings.backup_mail_scopes are ignored
+
+        Returns:
+            Run and mailbox entry, or None
+        """
+        mail_scopes = settings.backup_mail_scopes
+        scopes = [scope for scope in scopes or mail_scopes if scope in mail_scopes]
+        if not scopes:
+            return None
+
+        query = (
+            "SELECT r.*, m.artifact AS mailbox_artifact, m.size_bytes AS mailbox_size_bytes, "
+            "m.file_count AS mailbox_file_count "
+            "FROM backup_mailboxes m JOIN backup_runs r ON r.id = m.run_id "
+            "JOIN backup_components c ON c.run_id = m.run_id AND c.component = 'mail' "
+            f"WHERE m.mailbox = ? AND c.status = 'success' AND r.scope IN ({', '.join('?' * len(scopes))})"
+        )
+        params: List[Any] = [mailbox.lower(), *scopes]
+        if before:
+            query += " AND r.backup_date <= ?"
+            params.append(before)
+        query += " ORDER BY r.backup_date DESC LIMIT 1"
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+        return dict(row) if row else None
+
+    def latest_component_backup(
+        self, scope: str, component: str, before: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Latest backup run of a scope with a successful component.
+
+        Args:
+            scope: Scope
+            component: Component name
+            before: Only backups dated on or before this ISO date
+
+        Returns:
+            Run with component artifact and size, or None
+        """
+        query = (
+            "SELECT r.*, c.artifact AS component_artifact, c.size_bytes AS component_size_bytes "
+            "FROM backup_components c JOIN backup_runs r ON r.id = c.run_id "
+            "WHERE r.scope = ? AND c.component = ? AND c.status = 'success'"
+        )
+        params: List[Any] = [scope, component]
+        if before:
+            query += " AND r.backup_date <= ?"
+            params.append(before)
+        query += " ORDER BY r.backup_date DESC LIMIT 1"
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+        return dict(row) if row else None
+
+    def plan_restore(
+        self,
+        scope: str,
+        components: Iterable[str],
+        before: Optional[str] = None,
+        mailboxes: Iterable[str] = (),
+    ) -> Dict[str, Any]:
+        """Plan the minimal set of artifacts to read for a restore.
+
+        Mailboxes are restored from their own maildir subtree rather than the
+        whole mail component; every other component uses the newest good
+        backup on or before the requested date.
+
+        Args:
+            scope: Scope (e.g. mailserver)
+            components: Components to restore (mail, mysql, config, ssl, dkim, sites)
+            before: Point in time (ISO date); latest when omitted
+            mailboxes: Email addresses to restore instead of the whole mail component
+
+        Returns:
+            Plan with steps, total bytes to read and components that cannot be restored
+        """
+        steps, missing = [], []
+
+        for mailbox in mailboxes:
+            run = self.latest_mailbox_backup(mailbox, before, scopes=[scope])
+            if run is None:
+                missing.append(f"mailbox:{mailbox}")
+                continue
+            steps.append({
+                "component": "mail",
+                "mailbox": mailbox.lower(),
+                "run_id": run["id"],
+                "backup_date": run["backup_date"],
+                "artifact": os.path.join(run["path"], run["mailbox_artifact"]),
+                "read_bytes": run["mailbox_size_bytes"],
+            })
+
+        for component in components:
+            if component == "mail" and mailboxes:
+                continue
+            run = self.latest_component_backup(scope, component, before)
+            if run is None:
+                missing.append(component)
+                continue
+            steps.append({
+                "component": component,
+                "mailbox": None,
+                "run_id": run["id"],
+                "backup_date": run["backup_date"],
+                "artifact": os.path.join(run["path"], run["component_artifact"]),
+                "read_bytes": run["component_size_bytes"],
+            })
+
+        return {
+            "scope": scope,
+            "before": before,
+            "steps": steps,
+            "total_read_bytes": sum(step["read_bytes"] for step in steps),
+            "missing": missing,
+        }
+
+
+# Singleton instance
+_backup_catalog: BackupCatalog | None = None
+
+
+def get_backup_catalog() -> BackupCatalog:
+    """Get backup catalogue singleton.
+
+    Returns:
+        BackupCatalog instance
+    """
+    global _backup_catalog
+    if _backup_catalog is None:
+        _backup_catalog = BackupCatalog()
+    return _backup_catalog
@@ -0,0 +1,348 @@
+"""Persistent size index for backup directories."""
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class ScanCancelled(Exception):
+    """Raised when a directory scan is cancelled."""
+
+
+def scan_directory(path: str, cancel_event: Optional[threading.Event] = None) -> Tuple[int, int]:
+    """Compute total size and file count of a directory tree.
+
+    Uses os.scandir so each file costs a single lstat (cached on the
+    DirEntry) instead of exists() + getsize().
+
+    Args:
+        path: Directory path
+        cancel_event: Abort the scan when set
+
+    Returns:
+        Tuple of (size in bytes, file count)
+
+    Raises:
+        ScanCancelled: If cancel_event is set during the scan
+    """
+    total_size = 0
+    file_count = 0
+    stack = [path]
+    while stack:
+        if cancel_event is not None and cancel_event.is_set():
+            raise ScanCancelled(path)
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            total_size += entry.stat(follow_symlinks=False).st_size
+                            file_count += 1
+                    except OSError:
+                        continue
+        except OSError as e:
+            logger.debug(f"Skipping unreadable directory {current}: {e}")
+    return total_size, file_count
+
+
+def scan_directories(
+    paths: Iterable[str],
+    max_workers: int = 4,
+    cancel_event: Optional[threading.Event] = None,
+) -> Iterator[Tuple[str, int, int]]:
+    """Scan several backup directories in parallel, one worker per directory.
+
+    Results are yielded as each directory finishes, so callers can report
+    partial progress. Setting cancel_event stops running scans and skips
+    queued ones; the event is also set if the consumer stops early, but
+    not after a normal finish, so it must not be shared between callers.
+
+    Args:
+        paths: Top-level backup directories
+        max_workers: Thread pool size
+        cancel_event: Cancel remaining scans when set
+
+    Yields:
+        Tuples of (path, size in bytes, file count)
+    """
+    paths = list(paths)
+    if not paths:
+        return
+
+    cancel_event = cancel_event or threading.Event()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(paths)), thread_name_prefix="backup-scan") as executor:
+        futures = {executor.submit(scan_directory, path, cancel_event): path for path in paths}
+        finished = False
+        try:
+            for future in as_completed(futures):
+                try:
+                    size_bytes, file_count = future.result()
+                except ScanCancelled:
+                    continue
+                yield futures[future], size_bytes, file_count
+            finished = True
+        finally:
+            if not finished:
+                # Consumer stopped early (or error) - don't keep the disk busy
+                cancel_event.set()
+                for future in futures:
+                    future.cancel()
+
+
+def directory_signature(path: str) -> float:
+    """Get change signature of a backup directory.
+
+    Backup scripts write into subdirectories (mail/, mysql/, config/...), which
+    does not update the top-level mtime, so the newest mtime of the directory
+    and its immediate children is used.
+
+    Args:
+        path: Directory path
+
+    Returns:
+        Newest mtime (seconds since epoch)
+    """
+    signature = os.stat(path).st_mtime
+    with os.scandir(path) as entries:
+        for entry in entries:
+            try:
+                signature = max(signature, entry.stat(follow_symlinks=False).st_mtime)
+            except OSError:
+                continue
+    return signature
+
+
+class BackupSizeIndex:
+    """SQLite-backed index of backup directory sizes.
+
+    Each backup directory is scanned once and re-scanned only when its
+    signature (see directory_signature) changes. The backup HDD is mounted
+    read-only in the portal container, so the index lives in the portal's
+    own data directory instead of next to the backups.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        scanner: Callable[[str], Tuple[int, int]] = scan_directory,
+        max_workers: Optional[int] = None,
+    ):
+        """Initialize backup size index.
+
+        Args:
+            db_path: SQLite file path (defaults to settings.backup_index_path)
+            scanner: Function returning (size in bytes, file count) for a directory
+            max_workers: Parallel scan workers (defaults to settings.backup_scan_workers)
+        """
+        self.db_path = db_path or settings.backup_index_path
+        self.scanner = scanner
+        self.max_workers = max_workers or settings.backup_scan_workers
+        self._lock = threading.Lock()
+        # Running get_many() scans: cancel event and progress per call
+        self._scans: Dict[int, Tuple[threading.Event, Dict[str, Any]]] = {}
+        self._scan_ids = itertools.count()
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS backup_sizes (
+                path TEXT PRIMARY KEY,
+                signature REAL NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                file_count INTEGER NOT NULL,
+                scanned_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def _lookup(self, path: str) -> Optional[sqlite3.Row]:
+        """Get indexed entry for a path."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT * FROM backup_sizes WHERE path = ?", (path,)
+            ).fetchone()
+
+    def record(self, path: str, size_bytes: int, file_count: int, signature: Optional[float] = None) -> None:
+        """Record size of a backup directory.
+
+        Args:
+            path: Backup directory
+            size_bytes: Total size in bytes
+            file_count: Number of files
+            signature: Directory signature (computed if omitted)
+        """
+        if signature is None:
+            signature = directory_signature(path)
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO backup_sizes (path, signature, size_bytes, file_count, scanned_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET
+                    signature = excluded.signature,
+                    size_bytes = excluded.size_bytes,
+                    file_count = excluded.file_count,
+                    scanned_at = excluded.scanned_at
+                """,
+                (path, signature, size_bytes, file_count, time.time()),
+            )
+            self._conn.commit()
+
+    def get(self, path: str, force: bool = False) -> Dict[str, Any]:
+        """Get size of a backup directory, scanning only if it changed.
+
+        Args:
+            path: Backup directory
+            force: Re-scan even if the signature is unchanged
+
+        Returns:
+            Dict with size_bytes, file_count and cached flag
+        """
+        try:
+            signature = directory_signature(path)
+        except OSError as e:
+            logger.warning(f"Cannot stat backup directory {path}: {e}")
+            return {"size_bytes": 0, "file_count": 0, "cached": False}
+
+        entry = self._lookup(path)
+        if entry is not None and not force and entry["signature"] == signature:
+            return {"size_bytes": entry["size_bytes"], "file_count": entry["file_count"], "cached": True}
+
+        size_bytes, file_count = self.scanner(path)
+        self.record(path, size_bytes, file_count, signature)
+        logger.info(f"Indexed backup {path}: {size_bytes} bytes, {file_count} files")
+        return {"size_bytes": size_bytes, "file_count": file_count, "cached": False}
+
+    def get_many(
+        self,
+        paths: Iterable[str],
+        cancel_event: Optional[threading.Event] = None,
+        progress: Optional[Callable[[str, int, int], None]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Get sizes of many backup directories, scanning changed ones in parallel.
+
+        Every entry has a status: "indexed" (with size_bytes and file_count),
+        "pending" (scan cancelled before it finished) or "unknown" (directory
+        could not be read). Sizes of pending and unknown entries are None.
+
+        Args:
+            paths: Backup directories
+            cancel_event: Cancel remaining scans when set (a new event per call by default)
+            progress: Callback(path, done, total) after each fresh scan
+
+        Returns:
+            Entries keyed by path
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        stale: List[Tuple[str, float]] = []
+
+        for path in paths:
+            try:
+                signature = directory_signature(path)
+            except OSError as e:
+                logger.warning(f"Cannot stat backup directory {path}: {e}")
+                results[path] = {"size_bytes": None, "file_count": None, "cached": False, "status": "unknown"}
+                continue
+            entry = self._lookup(path)
+            if entry is not None and entry["signature"] == signature:
+                results[path] = {
+                    "size_bytes": entry["size_bytes"],
+                    "file_count": entry["file_count"],
+                    "cached": True,
+                    "status": "indexed",
+                }
+            else:
+                stale.append((path, signature))
+
+        if not stale:
+            return results
+
+        signatures = dict(stale)
+        cancel_event = cancel_event or threading.Event()
+        scan_progress: Dict[str, Any] = {"running": True, "done": 0, "total": len(stale), "last_path": None}
+        scan_id = next(self._scan_ids)
+        self._scans[scan_id] = (cancel_event, scan_progress)
+        try:
+            for done, (path, size_bytes, file_count) in enumerate(
+                scan_directories(signatures, self.max_workers, cancel_event), start=1
+            ):
+                self.record(path, size_bytes, file_count, signatures[path])
+                results[path] = {"size_bytes": size_bytes, "file_count": file_count, "cached": False, "status": "indexed"}
+                scan_progress.update(done=done, last_path=path)
+                if progress is not None:
+                    progress(path, done, len(stale))
+        finally:
+            del self._scans[scan_id]
+
+        for path in signatures:
+            # Cancelled before scanning finished - size not known yet
+            results.setdefault(path, {"size_bytes": None, "file_count": None, "cached": False, "status": "pending"})
+
+        logger.info(f"Indexed {scan_progress['done']} of {len(stale)} changed backup directories ({len(results)} total)")
+        return results
+
+    @property
+    def scan_progress(self) -> Dict[str, Any]:
+        """Combined progress of the running scans."""
+        scans = [progress for _, progress in list(self._scans.values())]
+        return {
+            "running": bool(scans),
+            "done": sum(progress["done"] for progress in scans),
+            "total": sum(progress["total"] for progress in scans),
+            "last_path": next((progress["last_path"] for progress in reversed(scans) if progress["last_path"]), None),
+        }
+
+    def cancel_scan(self) -> None:
+        """Cancel the running parallel scans (already scanned dirs stay indexed)."""
+        for cancel_event, _ in list(self._scans.values()):
+            cancel_event.set()
+
+    def prune(self) -> int:
+        """Remove index entries for backup directories that no longer exist.
+
+        Returns:
+            Number of removed entries
+        """
+        with self._lock:
+            paths = [row["path"] for row in self._conn.execute("SELECT path FROM backup_sizes")]
+            missing = [(path,) for path in paths if not os.path.isdir(path)]
+            self._conn.executemany("DELETE FROM backup_sizes WHERE path = ?", missing)
+            self._conn.commit()
+        return len(missing)
+
+
+# Singleton instance
+_backup_index: BackupSizeIndex | None = None
+
+
+def get_backup_size_index() -> BackupSizeIndex:
+    """Get backup size index singleton.
+
+    Returns:
+        BackupSizeIndex instance
+    """
+    global _backup_index
+    if _backup_index is None:
+        _backup_index = BackupSizeIndex()
+    return _backup_index
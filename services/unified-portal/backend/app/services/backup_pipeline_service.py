@@ -0,0 +1,280 @@
+"""Streaming backup pipeline: source → compressor → destination.
+
+A source process (tar or mysqldump) is piped through a multi-threaded
+compressor straight into the destination file, with no intermediate files.
+Each stage counts its bytes so throughput (MB/s) can be reported per stage
+while the pipeline runs.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Pipe buffer between stages (bytes)
+CHUNK_SIZE = 1024 * 1024
+
+# zstd long-range matching window (2^27 = 128 MiB), same as backup-config.sh
+ZSTD_WINDOW_LOG = 27
+
+
+def compressor_command(level: int = 3) -> tuple[List[str], str]:
+    """Build the compressor command.
+
+    zstd is used when installed (all cores, long-range matching), gzip otherwise.
+
+    Args:
+        level: Compression level
+
+    Returns:
+        Tuple of (command, file extension)
+    """
+    if shutil.which("zstd"):
+        return ["zstd", "-q", "-T0", f"-{level}", f"--long={ZSTD_WINDOW_LOG}"], "zst"
+    return ["gzip", f"-{min(level, 9)}"], "gz"
+
+
+class PipelineStage:
+    """Byte counter for one pipeline stage."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.bytes = 0
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    def add(self, count: int) -> None:
+        """Count bytes passing through the stage."""
+        if self.started is None:
+            self.started = time.monotonic()
+        self.bytes += count
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Stage stats with throughput in MB/s."""
+        elapsed = 0.0
+        if self.started is not None:
+            elapsed = (self.finished or time.monotonic()) - self.started
+        return {
+            "name": self.name,
+            "bytes": self.bytes,
+            "seconds": round(elapsed, 2),
+            "mb_per_s": round(self.bytes / (1024 * 1024) / elapsed, 2) if elapsed > 0 else None,
+        }
+
+
+class BackupPipelineService:
+    """Service running streaming backup pipelines as background jobs."""
+
+    def __init__(self, max_concurrent_jobs: int = 1, compression_level: int = 3):
+        """Initialize backup pipeline service.
+
+        Args:
+            max_concurrent_jobs: Pipelines running at once (each compressor uses all cores)
+            compression_level: Compressor level
+        """
+        self.compression_level = compression_level
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_jobs, thread_name_prefix="backup-pipeline")
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._stages: Dict[str, List[PipelineStage]] = {}
+        self._lock = threading.Lock()
+
+    def start_tar(self, source_dir: str, dest_base: str) -> Dict[str, Any]:
+        """Queue a tar → compressor → file pipeline.
+
+        Args:
+            source_dir: Directory to archive
+            dest_base: Destination path without suffix (.tar.zst/.tar.gz is appended)
+
+        Returns:
+            Queued job
+        """
+        return self._submit("tar", ["tar", "-cf", "-", "-C", source_dir, "."], f"{dest_base}.tar", None)
+
+    def start_mysqldump(self, container: str, database: str, password: str, dest_base: str) -> Dict[str, Any]:
+        """Queue a mysqldump → compressor → file pipeline.
+
+        The password is passed through the environment (docker exec -e MYSQL_PWD)
+        so it never appears in a process argument list.
+
+        Args:
+            container: MariaDB container name
+            database: Database name (already validated)
+            password: MariaDB root password
+            dest_base: Destination path without suffix (.sql.zst/.sql.gz is appended)
+
+        Returns:
+            Queued job
+        """
+        command = [
+            "docker", "exec", "-e", "MYSQL_PWD", container,
+            "mysqldump", "-u", "root", "--single-transaction", "--quick",
+            "--routines", "--triggers", "--events", database,
+        ]
+        return self._submit("mysqldump", command, f"{dest_base}.sql", {**os.environ, "MYSQL_PWD": password})
+
+    def _submit(
+        self,
+        kind: str,
+        source_cmd: List[str],
+        dest_base: str,
+        env: Optional[Dict[str, str]],
+    ) -> Dict[str, Any]:
+        """Queue a pipeline job."""
+        compress_cmd, ext = compressor_command(self.compression_level)
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "kind": kind,
+            "destination": f"{dest_base}.{ext}",
+            "compressor": compress_cmd[0],
+            "status": "queued",
+            "queued_at": datetime.now(timezone.utc).isoformat(),
+            "finished_at": None,
+            "error": None,
+        }
+        stages = [PipelineStage(kind), PipelineStage(compress_cmd[0])]
+        with self._lock:
+            self._jobs[job["job_id"]] = job
+            self._stages[job["job_id"]] = stages
+        self._executor.submit(self._run, job, stages, source_cmd, compress_cmd, env)
+        return self.get_job(job["job_id"])
+
+    def _run(
+        self,
+        job: Dict[str, Any],
+        stages: List[PipelineStage],
+        source_cmd: List[str],
+        compress_cmd: List[str],
+        env: Optional[Dict[str, str]],
+    ) -> None:
+        """Run a pipeline (executed on the pipeline worker thread).
+
+        Data is relayed through this process between stages, which is what
+        lets each stage be metered; the relay cost is small next to compression.
+        """
+        source_stage, compress_stage = stages
+        destination = job["destination"]
+        tmp_path = f"{destination}.partial"
+        job["status"] = "running"
+        source = compressor = None
+        source_stderr: List[bytes] = []
+
+        try:
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            source = subprocess.Popen(source_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+            compressor = subprocess.Popen(compress_cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+            def drain_stderr() -> None:
+                source_stderr.append(source.stderr.read())
+
+            def feed_compressor() -> None:
+                try:
+                    while True:
+                        chunk = source.stdout.read(CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        source_stage.add(len(chunk))
+                        compressor.stdin.write(chunk)
+                except BrokenPipeError:
+                    # Compressor died; its exit code is reported below
+                    source.kill()
+                finally:
+                    source_stage.finished = time.monotonic()
+                    try:
+                        compressor.stdin.close()
+                    except BrokenPipeError:
+                        pass
+
+            threads = [threading.Thread(target=drain_stderr), threading.Thread(target=feed_compressor)]
+            for thread in threads:
+                thread.start()
+
+            with open(tmp_path, "wb") as out:
+                while True:
+                    chunk = compressor.stdout.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    compress_stage.add(len(chunk))
+                    out.write(chunk)
+            compress_stage.finished = time.monotonic()
+
+            for thread in threads:
+                thread.join()
+            source_rc = source.wait()
+            compress_rc = compressor.wait()
+
+            # tar exit code 1 = files changed while reading (acceptable on live systems)
+            if source_rc != 0 and not (job["kind"] == "tar" and source_rc == 1):
+                stderr = b"".join(source_stderr).decode(errors="replace").strip()
+                raise RuntimeError(f"{source_cmd[0]} exited with {source_rc}: {stderr}")
+            if compress_rc != 0:
+                raise RuntimeError(f"{compress_cmd[0]} exited with {compress_rc}")
+
+            os.replace(tmp_path, destination)
+            job["status"] = "completed"
+            logger.info(
+                f"Backup pipeline {job['job_id']} wrote {destination}: "
+                + ", ".join(f"{s['name']} {s['mb_per_s']} MB/s" for s in (st.to_dict() for st in stages))
+            )
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(e)
+            logger.error(f"Backup pipeline {job['job_id']} failed: {e}")
+            for proc in (source, compressor):
+                if proc is not None and proc.poll() is None:
+                    proc.kill()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        finally:
+            job["finished_at"] = datetime.now(timezone.utc).isoformat()
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a pipeline job with live per-stage throughput.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            Job or None if not found
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            stages = [stage.to_dict() for stage in self._stages[job_id]]
+        source_bytes, output_bytes = stages[0]["bytes"], stages[1]["bytes"]
+        return {
+            **job,
+            "stages": stages,
+            "compression_ratio": round(source_bytes / output_bytes, 2) if output_bytes else None,
+        }
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """List pipeline jobs, newest first."""
+        with self._lock:
+            job_ids = list(self._jobs)
+        return [self.get_job(job_id) for job_id in reversed(job_ids)]
+
+
+# Singleton instance
+_pipeline_service: BackupPipelineService | None = None
+
+
+def get_backup_pipeline_service() -> BackupPipelineService:
+    """Get backup pipeline service singleton.
+
+    Returns:
+        BackupPipelineService instance
+    """
+    global _pipeline_service
+    if _pipeline_service is None:
+        _pipeline_service = BackupPipelineService()
+    return _pipeline_service
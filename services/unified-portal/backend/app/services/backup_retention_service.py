@@ -0,0 +1,107 @@
+"""Portal-side retention jobs.
+
+Planning and pruning live in backup_tools.retention. The portal's backup
+mount is read-only, so runs started here only plan; the backup scripts
+prune on the host (python3 -m backup_tools.retention apply).
+"""
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from backup_tools.retention import BackupSizes, RetentionPolicy, plan_retention
+
+logger = logging.getLogger(__name__)
+
+
+class BackupRetentionService:
+    """Service running retention plans as background jobs."""
+
+    def __init__(self):
+        """Initialize backup retention service (one run at a time)."""
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="backup-retention")
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def start(
+        self,
+        root: str,
+        policy: RetentionPolicy,
+        scopes: Iterable[str],
+        sizes: Optional[BackupSizes] = None,
+    ) -> Dict[str, Any]:
+        """Queue a retention run (plan only, nothing is deleted).
+
+        Args:
+            root: Backup root
+            policy: Retention policy
+            scopes: Scopes relative to the root
+            sizes: Size lookup
+
+        Returns:
+            Queued job
+        """
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "dry_run": True,
+            "status": "queued",
+            "queued_at": datetime.now(timezone.utc).isoformat(),
+            "finished_at": None,
+            "plan": None,
+            "error": None,
+        }
+        with self._lock:
+            self._jobs[job["job_id"]] = job
+        self._executor.submit(self._run, job, root, policy, list(scopes), sizes)
+        return self.get_job(job["job_id"])
+
+    def _run(
+        self,
+        job: Dict[str, Any],
+        root: str,
+        policy: RetentionPolicy,
+        scopes: List[str],
+        sizes: Optional[BackupSizes],
+    ) -> None:
+        """Run a retention job (executed on the retention worker thread)."""
+        job["status"] = "running"
+        try:
+            job["plan"] = plan_retention(root, policy, scopes, sizes)
+            job["status"] = "completed"
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(e)
+            logger.error(f"Retention run {job['job_id']} failed: {e}")
+        finally:
+            job["finished_at"] = datetime.now(timezone.utc).isoformat()
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a retention job by ID.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            Job or None if not found
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+
+# Singleton instance
+_retention_service: BackupRetentionService | None = None
+
+
+def get_backup_retention_service() -> BackupRetentionService:
+    """Get backup retention service singleton.
+
+    Returns:
+        BackupRetentionService instance
+    """
+    global _retention_service
+    if _retention_service is None:
+        _retention_service = BackupRetentionService()
+    return _retention_service
@@ -0,0 +1,26 @@
+"""Portal access to the host backup job runner's state.
+
+The runner (backup_tools.scheduler) records jobs in a state directory that
+is bind-mounted into the portal container; the portal reads those jobs and
+queues runs through the same BackupJobStore.
+"""
+from backup_tools.scheduler import BackupJobStore
+
+
+# Singleton instance
+_job_store: BackupJobStore | None = None
+
+
+def get_backup_job_store(state_dir: str) -> BackupJobStore:
+    """Get backup job store singleton.
+
+    Args:
+        state_dir: State directory (used on first call)
+
+    Returns:
+        BackupJobStore instance
+    """
+    global _job_store
+    if _job_store is None:
+        _job_store = BackupJobStore(state_dir)
+    return _job_store
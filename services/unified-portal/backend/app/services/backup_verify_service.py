@@ -0,0 +1,98 @@
+"""Portal-side backup verification jobs.
+
+Verification itself lives in backup_tools.manifest, which the backup scripts
+also run on the host to write manifests.
+"""
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from backup_tools.manifest import verify_backup
+
+logger = logging.getLogger(__name__)
+
+
+class BackupVerifyService:
+    """Service running backup verifications as background jobs."""
+
+    def __init__(self, max_concurrent_jobs: int = 1):
+        """Initialize backup verify service.
+
+        Args:
+            max_concurrent_jobs: Verifications running at once (each uses all cores)
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_jobs, thread_name_prefix="backup-verify")
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def start(self, backup_id: str, backup_dir: str) -> Dict[str, Any]:
+        """Queue verification of a backup directory.
+
+        Args:
+            backup_id: Backup ID (path relative to the backup root)
+            backup_dir: Absolute backup directory
+
+        Returns:
+            Queued job
+        """
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "backup_id": backup_id,
+            "status": "queued",
+            "queued_at": datetime.now(timezone.utc).isoformat(),
+            "finished_at": None,
+            "progress": {"files_total": 0, "files_done": 0, "bytes_done": 0},
+            "result": None,
+            "error": None,
+        }
+        with self._lock:
+            self._jobs[job["job_id"]] = job
+        self._executor.submit(self._run, job, backup_dir)
+        return self.get_job(job["job_id"])
+
+    def _run(self, job: Dict[str, Any], backup_dir: str) -> None:
+        """Run a verification job (executed on the verify worker thread)."""
+        job["status"] = "running"
+        try:
+            job["result"] = verify_backup(backup_dir, progress=job["progress"])
+            job["status"] = "completed"
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(e)
+            logger.error(f"Backup verification {job['job_id']} failed: {e}")
+        finally:
+            job["finished_at"] = datetime.now(timezone.utc).isoformat()
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a verification job by ID.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            Job or None if not found
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return {**job, "progress": dict(job["progress"])}
+
+
+# Singleton instance
+_verify_service: BackupVerifyService | None = None
+
+
+def get_backup_verify_service() -> BackupVerifyService:
+    """Get backup verify service singleton.
+
+    Returns:
+        BackupVerifyService instance
+    """
+    global _verify_service
+    if _verify_service is None:
+        _verify_service = BackupVerifyService()
+    return _verify_service
@@ -0,0 +1,253 @@
+"""TLS certificate inventory.
+
+Certificate files under the configured directories (mail's Tailscale
+certificate, Let's Encrypt live directories, origin certificates in the
+blog nginx config) are parsed with cryptography and indexed by SAN, so
+questions like "what expires in the next 14 days" are answered from memory.
+
+Parsed files are cached by (mtime, size); a rescan only stats the files and
+re-parses the ones that changed, and the index is rebuilt only when some
+file was added, changed or removed. Private keys in the same directories
+are never parsed - only CERTIFICATE PEM blocks are read.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from cryptography import x509
+from cryptography.hazmat.primitives.serialization import Encoding
+from cryptography.x509.oid import NameOID
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+CERTIFICATE_EXTENSIONS = (".pem", ".crt", ".cer")
+PEM_CERTIFICATE_MARKER = b"-----BEGIN CERTIFICATE-----"
+# Larger files are not certificates
+MAX_CERTIFICATE_FILE_SIZE = 1024 * 1024
+
+
+@dataclass
+class CertificateInfo:
+    """Leaf certificate parsed from a file."""
+
+    path: str
+    fingerprint: str  # SHA-256 of the DER encoding
+    subject: str
+    issuer: str
+    sans: List[str]
+    not_before: datetime
+    not_after: datetime
+
+    def days_remaining(self, now: Optional[datetime] = None) -> int:
+        """Whole days until expiry (negative once expired)."""
+        return (self.not_after - (now or datetime.now(timezone.utc))).days
+
+    def status(self, now: Optional[datetime] = None, warning_days: Optional[int] = None) -> str:
+        """Status: active, expiring (within warning_days) or expired."""
+        days = self.days_remaining(now)
+        if days < 0:
+            return "expired"
+        warning = settings.certificate_expiry_warning_days if warning_days is None else warning_days
+        return "expiring" if days < warning else "active"
+
+
+@dataclass
+class CertificateIndex:
+    """Certificates indexed by SAN."""
+
+    certificates: List[CertificateInfo] = field(default_factory=list)
+    by_name: Dict[str, List[CertificateInfo]] = field(default_factory=dict)
+    scanned_at: Optional[datetime] = None
+
+
+def _common_name(name: x509.Name) -> str:
+    """CN of a name, or its RFC 4514 string."""
+    values = name.get_attributes_for_oid(NameOID.COMMON_NAME)
+    return str(values[0].value) if values else name.rfc4514_string()
+
+
+def _utc(value: datetime) -> datetime:
+    """Treat naive datetimes from cryptography as UTC."""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def parse_certificate_file(path: str) -> Optional[CertificateInfo]:
+    """Parse the leaf (first) certificate of a PEM file.
+
+    Args:
+        path: Certificate file path
+
+    Returns:
+        CertificateInfo, or None if the file holds no certificate
+    """
+    with open(path, "rb") as f:
+        data = f.read(MAX_CERTIFICATE_FILE_SIZE)
+    if PEM_CERTIFICATE_MARKER not in data:
+        return None
+
+    cert = x509.load_pem_x509_certificates(data)[0]
+    try:
+        san = cert.extensions.get_extension_for_class(x509.SubjectAlternativeName)
+        sans = [name.lower() for name in san.value.get_values_for_type(x509.DNSName)]
+    except x509.ExtensionNotFound:
+        sans = []
+    subject = _common_name(cert.subject)
+    if not sans and "." in subject:
+        sans = [subject.lower()]
+
+    return CertificateInfo(
+        path=path,
+        fingerprint=hashlib.sha256(cert.public_bytes(Encoding.DER)).hexdigest(),
+        subject=subject,
+        issuer=_common_name(cert.issuer),
+        sans=sans,
+        not_before=_utc(getattr(cert, "not_valid_before_utc", None) or cert.not_valid_before),
+        not_after=_utc(getattr(cert, "not_valid_after_utc", None) or cert.not_valid_after),
+    )
+
+
+def _name_matches(pattern: str, hostname: str) -> bool:
+    """Whether a SAN (possibly *.wildcard) covers hostname."""
+    if pattern == hostname:
+        return True
+    if pattern.startswith("*."):
+        head, _, rest = hostname.partition(".")
+        return bool(head) and rest == pattern[2:]
+    return False
+
+
+class CertificateInventory:
+    """Cached certificate scan of the configured directories."""
+
+    def __init__(self, directories: Optional[List[str]] = None):
+        """Initialize certificate inventory.
+
+        Args:
+            directories: Directories to scan (defaults to settings)
+        """
+        self.directories = directories or list(settings.certificate_dirs)
+        self._files: Dict[str, Tuple[Tuple[int, int], Optional[CertificateInfo]]] = {}
+        self._index = CertificateIndex()
+        self._lock = threading.Lock()
+
+    def _candidate_files(self) -> Dict[str, Tuple[int, int]]:
+        """Certificate-looking files with their (mtime_ns, size)."""
+        found: Dict[str, Tuple[int, int]] = {}
+        for directory in self.directories:
+            if not os.path.isdir(directory):
+                continue
+            for dirpath, _, filenames in os.walk(directory, followlinks=True):
+                for filename in filenames:
+                    if not filename.lower().endswith(CERTIFICATE_EXTENSIONS):
+                        continue
+                    path = os.path.join(dirpath, filename)
+                    try:
+                        stat = os.stat(path)  # Follows Let's Encrypt's live/ symlinks
+                    except OSError:
+                        continue
+                    if stat.st_size <= MAX_CERTIFICATE_FILE_SIZE:
+                        found[path] = (stat.st_mtime_ns, stat.st_size)
+        return found
+
+    def scan(self) -> CertificateIndex:
+        """Rescan, re-parsing only files whose mtime or size changed.
+
+        Returns:
+            Current certificate index
+        """
+        with self._lock:
+            found = self._candidate_files()
+            changed = found.keys() != self._files.keys()
+            for path, signature in found.items():
+                cached = self._files.get(path)
+                if cached is not None and cached[0] == signature:
+                    continue
+                try:
+                    info = parse_certificate_file(path)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Could not parse certificate {path}: {e}")
+                    info = None
+                self._files[path] = (signature, info)
+                changed = True
+            for path in set(self._files) - set(found):
+                del self._files[path]
+
+            if changed or self._index.scanned_at is None:
+                self._index = self._build_index()
+                logger.info(f"Certificate inventory: {len(self._index.certificates)} certificates, "
+                            f"{len(self._index.by_name)} names")
+            return self._index
+
+    def _build_index(self) -> CertificateIndex:
+        """Index parsed certificates by SAN (duplicates by fingerprint dropped)."""
+        index = CertificateIndex(scanned_at=datetime.now(timezone.utc))
+        seen = set()
+        for path in sorted(self._files):
+            info = self._files[path][1]
+            if info is None or info.fingerprint in seen:
+                continue
+            seen.add(info.fingerprint)
+            index.certificates.append(info)
+            for name in info.sans:
+                index.by_name.setdefault(name, []).append(info)
+        for certs in index.by_name.values():
+            certs.sort(key=lambda cert: cert.not_after, reverse=True)
+        return index
+
+    def lookup(self, hostname: str) -> List[CertificateInfo]:
+        """Certificates covering a hostname (exact or wildcard SAN), newest first.
+
+        Args:
+            hostname: Hostname
+
+        Returns:
+            Matching certificates
+        """
+        hostname = hostname.lower().rstrip(".")
+        index = self.scan()
+        matches = list(index.by_name.get(hostname, []))
+        for name, certs in index.by_name.items():
+            if name.startswith("*.") and _name_matches(name, hostname):
+                matches += [cert for cert in certs if cert not in matches]
+        return sorted(matches, key=lambda cert: cert.not_after, reverse=True)
+
+    def expiring(self, days: int) -> List[Tuple[str, CertificateInfo]]:
+        """Names whose newest certificate expires within days.
+
+        A name also covered by a renewed certificate is not reported.
+
+        Args:
+            days: Window in days
+
+        Returns:
+            (name, certificate) pairs ordered by expiry
+        """
+        cutoff = datetime.now(timezone.utc) + timedelta(days=days)
+        index = self.scan()
+        result = [(name, certs[0]) for name, certs in index.by_name.items() if certs[0].not_after <= cutoff]
+        return sorted(result, key=lambda item: (item[1].not_after, item[0]))
+
+
+# Singleton instance
+_certificate_inventory: CertificateInventory | None = None
+
+
+def get_certificate_inventory() -> CertificateInventory:
+    """Get certificate inventory singleton.
+
+    Returns:
+        CertificateInventory instance
+    """
+    global _certificate_inventory
+    if _certificate_inventory is None:
+        _certificate_inventory = CertificateInventory()
+    return _certificate_inventory
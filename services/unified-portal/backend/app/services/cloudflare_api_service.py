@@ -0,0 +1,334 @@
+"""Shared Cloudflare API client.
+
+One pooled httpx.AsyncClient (HTTP/2 when the h2 package is installed) is
+reused by every router and service, so requests to api.cloudflare.com ride
+warm keep-alive connections instead of paying DNS, TCP and TLS setup per
+call. The client is opened lazily and closed by the application lifespan.
+Every request (retries included) draws from a token bucket sized to stay
+under Cloudflare's per-user rate limit.
+
+Failed calls raise CloudflareAPIError subclasses; rate limits, server
+errors and connection failures are retried with jittered exponential
+backoff (non-idempotent requests only when nothing reached the server).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+API_BASE_URL = "https://api.cloudflare.com/client/v4"
+
+# Requests that can be replayed after a response was lost
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE", "OPTIONS"}
+# Errors raised before the request reached Cloudflare - always safe to retry
+CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class CloudflareAPIError(Exception):
+    """Cloudflare API request failed."""
+
+    def __init__(self, message: str, status_code: int = 502, errors: Optional[List[Any]] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.errors = errors or []
+
+
+class CloudflareNotConfiguredError(CloudflareAPIError):
+    """Cloudflare API token is not configured."""
+
+    def __init__(self):
+        super().__init__("Cloudflare API token not configured", status_code=500)
+
+
+class CloudflareAuthError(CloudflareAPIError):
+    """Token rejected or lacking permission (401/403)."""
+
+
+class CloudflareNotFoundError(CloudflareAPIError):
+    """Zone, record or resource not found (404)."""
+
+
+class CloudflareRateLimitError(CloudflareAPIError):
+    """Rate limit still exceeded after retries (429)."""
+
+
+class TokenBucket:
+    """Async token bucket rate limiter."""
+
+    def __init__(self, rate: float, capacity: float):
+        """Initialize token bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens (burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    @classmethod
+    def for_window(cls, limit: int, period: float) -> "TokenBucket":
+        """Bucket that never exceeds limit requests in any period-long window.
+
+        Half the limit is available as a burst and the other half refills
+        over the period, so a full burst plus refill still fits the window.
+
+        Args:
+            limit: Requests allowed per window
+            period: Window length in seconds
+
+        Returns:
+            TokenBucket instance
+        """
+        return cls(rate=limit / 2 / period, capacity=limit / 2)
+
+    def _refill(self) -> None:
+        """Add tokens for the time elapsed since the last update."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self) -> None:
+        """Take one token, waiting until one is available."""
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def _error_for(status_code: int, message: str, errors: List[Any]) -> CloudflareAPIError:
+    """Map an HTTP status to the matching error type."""
+    if status_code in (401, 403):
+        return CloudflareAuthError(message, status_code, errors)
+    if status_code == 404:
+        return CloudflareNotFoundError(message, status_code, errors)
+    if status_code == 429:
+        return CloudflareRateLimitError(message, status_code, errors)
+    return CloudflareAPIError(message, status_code, errors)
+
+
+class CloudflareClient:
+    """Pooled, retrying Cloudflare API client."""
+
+    def __init__(
+        self,
+        api_token: Optional[str] = None,
+        timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+    ):
+        """Initialize Cloudflare client.
+
+        Args:
+            api_token: API token (defaults to settings)
+            timeout: Request timeout in seconds (defaults to settings)
+            max_retries: Retries after the first attempt (defaults to settings)
+            backoff_base: First backoff ceiling in seconds
+            backoff_max: Backoff ceiling in seconds
+            transport: httpx transport (tests)
+            rate_limiter: Request rate limiter (defaults to the settings' limit)
+        """
+        self.api_token = api_token or settings.cloudflare_api_token
+        self.timeout = timeout or settings.cloudflare_api_timeout
+        self.max_retries = settings.cloudflare_api_max_retries if max_retries is None else max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._transport = transport
+        self.rate_limiter = rate_limiter or TokenBucket.for_window(
+            settings.cloudflare_api_rate_limit, settings.cloudflare_api_rate_period
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def configured(self) -> bool:
+        """Whether an API token is set."""
+        return bool(self.api_token) and self.api_token != "your-cloudflare-api-token"
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the pooled client, opening it on first use in this event loop."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                base_url=API_BASE_URL,
+                headers={
+                    "Authorization": f"Bearer {self.api_token}",
+                    "Content-Type": "application/json",
+                },
+                http2=HTTP2_AVAILABLE and self._transport is None,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=120),
+                transport=self._transport,
+            )
+            self._loop = loop
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Delay before a retry (Retry-After wins, otherwise full jitter)."""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max * 4)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def request_envelope(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Optional[Any] = None,
+    ) -> Dict[str, Any]:
+        """Send a request and return the full response envelope.
+
+        Args:
+            method: HTTP method
+            path: Path below /client/v4 (e.g. /zones)
+            params: Query parameters
+            json: JSON body
+
+        Returns:
+            Response envelope (success, result, result_info, ...)
+
+        Raises:
+            CloudflareAPIError: On API errors (typed subclasses by status)
+        """
+        if not self.configured:
+            raise CloudflareNotConfiguredError()
+
+        method = method.upper()
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire()
+            try:
+                response = await self._get_client().request(method, path, params=params, json=json)
+            except CONNECT_ERRORS as e:
+                if attempt >= self.max_retries:
+                    raise CloudflareAPIError(f"Cloudflare API unreachable: {e}", status_code=503)
+                delay = self._backoff(attempt)
+            except httpx.TransportError as e:
+                if method not in IDEMPOTENT_METHODS or attempt >= self.max_retries:
+                    raise CloudflareAPIError(f"Cloudflare API request failed: {e}", status_code=502)
+                delay = self._backoff(attempt)
+            else:
+                retryable = response.status_code == 429 or (
+                    response.status_code >= 500 and method in IDEMPOTENT_METHODS
+                )
+                if not retryable or attempt >= self.max_retries:
+                    return self._parse(response)
+                delay = self._backoff(attempt, response.headers.get("Retry-After"))
+
+            attempt += 1
+            logger.warning(f"Cloudflare {method} {path} failed, retry {attempt}/{self.max_retries} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _parse(response: httpx.Response) -> Dict[str, Any]:
+        """Decode an envelope, raising typed errors for failures."""
+        try:
+            data = response.json()
+        except ValueError:
+            data = None
+
+        if response.status_code >= 400 or not isinstance(data, dict):
+            errors = data.get("errors", []) if isinstance(data, dict) else []
+            raise _error_for(
+                response.status_code if response.status_code >= 400 else 502,
+                f"Cloudflare API error: {errors or response.text}",
+                errors,
+            )
+        if not data.get("success"):
+            errors = data.get("errors", [])
+            raise CloudflareAPIError(f"Cloudflare API error: {errors}", status_code=400, errors=errors)
+        return data
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Optional[Any] = None,
+    ) -> Any:
+        """Send a request and return the envelope's result.
+
+        Args:
+            method: HTTP method
+            path: Path below /client/v4
+            params: Query parameters
+            json: JSON body
+
+        Returns:
+            Envelope "result" value
+        """
+        return (await self.request_envelope(method, path, params=params, json=json)).get("result")
+
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """GET a resource."""
+        return await self.request("GET", path, params=params)
+
+    async def post(self, path: str, json: Any) -> Any:
+        """POST a resource."""
+        return await self.request("POST", path, json=json)
+
+    async def put(self, path: str, json: Any) -> Any:
+        """PUT a resource."""
+        return await self.request("PUT", path, json=json)
+
+    async def patch(self, path: str, json: Any) -> Any:
+        """PATCH a resource."""
+        return await self.request("PATCH", path, json=json)
+
+    async def delete(self, path: str) -> Any:
+        """DELETE a resource."""
+        return await self.request("DELETE", path)
+
+
+# Singleton instance
+_cloudflare_client: CloudflareClient | None = None
+
+
+def get_cloudflare_client() -> CloudflareClient:
+    """Get shared Cloudflare client singleton.
+
+    Returns:
+        CloudflareClient instance
+    """
+    global _cloudflare_client
+    if _cloudflare_client is None:
+        _cloudflare_client = CloudflareClient()
+    return _cloudflare_client
+
+
+async def close_cloudflare_client() -> None:
+    """Close the shared client's connections (application shutdown)."""
+    if _cloudflare_client is not None:
+        await _cloudflare_client.aclose()
@@ -0,0 +1,344 @@
+"""Bulk DNS record import from CSV.
+
+The CSV is read as a stream and every row is validated before anything is
+sent to Cloudflare. Valid rows are diffed against the zone's current records
+(from the DNS record mirror): identical records are skipped, changed ones
+are updated in place and only new ones are created, so an import can be
+re-run safely. Writes go out with bounded concurrency; the shared client's
+token bucket keeps them under the API rate limit and retries 429s.
+"""
+from __future__ import annotations
+
+import asyncio
+import csv
+import ipaddress
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.config import get_settings
+from app.services.cloudflare_api_service import CloudflareAPIError, CloudflareClient, get_cloudflare_client
+from app.services.cloudflare_dns_service import DNSRecordMirror, get_dns_mirror, to_fqdn
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+REQUIRED_COLUMNS = ("Type", "Name", "Content")
+RECORD_TYPES = {"A", "AAAA", "CAA", "CNAME", "MX", "NS", "PTR", "SRV", "TXT"}
+PROXIABLE_TYPES = {"A", "AAAA", "CNAME"}
+PRIORITY_TYPES = {"MX"}
+# Only one record per name - a different content is an update, not a new record
+SINGLETON_TYPES = {"CNAME"}
+# Content holding hostnames (compared case-insensitively, without trailing dot)
+HOSTNAME_TYPES = {"CNAME", "MX", "NS", "PTR"}
+
+
+@dataclass
+class ImportRow:
+    """Validated CSV row."""
+
+    row: int
+    record: Dict[str, str]
+    payload: Dict[str, Any]
+
+
+@dataclass
+class RowError:
+    """CSV row that failed validation or submission."""
+
+    row: int
+    record: Dict[str, str]
+    error: str
+
+
+@dataclass
+class ImportPlan:
+    """Changes needed to bring a zone in line with a CSV file."""
+
+    creates: List[ImportRow] = field(default_factory=list)
+    updates: List[Tuple[ImportRow, str]] = field(default_factory=list)  # (row, record ID)
+    skipped: List[ImportRow] = field(default_factory=list)
+    errors: List[RowError] = field(default_factory=list)
+
+
+@dataclass
+class ImportOutcome:
+    """Result of applying an import plan."""
+
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    errors: List[RowError] = field(default_factory=list)
+
+
+def normalize_content(record_type: str, content: str) -> str:
+    """Content in the form used for comparison.
+
+    Args:
+        record_type: DNS record type
+        content: Record content
+
+    Returns:
+        Normalized content
+    """
+    content = content.strip()
+    if record_type in HOSTNAME_TYPES:
+        return content.rstrip(".").lower()
+    if record_type == "TXT" and len(content) >= 2 and content[0] == content[-1] == '"':
+        return content[1:-1]
+    if record_type == "AAAA":
+        try:
+            return str(ipaddress.IPv6Address(content))
+        except ValueError:
+            return content
+    return content
+
+
+def validate_row(row: Dict[str, str], domain: str) -> Dict[str, Any]:
+    """Validate a CSV row and build its Cloudflare payload.
+
+    Args:
+        row: CSV row (Type, Name, Content, TTL, Proxied, Priority)
+        domain: Domain name the records belong to
+
+    Returns:
+        DNS record payload with a fully qualified name
+
+    Raises:
+        ValueError: If the row is invalid
+    """
+    missing = [key for key in REQUIRED_COLUMNS if not (row.get(key) or "").strip()]
+    if missing:
+        raise ValueError(f"Missing required fields ({', '.join(missing)})")
+
+    record_type = row["Type"].strip().upper()
+    if record_type not in RECORD_TYPES:
+        raise ValueError(f"Unsupported record type: {record_type}")
+
+    content = row["Content"].strip()
+    if record_type == "A":
+        try:
+            ipaddress.IPv4Address(content)
+        except ValueError:
+            raise ValueError(f"Invalid IPv4 address: {content}")
+    elif record_type == "AAAA":
+        try:
+            ipaddress.IPv6Address(content)
+        except ValueError:
+            raise ValueError(f"Invalid IPv6 address: {content}")
+
+    try:
+        ttl = int((row.get("TTL") or "1").strip() or "1")
+    except ValueError:
+        raise ValueError(f"Invalid TTL: {row.get('TTL')}")
+    if ttl != 1 and not 60 <= ttl <= 86400:
+        raise ValueError(f"TTL must be 1 (auto) or 60-86400: {ttl}")
+
+    proxied = (row.get("Proxied") or "No").strip().lower() in ("yes", "true", "1")
+    if proxied and record_type not in PROXIABLE_TYPES:
+        raise ValueError(f"{record_type} records cannot be proxied")
+
+    payload: Dict[str, Any] = {
+        "type": record_type,
+        "name": to_fqdn(row["Name"], domain),
+        "content": content,
+        "ttl": 1 if proxied else ttl,
+        "proxied": proxied,
+    }
+
+    priority = (row.get("Priority") or "").strip()
+    if priority:
+        try:
+            payload["priority"] = int(priority)
+        except ValueError:
+            raise ValueError(f"Invalid priority: {priority}")
+    elif record_type in PRIORITY_TYPES:
+        raise ValueError(f"{record_type} records require a priority")
+
+    return payload
+
+
+def parse_csv(lines: Iterable[str], domain: str) -> Tuple[List[ImportRow], List[RowError]]:
+    """Parse and validate a CSV stream.
+
+    Args:
+        lines: CSV text lines (header first)
+        domain: Domain name the records belong to
+
+    Returns:
+        Tuple of (valid rows, row errors)
+    """
+    rows: List[ImportRow] = []
+    errors: List[RowError] = []
+    seen: Dict[Tuple[str, ...], int] = {}
+
+    for row_num, row in enumerate(csv.DictReader(lines), start=2):  # Header is row 1
+        record = {key: value for key, value in row.items() if key is not None}
+        try:
+            payload = validate_row(record, domain)
+        except ValueError as e:
+            errors.append(RowError(row=row_num, record=record, error=str(e)))
+            continue
+
+        key = record_key(payload)
+        if key in seen:
+            errors.append(RowError(row=row_num, record=record, error=f"Duplicate of row {seen[key]}"))
+            continue
+        seen[key] = row_num
+        rows.append(ImportRow(row=row_num, record=record, payload=payload))
+
+    return rows, errors
+
+
+def record_key(record: Dict[str, Any]) -> Tuple[str, ...]:
+    """Identity of a record: (type, name) for single-record types, else content too.
+
+    Args:
+        record: DNS record or payload
+
+    Returns:
+        Comparison key
+    """
+    record_type = record["type"].upper()
+    name = record["name"].rstrip(".").lower()
+    if record_type in SINGLETON_TYPES:
+        return (record_type, name)
+    return (record_type, name, normalize_content(record_type, record["content"]))
+
+
+def record_differs(payload: Dict[str, Any], existing: Dict[str, Any]) -> bool:
+    """Whether an existing record needs updating to match a payload.
+
+    Args:
+        payload: Desired DNS record payload
+        existing: Current Cloudflare DNS record
+
+    Returns:
+        True if content, proxying, TTL or priority differ
+    """
+    if normalize_content(payload["type"], payload["content"]) != normalize_content(
+        payload["type"], existing["content"]
+    ):
+        return True
+    if payload["proxied"] != existing.get("proxied", False):
+        return True
+    # Proxied records always report TTL 1 (auto)
+    if not payload["proxied"] and payload["ttl"] != existing.get("ttl"):
+        return True
+    return "priority" in payload and payload["priority"] != existing.get("priority")
+
+
+def plan_import(rows: List[ImportRow], existing: List[Dict[str, Any]]) -> ImportPlan:
+    """Diff validated rows against a zone's records.
+
+    Args:
+        rows: Validated rows
+        existing: Current Cloudflare DNS records of the zone
+
+    Returns:
+        Import plan (creates, updates and skipped rows)
+    """
+    current = {record_key(record): record for record in existing}
+    plan = ImportPlan()
+    for row in rows:
+        match = current.get(record_key(row.payload))
+        if match is None:
+            plan.creates.append(row)
+        elif record_differs(row.payload, match):
+            plan.updates.append((row, match["id"]))
+        else:
+            plan.skipped.append(row)
+    return plan
+
+
+class DNSBulkImporter:
+    """Applies CSV imports to a zone."""
+
+    def __init__(
+        self,
+        client: Optional[CloudflareClient] = None,
+        mirror: Optional[DNSRecordMirror] = None,
+        concurrency: Optional[int] = None,
+    ):
+        """Initialize bulk importer.
+
+        Args:
+            client: Cloudflare client (defaults to the shared client)
+            mirror: DNS record mirror (defaults to the shared mirror)
+            concurrency: Writes in flight at once (defaults to settings)
+        """
+        self.client = client or get_cloudflare_client()
+        self.mirror = mirror or get_dns_mirror()
+        self.concurrency = concurrency or settings.cloudflare_dns_import_concurrency
+
+    async def apply(self, zone_id: str, plan: ImportPlan) -> ImportOutcome:
+        """Submit a plan's creates and updates.
+
+        Args:
+            zone_id: Cloudflare Zone ID
+            plan: Import plan
+
+        Returns:
+            Import outcome
+        """
+        outcome = ImportOutcome(skipped=len(plan.skipped), errors=list(plan.errors))
+        semaphore = asyncio.Semaphore(self.concurrency)
+        path = f"/zones/{zone_id}/dns_records"
+
+        async def submit(row: ImportRow, record_id: Optional[str]) -> None:
+            async with semaphore:
+                try:
+                    if record_id is None:
+                        result = await self.client.post(path, json=row.payload)
+                        outcome.created += 1
+                    else:
+                        result = await self.client.put(f"{path}/{record_id}", json=row.payload)
+                        outcome.updated += 1
+                except CloudflareAPIError as e:
+                    outcome.errors.append(RowError(row=row.row, record=row.record, error=str(e)))
+                    return
+            self.mirror.upsert(zone_id, result)
+
+        await asyncio.gather(
+            *(submit(row, None) for row in plan.creates),
+            *(submit(row, record_id) for row, record_id in plan.updates),
+        )
+        outcome.errors.sort(key=lambda error: error.row)
+        return outcome
+
+    async def run(self, zone_id: str, domain: str, lines: Iterable[str]) -> ImportOutcome:
+        """Validate, diff and apply a CSV import.
+
+        Args:
+            zone_id: Cloudflare Zone ID
+            domain: Domain name
+            lines: CSV text lines (header first)
+
+        Returns:
+            Import outcome
+        """
+        rows, errors = parse_csv(lines, domain)
+        await self.mirror.get_zone(zone_id, refresh=True)
+        plan = plan_import(rows, await self.mirror.list_records(zone_id))
+        plan.errors = errors
+        logger.info(
+            f"DNS import for {domain}: {len(plan.creates)} new, {len(plan.updates)} changed, "
+            f"{len(plan.skipped)} unchanged, {len(errors)} invalid"
+        )
+        return await self.apply(zone_id, plan)
+
+
+# Singleton instance
+_dns_importer: DNSBulkImporter | None = None
+
+
+def get_dns_importer() -> DNSBulkImporter:
+    """Get DNS bulk importer singleton.
+
+    Returns:
+        DNSBulkImporter instance
+    """
+    global _dns_importer
+    if _dns_importer is None:
+        _dns_importer = DNSBulkImporter()
+    return _dns_importer
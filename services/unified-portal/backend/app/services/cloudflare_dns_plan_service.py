@@ -0,0 +1,529 @@
+"""Declarative DNS zones: plan and apply.
+
+The desired records of a zone come from an optional YAML file
+(<dns_zone_dir>/<zone>.yml) and from records generated for the portal's own
+data: a proxied tunnel CNAME for every enabled WordPress site, and MX, SPF
+(and optionally DMARC and DKIM) records for every enabled mail domain.
+
+Desired records are diffed against the live records (from the DNS record
+mirror) into a minimal plan: identical records are left alone, a changed
+record is updated in place rather than deleted and re-created, and live
+records are only deleted when they occupy a slot the desired state
+declares (e.g. a stale MX next to the desired one, or the A record a
+desired CNAME replaces) - or, with prune enabled in the zone file, when
+they are not declared at all. Deletes are applied first, then updates and
+creates concurrently; the shared client's token bucket keeps the writes
+under the API rate limit.
+
+Zone file format::
+
+    prune: false              # delete live records not declared
+    sources: [wordpress, mail]  # generated records to include
+    records:
+      - {type: A, name: mail, content: 192.0.2.10, ttl: 3600}
+      - {type: CNAME, name: s1._domainkey, content: s1.domainkey.u1.wl.sendgrid.net}
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import yaml
+
+from app.config import get_settings
+from app.services.cloudflare_api_service import CloudflareAPIError, CloudflareClient, get_cloudflare_client
+from app.services.cloudflare_dns_import_service import (
+    normalize_content,
+    record_differs,
+    record_key,
+    validate_row,
+)
+from app.services.cloudflare_dns_service import DNSRecordMirror, get_dns_mirror
+from app.services.cloudflare_zone_service import CloudflareZoneCache, get_zone_cache
+from app.services.site_dns_service import expected_tunnel_cname
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+GENERATED_SOURCES = ("wordpress", "mail")
+# A desired CNAME replaces address records of the same name
+CNAME_CONFLICT_TYPES = {"A", "AAAA"}
+
+
+@dataclass
+class DesiredRecord:
+    """Record the zone should contain."""
+
+    payload: Dict[str, Any]
+    source: str  # e.g. "file", "wordpress:example.com", "mail:example.com"
+
+
+@dataclass
+class PlannedChange:
+    """Single write needed to reach the desired state."""
+
+    action: str  # create, update, delete
+    source: str
+    record: Dict[str, Any]  # Desired payload (delete: the live record)
+    existing: Optional[Dict[str, Any]] = None  # Live record (update, delete)
+
+
+@dataclass
+class ZonePlan:
+    """Changes needed to bring a zone in line with its desired records."""
+
+    zone_id: str
+    zone_name: str
+    prune: bool = False
+    changes: List[PlannedChange] = field(default_factory=list)
+    unchanged: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def plan_id(self) -> str:
+        """Fingerprint of the changes (an apply must match the plan shown)."""
+        digest = hashlib.sha256()
+        for change in self.changes:
+            record_id = change.existing["id"] if change.existing else None
+            body = change.record if change.action != "delete" else None
+            digest.update(json.dumps([change.action, record_id, body], sort_keys=True).encode())
+        return digest.hexdigest()[:16]
+
+    def count(self, action: str) -> int:
+        """Number of changes of one action."""
+        return sum(1 for change in self.changes if change.action == action)
+
+
+@dataclass
+class ZoneApplyResult:
+    """Result of applying a zone plan."""
+
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    errors: List[Tuple[PlannedChange, str]] = field(default_factory=list)
+
+
+def in_zone(name: str, zone_name: str) -> bool:
+    """Whether a hostname belongs to a zone.
+
+    Args:
+        name: Hostname
+        zone_name: Zone apex
+
+    Returns:
+        True if name is the apex or below it
+    """
+    name = name.rstrip(".").lower()
+    zone_name = zone_name.rstrip(".").lower()
+    return name == zone_name or name.endswith(f".{zone_name}")
+
+
+def _slot(record: Dict[str, Any]) -> Tuple[str, ...]:
+    """Records a desired record competes with: same type and name.
+
+    TXT records share a slot only with the same v= tag (v=spf1, v=DMARC1),
+    so verification tokens next to an SPF record are not touched.
+    """
+    record_type = record["type"].upper()
+    name = record["name"].rstrip(".").lower()
+    if record_type == "TXT":
+        content = normalize_content(record_type, record["content"])
+        tag = re.split(r"[;\s]", content, maxsplit=1)[0].lower()
+        return (record_type, name, tag if tag.startswith("v=") else content)
+    return (record_type, name)
+
+
+def parse_dkim_txt(text: str) -> Optional[str]:
+    """Join the quoted strings of an opendkim-genkey selector.txt file.
+
+    Args:
+        text: File content (``selector._domainkey IN TXT ( "v=DKIM1; ..." "p=..." )``)
+
+    Returns:
+        TXT record content, or None if the file holds none
+    """
+    content = "".join(re.findall(r'"([^"]*)"', text))
+    return content or None
+
+
+def load_zone_file(path: str, zone_name: str) -> Tuple[List[DesiredRecord], Dict[str, Any], List[str]]:
+    """Read a zone file.
+
+    Args:
+        path: YAML file path
+        zone_name: Zone apex (relative names are qualified with it)
+
+    Returns:
+        Tuple of (desired records, options - prune and sources, record errors)
+
+    Raises:
+        ValueError: If the file is not a valid zone file
+    """
+    with open(path, encoding="utf-8") as f:
+        try:
+            data = yaml.safe_load(f) or {}
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid zone file {os.path.basename(path)}: {e}")
+    if not isinstance(data, dict) or not isinstance(data.get("records", []), list):
+        raise ValueError(f"Invalid zone file {os.path.basename(path)}: expected a mapping with a records list")
+
+    sources = data.get("sources", list(GENERATED_SOURCES))
+    unknown = set(sources) - set(GENERATED_SOURCES)
+    if unknown:
+        raise ValueError(f"Unknown record sources in {os.path.basename(path)}: {', '.join(sorted(unknown))}")
+    options = {"prune": bool(data.get("prune", False)), "sources": list(sources)}
+
+    records: List[DesiredRecord] = []
+    errors: List[str] = []
+    seen: Dict[Tuple[str, ...], int] = {}
+    for number, entry in enumerate(data.get("records") or [], start=1):
+        if not isinstance(entry, dict):
+            errors.append(f"Record {number}: expected a mapping")
+            continue
+        row = {
+            "Type": str(entry.get("type", "")),
+            "Name": str(entry.get("name", "")),
+            "Content": str(entry.get("content", "")),
+            "TTL": str(entry.get("ttl", 1)),
+            "Proxied": str(entry.get("proxied", False)),
+            "Priority": "" if entry.get("priority") is None else str(entry["priority"]),
+        }
+        try:
+            payload = validate_row(row, zone_name)
+        except ValueError as e:
+            errors.append(f"Record {number} ({row['Type']} {row['Name']}): {e}")
+            continue
+
+        key = record_key(payload)
+        if key in seen:
+            errors.append(f"Record {number} ({row['Type']} {row['Name']}): Duplicate of record {seen[key]}")
+            continue
+        seen[key] = number
+        records.append(DesiredRecord(payload=payload, source="file"))
+    return records, options, errors
+
+
+def wordpress_site_records(domains: Iterable[str], zone_name: str) -> List[DesiredRecord]:
+    """Tunnel CNAMEs for WordPress site domains in a zone.
+
+    Args:
+        domains: Enabled site domains
+        zone_name: Zone apex
+
+    Returns:
+        Desired records (none if no tunnel is configured)
+    """
+    target = expected_tunnel_cname()
+    if target is None:
+        return []
+    return [
+        DesiredRecord(
+            payload={"type": "CNAME", "name": domain.lower(), "content": target, "ttl": 1, "proxied": True},
+            source=f"wordpress:{domain.lower()}",
+        )
+        for domain in domains
+        if in_zone(domain, zone_name)
+    ]
+
+
+def mail_domain_records(domains: Iterable[str], zone_name: str) -> List[DesiredRecord]:
+    """MX, SPF, DMARC and DKIM records for mail domains in a zone.
+
+    DMARC is only generated when dns_mail_dmarc is set, and DKIM only when
+    dns_mail_dkim_dir holds <domain>/<selector>.txt (opendkim-genkey layout);
+    SendGrid DKIM CNAMEs belong in the zone file.
+
+    Args:
+        domains: Enabled mail domain names
+        zone_name: Zone apex
+
+    Returns:
+        Desired records
+    """
+    records: List[DesiredRecord] = []
+    for domain in domains:
+        domain = domain.lower()
+        if not in_zone(domain, zone_name):
+            continue
+        source = f"mail:{domain}"
+        records.append(DesiredRecord(
+            payload={"type": "MX", "name": domain, "content": settings.dns_mail_hostname,
+                     "ttl": settings.dns_mail_ttl, "proxied": False, "priority": 10},
+            source=source,
+        ))
+        records.append(DesiredRecord(
+            payload={"type": "TXT", "name": domain, "content": settings.dns_mail_spf,
+                     "ttl": settings.dns_mail_ttl, "proxied": False},
+            source=source,
+        ))
+        if settings.dns_mail_dmarc:
+            records.append(DesiredRecord(
+                payload={"type": "TXT", "name": f"_dmarc.{domain}", "content": settings.dns_mail_dmarc,
+                         "ttl": settings.dns_mail_ttl, "proxied": False},
+                source=source,
+            ))
+        if settings.dns_mail_dkim_dir:
+            selector = settings.dns_mail_dkim_selector
+            key_path = os.path.join(settings.dns_mail_dkim_dir, domain, f"{selector}.txt")
+            try:
+                with open(key_path, encoding="utf-8") as f:
+                    content = parse_dkim_txt(f.read())
+            except OSError:
+                content = None
+            if content:
+                records.append(DesiredRecord(
+                    payload={"type": "TXT", "name": f"{selector}._domainkey.{domain}", "content": content,
+                             "ttl": settings.dns_mail_ttl, "proxied": False},
+                    source=source,
+                ))
+    return records
+
+
+def plan_zone(
+    zone_id: str,
+    zone_name: str,
+    desired: List[DesiredRecord],
+    live: List[Dict[str, Any]],
+    prune: bool = False,
+) -> ZonePlan:
+    """Diff desired records against a zone's live records.
+
+    Args:
+        zone_id: Cloudflare Zone ID
+        zone_name: Zone apex
+        desired: Desired records (one per record key)
+        live: Current Cloudflare DNS records of the zone
+        prune: Delete live records that are not desired
+
+    Returns:
+        Zone plan with the minimal set of changes
+    """
+    plan = ZonePlan(zone_id=zone_id, zone_name=zone_name, prune=prune)
+    current = {record_key(record): record for record in live}
+    matched = set()
+    unmatched: List[DesiredRecord] = []
+
+    for record in desired:
+        match = current.get(record_key(record.payload))
+        if match is None or match["id"] in matched:
+            unmatched.append(record)
+            continue
+        matched.add(match["id"])
+        if record_differs(record.payload, match):
+            plan.changes.append(PlannedChange("update", record.source, record.payload, match))
+        else:
+            plan.unchanged += 1
+
+    # Remaining live records in a desired slot are changed in place where possible
+    slots = {_slot(record.payload) for record in desired}
+    cname_names = {_slot(record.payload)[1] for record in desired if record.payload["type"] == "CNAME"}
+    leftovers: Dict[Tuple[str, ...], List[Dict[str, Any]]] = defaultdict(list)
+    for record in sorted(live, key=lambda record: (record["name"], record["type"], record["content"])):
+        if record["id"] not in matched:
+            leftovers[_slot(record)].append(record)
+
+    for record in unmatched:
+        candidates = leftovers.get(_slot(record.payload))
+        if candidates:
+            plan.changes.append(PlannedChange("update", record.source, record.payload, candidates.pop(0)))
+        else:
+            plan.changes.append(PlannedChange("create", record.source, record.payload))
+
+    for slot, records in leftovers.items():
+        for record in records:
+            conflict = slot in slots or (record["type"] in CNAME_CONFLICT_TYPES and slot[1] in cname_names)
+            if conflict or prune:
+                plan.changes.append(PlannedChange("delete", "conflict" if conflict else "prune", record, record))
+
+    order = {"delete": 0, "update": 1, "create": 2}
+    plan.changes.sort(key=lambda change: (order[change.action], change.record["name"], change.record["type"]))
+    return plan
+
+
+class DNSZoneReconciler:
+    """Plans and applies declarative zone changes."""
+
+    def __init__(
+        self,
+        client: Optional[CloudflareClient] = None,
+        mirror: Optional[DNSRecordMirror] = None,
+        zone_cache: Optional[CloudflareZoneCache] = None,
+        zone_dir: Optional[str] = None,
+        concurrency: Optional[int] = None,
+    ):
+        """Initialize zone reconciler.
+
+        Args:
+            client: Cloudflare client (defaults to the shared client)
+            mirror: DNS record mirror (defaults to the shared mirror)
+            zone_cache: Zone cache (defaults to the shared cache)
+            zone_dir: Directory of <zone>.yml files (defaults to settings)
+            concurrency: Writes in flight at once (defaults to settings)
+        """
+        self.client = client or get_cloudflare_client()
+        self.mirror = mirror or get_dns_mirror()
+        self.zone_cache = zone_cache or get_zone_cache()
+        self.zone_dir = zone_dir or settings.dns_zone_dir
+        self.concurrency = concurrency or settings.cloudflare_dns_import_concurrency
+
+    def _zone_file(self, zone_name: str) -> Tuple[List[DesiredRecord], Dict[str, Any], List[str]]:
+        """Read a zone's file, or the defaults when it has none."""
+        path = os.path.join(self.zone_dir, f"{zone_name}.yml")
+        if os.path.exists(path):
+            return load_zone_file(path, zone_name)
+        return [], {"prune": False, "sources": list(GENERATED_SOURCES)}, []
+
+    def zone_sources(self, zone_name: str) -> List[str]:
+        """Generated record sources a zone includes.
+
+        Callers only need to look up the domains of these sources.
+
+        Args:
+            zone_name: Zone apex
+
+        Returns:
+            Source names (subset of GENERATED_SOURCES)
+
+        Raises:
+            ValueError: If the zone file is invalid
+        """
+        return self._zone_file(zone_name)[1]["sources"]
+
+    def desired_records(
+        self,
+        zone_name: str,
+        site_domains: Iterable[str] = (),
+        mail_domains: Iterable[str] = (),
+    ) -> Tuple[List[DesiredRecord], bool, List[str]]:
+        """Collect a zone's desired records.
+
+        Zone file records take precedence: generated records in a slot the
+        file declares are dropped.
+
+        Args:
+            zone_name: Zone apex
+            site_domains: Enabled WordPress site domains
+            mail_domains: Enabled mail domain names
+
+        Returns:
+            Tuple of (desired records, prune, errors)
+
+        Raises:
+            ValueError: If the zone file is invalid
+        """
+        records, options, errors = self._zone_file(zone_name)
+
+        generated: List[DesiredRecord] = []
+        if "wordpress" in options["sources"]:
+            generated += wordpress_site_records(site_domains, zone_name)
+        if "mail" in options["sources"]:
+            generated += mail_domain_records(mail_domains, zone_name)
+
+        declared = {_slot(record.payload) for record in records}
+        keys = {record_key(record.payload) for record in records}
+        for record in generated:
+            if _slot(record.payload) not in declared and record_key(record.payload) not in keys:
+                keys.add(record_key(record.payload))
+                records.append(record)
+        return records, options["prune"], errors
+
+    async def plan(
+        self,
+        domain: str,
+        site_domains: Iterable[str] = (),
+        mail_domains: Iterable[str] = (),
+    ) -> ZonePlan:
+        """Plan the changes for a zone against freshly loaded records.
+
+        Args:
+            domain: Zone apex or a name below it
+            site_domains: Enabled WordPress site domains
+            mail_domains: Enabled mail domain names
+
+        Returns:
+            Zone plan
+
+        Raises:
+            CloudflareAPIError: If the zone or its records cannot be loaded
+            ValueError: If the zone file is invalid
+        """
+        zone = await self.zone_cache.get_zone(domain)
+        desired, prune, errors = self.desired_records(zone["name"], site_domains, mail_domains)
+        await self.mirror.get_zone(zone["id"], refresh=True)
+        live = await self.mirror.list_records(zone["id"])
+
+        plan = plan_zone(zone["id"], zone["name"], desired, live, prune)
+        plan.errors = errors
+        logger.info(
+            f"DNS plan for {zone['name']}: {plan.count('create')} to create, {plan.count('update')} to update, "
+            f"{plan.count('delete')} to delete, {plan.unchanged} unchanged"
+        )
+        return plan
+
+    async def apply(self, plan: ZonePlan) -> ZoneApplyResult:
+        """Apply a plan: deletes first, then updates and creates concurrently.
+
+        Args:
+            plan: Zone plan
+
+        Returns:
+            Apply result
+        """
+        result = ZoneApplyResult()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        path = f"/zones/{plan.zone_id}/dns_records"
+
+        async def submit(change: PlannedChange) -> None:
+            async with semaphore:
+                try:
+                    if change.action == "delete":
+                        await self.client.delete(f"{path}/{change.existing['id']}")
+                    elif change.action == "update":
+                        record = await self.client.put(f"{path}/{change.existing['id']}", json=change.record)
+                    else:
+                        record = await self.client.post(path, json=change.record)
+                except CloudflareAPIError as e:
+                    result.errors.append((change, str(e)))
+                    return
+            if change.action == "delete":
+                self.mirror.remove(plan.zone_id, change.existing["id"])
+                result.deleted += 1
+            else:
+                self.mirror.upsert(plan.zone_id, record)
+                if change.action == "update":
+                    result.updated += 1
+                else:
+                    result.created += 1
+
+        # Deletes first, so a CNAME can replace the A record of the same name
+        await asyncio.gather(*(submit(change) for change in plan.changes if change.action == "delete"))
+        await asyncio.gather(*(submit(change) for change in plan.changes if change.action != "delete"))
+        logger.info(
+            f"DNS apply for {plan.zone_name}: {result.created} created, {result.updated} updated, "
+            f"{result.deleted} deleted, {len(result.errors)} failed"
+        )
+        return result
+
+
+# Singleton instance
+_zone_reconciler: DNSZoneReconciler | None = None
+
+
+def get_zone_reconciler() -> DNSZoneReconciler:
+    """Get DNS zone reconciler singleton.
+
+    Returns:
+        DNSZoneReconciler instance
+    """
+    global _zone_reconciler
+    if _zone_reconciler is None:
+        _zone_reconciler = DNSZoneReconciler()
+    return _zone_reconciler
@@ -0,0 +1,269 @@
+"""In-process mirror of Cloudflare DNS records per zone.
+
+A zone's records are loaded in full: the first page reports total_pages and
+the remaining pages are fetched concurrently, so large zones are complete
+instead of silently truncated at the API's default page size. Filtered
+reads (by type or name) are then served from memory.
+
+Each mirror carries a watermark - the newest record modified_on and an ETag
+over every record's id and modified_on - so clients can revalidate cheaply.
+Entries older than the TTL are served while a background reload runs;
+writes made through the portal update the mirror in place.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import get_settings
+from app.services.cloudflare_api_service import CloudflareClient, get_cloudflare_client
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+RECORDS_PER_PAGE = 500
+# Pages fetched at once when loading a zone
+PAGE_CONCURRENCY = 4
+
+
+def to_fqdn(name: str, domain: str) -> str:
+    """Expand @ or a relative record name to a FQDN.
+
+    Args:
+        name: Record name (@, subdomain or FQDN)
+        domain: Domain name
+
+    Returns:
+        Fully qualified, lower-case record name
+    """
+    name = name.strip().rstrip(".").lower()
+    domain = domain.lower()
+    if name in ("", "@"):
+        return domain
+    if name == domain or name.endswith(f".{domain}"):
+        return name
+    return f"{name}.{domain}"
+
+
+@dataclass
+class ZoneRecords:
+    """Mirrored DNS records of one zone."""
+
+    records: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    loaded_at: float = 0.0
+    etag: str = ""
+    modified_on: Optional[str] = None
+
+    def update_watermark(self) -> None:
+        """Recompute the ETag and newest modified_on from the records."""
+        digest = hashlib.sha1()
+        for record_id in sorted(self.records):
+            digest.update(f"{record_id}:{self.records[record_id].get('modified_on', '')}\n".encode())
+        self.etag = f'"{digest.hexdigest()}"'
+        self.modified_on = max(
+            (record.get("modified_on") or "" for record in self.records.values()), default=None
+        ) or None
+
+
+class DNSRecordMirror:
+    """Per-zone DNS record cache with write-through updates."""
+
+    def __init__(self, client: Optional[CloudflareClient] = None, ttl: Optional[float] = None):
+        """Initialize DNS record mirror.
+
+        Args:
+            client: Cloudflare client (defaults to the shared client)
+            ttl: Seconds before a zone's records are reloaded (defaults to settings)
+        """
+        self.client = client or get_cloudflare_client()
+        self.ttl = settings.cloudflare_dns_mirror_ttl if ttl is None else ttl
+        self._zones: Dict[str, ZoneRecords] = {}
+        self._load_tasks: Dict[str, asyncio.Task] = {}
+        # Writes made while a zone's load is in flight, replayed onto its result
+        self._load_writes: Dict[str, List[Tuple[str, Optional[Dict[str, Any]]]]] = {}
+
+    async def _fetch_page(self, zone_id: str, page: int) -> Dict[str, Any]:
+        """Fetch one page of a zone's records."""
+        return await self.client.request_envelope(
+            "GET",
+            f"/zones/{zone_id}/dns_records",
+            params={"page": page, "per_page": RECORDS_PER_PAGE},
+        )
+
+    async def _load(self, zone_id: str) -> ZoneRecords:
+        """Load every page of a zone's records.
+
+        upsert/remove calls made while the pages are in flight are replayed
+        onto the loaded records, so a load never reverts a newer write.
+        """
+        writes: List[Tuple[str, Optional[Dict[str, Any]]]] = []
+        self._load_writes[zone_id] = writes
+        try:
+            first = await self._fetch_page(zone_id, 1)
+            envelopes = [first]
+            total_pages = (first.get("result_info") or {}).get("total_pages", 1)
+
+            if total_pages > 1:
+                semaphore = asyncio.Semaphore(PAGE_CONCURRENCY)
+
+                async def fetch(page: int) -> Dict[str, Any]:
+                    async with semaphore:
+                        return await self._fetch_page(zone_id, page)
+
+                envelopes += await asyncio.gather(*(fetch(page) for page in range(2, total_pages + 1)))
+        finally:
+            if self._load_writes.get(zone_id) is writes:
+                del self._load_writes[zone_id]
+
+        zone = ZoneRecords(loaded_at=time.monotonic())
+        for envelope in envelopes:
+            for record in envelope.get("result") or []:
+                zone.records[record["id"]] = record
+        for record_id, record in writes:
+            if record is None:
+                zone.records.pop(record_id, None)
+            else:
+                zone.records[record_id] = record
+        zone.update_watermark()
+
+        previous = self._zones.get(zone_id)
+        if previous is None or previous.etag != zone.etag:
+            logger.info(f"Loaded {len(zone.records)} DNS records for zone {zone_id} ({total_pages} pages)")
+        self._zones[zone_id] = zone
+        return zone
+
+    def _start_load(self, zone_id: str) -> asyncio.Task:
+        """Start loading a zone, or join the load already in flight."""
+        task = self._load_tasks.get(zone_id)
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self._load(zone_id))
+            task.add_done_callback(self._log_load_error)
+            self._load_tasks[zone_id] = task
+        return task
+
+    @staticmethod
+    def _log_load_error(task: asyncio.Task) -> None:
+        """Log a failed load (a mirrored copy, if any, stays in use)."""
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"DNS record load failed: {task.exception()}")
+
+    async def get_zone(self, zone_id: str, refresh: bool = False) -> ZoneRecords:
+        """Get a zone's mirrored records, loading them on first use.
+
+        Args:
+            zone_id: Cloudflare Zone ID
+            refresh: Reload from Cloudflare before returning
+
+        Returns:
+            Mirrored zone records
+        """
+        zone = self._zones.get(zone_id)
+        if zone is None or refresh:
+            return await asyncio.shield(self._start_load(zone_id))
+        if time.monotonic() - zone.loaded_at > self.ttl:
+            self._start_load(zone_id)
+        return zone
+
+    async def list_records(
+        self,
+        zone_id: str,
+        record_type: Optional[str] = None,
+        name: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """List a zone's records from the mirror.
+
+        Args:
+            zone_id: Cloudflare Zone ID
+            record_type: Only records of this type (A, MX, etc.)
+            name: Only records with this FQDN
+
+        Returns:
+            Cloudflare DNS records sorted by type and name
+        """
+        zone = await self.get_zone(zone_id)
+        record_type = record_type.upper() if record_type else None
+        name = name.lower().rstrip(".") if name else None
+        records = [
+            record
+            for record in zone.records.values()
+            if (record_type is None or record["type"] == record_type)
+            and (name is None or record["name"].lower() == name)
+        ]
+        return sorted(records, key=lambda record: (record["type"], record["name"], record["content"]))
+
+    async def get_record(self, zone_id: str, record_id: str) -> Dict[str, Any]:
+        """Get one record, from the mirror when present.
+
+        Args:
+            zone_id: Cloudflare Zone ID
+            record_id: DNS record ID
+
+        Returns:
+            Cloudflare DNS record
+        """
+        zone = self._zones.get(zone_id)
+        if zone is not None and record_id in zone.records:
+            return zone.records[record_id]
+        record = await self.client.get(f"/zones/{zone_id}/dns_records/{record_id}")
+        self.upsert(zone_id, record)
+        return record
+
+    def upsert(self, zone_id: str, record: Dict[str, Any]) -> None:
+        """Store a created or updated record (no-op for zones not mirrored).
+
+        Args:
+            zone_id: Cloudflare Zone ID
+            record: Cloudflare DNS record as returned by the API
+        """
+        writes = self._load_writes.get(zone_id)
+        if writes is not None:
+            writes.append((record["id"], record))
+        zone = self._zones.get(zone_id)
+        if zone is not None:
+            zone.records[record["id"]] = record
+            zone.update_watermark()
+
+    def remove(self, zone_id: str, record_id: str) -> None:
+        """Drop a deleted record (no-op for zones not mirrored).
+
+        Args:
+            zone_id: Cloudflare Zone ID
+            record_id: DNS record ID
+        """
+        writes = self._load_writes.get(zone_id)
+        if writes is not None:
+            writes.append((record_id, None))
+        zone = self._zones.get(zone_id)
+        if zone is not None and zone.records.pop(record_id, None) is not None:
+            zone.update_watermark()
+
+    def invalidate(self, zone_id: Optional[str] = None) -> None:
+        """Drop one zone's mirror, or all of them.
+
+        Args:
+            zone_id: Cloudflare Zone ID (None for every zone)
+        """
+        if zone_id is None:
+            self._zones.clear()
+        else:
+            self._zones.pop(zone_id, None)
+
+
+# Singleton instance
+_dns_mirror: DNSRecordMirror | None = None
+
+
+def get_dns_mirror() -> DNSRecordMirror:
+    """Get DNS record mirror singleton.
+
+    Returns:
+        DNSRecordMirror instance
+    """
+    global _dns_mirror
+    if _dns_mirror is None:
+        _dns_mirror = DNSRecordMirror()
+    return _dns_mirror
@@ -1,17 +1,171 @@
-"""Cloudflare Tunnel service for managing Public Hostnames."""
+"""Cloudflare Tunnel service for managing Public Hostnames.
+
+Ingress changes go through TunnelConfigManager, which serializes them and
+batches the adds and removes arriving within a short window into a single
+configuration PUT, so concurrent site creations cannot overwrite each
+other's rules.
+"""
 from __future__ import annotations
 
+import asyncio
+import copy
 import logging
 from typing import Any
 
-import httpx
-
 from app.config import get_settings
+from app.services.cloudflare_api_service import CloudflareClient, CloudflareNotFoundError, get_cloudflare_client
+from app.services.cloudflare_dns_service import get_dns_mirror
+from app.services.cloudflare_zone_service import get_zone_cache
+from app.services.site_dns_service import get_site_dns_checker
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
+class TunnelConfigManager:
+    """Serialized, batched editor of a tunnel's ingress configuration.
+
+    Keeps a local copy of the configuration. Pending hostname changes are
+    collected for a short window and applied in one PUT under a lock; before
+    writing, the remote version is compared with the local copy and, if the
+    configuration was changed elsewhere (e.g. the dashboard), the batch is
+    rebased onto the remote configuration instead of overwriting it.
+    """
+
+    def __init__(self, client: CloudflareClient, config_path: str, window: float | None = None):
+        """Initialize tunnel config manager.
+
+        Args:
+            client: Cloudflare client
+            config_path: API path of the tunnel configuration
+            window: Seconds to collect changes before writing (defaults to settings)
+        """
+        self.client = client
+        self.config_path = config_path
+        self.window = settings.cloudflare_tunnel_batch_window if window is None else window
+        self._config: dict[str, Any] | None = None
+        self._pending: list[tuple[str, dict[str, Any], asyncio.Future]] = []
+        self._flush_task: asyncio.Task | None = None
+        self._lock: asyncio.Lock | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _bind_loop(self) -> None:
+        """Recreate loop-bound state when used from a new event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._pending = []
+            self._flush_task = None
+            self._loop = loop
+
+    async def get_config(self, refresh: bool = False) -> dict[str, Any]:
+        """Get the tunnel configuration (local copy unless refresh).
+
+        Args:
+            refresh: Fetch from Cloudflare even if a local copy exists
+
+        Returns:
+            Tunnel configuration (version, config.ingress, ...)
+        """
+        if self._config is None or refresh:
+            self._config = await self.client.get(self.config_path)
+        return copy.deepcopy(self._config)
+
+    async def add_hostname(self, rule: dict[str, Any]) -> dict[str, Any]:
+        """Queue an ingress rule and wait for its batch to be written.
+
+        Args:
+            rule: Ingress rule with hostname and service
+
+        Returns:
+            Tunnel configuration after the batch
+        """
+        return await self._submit("add", rule)
+
+    async def remove_hostname(self, hostname: str) -> dict[str, Any]:
+        """Queue a hostname removal and wait for its batch to be written.
+
+        Args:
+            hostname: Public hostname
+
+        Returns:
+            Tunnel configuration after the batch
+        """
+        return await self._submit("remove", {"hostname": hostname})
+
+    async def _submit(self, op: str, rule: dict[str, Any]) -> dict[str, Any]:
+        """Queue a change and start the batch window if none is open."""
+        self._bind_loop()
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((op, rule, future))
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self._flush_after_window())
+        return await future
+
+    async def _flush_after_window(self) -> None:
+        """Wait for the batch window, then write everything queued."""
+        await asyncio.sleep(self.window)
+        async with self._lock:
+            batch, self._pending = self._pending, []
+            if batch:
+                await self._flush(batch)
+            if self._pending:
+                # Changes queued while writing start the next window
+                self._flush_task = asyncio.ensure_future(self._flush_after_window())
+
+    @staticmethod
+    def _apply(ingress: list[dict[str, Any]], batch: list[tuple[str, dict[str, Any], asyncio.Future]]) -> bool:
+        """Apply queued changes to an ingress list in place.
+
+        Returns:
+            True if the list changed
+        """
+        catch_all = ingress.pop()  # Last rule has no hostname
+        changed = False
+        for op, rule, _ in batch:
+            hostname = rule["hostname"]
+            exists = any(existing.get("hostname") == hostname for existing in ingress)
+            if op == "add" and not exists:
+                ingress.append(rule)
+                changed = True
+            elif op == "add":
+                logger.warning(f"Hostname {hostname} already exists in tunnel configuration")
+            elif exists:
+                ingress[:] = [existing for existing in ingress if existing.get("hostname") != hostname]
+                changed = True
+            else:
+                logger.warning(f"Hostname {hostname} not found in tunnel configuration")
+        ingress.append(catch_all)
+        return changed
+
+    async def _flush(self, batch: list[tuple[str, dict[str, Any], asyncio.Future]]) -> None:
+        """Write one batch (called with the lock held)."""
+        try:
+            local_version = (self._config or {}).get("version")
+            remote = await self.client.get(self.config_path)
+            if local_version is not None and remote.get("version") != local_version:
+                logger.warning(
+                    f"Tunnel configuration changed outside the portal "
+                    f"(version {local_version} -> {remote.get('version')}), rebasing {len(batch)} changes"
+                )
+            self._config = remote
+
+            updated = copy.deepcopy(remote["config"])
+            if self._apply(updated["ingress"], batch):
+                self._config = await self.client.put(self.config_path, json={"config": updated})
+                logger.info(f"Tunnel configuration updated: {len(batch)} changes in one write "
+                            f"(version {self._config.get('version')})")
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for _, _, future in batch:
+            if not future.done():
+                future.set_result(copy.deepcopy(self._config))
+
+
 class CloudflareTunnelService:
     """Service for managing Cloudflare Tunnel Public Hostnames.
 
@@ -34,8 +188,13 @@ class CloudflareTunnelService:
         """
         self.account_id = account_id or settings.cloudflare_account_id
         self.tunnel_id = tunnel_id or settings.cloudflare_tunnel_id
-        self.api_token = api_token or settings.cloudflare_api_token
-        self.base_url = "https://api.cloudflare.com/client/v4"
+        # Shared pooled client unless a different token is given
+        self.client = CloudflareClient(api_token) if api_token else get_cloudflare_client()
+        self.config_manager = TunnelConfigManager(self.client, self._config_path())
+
+    def _config_path(self) -> str:
+        """API path of the tunnel configuration."""
+        return f"/accounts/{self.account_id}/cfd_tunnel/{self.tunnel_id}/configurations"
 
     async def get_tunnel_config(self) -> dict[str, Any]:
         """Get current Cloudflare Tunnel configuration.
@@ -44,28 +203,11 @@ class CloudflareTunnelService:
             Current tunnel configuration with ingress rules
 
         Raises:
-            httpx.HTTPError: If API request fails
+            CloudflareAPIError: If API request fails
         """
-        url = f"{self.base_url}/accounts/{self.account_id}/cfd_tunnel/{self.tunnel_id}/configurations"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url,
-                headers={
-                    "Authorization": f"Bearer {self.api_token}",
-                    "Content-Type": "application/json",
-                },
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            if not data.get("success"):
-                errors = data.get("errors", [])
-                raise ValueError(f"Cloudflare API error: {errors}")
-
-            logger.info(f"Retrieved tunnel configuration: {len(data['result']['config']['ingress'])} ingress rules")
-            return data["result"]
+        result = await self.config_manager.get_config(refresh=True)
+        logger.info(f"Retrieved tunnel configuration: {len(result['config']['ingress'])} ingress rules")
+        return result
 
     async def add_public_hostname(
         self,
@@ -84,64 +226,22 @@ class CloudflareTunnelService:
             Updated tunnel configuration
 
         Raises:
-            httpx.HTTPError: If API request fails
+            CloudflareAPIError: If API request fails
             ValueError: If configuration is invalid
         """
-        # Get current configuration
-        current_config = await self.get_tunnel_config()
-        ingress_rules = current_config["config"]["ingress"]
-
-        # Check if hostname already exists
-        for rule in ingress_rules[:-1]:  # Exclude catch-all rule
-            if rule.get("hostname") == hostname:
-                logger.warning(f"Hostname {hostname} already exists in tunnel configuration")
-                return current_config
-
         # Create new ingress rule
         new_rule = {
             "hostname": hostname,
             "service": service,
-        }
-
-        # Add HTTP Host header if specified
-        if http_host_header or hostname:
-            new_rule["originRequest"] = {
+            "originRequest": {
                 "httpHostHeader": http_host_header or hostname,
-            }
-
-        # Insert new rule before catch-all rule (last rule)
-        catch_all = ingress_rules.pop()  # Remove catch-all
-        ingress_rules.append(new_rule)   # Add new rule
-        ingress_rules.append(catch_all)  # Re-add catch-all
-
-        # Update configuration
-        updated_config = {
-            "config": {
-                "ingress": ingress_rules,
-            }
+            },
         }
 
-        url = f"{self.base_url}/accounts/{self.account_id}/cfd_tunnel/{self.tunnel_id}/configurations"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.put(
-                url,
-                headers={
-                    "Authorization": f"Bearer {self.api_token}",
-                    "Content-Type": "application/json",
-                },
-                json=updated_config,
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            if not data.get("success"):
-                errors = data.get("errors", [])
-                raise ValueError(f"Cloudflare API error: {errors}")
-
-            logger.info(f"Added Public Hostname: {hostname} → {service}")
-            return data["result"]
+        # Inserted before the catch-all rule, batched with concurrent changes
+        result = await self.config_manager.add_hostname(new_rule)
+        logger.info(f"Added Public Hostname: {hostname} → {service}")
+        return result
 
     async def remove_public_hostname(self, hostname: str) -> dict[str, Any]:
         """Remove a Public Hostname from Cloudflare Tunnel.
@@ -153,63 +253,16 @@ class CloudflareTunnelService:
             Updated tunnel configuration
 
         Raises:
-            httpx.HTTPError: If API request fails
+            CloudflareAPIError: If API request fails
             ValueError: If hostname not found
         """
-        # Get current configuration
-        current_config = await self.get_tunnel_config()
-        ingress_rules = current_config["config"]["ingress"]
-
-        # Find and remove the hostname
-        catch_all = ingress_rules.pop()  # Remove catch-all
-
-        found = False
-        new_rules = []
-        for rule in ingress_rules:
-            if rule.get("hostname") == hostname:
-                found = True
-                logger.info(f"Removing hostname: {hostname}")
-            else:
-                new_rules.append(rule)
-
-        if not found:
-            logger.warning(f"Hostname {hostname} not found in tunnel configuration")
-            ingress_rules.append(catch_all)  # Re-add catch-all
-            return current_config
-
-        new_rules.append(catch_all)  # Re-add catch-all
-
-        # Update configuration
-        updated_config = {
-            "config": {
-                "ingress": new_rules,
-            }
-        }
-
-        url = f"{self.base_url}/accounts/{self.account_id}/cfd_tunnel/{self.tunnel_id}/configurations"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.put(
-                url,
-                headers={
-                    "Authorization": f"Bearer {self.api_token}",
-                    "Content-Type": "application/json",
-                },
-                json=updated_config,
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            if not data.get("success"):
-                errors = data.get("errors", [])
-                raise ValueError(f"Cloudflare API error: {errors}")
-
-            logger.info(f"Removed Public Hostname: {hostname}")
-            return data["result"]
+        # Batched with concurrent changes
+        result = await self.config_manager.remove_hostname(hostname)
+        logger.info(f"Removed Public Hostname: {hostname}")
+        return result
 
     async def get_zone_id(self, domain: str) -> str:
-        """Get Cloudflare Zone ID for a domain.
+        """Get Cloudflare Zone ID for a domain (served from the zone cache).
 
         Args:
             domain: Domain name (e.g., kuma8088.com)
@@ -218,34 +271,13 @@ class CloudflareTunnelService:
             Zone ID
 
         Raises:
-            httpx.HTTPError: If API request fails
+            CloudflareAPIError: If API request fails
             ValueError: If zone not found
         """
-        url = f"{self.base_url}/zones?name={domain}"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url,
-                headers={
-                    "Authorization": f"Bearer {self.api_token}",
-                    "Content-Type": "application/json",
-                },
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            if not data.get("success"):
-                errors = data.get("errors", [])
-                raise ValueError(f"Cloudflare API error: {errors}")
-
-            zones = data.get("result", [])
-            if not zones:
-                raise ValueError(f"Zone not found: {domain}")
-
-            zone_id = zones[0]["id"]
-            logger.info(f"Retrieved Zone ID for {domain}: {zone_id}")
-            return zone_id
+        try:
+            return await get_zone_cache().get_zone_id(domain)
+        except CloudflareNotFoundError:
+            raise ValueError(f"Zone not found: {domain}")
 
     async def create_dns_record(
         self,
@@ -264,7 +296,7 @@ class CloudflareTunnelService:
             Created DNS record
 
         Raises:
-            httpx.HTTPError: If API request fails
+            CloudflareAPIError: If API request fails
         """
         tunnel_cname = f"{self.tunnel_id}.cfargotunnel.com"
 
@@ -280,27 +312,10 @@ class CloudflareTunnelService:
             "ttl": 1,  # Auto (when proxied=True)
         }
 
-        url = f"{self.base_url}/zones/{zone_id}/dns_records"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                url,
-                headers={
-                    "Authorization": f"Bearer {self.api_token}",
-                    "Content-Type": "application/json",
-                },
-                json=dns_record,
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            if not data.get("success"):
-                errors = data.get("errors", [])
-                raise ValueError(f"Cloudflare API error: {errors}")
-
-            logger.info(f"Created DNS CNAME record: {hostname} → {tunnel_cname}")
-            return data["result"]
+        result = await self.client.post(f"/zones/{zone_id}/dns_records", json=dns_record)
+        get_dns_mirror().upsert(zone_id, result)
+        logger.info(f"Created DNS CNAME record: {hostname} → {tunnel_cname}")
+        return result
 
     async def find_dns_record(self, zone_id: str, hostname: str) -> dict[str, Any] | None:
         """Find DNS record by hostname.
@@ -313,33 +328,15 @@ class CloudflareTunnelService:
             DNS record dict or None if not found
 
         Raises:
-            httpx.HTTPError: If API request fails
+            CloudflareAPIError: If API request fails
         """
-        url = f"{self.base_url}/zones/{zone_id}/dns_records?name={hostname}"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url,
-                headers={
-                    "Authorization": f"Bearer {self.api_token}",
-                    "Content-Type": "application/json",
-                },
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            if not data.get("success"):
-                errors = data.get("errors", [])
-                raise ValueError(f"Cloudflare API error: {errors}")
-
-            records = data.get("result", [])
-            if records:
-                logger.info(f"Found DNS record for {hostname}: {records[0]['id']}")
-                return records[0]
+        records = await self.client.get(f"/zones/{zone_id}/dns_records", params={"name": hostname})
+        if records:
+            logger.info(f"Found DNS record for {hostname}: {records[0]['id']}")
+            return records[0]
 
-            logger.info(f"No DNS record found for {hostname}")
-            return None
+        logger.info(f"No DNS record found for {hostname}")
+        return None
 
     async def delete_dns_record(self, zone_id: str, record_id: str) -> bool:
         """Delete DNS record.
@@ -352,28 +349,12 @@ class CloudflareTunnelService:
             True if deletion successful
 
         Raises:
-            httpx.HTTPError: If API request fails
+            CloudflareAPIError: If API request fails
         """
-        url = f"{self.base_url}/zones/{zone_id}/dns_records/{record_id}"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.delete(
-                url,
-                headers={
-                    "Authorization": f"Bearer {self.api_token}",
-                    "Content-Type": "application/json",
-                },
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            if not data.get("success"):
-                errors = data.get("errors", [])
-                raise ValueError(f"Cloudflare API error: {errors}")
-
-            logger.info(f"Deleted DNS record: {record_id}")
-            return True
+        await self.client.delete(f"/zones/{zone_id}/dns_records/{record_id}")
+        get_dns_mirror().remove(zone_id, record_id)
+        logger.info(f"Deleted DNS record: {record_id}")
+        return True
 
     async def setup_site_routing(
         self,
@@ -392,7 +373,7 @@ class CloudflareTunnelService:
             Dictionary with tunnel_config and dns_record
 
         Raises:
-            httpx.HTTPError: If API request fails
+            CloudflareAPIError: If API request fails
         """
         try:
             # 1. Add Public Hostname to Tunnel
@@ -412,6 +393,7 @@ class CloudflareTunnelService:
                 proxied=True,
             )
 
+            get_site_dns_checker().invalidate(hostname)
             logger.info(f"✅ Site routing setup complete for {hostname}")
 
             return {
@@ -438,7 +420,7 @@ class CloudflareTunnelService:
             Dictionary with removal results
 
         Raises:
-            httpx.HTTPError: If API request fails
+            CloudflareAPIError: If API request fails
         """
         results = {
             "tunnel_removed": False,
@@ -475,6 +457,8 @@ class CloudflareTunnelService:
                 logger.warning(error_msg)
                 results["errors"].append(error_msg)
 
+            get_site_dns_checker().invalidate(hostname)
+
             if results["tunnel_removed"] and results["dns_removed"]:
                 logger.info(f"✅ Site routing teardown complete for {hostname}")
             else:
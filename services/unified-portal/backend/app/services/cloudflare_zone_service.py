@@ -0,0 +1,168 @@
+"""In-process cache of Cloudflare zones.
+
+All zones are loaded from /zones (every page) in one go and kept keyed by
+apex domain. Lookups resolve any hostname to its zone by longest-suffix
+match, so DNS operations no longer pay a /zones?name= round trip first.
+
+Entries older than the TTL are still served while a background refresh
+runs (stale-while-revalidate). A lookup that misses forces a refresh (at
+most once a minute) to pick up newly added zones; invalidate() drops the
+cache explicitly.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from app.config import get_settings
+from app.services.cloudflare_api_service import CloudflareClient, CloudflareNotFoundError, get_cloudflare_client
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+ZONES_PER_PAGE = 50
+# A lookup miss reloads zones at most this often (seconds)
+MISS_REFRESH_INTERVAL = 60
+
+
+class CloudflareZoneCache:
+    """Zone list and apex lookup cache."""
+
+    def __init__(self, client: Optional[CloudflareClient] = None, ttl: Optional[float] = None):
+        """Initialize zone cache.
+
+        Args:
+            client: Cloudflare client (defaults to the shared client)
+            ttl: Seconds before cached zones are refreshed (defaults to settings)
+        """
+        self.client = client or get_cloudflare_client()
+        self.ttl = settings.cloudflare_zone_cache_ttl if ttl is None else ttl
+        self._zones: Dict[str, Dict[str, Any]] = {}
+        self._loaded_at: Optional[float] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def stale(self) -> bool:
+        """Whether the cache is empty or older than the TTL."""
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+
+    async def _load(self) -> None:
+        """Load every page of /zones."""
+        zones: Dict[str, Dict[str, Any]] = {}
+        page = 1
+        while True:
+            envelope = await self.client.request_envelope(
+                "GET", "/zones", params={"page": page, "per_page": ZONES_PER_PAGE}
+            )
+            for zone in envelope.get("result") or []:
+                zones[zone["name"].lower()] = zone
+            info = envelope.get("result_info") or {}
+            if page >= info.get("total_pages", 1):
+                break
+            page += 1
+        self._zones = zones
+        self._loaded_at = time.monotonic()
+        logger.info(f"Loaded {len(zones)} Cloudflare zones")
+
+    async def refresh(self) -> None:
+        """Reload zones now; concurrent callers share one in-flight load."""
+        task = self._refresh_task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self._load())
+            self._refresh_task = task
+        await asyncio.shield(task)
+
+    def _refresh_in_background(self) -> None:
+        """Start a refresh without waiting for it."""
+        task = self._refresh_task
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            return
+        self._refresh_task = asyncio.ensure_future(self._load())
+        self._refresh_task.add_done_callback(self._log_refresh_error)
+
+    @staticmethod
+    def _log_refresh_error(task: asyncio.Task) -> None:
+        """Log a failed background refresh (cached zones stay in use)."""
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background zone refresh failed: {task.exception()}")
+
+    async def _ensure_loaded(self) -> None:
+        """Load on first use; refresh stale entries in the background."""
+        if self._loaded_at is None:
+            await self.refresh()
+        elif self.stale:
+            self._refresh_in_background()
+
+    def invalidate(self) -> None:
+        """Drop cached zones (the next lookup reloads them)."""
+        self._zones = {}
+        self._loaded_at = None
+
+    def _match(self, hostname: str) -> Optional[Dict[str, Any]]:
+        """Zone whose name is the longest suffix of hostname."""
+        labels = hostname.lower().rstrip(".").split(".")
+        for start in range(len(labels)):
+            zone = self._zones.get(".".join(labels[start:]))
+            if zone is not None:
+                return zone
+        return None
+
+    async def list_zones(self) -> List[Dict[str, Any]]:
+        """List all zones.
+
+        Returns:
+            Cloudflare zone objects sorted by name
+        """
+        await self._ensure_loaded()
+        return [self._zones[name] for name in sorted(self._zones)]
+
+    async def get_zone(self, hostname: str) -> Dict[str, Any]:
+        """Get the zone a hostname belongs to.
+
+        Args:
+            hostname: Apex domain or any name below it (e.g. blog.kuma8088.com)
+
+        Returns:
+            Cloudflare zone object
+
+        Raises:
+            CloudflareNotFoundError: If no zone covers the hostname
+        """
+        await self._ensure_loaded()
+        zone = self._match(hostname)
+        if zone is None and time.monotonic() - (self._loaded_at or 0) > MISS_REFRESH_INTERVAL:
+            # Possibly a zone added since the last load
+            await self.refresh()
+            zone = self._match(hostname)
+        if zone is None:
+            raise CloudflareNotFoundError(f"Zone not found for domain: {hostname}", status_code=404)
+        return zone
+
+    async def get_zone_id(self, hostname: str) -> str:
+        """Get the zone ID a hostname belongs to.
+
+        Args:
+            hostname: Apex domain or any name below it
+
+        Returns:
+            Zone ID
+        """
+        return (await self.get_zone(hostname))["id"]
+
+
+# Singleton instance
+_zone_cache: CloudflareZoneCache | None = None
+
+
+def get_zone_cache() -> CloudflareZoneCache:
+    """Get Cloudflare zone cache singleton.
+
+    Returns:
+        CloudflareZoneCache instance
+    """
+    global _zone_cache
+    if _zone_cache is None:
+        _zone_cache = CloudflareZoneCache()
+    return _zone_cache
@@ -0,0 +1,101 @@
+"""Cached Cloudflare zone settings.
+
+Each zone's settings come from the bulk /zones/{id}/settings endpoint (one
+request returns every setting) and are cached per zone for a TTL. Fetched
+concurrently for all zones, a security overview of many zones costs one
+round trip when cold and none when warm.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import get_settings
+from app.services.cloudflare_api_service import CloudflareClient, get_cloudflare_client
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def summarize_ssl_settings(zone_settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract the TLS-related settings of a zone.
+
+    Args:
+        zone_settings: Setting values keyed by setting ID
+
+    Returns:
+        ssl_mode, min_tls_version, tls_1_3, always_use_https and HSTS fields
+    """
+    hsts = (zone_settings.get("security_header") or {}).get("strict_transport_security") or {}
+    return {
+        "ssl_mode": zone_settings.get("ssl", "unknown"),
+        "min_tls_version": zone_settings.get("min_tls_version"),
+        "tls_1_3": zone_settings.get("tls_1_3"),
+        "always_use_https": zone_settings.get("always_use_https") == "on",
+        "hsts_enabled": bool(hsts.get("enabled", False)),
+        "hsts_max_age": hsts.get("max_age"),
+        "hsts_include_subdomains": hsts.get("include_subdomains"),
+        "hsts_preload": hsts.get("preload"),
+    }
+
+
+class ZoneSettingsCache:
+    """Per-zone settings cache."""
+
+    def __init__(self, client: Optional[CloudflareClient] = None, ttl: Optional[float] = None):
+        """Initialize zone settings cache.
+
+        Args:
+            client: Cloudflare client (defaults to the shared client)
+            ttl: Seconds a zone's settings are cached (defaults to settings)
+        """
+        self.client = client or get_cloudflare_client()
+        self.ttl = settings.cloudflare_zone_settings_ttl if ttl is None else ttl
+        self._cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+    async def get_settings(self, zone_id: str, refresh: bool = False) -> Dict[str, Any]:
+        """Get every setting of a zone.
+
+        Args:
+            zone_id: Cloudflare Zone ID
+            refresh: Ignore the cached copy
+
+        Returns:
+            Setting values keyed by setting ID (ssl, min_tls_version, ...)
+        """
+        cached = self._cache.get(zone_id)
+        if cached is not None and not refresh and cached[0] > time.monotonic():
+            return cached[1]
+
+        result = await self.client.get(f"/zones/{zone_id}/settings")
+        values = {setting["id"]: setting.get("value") for setting in result or []}
+        self._cache[zone_id] = (time.monotonic() + self.ttl, values)
+        return values
+
+    def invalidate(self, zone_id: Optional[str] = None) -> None:
+        """Drop cached settings for a zone, or for every zone.
+
+        Args:
+            zone_id: Cloudflare Zone ID (None for all)
+        """
+        if zone_id is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(zone_id, None)
+
+
+# Singleton instance
+_zone_settings_cache: ZoneSettingsCache | None = None
+
+
+def get_zone_settings_cache() -> ZoneSettingsCache:
+    """Get zone settings cache singleton.
+
+    Returns:
+        ZoneSettingsCache instance
+    """
+    global _zone_settings_cache
+    if _zone_settings_cache is None:
+        _zone_settings_cache = ZoneSettingsCache()
+    return _zone_settings_cache
@@ -0,0 +1,387 @@
+"""Streaming logical export/import service for blog MariaDB databases."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import re
+import zlib
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, Literal, Optional
+
+from app.services.index_advisor_service import SYSTEM_SCHEMAS
+
+logger = logging.getLogger(__name__)
+
+# Read/write chunk size for dump streams (bytes)
+CHUNK_SIZE = 64 * 1024
+
+# gzip container for zlib (16 + MAX_WBITS)
+GZIP_WBITS = 31
+
+# Bytes of stderr kept in error messages
+STDERR_TAIL = 2000
+
+Compression = Literal["gzip", "none"]
+
+
+class DatabaseDumpService:
+    """Service for streaming database dumps in and out of blog MariaDB.
+
+    Runs mysqldump / mysql inside the MariaDB container via docker exec and
+    pipes data chunk by chunk, so memory use is constant regardless of
+    database size and nothing is written to disk.
+    """
+
+    def __init__(
+        self,
+        container: str = "blog-mariadb",
+        password: Optional[str] = None,
+    ):
+        """Initialize database dump service.
+
+        Args:
+            container: MariaDB container name
+            password: MariaDB root password (defaults to BLOG_MYSQL_ROOT_PASSWORD)
+        """
+        self.container = container
+        self.password = password or os.environ.get("BLOG_MYSQL_ROOT_PASSWORD", "wordpress_root_password")
+        self._import_progress: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def _validate_db_name(db_name: str) -> str:
+        """Validate database name to prevent injection.
+
+        System schemas (mysql, information_schema, ...) are rejected: they
+        must never be exported, overwritten by an import or a clone.
+
+        Args:
+            db_name: Database name
+
+        Returns:
+            Validated database name
+
+        Raises:
+            ValueError: If name is invalid or a system schema
+        """
+        if not re.match(r"^[a-zA-Z_][a-zA-Z0-9_]*$", db_name) or len(db_name) > 64:
+            raise ValueError(f"Invalid database name: {db_name}")
+        if db_name.lower() in SYSTEM_SCHEMAS:
+            raise ValueError(f"System schema not allowed: {db_name}")
+        return db_name
+
+    def _docker_cmd(self, *args: str, stdin: bool = False) -> list[str]:
+        """Build docker exec command for the MariaDB container.
+
+        The password is passed via MYSQL_PWD so it does not appear in argv.
+
+        Args:
+            *args: Command and arguments to run in the container
+            stdin: Attach stdin (-i)
+
+        Returns:
+            Command list
+        """
+        cmd = ["docker", "exec"]
+        if stdin:
+            cmd.append("-i")
+        cmd += ["-e", f"MYSQL_PWD={self.password}", self.container, *args]
+        return cmd
+
+    async def _run(self, *args: str) -> str:
+        """Run a short mysql command and return stdout.
+
+        Args:
+            *args: Command and arguments to run in the container
+
+        Returns:
+            Command stdout
+
+        Raises:
+            RuntimeError: If the command fails
+        """
+        proc = await asyncio.create_subprocess_exec(
+            *self._docker_cmd(*args),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, stderr = await proc.communicate()
+        if proc.returncode != 0:
+            raise RuntimeError(f"MySQL command failed: {stderr.decode(errors='replace').strip()}")
+        return stdout.decode(errors="replace").strip()
+
+    async def database_exists(self, db_name: str) -> bool:
+        """Check whether a database exists.
+
+        Args:
+            db_name: Database name
+
+        Returns:
+            True if the database exists
+        """
+        safe_db_name = self._validate_db_name(db_name)
+        output = await self._run(
+            "mysql", "-u", "root", "-N", "-e", f"SHOW DATABASES LIKE '{safe_db_name}'"
+        )
+        return safe_db_name in output.split()
+
+    async def _create_database(self, db_name: str) -> None:
+        """Create database if it does not exist.
+
+        Args:
+            db_name: Database name (already validated)
+        """
+        await self._run(
+            "mysql", "-u", "root", "-e",
+            f"CREATE DATABASE IF NOT EXISTS `{db_name}` CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci",
+        )
+
+    def _dump_cmd(self, db_name: str) -> list[str]:
+        """Build mysqldump command for a consistent, unbuffered dump.
+
+        Args:
+            db_name: Database name (already validated)
+
+        Returns:
+            Command list
+        """
+        return self._docker_cmd(
+            "mysqldump", "-u", "root",
+            "--single-transaction", "--quick",
+            "--routines", "--triggers", "--events",
+            "--hex-blob", "--default-character-set=utf8mb4",
+            db_name,
+        )
+
+    @staticmethod
+    async def _drain_stderr(stream: asyncio.StreamReader) -> bytes:
+        """Read stderr concurrently so a full pipe can't stall the child."""
+        return await stream.read()
+
+    @staticmethod
+    def _stderr_tail(stderr: bytes) -> str:
+        """Last part of a child's stderr for error messages."""
+        return stderr[-STDERR_TAIL:].decode(errors="replace").strip()
+
+    @staticmethod
+    async def _terminate(proc: asyncio.subprocess.Process) -> None:
+        """Kill a child process if it is still running."""
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+
+    async def export_database(
+        self,
+        db_name: str,
+        compression: Compression = "gzip",
+    ) -> AsyncIterator[bytes]:
+        """Stream a logical dump of a database.
+
+        Args:
+            db_name: Database name
+            compression: Output compression (gzip or none)
+
+        Yields:
+            Dump chunks (compressed if requested)
+
+        Raises:
+            RuntimeError: If mysqldump fails
+        """
+        safe_db_name = self._validate_db_name(db_name)
+        compressor = zlib.compressobj(6, zlib.DEFLATED, GZIP_WBITS) if compression == "gzip" else None
+
+        proc = await asyncio.create_subprocess_exec(
+            *self._dump_cmd(safe_db_name),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stderr_task = asyncio.create_task(self._drain_stderr(proc.stderr))
+        bytes_read = 0
+        # Held back until mysqldump has exited cleanly, so a failed dump
+        # never ends in a complete-looking file (no gzip trailer / last chunk)
+        pending = b""
+
+        try:
+            while True:
+                chunk = await proc.stdout.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                bytes_read += len(chunk)
+                if compressor:
+                    chunk = compressor.compress(chunk)
+                    if not chunk:
+                        continue
+                if pending:
+                    yield pending
+                pending = chunk
+
+            await proc.wait()
+            stderr = await stderr_task
+            if proc.returncode != 0:
+                raise RuntimeError(f"mysqldump failed (exit {proc.returncode}): {self._stderr_tail(stderr)}")
+
+            if compressor:
+                pending += compressor.flush()
+            if pending:
+                yield pending
+
+            logger.info(f"Exported database {safe_db_name}: {bytes_read} bytes uncompressed")
+        finally:
+            # Client disconnected or dump failed - don't leave mysqldump running
+            await self._terminate(proc)
+            if not stderr_task.done():
+                stderr_task.cancel()
+
+    async def import_database(
+        self,
+        db_name: str,
+        chunks: AsyncIterator[bytes],
+        compression: Compression = "gzip",
+        create: bool = True,
+    ) -> Dict[str, Any]:
+        """Restore a database from a streamed logical dump.
+
+        Progress is recorded per database and can be read with
+        get_import_progress() while the upload is running.
+
+        Args:
+            db_name: Database name
+            chunks: Uploaded dump chunks
+            compression: Input compression (gzip or none)
+            create: Create the database if it does not exist
+
+        Returns:
+            Final import progress
+
+        Raises:
+            RuntimeError: If an import is already running or mysql fails
+        """
+        safe_db_name = self._validate_db_name(db_name)
+        current = self._import_progress.get(safe_db_name)
+        if current and current["status"] == "running":
+            raise RuntimeError(f"Import already running for {safe_db_name}")
+
+        progress: Dict[str, Any] = {
+            "database": safe_db_name,
+            "status": "running",
+            "bytes_received": 0,
+            "bytes_written": 0,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "finished_at": None,
+            "error": None,
+        }
+        self._import_progress[safe_db_name] = progress
+
+        proc: Optional[asyncio.subprocess.Process] = None
+        stderr_task: Optional[asyncio.Task] = None
+        try:
+            if create:
+                await self._create_database(safe_db_name)
+
+            decompressor = zlib.decompressobj(GZIP_WBITS) if compression == "gzip" else None
+            proc = await asyncio.create_subprocess_exec(
+                *self._docker_cmd("mysql", "-u", "root", "--default-character-set=utf8mb4", safe_db_name, stdin=True),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            stderr_task = asyncio.create_task(self._drain_stderr(proc.stderr))
+
+            async for chunk in chunks:
+                progress["bytes_received"] += len(chunk)
+                data = decompressor.decompress(chunk) if decompressor else chunk
+                if data:
+                    proc.stdin.write(data)
+                    await proc.stdin.drain()
+                    progress["bytes_written"] += len(data)
+
+            if decompressor:
+                tail = decompressor.flush()
+                if tail:
+                    proc.stdin.write(tail)
+                    await proc.stdin.drain()
+                    progress["bytes_written"] += len(tail)
+
+            proc.stdin.close()
+            await proc.wait()
+            stderr = await stderr_task
+            if proc.returncode != 0:
+                raise RuntimeError(f"mysql import failed (exit {proc.returncode}): {self._stderr_tail(stderr)}")
+
+            progress["status"] = "completed"
+            logger.info(
+                f"Imported database {safe_db_name}: "
+                f"{progress['bytes_received']} bytes received, {progress['bytes_written']} bytes written"
+            )
+        except Exception as e:
+            progress["status"] = "failed"
+            progress["error"] = str(e)
+            logger.error(f"Failed to import database {safe_db_name}: {e}")
+            raise
+        finally:
+            if proc is not None:
+                await self._terminate(proc)
+            if stderr_task is not None and not stderr_task.done():
+                stderr_task.cancel()
+            progress["finished_at"] = datetime.now(timezone.utc).isoformat()
+
+        return dict(progress)
+
+    def get_import_progress(self, db_name: str) -> Optional[Dict[str, Any]]:
+        """Get progress of the last import for a database.
+
+        Args:
+            db_name: Database name
+
+        Returns:
+            Import progress or None if no import has run
+        """
+        progress = self._import_progress.get(db_name)
+        return dict(progress) if progress else None
+
+    async def clone_database(self, source_db: str, target_db: str) -> Dict[str, Any]:
+        """Clone a database by piping mysqldump straight into mysql.
+
+        Args:
+            source_db: Source database name
+            target_db: Target database name (created if missing)
+
+        Returns:
+            Clone result with byte count
+
+        Raises:
+            ValueError: If source and target are the same
+            RuntimeError: If dump or import fails
+        """
+        safe_source = self._validate_db_name(source_db)
+        safe_target = self._validate_db_name(target_db)
+        if safe_source == safe_target:
+            raise ValueError("Source and target database must differ")
+
+        async def dump_chunks() -> AsyncIterator[bytes]:
+            async for chunk in self.export_database(safe_source, compression="none"):
+                yield chunk
+
+        result = await self.import_database(safe_target, dump_chunks(), compression="none")
+        logger.info(f"Cloned database {safe_source} -> {safe_target}")
+        return {
+            "source": safe_source,
+            "target": safe_target,
+            "bytes_copied": result["bytes_written"],
+        }
+
+
+# Singleton instance
+_dump_service: DatabaseDumpService | None = None
+
+
+def get_database_dump_service() -> DatabaseDumpService:
+    """Get database dump service singleton.
+
+    Returns:
+        DatabaseDumpService instance
+    """
+    global _dump_service
+    if _dump_service is None:
+        _dump_service = DatabaseDumpService()
+    return _dump_service
@@ -5,17 +5,28 @@ import logging
 import re
 import secrets
 import string
-from typing import Any, Dict, List, Literal, Optional
+import time
+from typing import Any, Dict, List, Literal, Optional, Set, Tuple
 
 import pymysql
-from sqlalchemy import create_engine, text
+from pymysql.constants import CLIENT
+from pymysql.converters import escape_string
+from sqlalchemy import text
 from sqlalchemy.engine import Engine
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from app.config import get_settings
+from app.database import get_target_engine
 from app.models.db_credential import DBCredential
-from app.schemas.database import DatabaseCreate, DatabaseResponse, DatabaseUserCreate
+from app.schemas.database import (
+    DatabaseCreate,
+    DatabaseProvisionRequest,
+    DatabaseProvisionResult,
+    DatabaseProvisionSite,
+    DatabaseResponse,
+    DatabaseUserCreate,
+)
 from app.services.encryption_service import get_encryption_service
 
 logger = logging.getLogger(__name__)
@@ -37,7 +48,6 @@ class DatabaseService:
         """
         self.db = db
         self.encryption = get_encryption_service()
-        self._engines: Dict[str, Engine] = {}
 
     @staticmethod
     def _sanitize_identifier(identifier: str) -> str:
@@ -71,28 +81,16 @@ class DatabaseService:
     def _get_engine(self, target: Literal["blog", "mailserver"]) -> Engine:
         """Get database engine for target system.
 
+        Engines are shared process-wide (see app.database.get_target_engine)
+        so per-request service instances do not create new pools.
+
         Args:
             target: Target system (blog or mailserver)
 
         Returns:
             SQLAlchemy engine
         """
-        if target not in self._engines:
-            if target == "blog":
-                url = settings.blog_database_url
-            elif target == "mailserver":
-                url = settings.mailserver_database_url
-            else:
-                raise ValueError(f"Invalid target system: {target}")
-
-            # Create engine with isolation_level="AUTOCOMMIT" for DDL operations
-            self._engines[target] = create_engine(
-                url,
-                pool_pre_ping=True,
-                isolation_level="AUTOCOMMIT"
-            )
-
-        return self._engines[target]
+        return get_target_engine(target)
 
     def list_databases(self, target: Literal["blog", "mailserver"]) -> List[DatabaseResponse]:
         """List all databases in target system.
@@ -143,109 +141,299 @@ class DatabaseService:
             logger.error(f"Failed to list databases for {target}: {e}")
             raise ValueError(f"Failed to list databases: {e}")
 
-    def create_database(
-        self,
-        db_create: DatabaseCreate,
-    ) -> DatabaseResponse:
-        """Create a new database.
+    def _connection_params(self, target: Literal["blog", "mailserver"]) -> Dict[str, Any]:
+        """Get raw PyMySQL connection parameters for target system.
 
         Args:
-            db_create: Database creation data
+            target: Target system
 
         Returns:
-            Created database info
+            Connection keyword arguments
 
         Raises:
-            ValueError: If creation fails
+            ValueError: If target is unknown
         """
-        print(f"🔍 DEBUG: create_database called with database_name={db_create.database_name}, target_system={db_create.target_system}")
-        engine = self._get_engine(db_create.target_system)
-        print(f"🔍 DEBUG: Engine obtained: {engine.url}")
+        if target == "blog":
+            return {
+                "host": settings.blog_db_host,
+                "port": settings.blog_db_port,
+                "user": settings.blog_db_user,
+                "password": settings.blog_db_password,
+            }
+        if target == "mailserver":
+            return {
+                "host": settings.mailserver_db_host,
+                "port": settings.mailserver_db_port,
+                "user": "root",  # Assuming root for mailserver
+                "password": settings.mailserver_database_url.split(":")[-2].split("@")[0],
+            }
+        raise ValueError(f"Invalid target system: {target}")
+
+    def _execute_batch(self, target: Literal["blog", "mailserver"], statements: List[str]) -> None:
+        """Execute statements as one multi-statement round trip.
+
+        Uses raw PyMySQL with MULTI_STATEMENTS to bypass SQLAlchemy transaction
+        management. Note that MariaDB DDL and account statements commit
+        implicitly, so the batch is made safe to re-run through IF NOT EXISTS
+        clauses rather than by rolling back.
 
-        # Defense-in-depth: Sanitize identifiers (Pydantic should already validate)
-        safe_db_name = self._sanitize_identifier(db_create.database_name)
-        safe_charset = db_create.charset  # Already validated by Pydantic whitelist
-        safe_collation = db_create.collation  # Already validated by Pydantic whitelist
-
-        print(f"🔍 DEBUG: Sanitized values - db_name={safe_db_name}, charset={safe_charset}, collation={safe_collation}")
-
-        # Get connection parameters from engine URL
-        if db_create.target_system == "blog":
-            db_host = settings.blog_db_host
-            db_port = settings.blog_db_port
-            db_user = settings.blog_db_user
-            db_password = settings.blog_db_password
-        elif db_create.target_system == "mailserver":
-            db_host = settings.mailserver_db_host
-            db_port = settings.mailserver_db_port
-            db_user = "root"  # Assuming root for mailserver
-            db_password = settings.mailserver_database_url.split(":")[-2].split("@")[0]
-        else:
-            raise ValueError(f"Invalid target system: {db_create.target_system}")
+        Args:
+            target: Target system
+            statements: SQL statements (without trailing semicolons)
 
-        print(f"🔍 DEBUG: Connecting to {db_host}:{db_port} as {db_user}")
+        Raises:
+            ValueError: If any statement fails
+        """
+        if not statements:
+            return
 
+        connection = None
         try:
-            # Use raw PyMySQL to bypass SQLAlchemy transaction management
-            # PyMySQL auto-commits DDL statements by default
             connection = pymysql.connect(
-                host=db_host,
-                port=db_port,
-                user=db_user,
-                password=db_password,
-                autocommit=True  # Ensure autocommit for DDL
+                **self._connection_params(target),
+                autocommit=True,
+                client_flag=CLIENT.MULTI_STATEMENTS,
             )
-            print(f"🔍 DEBUG: PyMySQL connection established")
-
-            try:
-                with connection.cursor() as cursor:
-                    # Create database with IF NOT EXISTS to handle existing databases gracefully
-                    sql_statement = f"CREATE DATABASE IF NOT EXISTS `{safe_db_name}` CHARACTER SET {safe_charset} COLLATE {safe_collation}"
-                    print(f"🔍 DEBUG: About to execute SQL: {sql_statement}")
-
-                    cursor.execute(sql_statement)
-                    print(f"🔍 DEBUG: SQL executed successfully with PyMySQL")
-
-                    # Verify database was created
-                    cursor.execute(f"SHOW DATABASES LIKE '{safe_db_name}'")
-                    verify_rows = cursor.fetchall()
-                    print(f"🔍 DEBUG: Verification - found {len(verify_rows)} databases matching '{safe_db_name}'")
-                    if verify_rows:
-                        print(f"🔍 DEBUG: Database verified: {verify_rows[0][0]}")
-                    else:
-                        print(f"🔍 DEBUG: WARNING - Database NOT found immediately after creation!")
-
-                    # Grant privileges to wpuser for WordPress sites
-                    if db_create.target_system == "blog":
-                        wp_user = settings.blog_wp_db_user
-                        grant_sql = f"GRANT ALL PRIVILEGES ON `{safe_db_name}`.* TO '{wp_user}'@'%'"
-                        print(f"🔍 DEBUG: Granting privileges to {wp_user}: {grant_sql}")
-                        cursor.execute(grant_sql)
-                        cursor.execute("FLUSH PRIVILEGES")
-                        print(f"🔍 DEBUG: Privileges granted successfully to {wp_user}")
-            finally:
+            with connection.cursor() as cursor:
+                cursor.execute(";\n".join(statements))
+                # Consume every result set so errors in later statements surface
+                while cursor.nextset():
+                    pass
+        except pymysql.MySQLError as e:
+            logger.error(f"Batch execution failed on {target}: {e}")
+            raise ValueError(f"Batch execution failed: {e}")
+        finally:
+            if connection is not None:
                 connection.close()
-                print(f"🔍 DEBUG: PyMySQL connection closed")
-
-            # Success - log and return
-            print(f"🔍 DEBUG: Database creation completed, preparing response")
-            logger.info(f"Database created: {db_create.database_name} ({db_create.target_system})")
-
-            return DatabaseResponse(
-                database_name=db_create.database_name,
-                charset=db_create.charset,
-                collation=db_create.collation,
-                size_mb=0.0,
-                table_count=0,
+
+    def _existing_accounts(
+        self,
+        target: Literal["blog", "mailserver"],
+        accounts: List[Tuple[str, str]],
+    ) -> Set[Tuple[str, str]]:
+        """Find which accounts already exist.
+
+        Args:
+            target: Target system
+            accounts: (user, host) pairs
+
+        Returns:
+            Existing (user, host) pairs
+
+        Raises:
+            ValueError: If the lookup fails
+        """
+        if not accounts:
+            return set()
+
+        placeholders = ", ".join(["(%s, %s)"] * len(accounts))
+        connection = None
+        try:
+            connection = pymysql.connect(**self._connection_params(target))
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT User, Host FROM mysql.user WHERE (User, Host) IN ({placeholders})",
+                    [value for account in accounts for value in account],
+                )
+                return {(str(user), str(host)) for user, host in cursor.fetchall()}
+        except pymysql.MySQLError as e:
+            logger.error(f"Account lookup failed on {target}: {e}")
+            raise ValueError(f"Account lookup failed: {e}")
+        finally:
+            if connection is not None:
+                connection.close()
+
+    def _build_site_statements(
+        self,
+        site: DatabaseProvisionSite,
+        target: Literal["blog", "mailserver"],
+        password: Optional[str],
+        grant_wp_user: bool,
+        reset_password: bool = False,
+    ) -> List[str]:
+        """Build idempotent provisioning statements for one site.
+
+        Args:
+            site: Site provisioning data
+            target: Target system
+            password: Password for a newly created user (None to skip user)
+            grant_wp_user: Grant the shared WordPress user on blog databases
+            reset_password: Also set the password of an existing user
+
+        Returns:
+            SQL statements
+        """
+        # Defense-in-depth: Sanitize identifiers (Pydantic should already validate)
+        safe_db_name = self._sanitize_identifier(site.database_name)
+
+        statements = [
+            f"CREATE DATABASE IF NOT EXISTS `{safe_db_name}` "
+            f"CHARACTER SET {site.charset} COLLATE {site.collation}"
+        ]
+
+        if site.username and password is not None:
+            safe_username = self._sanitize_identifier(site.username)
+            account = f"'{safe_username}'@'{site.host}'"
+            safe_password = escape_string(password)
+            statements.append(f"CREATE USER IF NOT EXISTS {account} IDENTIFIED BY '{safe_password}'")
+            if reset_password:
+                # Only an explicitly requested password replaces an existing one
+                statements.append(f"ALTER USER {account} IDENTIFIED BY '{safe_password}'")
+            statements.append(f"GRANT {', '.join(site.privileges)} ON `{safe_db_name}`.* TO {account}")
+
+        # Grant privileges to wpuser for WordPress sites
+        if target == "blog" and grant_wp_user:
+            wp_user = self._sanitize_identifier(settings.blog_wp_db_user)
+            statements.append(f"GRANT ALL PRIVILEGES ON `{safe_db_name}`.* TO '{wp_user}'@'%'")
+
+        return statements
+
+    @staticmethod
+    def _mask_passwords(statement: str) -> str:
+        """Mask password literals in a statement for logging/dry-run output."""
+        return re.sub(r"IDENTIFIED BY '(?:[^'\\]|\\.)*'", "IDENTIFIED BY '********'", statement)
+
+    def provision(self, request: DatabaseProvisionRequest) -> DatabaseProvisionResult:
+        """Provision databases, users and grants for many sites in one batch.
+
+        All statements for all sites are sent in a single multi-statement
+        round trip. Statements are idempotent, so the call can be re-run
+        (e.g. when migrating sites to a new MariaDB host). Existing users
+        keep their password unless the request supplies one; generated
+        passwords are only stored for users this call creates. Sites sharing
+        a user account share its password (one generated per account).
+
+        Args:
+            request: Provisioning request
+
+        Returns:
+            Provisioning result
+
+        Raises:
+            ValueError: If provisioning fails
+        """
+        started = time.monotonic()
+        target = request.target_system
+
+        statements: List[str] = []
+        passwords: Dict[str, str] = {}
+        databases: List[str] = []
+        users: List[str] = []
+
+        # One password per account: CREATE USER only applies the first
+        account_passwords = {
+            (site.username, site.host): site.password
+            for site in request.sites
+            if site.username and site.password is not None
+        }
+        generated_accounts = set()
+        for site in request.sites:
+            password = None
+            if site.username:
+                account = (site.username, site.host)
+                if account not in account_passwords:
+                    account_passwords[account] = self._generate_password()
+                    generated_accounts.add(account)
+                password = account_passwords[account]
+                passwords[site.database_name] = password
+                users.append(f"{site.username}@{site.host}")
+            statements += self._build_site_statements(
+                site, target, password, request.grant_wp_user, reset_password=site.password is not None
             )
+            databases.append(site.database_name)
+
+        masked = [self._mask_passwords(stmt) for stmt in statements]
+
+        if not request.dry_run:
+            generated = [
+                site for site in request.sites
+                if site.username and (site.username, site.host) in generated_accounts
+            ]
+            existing = self._existing_accounts(target, [(site.username, site.host) for site in generated])
+            for site in generated:
+                if (site.username, site.host) in existing:
+                    # CREATE USER IF NOT EXISTS leaves it alone - keep the stored credential
+                    del passwords[site.database_name]
+            self._execute_batch(target, statements)
+            self._store_credentials(request, passwords)
+            logger.info(f"Provisioned {len(databases)} databases, {len(users)} users ({target})")
+
+        return DatabaseProvisionResult(
+            dry_run=request.dry_run,
+            executed=not request.dry_run,
+            databases=databases,
+            users=users,
+            statements=masked,
+            duration_ms=round((time.monotonic() - started) * 1000, 2),
+        )
+
+    def _store_credentials(self, request: DatabaseProvisionRequest, passwords: Dict[str, str]) -> None:
+        """Store encrypted credentials for provisioned users.
 
-        except SQLAlchemyError as e:
-            print(f"🔍 DEBUG: SQLAlchemyError caught: {type(e).__name__} - {e}")
-            logger.error(f"Failed to create database: {e}")
-            raise ValueError(f"Failed to create database: {e}")
-        except Exception as e:
-            print(f"🔍 DEBUG: Unexpected exception caught: {type(e).__name__} - {e}")
-            raise
+        Args:
+            request: Provisioning request
+            passwords: Plaintext passwords keyed by database name
+        """
+        if not passwords:
+            return
+
+        params = self._connection_params(request.target_system)
+        existing = {
+            cred.database_name: cred
+            for cred in self.db.query(DBCredential).filter(
+                DBCredential.database_name.in_(list(passwords.keys()))
+            )
+        }
+
+        for site in request.sites:
+            if site.database_name not in passwords:
+                continue
+            credential = existing.get(site.database_name)
+            if credential is None:
+                credential = DBCredential(database_name=site.database_name)
+                self.db.add(credential)
+            credential.username = site.username
+            credential.password_encrypted = self.encryption.encrypt(passwords[site.database_name])
+            credential.host = params["host"]
+            credential.port = params["port"]
+            credential.target_system = request.target_system
+
+        self.db.commit()
+
+    def create_database(
+        self,
+        db_create: DatabaseCreate,
+    ) -> DatabaseResponse:
+        """Create a new database.
+
+        Args:
+            db_create: Database creation data
+
+        Returns:
+            Created database info
+
+        Raises:
+            ValueError: If creation fails
+        """
+        site = DatabaseProvisionSite(
+            database_name=db_create.database_name,
+            charset=db_create.charset,
+            collation=db_create.collation,
+        )
+        statements = self._build_site_statements(
+            site, db_create.target_system, password=None, grant_wp_user=True
+        )
+        self._execute_batch(db_create.target_system, statements)
+
+        logger.info(f"Database created: {db_create.database_name} ({db_create.target_system})")
+
+        return DatabaseResponse(
+            database_name=db_create.database_name,
+            charset=db_create.charset,
+            collation=db_create.collation,
+            size_mb=0.0,
+            table_count=0,
+        )
 
     def delete_database(self, database_name: str, target: Literal["blog", "mailserver"]) -> None:
         """Delete a database.
@@ -0,0 +1,113 @@
+"""Portal-side dedup store jobs.
+
+The store itself lives in backup_tools.dedup_store, which the backup scripts
+also run on the host.
+"""
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from backup_tools.dedup_store import DedupStore
+
+logger = logging.getLogger(__name__)
+
+
+class DedupStoreService:
+    """Service running dedup snapshots and restores as background jobs."""
+
+    def __init__(self, store_root: str):
+        """Initialize dedup store service.
+
+        Args:
+            store_root: Store directory
+        """
+        self.store_root = store_root
+        self._store: Optional[DedupStore] = None
+        # Snapshots and restores share packfiles - run one at a time
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dedup-store")
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def store(self) -> DedupStore:
+        """Lazily opened store."""
+        if self._store is None:
+            self._store = DedupStore(self.store_root)
+        return self._store
+
+    def _submit(self, kind: str, params: Dict[str, Any], func) -> Dict[str, Any]:
+        """Queue a job."""
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "kind": kind,
+            "params": params,
+            "status": "queued",
+            "queued_at": datetime.now(timezone.utc).isoformat(),
+            "finished_at": None,
+            "progress": {"files_done": 0, "bytes_done": 0},
+            "result": None,
+            "error": None,
+        }
+        with self._lock:
+            self._jobs[job["job_id"]] = job
+
+        def run() -> None:
+            job["status"] = "running"
+            try:
+                job["result"] = func(job["progress"])
+                job["status"] = "completed"
+            except Exception as e:
+                job["status"] = "failed"
+                job["error"] = str(e)
+                logger.error(f"Dedup {kind} job {job['job_id']} failed: {e}")
+            finally:
+                job["finished_at"] = datetime.now(timezone.utc).isoformat()
+
+        self._executor.submit(run)
+        return self.get_job(job["job_id"])
+
+    def start_snapshot(self, source: str, name: Optional[str] = None) -> Dict[str, Any]:
+        """Queue a snapshot job."""
+        return self._submit(
+            "snapshot",
+            {"source": source, "name": name},
+            lambda progress: self.store.snapshot(source, name=name, progress=progress),
+        )
+
+    def start_restore(self, snapshot_id: str, target: str, prefix: Optional[str] = None) -> Dict[str, Any]:
+        """Queue a restore job."""
+        return self._submit(
+            "restore",
+            {"snapshot_id": snapshot_id, "target": target, "prefix": prefix},
+            lambda progress: self.store.restore(snapshot_id, target, prefix=prefix),
+        )
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job by ID."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return {**job, "progress": dict(job["progress"])}
+
+
+# Singleton instance
+_dedup_service: DedupStoreService | None = None
+
+
+def get_dedup_store_service(store_root: str) -> DedupStoreService:
+    """Get dedup store service singleton.
+
+    Args:
+        store_root: Store directory (used on first call)
+
+    Returns:
+        DedupStoreService instance
+    """
+    global _dedup_service
+    if _dedup_service is None:
+        _dedup_service = DedupStoreService(store_root)
+    return _dedup_service
@@ -0,0 +1,319 @@
+"""DNS propagation checks against public DNS-over-HTTPS resolvers.
+
+All configured resolvers are queried concurrently, so a check takes as long
+as the slowest resolver (bounded by the timeout) rather than the sum of
+them. Watch jobs repeat the check in the background until the record has
+propagated everywhere or the deadline passes; subscribers receive every
+check as it completes (streamed to the portal as server-sent events).
+
+The resolver set is configurable (dns_doh_resolvers), so tests and offline
+setups can point the checker at a local DoH JSON endpoint.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+DNS_TYPE_NUMBERS = {
+    "A": 1,
+    "AAAA": 28,
+    "CNAME": 5,
+    "MX": 15,
+    "TXT": 16,
+    "NS": 2,
+    "SOA": 6,
+    "PTR": 12,
+    "SRV": 33,
+    "CAA": 257,
+}
+# Finished watches kept for late subscribers
+MAX_FINISHED_WATCHES = 100
+
+
+def get_dns_type_number(record_type: str) -> int:
+    """Get DNS type number from record type string.
+
+    Args:
+        record_type: DNS record type (A, AAAA, MX, etc.)
+
+    Returns:
+        DNS type number
+    """
+    return DNS_TYPE_NUMBERS.get(record_type.upper(), 1)
+
+
+def _normalize_answer(record_type: str, data: str) -> str:
+    """Answer data in comparable form (no trailing dot or TXT quotes)."""
+    data = data.strip()
+    if record_type.upper() == "TXT":
+        return data[1:-1] if len(data) >= 2 and data[0] == data[-1] == '"' else data
+    return data.rstrip(".").lower()
+
+
+class DNSPropagationChecker:
+    """Concurrent multi-resolver DoH checks."""
+
+    def __init__(
+        self,
+        resolvers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """Initialize propagation checker.
+
+        Args:
+            resolvers: Resolver name to DoH JSON endpoint (defaults to settings)
+            timeout: Per-resolver timeout in seconds (defaults to settings)
+            transport: httpx transport (tests)
+        """
+        self.resolvers = resolvers or dict(settings.dns_doh_resolvers)
+        self.timeout = timeout or settings.dns_doh_timeout
+        self._transport = transport
+
+    async def _query(
+        self,
+        client: httpx.AsyncClient,
+        server_name: str,
+        server_url: str,
+        record_type: str,
+        name: str,
+    ) -> Dict[str, Any]:
+        """Query one resolver.
+
+        The result's ttl is the lowest TTL of the answers, or the negative
+        caching TTL from the SOA when there are none (None when unknown).
+        """
+        try:
+            response = await client.get(
+                server_url,
+                params={"name": name, "type": record_type},
+                headers={"Accept": "application/dns-json"},
+            )
+            if response.status_code != 200:
+                return {"server": server_name, "status": "failed", "records": [], "ttl": None,
+                        "error": f"HTTP {response.status_code}"}
+
+            data = response.json()
+            type_number = get_dns_type_number(record_type)
+            answers = [answer for answer in data.get("Answer", []) if answer.get("type") == type_number]
+        except httpx.TimeoutException:
+            return {"server": server_name, "status": "timeout", "records": [], "ttl": None,
+                    "error": "Request timeout"}
+        except Exception as err:
+            return {"server": server_name, "status": "failed", "records": [], "ttl": None, "error": str(err)}
+
+        records = [answer.get("data", "") for answer in answers]
+        if answers:
+            ttl = min(answer.get("TTL", 0) for answer in answers)
+        else:
+            ttl = min((entry.get("TTL", 0) for entry in data.get("Authority") or []), default=None)
+        return {
+            "server": server_name,
+            "status": "success" if records else "failed",
+            "records": records,
+            "ttl": ttl,
+            "error": None if records else "No records found",
+        }
+
+    async def check(self, record_type: str, name: str, expected_content: Optional[str] = None) -> Dict[str, Any]:
+        """Query every resolver at once.
+
+        Args:
+            record_type: DNS record type (A, AAAA, MX, TXT, etc.)
+            name: DNS record name (FQDN)
+            expected_content: Content every resolver must return (optional)
+
+        Returns:
+            Verification result (record_type, name, servers, propagated, expected_content)
+        """
+        async with httpx.AsyncClient(timeout=self.timeout, transport=self._transport) as client:
+            servers = await asyncio.gather(*(
+                self._query(client, server_name, server_url, record_type, name)
+                for server_name, server_url in self.resolvers.items()
+            ))
+
+        propagated = bool(servers) and all(server["records"] for server in servers)
+        if propagated and expected_content:
+            expected = _normalize_answer(record_type, expected_content)
+            propagated = all(
+                expected in {_normalize_answer(record_type, data) for data in server["records"]}
+                for server in servers
+            )
+
+        return {
+            "record_type": record_type,
+            "name": name,
+            "servers": list(servers),
+            "propagated": propagated,
+            "expected_content": expected_content,
+        }
+
+
+class DNSPropagationWatcher:
+    """Background watch jobs that poll until a record has propagated."""
+
+    def __init__(self, checker: Optional[DNSPropagationChecker] = None):
+        """Initialize propagation watcher.
+
+        Args:
+            checker: Propagation checker (defaults to one using settings)
+        """
+        self.checker = checker or DNSPropagationChecker()
+        self._watches: Dict[str, Dict[str, Any]] = {}
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+        self._tasks: set = set()
+
+    def active_count(self) -> int:
+        """Number of watches still polling."""
+        return sum(1 for watch in self._watches.values() if watch["status"] == "watching")
+
+    def start(
+        self,
+        record_type: str,
+        name: str,
+        expected_content: Optional[str] = None,
+        interval: float = 15.0,
+        timeout: float = 600.0,
+    ) -> Dict[str, Any]:
+        """Start watching a record.
+
+        Args:
+            record_type: DNS record type
+            name: DNS record name (FQDN)
+            expected_content: Content every resolver must return (optional)
+            interval: Seconds between checks
+            timeout: Seconds before the watch gives up
+
+        Returns:
+            Watch job
+        """
+        now = datetime.now(timezone.utc)
+        watch = {
+            "watch_id": uuid.uuid4().hex,
+            "record_type": record_type,
+            "name": name,
+            "expected_content": expected_content,
+            "status": "watching",  # watching, propagated, expired, failed
+            "attempts": 0,
+            "started_at": now.isoformat(),
+            "deadline": datetime.fromtimestamp(now.timestamp() + timeout, timezone.utc).isoformat(),
+            "finished_at": None,
+            "result": None,
+            "error": None,
+        }
+        self._watches[watch["watch_id"]] = watch
+        self._subscribers[watch["watch_id"]] = []
+        self._prune()
+        task = asyncio.ensure_future(self._run(watch, interval, timeout))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return dict(watch)
+
+    def get(self, watch_id: str) -> Optional[Dict[str, Any]]:
+        """Get a watch job by ID.
+
+        Args:
+            watch_id: Watch ID
+
+        Returns:
+            Watch job or None if not found
+        """
+        watch = self._watches.get(watch_id)
+        return dict(watch) if watch is not None else None
+
+    def _publish(self, watch: Dict[str, Any]) -> None:
+        """Send the watch's current state to its subscribers."""
+        for queue in self._subscribers.get(watch["watch_id"], []):
+            queue.put_nowait(dict(watch))
+
+    def _prune(self) -> None:
+        """Forget the oldest finished watches beyond the retention limit."""
+        finished = [watch_id for watch_id, watch in self._watches.items() if watch["status"] != "watching"]
+        for watch_id in finished[:max(0, len(finished) - MAX_FINISHED_WATCHES)]:
+            del self._watches[watch_id]
+            self._subscribers.pop(watch_id, None)
+
+    async def _run(self, watch: Dict[str, Any], interval: float, timeout: float) -> None:
+        """Poll until propagated or the deadline passes."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        try:
+            while True:
+                watch["result"] = await self.checker.check(
+                    watch["record_type"], watch["name"], watch["expected_content"]
+                )
+                watch["attempts"] += 1
+                if watch["result"]["propagated"]:
+                    watch["status"] = "propagated"
+                    break
+                if loop.time() + interval > deadline:
+                    watch["status"] = "expired"
+                    break
+                self._publish(watch)
+                await asyncio.sleep(interval)
+        except Exception as e:
+            watch["status"] = "failed"
+            watch["error"] = str(e)
+            logger.error(f"DNS watch {watch['watch_id']} failed: {e}")
+        finally:
+            watch["finished_at"] = datetime.now(timezone.utc).isoformat()
+            self._publish(watch)
+            for queue in self._subscribers.get(watch["watch_id"], []):
+                queue.put_nowait(None)
+            logger.info(f"DNS watch {watch['name']} {watch['record_type']}: {watch['status']} "
+                        f"after {watch['attempts']} checks")
+
+    async def subscribe(self, watch_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the watch's state now and after every check until it finishes.
+
+        Args:
+            watch_id: Watch ID
+
+        Yields:
+            Watch job snapshots
+        """
+        watch = self._watches.get(watch_id)
+        if watch is None:
+            return
+        yield dict(watch)
+        if watch["status"] != "watching":
+            return
+
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers[watch_id].append(queue)
+        try:
+            while True:
+                update = await queue.get()
+                if update is None:
+                    return
+                yield update
+        finally:
+            subscribers = self._subscribers.get(watch_id, [])
+            if queue in subscribers:
+                subscribers.remove(queue)
+
+
+# Singleton instance
+_propagation_watcher: DNSPropagationWatcher | None = None
+
+
+def get_propagation_watcher() -> DNSPropagationWatcher:
+    """Get DNS propagation watcher singleton.
+
+    Returns:
+        DNSPropagationWatcher instance
+    """
+    global _propagation_watcher
+    if _propagation_watcher is None:
+        _propagation_watcher = DNSPropagationWatcher()
+    return _propagation_watcher
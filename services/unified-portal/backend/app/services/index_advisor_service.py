@@ -0,0 +1,382 @@
+"""Index advisor for WordPress tables based on query digests."""
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Literal, Optional
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.sql.elements import TextClause
+
+from app.database import get_target_engine
+
+logger = logging.getLogger(__name__)
+
+# Known WordPress / WooCommerce hotspots.
+# table: table name without the WordPress prefix (e.g. "postmeta" for wp_postmeta)
+# columns: (column, prefix length or None) in index order
+# match: columns that must appear in a digest for it to count towards the benefit
+WORDPRESS_INDEX_HOTSPOTS: List[Dict[str, Any]] = [
+    {
+        "table": "postmeta",
+        "index_name": "meta_key_value",
+        "columns": [("meta_key", None), ("meta_value", 32)],
+        "match": ["meta_key", "meta_value"],
+        "reason": "meta_query lookups filter on meta_key and meta_value together",
+    },
+    {
+        "table": "postmeta",
+        "index_name": "post_id_meta_key",
+        "columns": [("post_id", None), ("meta_key", None)],
+        "match": ["post_id", "meta_key"],
+        "reason": "get_post_meta() reads by post_id and meta_key",
+    },
+    {
+        "table": "usermeta",
+        "index_name": "user_id_meta_key",
+        "columns": [("user_id", None), ("meta_key", None)],
+        "match": ["user_id", "meta_key"],
+        "reason": "get_user_meta() reads by user_id and meta_key",
+    },
+    {
+        "table": "options",
+        "index_name": "autoload",
+        "columns": [("autoload", None)],
+        "match": ["autoload"],
+        "reason": "wp_load_alloptions() scans options by autoload on every request",
+    },
+    {
+        "table": "woocommerce_order_itemmeta",
+        "index_name": "order_item_id_meta_key",
+        "columns": [("order_item_id", None), ("meta_key", 32)],
+        "match": ["order_item_id", "meta_key"],
+        "reason": "order item meta is read by order_item_id and meta_key",
+    },
+    {
+        "table": "wc_orders_meta",
+        "index_name": "meta_key_value",
+        "columns": [("meta_key", None), ("meta_value", 100)],
+        "match": ["meta_key", "meta_value"],
+        "reason": "HPOS order searches filter on meta_key and meta_value",
+    },
+    {
+        "table": "wc_product_meta_lookup",
+        "index_name": "stock_status_product_id",
+        "columns": [("stock_status", None), ("product_id", None)],
+        "match": ["stock_status"],
+        "reason": "catalog visibility queries filter products by stock_status",
+    },
+]
+
+SYSTEM_SCHEMAS = ["information_schema", "mysql", "performance_schema", "sys"]
+
+# performance_schema timers are in picoseconds
+PICOSECONDS = 1_000_000_000_000
+
+
+def _with_schema_list(query: str) -> TextClause:
+    """Compile a query whose :system_schemas parameter is bound as a list."""
+    return text(query).bindparams(bindparam("system_schemas", expanding=True))
+
+
+def _index_ddl(schema: str, table: str, index_name: str, columns: List[tuple]) -> str:
+    """Build online ADD INDEX DDL.
+
+    Args:
+        schema: Database name
+        table: Table name
+        index_name: Index name
+        columns: (column, prefix length) pairs
+
+    Returns:
+        ALTER TABLE statement using ALGORITHM=INPLACE, LOCK=NONE
+    """
+    column_sql = ", ".join(
+        f"`{column}`({length})" if length else f"`{column}`" for column, length in columns
+    )
+    return (
+        f"ALTER TABLE `{schema}`.`{table}` ADD INDEX `{index_name}` ({column_sql}), "
+        f"ALGORITHM=INPLACE, LOCK=NONE"
+    )
+
+
+class IndexAdvisorService:
+    """Service for proposing and applying indexes on WordPress hotspots.
+
+    Cross-references hot statement digests from performance_schema with
+    existing indexes in information_schema.STATISTICS, and applies accepted
+    indexes as serialized online DDL jobs.
+    """
+
+    def __init__(self, target: Literal["blog", "mailserver"] = "blog"):
+        """Initialize index advisor service.
+
+        Args:
+            target: Target system to analyse
+        """
+        self.target = target
+        # One worker: online DDL jobs never run concurrently against the same server
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="index-ddl")
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _validate_identifier(identifier: str) -> str:
+        """Validate SQL identifier to prevent injection.
+
+        Raises:
+            ValueError: If identifier is invalid
+        """
+        if not re.match(r"^[a-zA-Z_][a-zA-Z0-9_]*$", identifier) or len(identifier) > 64:
+            raise ValueError(f"Invalid identifier: {identifier}")
+        return identifier
+
+    def _load_hotspot_tables(self, conn, db_name: Optional[str]) -> List[Dict[str, Any]]:
+        """Find WordPress hotspot tables (any table prefix) with row estimates."""
+        suffixes = sorted({hotspot["table"] for hotspot in WORDPRESS_INDEX_HOTSPOTS})
+        conditions = " OR ".join(f"TABLE_NAME LIKE :suffix_{i}" for i in range(len(suffixes)))
+        params: Dict[str, Any] = {f"suffix_{i}": f"%\\_{suffix}" for i, suffix in enumerate(suffixes)}
+        params["system_schemas"] = SYSTEM_SCHEMAS
+
+        query = f"""
+            SELECT TABLE_SCHEMA, TABLE_NAME, TABLE_ROWS
+            FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA NOT IN :system_schemas
+              AND TABLE_TYPE = 'BASE TABLE'
+              AND ({conditions})
+        """
+        if db_name:
+            query += " AND TABLE_SCHEMA = :db_name"
+            params["db_name"] = db_name
+
+        return [dict(row._mapping) for row in conn.execute(_with_schema_list(query), params)]
+
+    def _load_indexes(self, conn, db_name: Optional[str]) -> Dict[tuple, List[List[str]]]:
+        """Load existing index column lists keyed by (schema, table)."""
+        query = """
+            SELECT TABLE_SCHEMA, TABLE_NAME, INDEX_NAME, COLUMN_NAME
+            FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA NOT IN :system_schemas
+        """
+        params: Dict[str, Any] = {"system_schemas": SYSTEM_SCHEMAS}
+        if db_name:
+            query += " AND TABLE_SCHEMA = :db_name"
+            params["db_name"] = db_name
+        query += " ORDER BY TABLE_SCHEMA, TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX"
+
+        by_index: Dict[tuple, List[str]] = {}
+        for row in conn.execute(_with_schema_list(query), params):
+            key = (row.TABLE_SCHEMA, row.TABLE_NAME, row.INDEX_NAME)
+            by_index.setdefault(key, []).append(row.COLUMN_NAME.lower())
+
+        indexes: Dict[tuple, List[List[str]]] = {}
+        for (schema, table, _), columns in by_index.items():
+            indexes.setdefault((schema, table), []).append(columns)
+        return indexes
+
+    def _load_digests(self, conn, db_name: Optional[str]) -> List[Dict[str, Any]]:
+        """Load statement digests from performance_schema (empty if disabled)."""
+        query = """
+            SELECT SCHEMA_NAME, DIGEST_TEXT, COUNT_STAR, SUM_TIMER_WAIT,
+                   SUM_ROWS_EXAMINED, SUM_NO_INDEX_USED
+            FROM performance_schema.events_statements_summary_by_digest
+            WHERE DIGEST_TEXT IS NOT NULL AND SCHEMA_NAME IS NOT NULL
+        """
+        params: Dict[str, Any] = {}
+        if db_name:
+            query += " AND SCHEMA_NAME = :db_name"
+            params["db_name"] = db_name
+
+        try:
+            return [dict(row._mapping) for row in conn.execute(text(query), params)]
+        except SQLAlchemyError as e:
+            logger.warning(f"Statement digests unavailable (performance_schema disabled?): {e}")
+            return []
+
+    @staticmethod
+    def _is_covered(existing: List[List[str]], columns: List[str]) -> bool:
+        """Check whether an existing index has the candidate columns as its leading prefix."""
+        return any(index[: len(columns)] == columns for index in existing)
+
+    @staticmethod
+    def _estimate_benefit(score: float) -> str:
+        """Bucket a benefit score (seconds of digest latency) into a label."""
+        if score >= 60:
+            return "high"
+        if score >= 5:
+            return "medium"
+        return "low"
+
+    def analyse(self, db_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Propose missing indexes on WordPress hotspot tables.
+
+        Args:
+            db_name: Limit analysis to one database
+
+        Returns:
+            Recommendations sorted by estimated benefit
+
+        Raises:
+            ValueError: If the analysis queries fail
+        """
+        if db_name:
+            db_name = self._validate_identifier(db_name)
+
+        engine = get_target_engine(self.target)
+        try:
+            with engine.connect() as conn:
+                tables = self._load_hotspot_tables(conn, db_name)
+                indexes = self._load_indexes(conn, db_name)
+                digests = self._load_digests(conn, db_name)
+        except SQLAlchemyError as e:
+            logger.error(f"Index analysis failed: {e}")
+            raise ValueError(f"Index analysis failed: {e}")
+
+        recommendations = []
+        for table in tables:
+            schema, table_name = table["TABLE_SCHEMA"], table["TABLE_NAME"]
+            for hotspot in WORDPRESS_INDEX_HOTSPOTS:
+                if not table_name.endswith(f"_{hotspot['table']}"):
+                    continue
+
+                column_names = [column for column, _ in hotspot["columns"]]
+                if self._is_covered(indexes.get((schema, table_name), []), column_names):
+                    continue
+
+                # Attribute digests that touch this table and all matching columns
+                executions = 0
+                latency = 0.0
+                rows_examined = 0
+                no_index_used = 0
+                digest_count = 0
+                for digest in digests:
+                    digest_text = (digest["DIGEST_TEXT"] or "").lower()
+                    if digest["SCHEMA_NAME"] != schema or table_name.lower() not in digest_text:
+                        continue
+                    if not all(column in digest_text for column in hotspot["match"]):
+                        continue
+                    digest_count += 1
+                    executions += int(digest["COUNT_STAR"] or 0)
+                    latency += (digest["SUM_TIMER_WAIT"] or 0) / PICOSECONDS
+                    rows_examined += int(digest["SUM_ROWS_EXAMINED"] or 0)
+                    no_index_used += int(digest["SUM_NO_INDEX_USED"] or 0)
+
+                recommendations.append({
+                    "database": schema,
+                    "table": table_name,
+                    "index_name": hotspot["index_name"],
+                    "columns": [f"{c}({n})" if n else c for c, n in hotspot["columns"]],
+                    "reason": hotspot["reason"],
+                    "table_rows": int(table["TABLE_ROWS"] or 0),
+                    "digest_count": digest_count,
+                    "executions": executions,
+                    "total_latency_seconds": round(latency, 3),
+                    "rows_examined": rows_examined,
+                    "no_index_used": no_index_used,
+                    "estimated_benefit": self._estimate_benefit(latency),
+                    "ddl": _index_ddl(schema, table_name, hotspot["index_name"], hotspot["columns"]),
+                })
+
+        recommendations.sort(
+            key=lambda r: (r["total_latency_seconds"], r["rows_examined"], r["table_rows"]),
+            reverse=True,
+        )
+        return recommendations
+
+    def apply_index(self, db_name: str, table: str, index_name: str) -> Dict[str, Any]:
+        """Queue an online DDL job for a recommended index.
+
+        Only indexes from WORDPRESS_INDEX_HOTSPOTS can be applied.
+
+        Args:
+            db_name: Database name
+            table: Table name (with WordPress prefix)
+            index_name: Recommended index name
+
+        Returns:
+            Queued job
+
+        Raises:
+            ValueError: If the index is not a known recommendation
+        """
+        db_name = self._validate_identifier(db_name)
+        table = self._validate_identifier(table)
+
+        hotspot = next(
+            (
+                h for h in WORDPRESS_INDEX_HOTSPOTS
+                if table.endswith(f"_{h['table']}") and h["index_name"] == index_name
+            ),
+            None,
+        )
+        if hotspot is None:
+            raise ValueError(f"Unknown index recommendation: {table}.{index_name}")
+
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "database": db_name,
+            "table": table,
+            "index_name": index_name,
+            "ddl": _index_ddl(db_name, table, index_name, hotspot["columns"]),
+            "status": "queued",
+            "queued_at": datetime.now(timezone.utc).isoformat(),
+            "started_at": None,
+            "finished_at": None,
+            "error": None,
+        }
+        with self._lock:
+            self._jobs[job["job_id"]] = job
+
+        self._executor.submit(self._run_job, job)
+        logger.info(f"Queued online index job {job['job_id']}: {job['ddl']}")
+        return dict(job)
+
+    def _run_job(self, job: Dict[str, Any]) -> None:
+        """Run an online DDL job (executed on the DDL worker thread)."""
+        job["status"] = "running"
+        job["started_at"] = datetime.now(timezone.utc).isoformat()
+        try:
+            with get_target_engine(self.target).connect() as conn:
+                conn.execute(text(job["ddl"]))
+            job["status"] = "completed"
+            logger.info(f"Online index job {job['job_id']} completed")
+        except SQLAlchemyError as e:
+            job["status"] = "failed"
+            job["error"] = str(e)
+            logger.error(f"Online index job {job['job_id']} failed: {e}")
+        finally:
+            job["finished_at"] = datetime.now(timezone.utc).isoformat()
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get an index job by ID.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            Job or None if not found
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return dict(job) if job else None
+
+
+# Singleton instance
+_index_advisor: IndexAdvisorService | None = None
+
+
+def get_index_advisor_service() -> IndexAdvisorService:
+    """Get index advisor service singleton.
+
+    Returns:
+        IndexAdvisorService instance
+    """
+    global _index_advisor
+    if _index_advisor is None:
+        _index_advisor = IndexAdvisorService()
+    return _index_advisor
@@ -0,0 +1,108 @@
+"""Portal-side per-mailbox restore jobs.
+
+The archive format and extraction live in backup_tools.mail_archive, which
+the backup scripts also run on the host to write indexed archives.
+"""
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from backup_tools.mail_archive import extract_mailbox
+
+logger = logging.getLogger(__name__)
+
+
+class MailboxRestoreService:
+    """Service running per-mailbox restores as background jobs."""
+
+    def __init__(self, max_concurrent_jobs: int = 2):
+        """Initialize mailbox restore service.
+
+        Args:
+            max_concurrent_jobs: Restores running at once
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_jobs, thread_name_prefix="mailbox-restore")
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def start(
+        self,
+        mailbox: str,
+        folder: Optional[str],
+        backup_id: str,
+        backup_dir: str,
+        target: str,
+    ) -> Dict[str, Any]:
+        """Queue restore of a mailbox from a backup.
+
+        Args:
+            mailbox: Email address
+            folder: IMAP folder name (whole mailbox if None)
+            backup_id: Backup ID (path relative to the backup root)
+            backup_dir: Absolute backup directory
+            target: Directory to restore into
+
+        Returns:
+            Queued job
+        """
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "mailbox": mailbox.lower(),
+            "folder": folder,
+            "backup_id": backup_id,
+            "target": target,
+            "status": "queued",
+            "queued_at": datetime.now(timezone.utc).isoformat(),
+            "finished_at": None,
+            "result": None,
+            "error": None,
+        }
+        with self._lock:
+            self._jobs[job["job_id"]] = job
+        self._executor.submit(self._run, job, backup_dir)
+        return self.get_job(job["job_id"])
+
+    def _run(self, job: Dict[str, Any], backup_dir: str) -> None:
+        """Run a restore job (executed on a restore worker thread)."""
+        job["status"] = "running"
+        try:
+            job["result"] = extract_mailbox(backup_dir, job["mailbox"], job["target"], job["folder"])
+            job["status"] = "completed"
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(e)
+            logger.error(f"Mailbox restore {job['job_id']} failed: {e}")
+        finally:
+            job["finished_at"] = datetime.now(timezone.utc).isoformat()
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a restore job by ID.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            Job or None if not found
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+
+# Singleton instance
+_restore_service: MailboxRestoreService | None = None
+
+
+def get_mailbox_restore_service() -> MailboxRestoreService:
+    """Get mailbox restore service singleton.
+
+    Returns:
+        MailboxRestoreService instance
+    """
+    global _restore_service
+    if _restore_service is None:
+        _restore_service = MailboxRestoreService()
+    return _restore_service
@@ -0,0 +1,253 @@
+"""MariaDB server health and buffer-pool efficiency service."""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Literal, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.database import get_target_engine
+
+logger = logging.getLogger(__name__)
+
+# GLOBAL_STATUS and GLOBAL_VARIABLES in a single round trip
+STATUS_AND_VARIABLES_QUERY = text("""
+    SELECT 'status' AS source, VARIABLE_NAME AS name, VARIABLE_VALUE AS value
+    FROM information_schema.GLOBAL_STATUS
+    UNION ALL
+    SELECT 'variable' AS source, VARIABLE_NAME AS name, VARIABLE_VALUE AS value
+    FROM information_schema.GLOBAL_VARIABLES
+""")
+
+# Cumulative counters that are reported as per-second rates between samples
+RATE_COUNTERS = [
+    "QUESTIONS",
+    "ABORTED_CONNECTS",
+    "CREATED_TMP_TABLES",
+    "CREATED_TMP_DISK_TABLES",
+    "INNODB_BUFFER_POOL_READS",
+    "INNODB_BUFFER_POOL_READ_REQUESTS",
+    "TABLE_OPEN_CACHE_MISSES",
+    "OPENED_TABLES",
+    "SLOW_QUERIES",
+]
+
+
+def _to_number(value: Optional[str]) -> Optional[float]:
+    """Convert a status/variable value to a number if possible."""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _ratio(numerator: Optional[float], denominator: Optional[float]) -> Optional[float]:
+    """Safe ratio rounded to 4 decimals (None if undefined)."""
+    if numerator is None or not denominator:
+        return None
+    return round(numerator / denominator, 4)
+
+
+class MariaDBHealthService:
+    """Service for sampling MariaDB health metrics.
+
+    Reads global status and variables in one query, derives efficiency
+    ratios (buffer pool, tmp tables, query cache, table cache) and keeps
+    a bounded history of samples with per-second deltas.
+    """
+
+    def __init__(
+        self,
+        target: Literal["blog", "mailserver"] = "blog",
+        history_size: int = 360,
+        min_interval: float = 5.0,
+    ):
+        """Initialize MariaDB health service.
+
+        Args:
+            target: Target system to sample
+            history_size: Number of samples kept in history
+            min_interval: Minimum seconds between samples (cached otherwise)
+        """
+        self.target = target
+        self.min_interval = min_interval
+        self._history: Deque[Dict[str, Any]] = deque(maxlen=history_size)
+        self._last_counters: Optional[Dict[str, float]] = None
+        self._last_sampled: float = 0.0
+        self._lock = threading.Lock()
+
+    def _read_status_and_variables(self) -> tuple[Dict[str, str], Dict[str, str]]:
+        """Read global status and variables in one query.
+
+        Returns:
+            Tuple of (status, variables) keyed by upper-case name
+        """
+        engine = get_target_engine(self.target)
+        status: Dict[str, str] = {}
+        variables: Dict[str, str] = {}
+
+        with engine.connect() as conn:
+            for row in conn.execute(STATUS_AND_VARIABLES_QUERY):
+                bucket = status if row.source == "status" else variables
+                bucket[row.name.upper()] = row.value
+
+        return status, variables
+
+    def _read_replication_lag(self) -> Optional[int]:
+        """Read replication lag in seconds (None if not a replica)."""
+        engine = get_target_engine(self.target)
+        try:
+            with engine.connect() as conn:
+                row = conn.execute(text("SHOW SLAVE STATUS")).mappings().first()
+        except SQLAlchemyError as e:
+            logger.debug(f"Replication status unavailable: {e}")
+            return None
+
+        if not row:
+            return None
+        lag = row.get("Seconds_Behind_Master")
+        return int(lag) if lag is not None else None
+
+    def _build_sample(
+        self,
+        status: Dict[str, str],
+        variables: Dict[str, str],
+        replication_lag: Optional[int],
+        now: float,
+    ) -> Dict[str, Any]:
+        """Derive health metrics from raw status and variables.
+
+        Args:
+            status: Global status
+            variables: Global variables
+            replication_lag: Replication lag in seconds
+            now: Monotonic timestamp of the sample
+
+        Returns:
+            Health sample
+        """
+        s = {name: _to_number(value) for name, value in status.items()}
+        v = {name: _to_number(value) for name, value in variables.items()}
+
+        read_requests = s.get("INNODB_BUFFER_POOL_READ_REQUESTS")
+        disk_reads = s.get("INNODB_BUFFER_POOL_READS")
+        hit_ratio = None
+        if read_requests:
+            hit_ratio = round(1 - (disk_reads or 0) / read_requests, 4)
+
+        qcache_hits = s.get("QCACHE_HITS") or 0
+        com_select = s.get("COM_SELECT") or 0
+        table_cache_hits = s.get("TABLE_OPEN_CACHE_HITS") or 0
+        table_cache_misses = s.get("TABLE_OPEN_CACHE_MISSES")
+
+        counters = {name: s[name] for name in RATE_COUNTERS if s.get(name) is not None}
+        rates: Dict[str, Optional[float]] = {}
+        interval_hit_ratio = None
+        if self._last_counters is not None and now > self._last_sampled:
+            elapsed = now - self._last_sampled
+            deltas = {
+                name: counters[name] - self._last_counters[name]
+                for name in counters
+                if name in self._last_counters
+            }
+            rates = {f"{name.lower()}_per_sec": round(delta / elapsed, 2) for name, delta in deltas.items()}
+            if deltas.get("INNODB_BUFFER_POOL_READ_REQUESTS"):
+                interval_hit_ratio = round(
+                    1 - deltas.get("INNODB_BUFFER_POOL_READS", 0) / deltas["INNODB_BUFFER_POOL_READ_REQUESTS"], 4
+                )
+        self._last_counters = counters
+
+        return {
+            "sampled_at": datetime.now(timezone.utc).isoformat(),
+            "version": variables.get("VERSION", ""),
+            "uptime": int(s.get("UPTIME") or 0),
+            "innodb_buffer_pool_size_mb": round((v.get("INNODB_BUFFER_POOL_SIZE") or 0) / 1024 / 1024, 1),
+            "innodb_buffer_pool_hit_ratio": hit_ratio,
+            "innodb_buffer_pool_hit_ratio_interval": interval_hit_ratio,
+            "innodb_buffer_pool_usage_ratio": _ratio(
+                s.get("INNODB_BUFFER_POOL_PAGES_DATA"), s.get("INNODB_BUFFER_POOL_PAGES_TOTAL")
+            ),
+            "innodb_buffer_pool_dirty_ratio": _ratio(
+                s.get("INNODB_BUFFER_POOL_PAGES_DIRTY"), s.get("INNODB_BUFFER_POOL_PAGES_TOTAL")
+            ),
+            "threads_running": int(s.get("THREADS_RUNNING") or 0),
+            "threads_connected": int(s.get("THREADS_CONNECTED") or 0),
+            "max_connections": int(v.get("MAX_CONNECTIONS") or 0),
+            "max_used_connections": int(s.get("MAX_USED_CONNECTIONS") or 0),
+            "aborted_connects": int(s.get("ABORTED_CONNECTS") or 0),
+            "tmp_disk_table_ratio": _ratio(s.get("CREATED_TMP_DISK_TABLES"), s.get("CREATED_TMP_TABLES")),
+            "query_cache_enabled": (variables.get("QUERY_CACHE_TYPE", "OFF").upper() not in ("OFF", "0"))
+            and bool(v.get("QUERY_CACHE_SIZE")),
+            "query_cache_hit_ratio": _ratio(qcache_hits, qcache_hits + com_select),
+            "query_cache_lowmem_prunes": int(s.get("QCACHE_LOWMEM_PRUNES") or 0),
+            "table_open_cache": int(v.get("TABLE_OPEN_CACHE") or 0),
+            "table_open_cache_miss_ratio": _ratio(
+                table_cache_misses, table_cache_hits + (table_cache_misses or 0)
+            ),
+            "replication_lag_seconds": replication_lag,
+            "rates": rates,
+        }
+
+    def sample(self, force: bool = False) -> Dict[str, Any]:
+        """Take a health sample (or return the cached one).
+
+        Args:
+            force: Ignore min_interval and always query the server
+
+        Returns:
+            Latest health sample
+
+        Raises:
+            ValueError: If the server cannot be queried
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._history and now - self._last_sampled < self.min_interval:
+                return self._history[-1]
+
+            try:
+                status, variables = self._read_status_and_variables()
+            except SQLAlchemyError as e:
+                logger.error(f"Failed to read MariaDB status for {self.target}: {e}")
+                raise ValueError(f"Failed to read MariaDB status: {e}")
+
+            sample = self._build_sample(status, variables, self._read_replication_lag(), now)
+            self._last_sampled = now
+            self._history.append(sample)
+            return sample
+
+    def history(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get sample history (oldest first).
+
+        Args:
+            limit: Return only the most recent N samples
+
+        Returns:
+            Health samples
+        """
+        with self._lock:
+            samples = list(self._history)
+        return samples[-limit:] if limit else samples
+
+
+# Singleton instance
+_health_service: MariaDBHealthService | None = None
+
+
+def get_mariadb_health_service() -> MariaDBHealthService:
+    """Get MariaDB health service singleton.
+
+    Returns:
+        MariaDBHealthService instance
+    """
+    global _health_service
+    if _health_service is None:
+        _health_service = MariaDBHealthService()
+    return _health_service
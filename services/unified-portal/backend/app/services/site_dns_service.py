@@ -0,0 +1,220 @@
+"""DNS status of managed WordPress site domains.
+
+Domains are resolved through the propagation checker's DNS-over-HTTPS
+resolvers (settings.dns_doh_resolvers, queried concurrently; resolved when
+any answers) and each result is cached for the TTL of the answer, so
+repeated checks within the record's TTL cost nothing. Negative answers are
+cached only briefly so newly created sites are picked up as soon as they
+propagate.
+
+Each domain's Cloudflare record (from the DNS record mirror) is also
+compared with the expected tunnel CNAME, flagging sites whose DNS no longer
+points at the tunnel - e.g. after the tunnel was replaced.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.config import get_settings
+from app.services.cloudflare_api_service import CloudflareAPIError
+from app.services.cloudflare_dns_service import DNSRecordMirror, get_dns_mirror
+from app.services.cloudflare_zone_service import CloudflareZoneCache, get_zone_cache
+from app.services.dns_propagation_service import DNSPropagationChecker
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Bounds for the cache lifetime taken from answer TTLs (seconds)
+MIN_CACHE_TTL = 5
+MAX_CACHE_TTL = 3600
+NEGATIVE_CACHE_TTL = 10
+# Domains resolved at once in a fleet check
+FLEET_CONCURRENCY = 16
+
+
+def expected_tunnel_cname() -> Optional[str]:
+    """CNAME target of the configured Cloudflare Tunnel.
+
+    Returns:
+        <tunnel-id>.cfargotunnel.com, or None if no tunnel is configured
+    """
+    if not settings.cloudflare_tunnel_id:
+        return None
+    return f"{settings.cloudflare_tunnel_id}.cfargotunnel.com"
+
+
+class SiteDNSChecker:
+    """Cached, concurrent DNS checks for site domains."""
+
+    def __init__(
+        self,
+        checker: Optional[DNSPropagationChecker] = None,
+        zone_cache: Optional[CloudflareZoneCache] = None,
+        mirror: Optional[DNSRecordMirror] = None,
+    ):
+        """Initialize site DNS checker.
+
+        Args:
+            checker: DoH checker (defaults to one using settings.dns_doh_resolvers)
+            zone_cache: Zone cache (defaults to the shared cache)
+            mirror: DNS record mirror (defaults to the shared mirror)
+        """
+        self.checker = checker or DNSPropagationChecker()
+        self.zone_cache = zone_cache or get_zone_cache()
+        self.mirror = mirror or get_dns_mirror()
+        self._cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._pending: Dict[str, asyncio.Task] = {}
+
+    async def _resolve(self, domain: str) -> Dict[str, Any]:
+        """Resolve a domain on every resolver at once."""
+        result = await self.checker.check("A", domain)
+
+        ip_addresses: List[str] = []
+        ttls = []
+        for server in result["servers"]:
+            ip_addresses += [ip for ip in server["records"] if ip and ip not in ip_addresses]
+            if server["records"] and server["ttl"] is not None:
+                ttls.append(server["ttl"])
+
+        if ip_addresses:
+            ttl = max(MIN_CACHE_TTL, min([MAX_CACHE_TTL] + ttls))
+        else:
+            ttl = NEGATIVE_CACHE_TTL
+
+        status = {
+            "domain": domain,
+            "resolved": bool(ip_addresses),
+            "ip_addresses": ip_addresses,
+            "checked_at": datetime.now(timezone.utc).isoformat(),
+            "ttl": ttl,
+        }
+        self._cache[domain] = (time.monotonic() + ttl, status)
+        return status
+
+    async def resolve(self, domain: str, refresh: bool = False) -> Dict[str, Any]:
+        """Get a domain's resolution status (cached for the answer TTL).
+
+        Args:
+            domain: Domain to resolve
+            refresh: Ignore the cached result
+
+        Returns:
+            Status dict (domain, resolved, ip_addresses, checked_at, ttl)
+        """
+        domain = domain.lower().rstrip(".")
+        cached = self._cache.get(domain)
+        if cached is not None and not refresh and cached[0] > time.monotonic():
+            return cached[1]
+
+        # Concurrent checks of the same domain share one lookup
+        task = self._pending.get(domain)
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self._resolve(domain))
+            self._pending[domain] = task
+        return await asyncio.shield(task)
+
+    async def tunnel_status(self, domain: str) -> Dict[str, Any]:
+        """Compare a domain's Cloudflare record with the tunnel CNAME.
+
+        Args:
+            domain: Site domain
+
+        Returns:
+            Dict with expected_cname, cname_target, tunnel_match (None when
+            unknown) and issue
+        """
+        expected = expected_tunnel_cname()
+        status: Dict[str, Any] = {
+            "expected_cname": expected,
+            "cname_target": None,
+            "tunnel_match": None,
+            "issue": None,
+        }
+        if expected is None:
+            return status
+
+        try:
+            zone_id = await self.zone_cache.get_zone_id(domain)
+            records = await self.mirror.list_records(zone_id, name=domain)
+        except CloudflareAPIError as e:
+            status["issue"] = f"Cloudflare record not checked: {e}"
+            return status
+
+        cname = next((record for record in records if record["type"] == "CNAME"), None)
+        if cname is not None:
+            status["cname_target"] = cname["content"]
+            status["tunnel_match"] = cname["content"].rstrip(".").lower() == expected.lower()
+            if not status["tunnel_match"]:
+                status["issue"] = f"CNAME points to {cname['content']}, expected {expected}"
+        elif records:
+            status["tunnel_match"] = False
+            status["issue"] = f"{records[0]['type']} record instead of tunnel CNAME"
+        else:
+            status["tunnel_match"] = False
+            status["issue"] = "No DNS record in Cloudflare"
+        return status
+
+    async def check(self, domain: str, refresh: bool = False) -> Dict[str, Any]:
+        """Resolution and tunnel status of one domain.
+
+        Args:
+            domain: Site domain
+            refresh: Ignore cached resolution results
+
+        Returns:
+            Combined status dict
+        """
+        resolution, tunnel = await asyncio.gather(self.resolve(domain, refresh), self.tunnel_status(domain))
+        return {**resolution, **tunnel}
+
+    async def check_many(self, domains: Iterable[str], refresh: bool = False) -> List[Dict[str, Any]]:
+        """Check many domains concurrently.
+
+        Args:
+            domains: Site domains
+            refresh: Ignore cached resolution results (e.g. after a tunnel change)
+
+        Returns:
+            Status dicts in the order of domains
+        """
+        if refresh:
+            # Records may have changed along with the tunnel
+            self.mirror.invalidate()
+        semaphore = asyncio.Semaphore(FLEET_CONCURRENCY)
+
+        async def bounded(domain: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.check(domain, refresh)
+
+        return list(await asyncio.gather(*(bounded(domain) for domain in domains)))
+
+    def invalidate(self, domain: Optional[str] = None) -> None:
+        """Drop cached results for a domain, or for every domain.
+
+        Args:
+            domain: Domain (None for all)
+        """
+        if domain is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(domain.lower().rstrip("."), None)
+
+
+# Singleton instance
+_site_dns_checker: SiteDNSChecker | None = None
+
+
+def get_site_dns_checker() -> SiteDNSChecker:
+    """Get site DNS checker singleton.
+
+    Returns:
+        SiteDNSChecker instance
+    """
+    global _site_dns_checker
+    if _site_dns_checker is None:
+        _site_dns_checker = SiteDNSChecker()
+    return _site_dns_checker
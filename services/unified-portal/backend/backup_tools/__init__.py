@@ -0,0 +1,8 @@
+"""
+Backup Tools Package
+
+Command line tools the backup scripts run on the host
+(python3 -m backup_tools.<tool>). They use only the standard library,
+except s3_upload which needs boto3. The portal imports the same modules for
+its backup views, so both sides read and write one on-disk format.
+"""
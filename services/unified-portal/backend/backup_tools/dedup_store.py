@@ -0,0 +1,493 @@
+"""Content-addressed deduplicating backup store.
+
+Files are streamed through content-defined chunking, each chunk is stored
+once in append-only packfiles and addressed by its BLAKE2b hash. A SQLite
+index maps chunks to pack offsets and snapshots to file chunk lists.
+
+Unchanged files (same path, size and mtime as in the previous snapshot of
+the same source) reuse their chunk list without being read, which matters
+for maildirs where delivered messages never change.
+
+    python3 -m backup_tools.dedup_store snapshot STORE SOURCE [--name NAME]
+    python3 -m backup_tools.dedup_store restore STORE SNAPSHOT_ID TARGET [--prefix PATH]
+    python3 -m backup_tools.dedup_store list STORE
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Content-defined chunking parameters (average ~64 KiB chunks)
+MIN_CHUNK_SIZE = 16 * 1024
+MAX_CHUNK_SIZE = 256 * 1024
+
+# Files are read and chunked in blocks of this size
+READ_BLOCK_SIZE = 4 * 1024 * 1024
+
+# Packfiles are rolled over at this size
+PACK_TARGET_SIZE = 64 * 1024 * 1024
+
+# Chunk flags
+FLAG_RAW = 0
+FLAG_ZLIB = 1
+
+# Boundary test: every byte maps to one pseudo-random bit, and a chunk ends
+# where the bits of the last 16 bytes spell _ANCHOR (2^-16 per position).
+# bytes.translate and bytes.find do the per-byte work in C. _ANCHOR does not
+# overlap itself, so matches are spaced ~64 KiB apart on average.
+_BIT_TABLE = bytes(hashlib.blake2b(bytes([i]), digest_size=1).digest()[0] & 1 for i in range(256))
+_ANCHOR = bytes(int(bit) for bit in "1111111010010100")
+
+
+def _find_cut(bits: bytes, start: int, length: int) -> int:
+    """End offset of the chunk starting at start.
+
+    Args:
+        bits: Boundary bits of the buffered data
+        start: Chunk start offset
+        length: Buffered data length
+
+    Returns:
+        Chunk end offset
+    """
+    end = min(start + MAX_CHUNK_SIZE, length)
+    if end - start <= MIN_CHUNK_SIZE:
+        return end
+    found = bits.find(_ANCHOR, start + MIN_CHUNK_SIZE - len(_ANCHOR) + 1, end)
+    return end if found < 0 else found + len(_ANCHOR)
+
+
+def iter_chunks(stream: BinaryIO, block_size: int = READ_BLOCK_SIZE) -> Iterator[bytes]:
+    """Split a stream into content-defined chunks.
+
+    Boundaries depend only on content (not on block_size), so an insertion
+    early in a file only changes the chunks around it. Only about one block
+    plus one chunk is held in memory, whatever the file size.
+
+    Args:
+        stream: Binary file object
+        block_size: Bytes read at a time
+
+    Yields:
+        Chunks
+    """
+    data = bits = b""
+    start = 0
+    eof = False
+    while True:
+        if not eof and len(data) - start < MAX_CHUNK_SIZE:
+            block = stream.read(block_size)
+            if block:
+                data = data[start:] + block
+                bits = bits[start:] + block.translate(_BIT_TABLE)
+                start = 0
+                continue
+            eof = True
+        if start >= len(data):
+            return
+        cut = _find_cut(bits, start, len(data))
+        yield data[start:cut]
+        start = cut
+
+
+def chunk_id(chunk: bytes) -> str:
+    """Content address of a chunk."""
+    return hashlib.blake2b(chunk, digest_size=32).hexdigest()
+
+
+class DedupStore:
+    """Chunk-level deduplicating store with packfiles and a SQLite index."""
+
+    def __init__(self, root: str):
+        """Open (or create) a store.
+
+        Args:
+            root: Store directory
+        """
+        self.root = root
+        self.packs_dir = os.path.join(root, "packs")
+        os.makedirs(self.packs_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root, "index.sqlite3"), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS chunks (
+                id TEXT PRIMARY KEY,
+                pack TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                raw_size INTEGER NOT NULL,
+                flags INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS snapshots (
+                id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                source TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                file_count INTEGER NOT NULL,
+                total_size INTEGER NOT NULL,
+                new_bytes INTEGER NOT NULL,
+                duration_seconds REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS snapshot_files (
+                snapshot_id TEXT NOT NULL,
+                path TEXT NOT NULL,
+                mode INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL,
+                chunks TEXT NOT NULL,
+                PRIMARY KEY (snapshot_id, path)
+            );
+            CREATE INDEX IF NOT EXISTS idx_snapshots_source ON snapshots(source, created_at);
+            """
+        )
+        self._conn.commit()
+
+        self._pack_id: Optional[str] = None
+        self._pack_file = None
+        self._pending: Dict[str, tuple] = {}
+
+    # ------------------------------------------------------------------ packs
+
+    def _open_pack(self) -> None:
+        """Start a new packfile."""
+        self._pack_id = uuid.uuid4().hex
+        self._pack_file = open(os.path.join(self.packs_dir, f"{self._pack_id}.pack"), "ab")
+
+    def _flush_pack(self) -> None:
+        """fsync the current pack and publish its pending chunks to the index.
+
+        Chunks only become visible in the index after their bytes are durable.
+        """
+        if self._pack_file is None:
+            return
+        self._pack_file.flush()
+        os.fsync(self._pack_file.fileno())
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO chunks (id, pack, offset, length, raw_size, flags) VALUES (?, ?, ?, ?, ?, ?)",
+                [(cid, *entry) for cid, entry in self._pending.items()],
+            )
+            self._conn.commit()
+        self._pending.clear()
+
+    def _close_pack(self) -> None:
+        """Flush and close the current packfile."""
+        if self._pack_file is None:
+            return
+        self._flush_pack()
+        self._pack_file.close()
+        self._pack_file = None
+        self._pack_id = None
+
+    def _has_chunk(self, cid: str) -> bool:
+        """Check whether a chunk is already stored (or pending in this pack)."""
+        if cid in self._pending:
+            return True
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM chunks WHERE id = ?", (cid,)).fetchone() is not None
+
+    def _put_chunk(self, chunk: bytes) -> tuple[str, int]:
+        """Store a chunk if new.
+
+        Returns:
+            Tuple of (chunk id, bytes written to the pack)
+        """
+        cid = chunk_id(chunk)
+        if self._has_chunk(cid):
+            return cid, 0
+
+        if self._pack_file is None:
+            self._open_pack()
+
+        compressed = zlib.compress(chunk, 3)
+        if len(compressed) < len(chunk):
+            payload, flags = compressed, FLAG_ZLIB
+        else:
+            payload, flags = chunk, FLAG_RAW
+
+        offset = self._pack_file.tell()
+        self._pack_file.write(payload)
+        self._pending[cid] = (self._pack_id, offset, len(payload), len(chunk), flags)
+
+        if offset + len(payload) >= PACK_TARGET_SIZE:
+            self._close_pack()
+        return cid, len(payload)
+
+    def _read_chunk(self, cid: str) -> bytes:
+        """Read and decompress a chunk."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM chunks WHERE id = ?", (cid,)).fetchone()
+        if row is None:
+            raise KeyError(f"Chunk not found: {cid}")
+
+        with open(os.path.join(self.packs_dir, f"{row['pack']}.pack"), "rb") as f:
+            f.seek(row["offset"])
+            payload = f.read(row["length"])
+        return zlib.decompress(payload) if row["flags"] == FLAG_ZLIB else payload
+
+    # -------------------------------------------------------------- snapshots
+
+    def _previous_files(self, source: str) -> Dict[str, sqlite3.Row]:
+        """Files of the latest snapshot of the same source, keyed by path."""
+        with self._lock:
+            previous = self._conn.execute(
+                "SELECT id FROM snapshots WHERE source = ? ORDER BY created_at DESC LIMIT 1", (source,)
+            ).fetchone()
+            if previous is None:
+                return {}
+            rows = self._conn.execute(
+                "SELECT path, mtime, size, chunks FROM snapshot_files WHERE snapshot_id = ?", (previous["id"],)
+            ).fetchall()
+        return {row["path"]: row for row in rows}
+
+    def snapshot(
+        self,
+        source: str,
+        name: Optional[str] = None,
+        progress: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Snapshot a directory tree into the store.
+
+        Args:
+            source: Directory to snapshot
+            name: Snapshot name (defaults to the current date)
+            progress: Optional dict updated with files_done / bytes_done
+
+        Returns:
+            Snapshot summary
+        """
+        started = time.monotonic()
+        source = os.path.realpath(source)
+        previous = self._previous_files(source)
+        snapshot_id = uuid.uuid4().hex
+        name = name or datetime.now().strftime("%Y-%m-%d")
+
+        file_rows = []
+        total_size = 0
+        new_bytes = 0
+        reused = 0
+
+        for dirpath, dirnames, filenames in os.walk(source):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                path = os.path.join(dirpath, filename)
+                relpath = os.path.relpath(path, source)
+                try:
+                    st = os.lstat(path)
+                except OSError:
+                    continue
+                if not os.path.isfile(path) or os.path.islink(path):
+                    continue
+
+                prev = previous.get(relpath)
+                if prev is not None and prev["size"] == st.st_size and prev["mtime"] == st.st_mtime:
+                    # Unchanged file - reuse chunk list without reading it
+                    chunks = prev["chunks"]
+                    reused += 1
+                else:
+                    ids = []
+                    try:
+                        with open(path, "rb") as f:
+                            for chunk in iter_chunks(f):
+                                cid, written = self._put_chunk(chunk)
+                                ids.append(cid)
+                                new_bytes += written
+                    except OSError as e:
+                        logger.warning(f"Skipping unreadable file {path}: {e}")
+                        continue
+                    chunks = json.dumps(ids)
+
+                file_rows.append((snapshot_id, relpath, st.st_mode & 0o7777, st.st_mtime, st.st_size, chunks))
+                total_size += st.st_size
+                if progress is not None:
+                    progress["files_done"] = len(file_rows)
+                    progress["bytes_done"] = total_size
+
+        self._close_pack()
+
+        duration = round(time.monotonic() - started, 2)
+        summary = {
+            "id": snapshot_id,
+            "name": name,
+            "source": source,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "file_count": len(file_rows),
+            "total_size": total_size,
+            "new_bytes": new_bytes,
+            "duration_seconds": duration,
+        }
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO snapshot_files (snapshot_id, path, mode, mtime, size, chunks) VALUES (?, ?, ?, ?, ?, ?)",
+                file_rows,
+            )
+            self._conn.execute(
+                "INSERT INTO snapshots (id, name, source, created_at, file_count, total_size, new_bytes, duration_seconds) "
+                "VALUES (:id, :name, :source, :created_at, :file_count, :total_size, :new_bytes, :duration_seconds)",
+                summary,
+            )
+            self._conn.commit()
+
+        logger.info(
+            f"Snapshot {snapshot_id} of {source}: {len(file_rows)} files ({reused} unchanged), "
+            f"{total_size} bytes, {new_bytes} new bytes stored in {duration}s"
+        )
+        return summary
+
+    def list_snapshots(self, source: Optional[str] = None) -> List[Dict[str, Any]]:
+        """List snapshots, newest first.
+
+        Args:
+            source: Only snapshots of this source directory
+
+        Returns:
+            Snapshot summaries
+        """
+        query = "SELECT * FROM snapshots"
+        params: tuple = ()
+        if source:
+            query += " WHERE source = ?"
+            params = (os.path.realpath(source),)
+        query += " ORDER BY created_at DESC"
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(query, params)]
+
+    def restore(
+        self,
+        snapshot_id: str,
+        target: str,
+        prefix: Optional[str] = None,
+        max_workers: int = 4,
+    ) -> Dict[str, Any]:
+        """Restore a snapshot (or a subtree of it) into a target directory.
+
+        Args:
+            snapshot_id: Snapshot ID
+            target: Directory to restore into
+            prefix: Only restore files under this relative path (e.g. a maildir)
+            max_workers: Files restored in parallel
+
+        Returns:
+            Restore summary
+
+        Raises:
+            KeyError: If the snapshot does not exist
+        """
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM snapshots WHERE id = ?", (snapshot_id,)).fetchone() is None:
+                raise KeyError(f"Snapshot not found: {snapshot_id}")
+            query = "SELECT * FROM snapshot_files WHERE snapshot_id = ?"
+            params: tuple = (snapshot_id,)
+            if prefix:
+                prefix = prefix.strip("/")
+                query += " AND (path = ? OR path LIKE ? ESCAPE '\\')"
+                escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                params += (prefix, f"{escaped}/%")
+            files = [dict(row) for row in self._conn.execute(query, params)]
+
+        target = os.path.realpath(target)
+
+        def restore_file(entry: Dict[str, Any]) -> int:
+            dest = os.path.realpath(os.path.join(target, entry["path"]))
+            if os.path.commonpath([target, dest]) != target:
+                raise ValueError(f"Refusing to restore outside target: {entry['path']}")
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            with open(dest, "wb") as f:
+                for cid in json.loads(entry["chunks"]):
+                    f.write(self._read_chunk(cid))
+            os.chmod(dest, entry["mode"])
+            os.utime(dest, (entry["mtime"], entry["mtime"]))
+            return entry["size"]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            restored_bytes = sum(executor.map(restore_file, files))
+
+        logger.info(f"Restored {len(files)} files ({restored_bytes} bytes) from {snapshot_id} to {target}")
+        return {
+            "snapshot_id": snapshot_id,
+            "target": target,
+            "prefix": prefix,
+            "file_count": len(files),
+            "restored_bytes": restored_bytes,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Get store statistics (logical vs stored bytes)."""
+        with self._lock:
+            chunks = self._conn.execute(
+                "SELECT COUNT(*) AS count, COALESCE(SUM(length), 0) AS stored, COALESCE(SUM(raw_size), 0) AS raw FROM chunks"
+            ).fetchone()
+            snapshots = self._conn.execute(
+                "SELECT COUNT(*) AS count, COALESCE(SUM(total_size), 0) AS logical FROM snapshots"
+            ).fetchone()
+        return {
+            "snapshot_count": snapshots["count"],
+            "chunk_count": chunks["count"],
+            "logical_bytes": snapshots["logical"],
+            "unique_bytes": chunks["raw"],
+            "stored_bytes": chunks["stored"],
+            "dedup_ratio": round(snapshots["logical"] / chunks["stored"], 2) if chunks["stored"] else None,
+        }
+
+
+def main(argv: List[str]) -> int:
+    """CLI entry point for backup scripts.
+
+    Args:
+        argv: Command line arguments
+
+    Returns:
+        Exit code
+    """
+    parser = argparse.ArgumentParser(description="Deduplicating backup store")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    snap = sub.add_parser("snapshot", help="Snapshot a directory")
+    snap.add_argument("store")
+    snap.add_argument("source")
+    snap.add_argument("--name")
+
+    rest = sub.add_parser("restore", help="Restore a snapshot")
+    rest.add_argument("store")
+    rest.add_argument("snapshot_id")
+    rest.add_argument("target")
+    rest.add_argument("--prefix")
+
+    lst = sub.add_parser("list", help="List snapshots")
+    lst.add_argument("store")
+
+    args = parser.parse_args(argv)
+    store = DedupStore(args.store)
+
+    if args.command == "snapshot":
+        result: Any = store.snapshot(args.source, name=args.name)
+    elif args.command == "restore":
+        result = store.restore(args.snapshot_id, args.target, prefix=args.prefix)
+    else:
+        result = {"stats": store.stats(), "snapshots": store.list_snapshots()}
+
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main(sys.argv[1:]))
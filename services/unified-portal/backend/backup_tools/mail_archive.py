@@ -0,0 +1,292 @@
+"""Indexed mail archives and per-mailbox selective restore.
+
+An indexed mail archive (mail.tar.zst) is a concatenation of independent
+zstd frames, one per mailbox, each holding a tar of that mailbox. The member
+index (mail.index.json) records each frame's offset and length, so one
+mailbox - or one maildir folder of it - is restored by seeking straight to
+its frame instead of decompressing the whole archive.
+
+The archive stays a valid .tar.zst for full restores:
+
+    zstd -dc --long=27 mail.tar.zst | tar -xif - -C /restore
+
+(-i skips the end-of-archive blocks between the per-mailbox tars.)
+
+    python3 -m backup_tools.mail_archive write MAIL_DIR BACKUP_DIR
+    python3 -m backup_tools.mail_archive extract BACKUP_DIR MAILBOX TARGET [--folder NAME]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_NAME = "mail.tar.zst"
+INDEX_NAME = "mail.index.json"
+ZSTD_WINDOW_LOG = 27
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def folder_members(mailbox_path: str, folder: Optional[str]) -> List[str]:
+    """Map an IMAP folder name to maildir paths inside a mailbox.
+
+    Dovecot Maildir++ layout: INBOX is cur/new/tmp at the mailbox root,
+    other folders are dot-prefixed directories with "." as hierarchy
+    separator (Archive/2024 → .Archive.2024).
+
+    Args:
+        mailbox_path: Mailbox path relative to the archive root (domain/user)
+        folder: IMAP folder name, or None for the whole mailbox
+
+    Returns:
+        Paths relative to the archive root
+    """
+    if not folder:
+        return [mailbox_path]
+    if folder.upper() == "INBOX":
+        return [f"{mailbox_path}/{sub}" for sub in ("cur", "new", "tmp")]
+    name = folder.strip("/").replace("/", ".")
+    if ".." in name or name.startswith("."):
+        raise ValueError(f"Invalid folder name: {folder}")
+    return [f"{mailbox_path}/.{name}"]
+
+
+def write_archive(mail_dir: str, backup_dir: str, level: int = 3) -> Dict[str, Any]:
+    """Write an indexed mail archive (one zstd frame per mailbox).
+
+    Args:
+        mail_dir: Maildir root (<domain>/<user>/...)
+        backup_dir: Backup directory receiving mail.tar.zst and mail.index.json
+        level: zstd level
+
+    Returns:
+        Member index
+    """
+    archive_path = os.path.join(backup_dir, ARCHIVE_NAME)
+    members: Dict[str, Dict[str, Any]] = {}
+    compress_cmd = ["zstd", "-q", "-T0", f"-{level}", f"--long={ZSTD_WINDOW_LOG}"]
+
+    with open(archive_path, "wb") as out:
+        for domain in sorted(os.listdir(mail_dir)):
+            domain_dir = os.path.join(mail_dir, domain)
+            if not os.path.isdir(domain_dir):
+                continue
+            for user in sorted(os.listdir(domain_dir)):
+                if not os.path.isdir(os.path.join(domain_dir, user)):
+                    continue
+                path = f"{domain}/{user}"
+                offset = out.tell()
+                tar = subprocess.Popen(["tar", "-cf", "-", "-C", mail_dir, path], stdout=subprocess.PIPE)
+                compress = subprocess.run(compress_cmd, stdin=tar.stdout, stdout=out)
+                tar.stdout.close()
+                # tar exit code 1 = files changed while reading (acceptable on live systems)
+                if tar.wait() > 1 or compress.returncode != 0:
+                    raise RuntimeError(f"Failed to archive mailbox {path}")
+                out.flush()
+                members[f"{user}@{domain}".lower()] = {
+                    "path": path,
+                    "offset": offset,
+                    "length": out.tell() - offset,
+                }
+
+    index = {
+        "version": 1,
+        "format": "tar+zstd-frames",
+        "archive": ARCHIVE_NAME,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "members": members,
+    }
+    tmp_path = os.path.join(backup_dir, f".{INDEX_NAME}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, os.path.join(backup_dir, INDEX_NAME))
+
+    logger.info(f"Wrote indexed mail archive {archive_path}: {len(members)} mailboxes")
+    return index
+
+
+def load_index(backup_dir: str) -> Optional[Dict[str, Any]]:
+    """Load the member index of a backup, None if it has no indexed archive."""
+    index_path = os.path.join(backup_dir, INDEX_NAME)
+    if not os.path.exists(index_path):
+        return None
+    with open(index_path) as f:
+        return json.load(f)
+
+
+def extract_mailbox(
+    backup_dir: str,
+    mailbox: str,
+    target: str,
+    folder: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Restore one mailbox (or one folder of it) from a backup directory.
+
+    Uses the indexed archive when present (seek to the mailbox frame),
+    otherwise copies the subtree of an rsync'd mail/ directory.
+
+    Args:
+        backup_dir: Backup directory
+        mailbox: Email address (user@domain)
+        target: Directory to restore into (receives <domain>/<user>/...)
+        folder: IMAP folder name (INBOX, Sent, Archive/2024); whole mailbox if omitted
+
+    Returns:
+        Restore summary
+
+    Raises:
+        KeyError: If the mailbox or folder is not in the backup
+    """
+    user, _, domain = mailbox.lower().partition("@")
+    if not user or not domain or "/" in mailbox:
+        raise ValueError(f"Invalid mailbox: {mailbox}")
+    os.makedirs(target, exist_ok=True)
+
+    index = load_index(backup_dir)
+    if index is not None:
+        member = index["members"].get(mailbox.lower())
+        if member is None:
+            raise KeyError(f"Mailbox not in backup: {mailbox}")
+        paths = folder_members(member["path"], folder)
+        read_bytes = _extract_frame(os.path.join(backup_dir, index["archive"]), member, paths, target)
+        source = "archive"
+    else:
+        mail_dir = os.path.join(backup_dir, "mail")
+        mailbox_path = f"{domain}/{user}"
+        if not os.path.isdir(os.path.join(mail_dir, mailbox_path)):
+            raise KeyError(f"Mailbox not in backup: {mailbox}")
+        paths = [p for p in folder_members(mailbox_path, folder) if os.path.isdir(os.path.join(mail_dir, p))]
+        if not paths:
+            raise KeyError(f"Folder not in backup: {folder}")
+        read_bytes = 0
+        for relpath in paths:
+            src = os.path.join(mail_dir, relpath)
+            shutil.copytree(src, os.path.join(target, relpath), dirs_exist_ok=True)
+            read_bytes += sum(
+                os.path.getsize(os.path.join(dirpath, name))
+                for dirpath, _, names in os.walk(src) for name in names
+            )
+        source = "directory"
+
+    logger.info(f"Restored {mailbox} ({folder or 'all folders'}) from {backup_dir} to {target}")
+    return {
+        "mailbox": mailbox.lower(),
+        "folder": folder,
+        "backup_dir": backup_dir,
+        "target": target,
+        "source": source,
+        "read_bytes": read_bytes,
+    }
+
+
+def _extract_frame(archive_path: str, member: Dict[str, Any], paths: List[str], target: str) -> int:
+    """Decompress one mailbox frame and extract the given paths from it.
+
+    The frame is streamed through zstd and read with tarfile in stream mode,
+    so only members under the requested paths are written.
+
+    Returns:
+        Compressed bytes read from the archive
+    """
+    decompress = subprocess.Popen(
+        ["zstd", "-q", "-dc", f"--long={ZSTD_WINDOW_LOG}"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    )
+
+    def feed() -> None:
+        remaining = member["length"]
+        try:
+            with open(archive_path, "rb") as f:
+                f.seek(member["offset"])
+                while remaining > 0:
+                    chunk = f.read(min(COPY_CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    decompress.stdin.write(chunk)
+                    remaining -= len(chunk)
+        except BrokenPipeError:
+            pass
+        finally:
+            decompress.stdin.close()
+
+    feeder = threading.Thread(target=feed)
+    feeder.start()
+
+    matched = 0
+
+    def wanted(tar: tarfile.TarFile):
+        nonlocal matched
+        for info in tar:
+            name = info.name[2:] if info.name.startswith("./") else info.name
+            if name.startswith("/") or ".." in name.split("/"):
+                continue
+            if any(name == path or name.startswith(f"{path}/") for path in paths):
+                matched += 1
+                yield info
+
+    extract_kwargs = {"filter": "data"} if hasattr(tarfile, "data_filter") else {}
+    try:
+        with tarfile.open(fileobj=decompress.stdout, mode="r|") as tar:
+            tar.extractall(target, members=wanted(tar), **extract_kwargs)
+    finally:
+        feeder.join()
+        decompress.stdout.close()
+    if decompress.wait() != 0:
+        raise RuntimeError("zstd failed to decompress mailbox frame")
+    if not matched:
+        raise KeyError(f"Folder not in backup: {', '.join(paths)}")
+    return member["length"]
+
+
+def main(argv: List[str]) -> int:
+    """CLI entry point for backup scripts.
+
+    Args:
+        argv: Command line arguments
+
+    Returns:
+        Exit code
+    """
+    parser = argparse.ArgumentParser(description="Indexed mail archives")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    write = sub.add_parser("write", help="Write mail.tar.zst and mail.index.json")
+    write.add_argument("mail_dir")
+    write.add_argument("backup_dir")
+    write.add_argument("--level", type=int, default=3)
+
+    extract = sub.add_parser("extract", help="Restore one mailbox")
+    extract.add_argument("backup_dir")
+    extract.add_argument("mailbox")
+    extract.add_argument("target")
+    extract.add_argument("--folder")
+
+    args = parser.parse_args(argv)
+    if args.command == "write":
+        index = write_archive(args.mail_dir, args.backup_dir, level=args.level)
+        print(f"Indexed mail archive written: {len(index['members'])} mailboxes")
+        return 0
+
+    try:
+        result = extract_mailbox(args.backup_dir, args.mailbox, args.target, args.folder)
+    except KeyError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,225 @@
+"""Backup manifest writer and parallel verifier.
+
+Manifests record size and BLAKE2b hash of every file in a backup directory.
+
+    python3 -m backup_tools.manifest write /mnt/backup-hdd/.../2025-11-10
+    python3 -m backup_tools.manifest verify /mnt/backup-hdd/.../2025-11-10
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+# Legacy checksum file written by backup-mailserver.sh verify_backup()
+SHA256_CHECKSUMS_NAME = "checksums.sha256"
+SKIP_FILES = {MANIFEST_NAME, f".{MANIFEST_NAME}.tmp", SHA256_CHECKSUMS_NAME, "backup.log", "catalog.json"}
+
+# Hash in 8 MiB slices of the mapped file; hashlib releases the GIL for
+# large buffers, so worker threads hash on separate cores.
+HASH_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def hash_file(path: str, algorithm: str = "blake2b") -> str:
+    """Hash a file with chunked mmap reads.
+
+    Args:
+        path: File path
+        algorithm: hashlib algorithm name (blake2b or sha256)
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            # Empty files cannot be mapped
+            return digest.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                for offset in range(0, size, HASH_CHUNK_SIZE):
+                    digest.update(view[offset:offset + HASH_CHUNK_SIZE])
+            finally:
+                view.release()
+    return digest.hexdigest()
+
+
+def _list_files(backup_dir: str) -> List[str]:
+    """List backup files relative to the backup directory (manifest files excluded)."""
+    files = []
+    for dirpath, _, filenames in os.walk(backup_dir):
+        for filename in filenames:
+            relpath = os.path.relpath(os.path.join(dirpath, filename), backup_dir)
+            if relpath not in SKIP_FILES:
+                files.append(relpath)
+    return sorted(files)
+
+
+def _default_workers() -> int:
+    """Default parallelism: one worker per core."""
+    return os.cpu_count() or 2
+
+
+def write_manifest(backup_dir: str, max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """Write a BLAKE2b manifest for a backup directory.
+
+    Args:
+        backup_dir: Backup directory
+        max_workers: Hashing threads (defaults to CPU count)
+
+    Returns:
+        Manifest content
+    """
+    files = _list_files(backup_dir)
+
+    def describe(relpath: str) -> Tuple[str, Dict[str, Any]]:
+        path = os.path.join(backup_dir, relpath)
+        return relpath, {"size": os.path.getsize(path), "blake2b": hash_file(path)}
+
+    with ThreadPoolExecutor(max_workers=max_workers or _default_workers()) as executor:
+        entries = dict(executor.map(describe, files))
+
+    manifest = {
+        "version": 1,
+        "algorithm": "blake2b",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "total_size": sum(entry["size"] for entry in entries.values()),
+        "file_count": len(entries),
+        "files": entries,
+    }
+
+    tmp_path = os.path.join(backup_dir, f".{MANIFEST_NAME}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, os.path.join(backup_dir, MANIFEST_NAME))
+
+    logger.info(f"Wrote manifest for {backup_dir}: {len(entries)} files")
+    return manifest
+
+
+def _load_expected(backup_dir: str) -> Tuple[str, Dict[str, Dict[str, Any]]]:
+    """Load expected hashes from manifest.json, falling back to checksums.sha256.
+
+    Returns:
+        Tuple of (algorithm, {relpath: {"size": int|None, "hash": str}})
+
+    Raises:
+        FileNotFoundError: If neither file exists
+    """
+    manifest_path = os.path.join(backup_dir, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        algorithm = manifest.get("algorithm", "blake2b")
+        return algorithm, {
+            relpath: {"size": entry.get("size"), "hash": entry[algorithm]}
+            for relpath, entry in manifest["files"].items()
+        }
+
+    checksums_path = os.path.join(backup_dir, SHA256_CHECKSUMS_NAME)
+    if os.path.exists(checksums_path):
+        expected = {}
+        with open(checksums_path) as f:
+            for line in f:
+                line = line.rstrip("\n")
+                if not line:
+                    continue
+                digest, relpath = line.split(None, 1)
+                expected[relpath.lstrip("*")] = {"size": None, "hash": digest}
+        return "sha256", expected
+
+    raise FileNotFoundError(f"No {MANIFEST_NAME} or {SHA256_CHECKSUMS_NAME} in {backup_dir}")
+
+
+def verify_backup(
+    backup_dir: str,
+    max_workers: Optional[int] = None,
+    progress: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Verify a backup directory against its manifest in parallel.
+
+    Sizes are checked first (cheap), then content hashes across all cores.
+
+    Args:
+        backup_dir: Backup directory
+        max_workers: Hashing threads (defaults to CPU count)
+        progress: Optional dict updated with files_done / bytes_done
+
+    Returns:
+        Verification result
+    """
+    algorithm, expected = _load_expected(backup_dir)
+    actual_files = set(_list_files(backup_dir))
+
+    missing = sorted(relpath for relpath in expected if relpath not in actual_files)
+    unexpected = sorted(actual_files - set(expected))
+    to_check = [relpath for relpath in expected if relpath in actual_files]
+
+    if progress is not None:
+        progress.update(files_total=len(to_check), files_done=0, bytes_done=0)
+    lock = threading.Lock()
+
+    def check(relpath: str) -> Optional[str]:
+        path = os.path.join(backup_dir, relpath)
+        size = os.path.getsize(path)
+        entry = expected[relpath]
+        ok = (entry["size"] is None or entry["size"] == size) and hash_file(path, algorithm) == entry["hash"]
+        if progress is not None:
+            with lock:
+                progress["files_done"] += 1
+                progress["bytes_done"] += size
+        return None if ok else relpath
+
+    with ThreadPoolExecutor(max_workers=max_workers or _default_workers()) as executor:
+        corrupted = sorted(relpath for relpath in executor.map(check, to_check) if relpath)
+
+    return {
+        "backup_dir": backup_dir,
+        "algorithm": algorithm,
+        "valid": not missing and not corrupted,
+        "files_checked": len(to_check),
+        "missing": missing,
+        "corrupted": corrupted,
+        "unexpected": unexpected,
+    }
+
+
+def main(argv: List[str]) -> int:
+    """CLI entry point for backup scripts.
+
+    Args:
+        argv: Command line arguments (write|verify BACKUP_DIR)
+
+    Returns:
+        Exit code
+    """
+    if len(argv) != 2 or argv[0] not in ("write", "verify"):
+        print("Usage: python3 -m backup_tools.manifest write|verify BACKUP_DIR", file=sys.stderr)
+        return 2
+
+    command, backup_dir = argv
+    if command == "write":
+        manifest = write_manifest(backup_dir)
+        print(f"Manifest written: {manifest['file_count']} files, {manifest['total_size']} bytes")
+        return 0
+
+    result = verify_backup(backup_dir)
+    print(json.dumps(result, indent=2))
+    return 0 if result["valid"] else 1
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,341 @@
+"""Backup retention engine: generation rules plus a disk-usage ceiling.
+
+Backups live in <root>/<scope>/{daily,weekly,monthly}/<date>. Each tier
+keeps its newest N generations; when the disk would still be above the
+usage ceiling afterwards, further backups are pruned oldest-first, daily
+before weekly before monthly, until the projected usage fits (the newest
+min_keep generations of every tier are never touched).
+
+Sizes come from the portal's backup size index (backup_sizes table), then
+from manifest.json, so planning does not rescan backup trees; only backups
+unknown to both are walked.
+
+The portal mounts /mnt/backup-hdd read-only, so it only plans; the backup
+scripts apply on the host:
+
+    python3 -m backup_tools.retention plan --root /mnt/backup-hdd
+    python3 -m backup_tools.retention apply --root /mnt/backup-hdd --scope mailserver --max-usage 75
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import sys
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TIERS = ("daily", "weekly", "monthly")
+DEFAULT_SCOPES = ("mailserver", "rental/mail", "rental/blog")
+MANIFEST_NAME = "manifest.json"
+
+
+def backup_date(name: str) -> Optional[str]:
+    """ISO date of a backup directory name (YYYY-MM-DD or YYYY-week-WW)."""
+    try:
+        return datetime.strptime(name, "%Y-%m-%d").date().isoformat()
+    except ValueError:
+        pass
+    match = re.match(r"^(\d{4})-week-(\d{2})$", name)
+    if match:
+        # Sunday-based week number (date +%U) → Sunday starting that week
+        week_start = datetime.strptime(f"{match.group(1)}-{match.group(2)}-0", "%Y-%U-%w")
+        return week_start.date().isoformat()
+    return None
+
+
+def _walk_size(path: str) -> int:
+    """Total size of a directory tree (last resort when no size is recorded)."""
+    total = 0
+    stack = [path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return total
+
+
+class BackupSizes:
+    """Backup directory sizes without rescanning.
+
+    Looks a directory up in the size index first, then in its manifest,
+    and walks it only when neither knows it.
+    """
+
+    def __init__(self, index_path: Optional[str] = None, index_root: Optional[str] = None):
+        """Initialize size lookup.
+
+        Args:
+            index_path: Size index SQLite file (read-only; skipped if missing)
+            index_root: Backup root as recorded in the index, when the index
+                was built under another mount path (e.g. inside the portal container)
+        """
+        self._conn: Optional[sqlite3.Connection] = None
+        self._index_root = index_root
+        if index_path and os.path.exists(index_path):
+            try:
+                self._conn = sqlite3.connect(f"file:{index_path}?mode=ro", uri=True, check_same_thread=False)
+            except sqlite3.Error as e:
+                logger.warning(f"Cannot open size index {index_path}: {e}")
+
+    def _indexed(self, path: str, root: str) -> Optional[int]:
+        """Size recorded in the size index."""
+        if self._conn is None:
+            return None
+        key = path
+        if self._index_root:
+            key = os.path.join(self._index_root, os.path.relpath(path, root))
+        try:
+            row = self._conn.execute("SELECT size_bytes FROM backup_sizes WHERE path = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            return None
+        return row[0] if row else None
+
+    def size(self, path: str, root: str) -> Tuple[int, str]:
+        """Get size of a backup directory.
+
+        Args:
+            path: Backup directory
+            root: Backup root the directory lives under
+
+        Returns:
+            Tuple of (size in bytes, source: index, manifest or scan)
+        """
+        indexed = self._indexed(path, root)
+        if indexed is not None:
+            return indexed, "index"
+        try:
+            with open(os.path.join(path, MANIFEST_NAME)) as f:
+                return int(json.load(f)["total_size"]), "manifest"
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return _walk_size(path), "scan"
+
+
+class RetentionPolicy:
+    """Generation counts per tier and the disk-usage ceiling."""
+
+    def __init__(
+        self,
+        keep: Optional[Dict[str, int]] = None,
+        max_usage_percent: Optional[float] = 75.0,
+        min_keep: int = 1,
+    ):
+        """Initialize retention policy.
+
+        Args:
+            keep: Generations kept per tier (daily/weekly/monthly)
+            max_usage_percent: Disk-usage ceiling (None disables space pruning)
+            min_keep: Newest generations per tier that space pruning never removes
+        """
+        self.keep = {"daily": 30, "weekly": 12, "monthly": 12, **(keep or {})}
+        self.max_usage_percent = max_usage_percent
+        self.min_keep = max(1, min_keep)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Policy as a plain dict."""
+        return {"keep": dict(self.keep), "max_usage_percent": self.max_usage_percent, "min_keep": self.min_keep}
+
+
+def discover_backups(root: str, scopes: Iterable[str]) -> List[Dict[str, Any]]:
+    """List backup directories under the given scopes.
+
+    Args:
+        root: Backup root
+        scopes: Scopes relative to the root
+
+    Returns:
+        Dicts with scope, tier, name, date and path
+    """
+    found = []
+    for scope in scopes:
+        for tier in TIERS:
+            tier_dir = os.path.join(root, scope, tier)
+            try:
+                entries = list(os.scandir(tier_dir))
+            except OSError:
+                continue
+            for entry in entries:
+                date = backup_date(entry.name)
+                if date and entry.is_dir(follow_symlinks=False):
+                    found.append({"scope": scope, "tier": tier, "name": entry.name, "date": date, "path": entry.path})
+    return found
+
+
+def plan_retention(
+    root: str,
+    policy: RetentionPolicy,
+    scopes: Iterable[str] = DEFAULT_SCOPES,
+    sizes: Optional[BackupSizes] = None,
+    disk_usage: Optional[Callable[[str], Any]] = None,
+) -> Dict[str, Any]:
+    """Decide which backups to prune.
+
+    Args:
+        root: Backup root (the backup disk's mount point)
+        policy: Retention policy
+        scopes: Scopes relative to the root
+        sizes: Size lookup (manifest/scan only if omitted)
+        disk_usage: Function returning (total, used, free) for a path (shutil.disk_usage)
+
+    Returns:
+        Plan with disk usage, backups to prune (with reason) and backups kept
+    """
+    sizes = sizes or BackupSizes()
+    disk_usage = disk_usage or shutil.disk_usage
+
+    groups: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for backup in discover_backups(root, scopes):
+        groups.setdefault((backup["scope"], backup["tier"]), []).append(backup)
+
+    prune: List[Dict[str, Any]] = []
+    spare: List[Dict[str, Any]] = []  # Kept by generation rules, prunable for space
+    keep: List[Dict[str, Any]] = []
+    for (_, tier), backups in groups.items():
+        backups.sort(key=lambda b: (b["date"], b["name"]), reverse=True)
+        generations = policy.keep.get(tier, 0)
+        for position, backup in enumerate(backups):
+            if position >= max(generations, policy.min_keep):
+                prune.append({**backup, "reason": "generations"})
+            elif position >= policy.min_keep:
+                spare.append(backup)
+            else:
+                keep.append(backup)
+
+    for entry in prune:
+        entry["size_bytes"], entry["size_source"] = sizes.size(entry["path"], root)
+    reclaim = sum(entry["size_bytes"] for entry in prune)
+
+    usage = disk_usage(root)
+    total, used = usage[0], usage[1]
+    ceiling = None
+    if policy.max_usage_percent is not None:
+        ceiling = int(total * policy.max_usage_percent / 100)
+        # Cheapest tier first, oldest first within a tier
+        spare.sort(key=lambda b: (TIERS.index(b["tier"]), b["date"]))
+        while spare and used - reclaim > ceiling:
+            backup = spare.pop(0)
+            size_bytes, source = sizes.size(backup["path"], root)
+            prune.append({**backup, "reason": "space", "size_bytes": size_bytes, "size_source": source})
+            reclaim += size_bytes
+    keep.extend(spare)
+
+    projected = used - reclaim
+    return {
+        "root": root,
+        "policy": policy.to_dict(),
+        "disk": {
+            "total_bytes": total,
+            "used_bytes": used,
+            "usage_percent": round(used / total * 100, 1) if total else None,
+            "ceiling_bytes": ceiling,
+            "projected_used_bytes": projected,
+            "projected_percent": round(projected / total * 100, 1) if total else None,
+        },
+        "ceiling_reached": ceiling is None or projected <= ceiling,
+        "reclaim_bytes": reclaim,
+        "prune": sorted(prune, key=lambda b: (b["scope"], b["tier"], b["date"])),
+        "keep": sorted(keep, key=lambda b: (b["scope"], b["tier"], b["date"])),
+    }
+
+
+def apply_plan(
+    plan: Dict[str, Any],
+    progress: Optional[Callable[[Dict[str, Any], int], None]] = None,
+) -> Dict[str, Any]:
+    """Delete the backups a plan prunes.
+
+    Only directories that are still inside the plan's root are removed, so a
+    stale or edited plan cannot delete anything else.
+
+    Args:
+        plan: Plan from plan_retention
+        progress: Callback(entry, done) after each deletion
+
+    Returns:
+        Dict with deleted count, freed bytes and errors
+    """
+    root = os.path.realpath(plan["root"])
+    deleted = 0
+    freed = 0
+    errors: List[str] = []
+    for done, entry in enumerate(plan["prune"], start=1):
+        path = entry["path"]
+        real = os.path.realpath(path)
+        if os.path.islink(path) or os.path.commonpath([root, real]) != root or real == root:
+            errors.append(f"{path}: outside backup root, skipped")
+            continue
+        if not os.path.isdir(real):
+            continue
+        try:
+            shutil.rmtree(real)
+        except OSError as e:
+            errors.append(f"{path}: {e}")
+            logger.error(f"Failed to prune {path}: {e}")
+            continue
+        deleted += 1
+        freed += entry["size_bytes"]
+        logger.info(f"Pruned {path} ({entry['reason']}, {entry['size_bytes']} bytes)")
+        if progress is not None:
+            progress(entry, done)
+    return {"deleted": deleted, "freed_bytes": freed, "errors": errors}
+
+
+def main(argv: List[str]) -> int:
+    """CLI entry point for backup scripts.
+
+    Args:
+        argv: Command line arguments (plan|apply with policy options)
+
+    Returns:
+        Exit code (1 if apply had errors or could not reach the ceiling)
+    """
+    parser = argparse.ArgumentParser(prog="python3 -m backup_tools.retention")
+    parser.add_argument("command", choices=("plan", "apply"))
+    parser.add_argument("--root", default="/mnt/backup-hdd")
+    parser.add_argument("--scope", action="append", dest="scopes")
+    parser.add_argument("--keep-daily", type=int, default=30)
+    parser.add_argument("--keep-weekly", type=int, default=12)
+    parser.add_argument("--keep-monthly", type=int, default=12)
+    parser.add_argument("--max-usage", type=float, default=75.0, help="Disk-usage ceiling in percent (0 disables)")
+    parser.add_argument("--min-keep", type=int, default=1)
+    parser.add_argument("--index", help="Backup size index (SQLite)")
+    parser.add_argument("--index-root", help="Backup root as recorded in the size index")
+    args = parser.parse_args(argv)
+
+    policy = RetentionPolicy(
+        keep={"daily": args.keep_daily, "weekly": args.keep_weekly, "monthly": args.keep_monthly},
+        max_usage_percent=args.max_usage or None,
+        min_keep=args.min_keep,
+    )
+    plan = plan_retention(args.root, policy, args.scopes or DEFAULT_SCOPES, BackupSizes(args.index, args.index_root))
+    summary = {key: plan[key] for key in ("disk", "ceiling_reached", "reclaim_bytes")}
+    summary["prune"] = [f"{entry['path']} ({entry['reason']})" for entry in plan["prune"]]
+
+    if args.command == "plan":
+        print(json.dumps(summary, indent=2))
+        return 0
+
+    result = apply_plan(plan)
+    print(json.dumps({**summary, **result}, indent=2))
+    return 0 if not result["errors"] and plan["ceiling_reached"] else 1
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main(sys.argv[1:]))
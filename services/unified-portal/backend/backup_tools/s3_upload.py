@@ -0,0 +1,419 @@
+"""Parallel multipart S3 uploader with a resume journal.
+
+Uploads a backup directory to S3 with concurrent multipart uploads. Upload
+IDs and completed parts are recorded in a local JSON journal, so an
+interrupted run continues where it stopped instead of starting over.
+Objects whose BLAKE2b hash (from manifest.json, see backup_tools.manifest)
+matches the hash stored on the remote object are skipped.
+
+boto3 is imported lazily, so the other backup tools never need it:
+
+    python3 -m backup_tools.s3_upload sync LOCAL_DIR s3://BUCKET/PREFIX \\
+        [--include PATTERN ...] [--part-size-mb 16] [--concurrency 4] \\
+        [--journal PATH] [--endpoint-url URL]
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import fnmatch
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from backup_tools.manifest import MANIFEST_NAME, hash_file
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PART_SIZE = 16 * 1024 * 1024
+# S3 minimum part size (except for the last part)
+MIN_PART_SIZE = 5 * 1024 * 1024
+DEFAULT_CONCURRENCY = 4
+HASH_METADATA_KEY = "blake2b"
+
+
+def _content_md5(data: bytes) -> str:
+    """Base64 MD5 for Content-MD5 (required by Object Lock buckets)."""
+    return base64.b64encode(hashlib.md5(data).digest()).decode()
+
+
+class UploadJournal:
+    """JSON journal of in-progress and completed uploads, keyed by s3 URI."""
+
+    def __init__(self, path: str):
+        """Load (or create) a journal.
+
+        Args:
+            path: Journal file path
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+
+    def get(self, uri: str) -> Optional[Dict[str, Any]]:
+        """Get journal entry for an object."""
+        with self._lock:
+            entry = self.entries.get(uri)
+            return json.loads(json.dumps(entry)) if entry is not None else None
+
+    def update(self, uri: str, **fields: Any) -> None:
+        """Update an entry and persist the journal atomically."""
+        with self._lock:
+            self.entries.setdefault(uri, {}).update(fields)
+            self._save()
+
+    def add_part(self, uri: str, part_number: int, etag: str) -> None:
+        """Record a completed part."""
+        with self._lock:
+            self.entries[uri].setdefault("parts", {})[str(part_number)] = etag
+            self._save()
+
+    def _save(self) -> None:
+        """Write journal (caller holds the lock)."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+class S3Uploader:
+    """Concurrent multipart uploader for backup directories."""
+
+    def __init__(
+        self,
+        client: Any,
+        bucket: str,
+        prefix: str = "",
+        journal_path: Optional[str] = None,
+        part_size: int = DEFAULT_PART_SIZE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        storage_class: str = "STANDARD",
+    ):
+        """Initialize uploader.
+
+        Args:
+            client: boto3 S3 client
+            bucket: Bucket name
+            prefix: Key prefix (e.g. mail/daily/2025-11-10)
+            journal_path: Resume journal (defaults to ~/.s3-upload-journal/<bucket>.json)
+            part_size: Multipart part size in bytes (min 5 MiB)
+            concurrency: Parallel part/object uploads
+            storage_class: S3 storage class
+        """
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.concurrency = concurrency
+        self.storage_class = storage_class
+        self.journal = UploadJournal(
+            journal_path or os.path.expanduser(f"~/.s3-upload-journal/{bucket}.json")
+        )
+
+    def _key(self, relpath: str) -> str:
+        """Object key for a relative path."""
+        return f"{self.prefix}/{relpath}" if self.prefix else relpath
+
+    def _uri(self, key: str) -> str:
+        """Journal key for an object."""
+        return f"s3://{self.bucket}/{key}"
+
+    # --------------------------------------------------------------- planning
+
+    @staticmethod
+    def list_files(local_dir: str, include: Optional[Sequence[str]] = None) -> List[str]:
+        """List files to upload, relative to local_dir.
+
+        Args:
+            local_dir: Backup directory
+            include: fnmatch patterns (aws s3 sync --include style); all files if empty
+
+        Returns:
+            Sorted relative paths
+        """
+        files = []
+        for dirpath, _, filenames in os.walk(local_dir):
+            for filename in filenames:
+                relpath = os.path.relpath(os.path.join(dirpath, filename), local_dir)
+                if not include or any(fnmatch.fnmatch(relpath, pattern) for pattern in include):
+                    files.append(relpath)
+        return sorted(files)
+
+    @staticmethod
+    def local_hashes(local_dir: str, files: Sequence[str]) -> Dict[str, str]:
+        """BLAKE2b hashes from manifest.json, hashing files missing from it."""
+        hashes: Dict[str, str] = {}
+        manifest_path = os.path.join(local_dir, MANIFEST_NAME)
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            if manifest.get("algorithm") == "blake2b":
+                hashes = {relpath: entry["blake2b"] for relpath, entry in manifest["files"].items()}
+
+        for relpath in files:
+            if relpath not in hashes:
+                hashes[relpath] = hash_file(os.path.join(local_dir, relpath))
+        return hashes
+
+    def _remote_hash(self, key: str) -> Optional[str]:
+        """Hash stored in the remote object's metadata, if the object exists."""
+        try:
+            response = self.client.head_object(Bucket=self.bucket, Key=key)
+        except self.client.exceptions.ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return response.get("Metadata", {}).get(HASH_METADATA_KEY)
+
+    def _is_unchanged(self, key: str, digest: str, remote_keys: Dict[str, int], size: int) -> bool:
+        """Check whether the remote object already has this content."""
+        if remote_keys.get(key) != size:
+            return False
+        entry = self.journal.get(self._uri(key))
+        if entry and entry.get("completed") and entry.get("hash") == digest:
+            return True
+        return self._remote_hash(key) == digest
+
+    def _list_remote(self) -> Dict[str, int]:
+        """Existing object sizes under the prefix."""
+        sizes: Dict[str, int] = {}
+        paginator = self.client.get_paginator("list_objects_v2")
+        prefix = f"{self.prefix}/" if self.prefix else ""
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                sizes[obj["Key"]] = obj["Size"]
+        return sizes
+
+    # -------------------------------------------------------------- uploading
+
+    def _put_object(self, path: str, key: str, digest: str) -> None:
+        """Upload a small file with a single PUT."""
+        with open(path, "rb") as f:
+            data = f.read()
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=key,
+            Body=data,
+            ContentMD5=_content_md5(data),
+            Metadata={HASH_METADATA_KEY: digest},
+            StorageClass=self.storage_class,
+        )
+        self.journal.update(self._uri(key), hash=digest, completed=True, upload_id=None, parts={})
+
+    def _multipart_upload(self, path: str, key: str, digest: str, size: int) -> int:
+        """Upload a large file in parallel parts, resuming from the journal.
+
+        Returns:
+            Number of parts uploaded in this run (resumed parts excluded)
+        """
+        uri = self._uri(key)
+        entry = self.journal.get(uri)
+        done: Dict[int, str] = {}
+
+        if (
+            entry
+            and entry.get("upload_id")
+            and not entry.get("completed")
+            and entry.get("hash") == digest
+            and entry.get("part_size") == self.part_size
+        ):
+            upload_id = entry["upload_id"]
+            try:
+                # The server's part list is authoritative
+                paginator = self.client.get_paginator("list_parts")
+                for page in paginator.paginate(Bucket=self.bucket, Key=key, UploadId=upload_id):
+                    for part in page.get("Parts", []):
+                        done[part["PartNumber"]] = part["ETag"]
+                logger.info(f"Resuming upload of {key}: {len(done)} parts already uploaded")
+            except self.client.exceptions.ClientError:
+                logger.info(f"Stale upload {upload_id} for {key}; starting over")
+                upload_id = None
+                done = {}
+        else:
+            upload_id = None
+
+        if upload_id is None:
+            upload_id = self.client.create_multipart_upload(
+                Bucket=self.bucket,
+                Key=key,
+                Metadata={HASH_METADATA_KEY: digest},
+                StorageClass=self.storage_class,
+            )["UploadId"]
+            self.journal.update(uri, upload_id=upload_id, hash=digest, part_size=self.part_size,
+                                completed=False, parts={})
+
+        part_count = (size + self.part_size - 1) // self.part_size
+        pending = [n for n in range(1, part_count + 1) if n not in done]
+
+        def upload_part(part_number: int) -> None:
+            with open(path, "rb") as f:
+                f.seek((part_number - 1) * self.part_size)
+                data = f.read(self.part_size)
+            etag = self.client.upload_part(
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=data,
+                ContentMD5=_content_md5(data),
+            )["ETag"]
+            done[part_number] = etag
+            self.journal.add_part(uri, part_number, etag)
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="s3-part") as executor:
+            list(executor.map(upload_part, pending))
+
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": [{"PartNumber": n, "ETag": done[n]} for n in sorted(done)]},
+        )
+        self.journal.update(uri, completed=True, upload_id=None, parts={})
+        return len(pending)
+
+    def sync(self, local_dir: str, include: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Upload changed files of a backup directory.
+
+        Small files are uploaded concurrently; large files are uploaded one
+        at a time with their parts in parallel.
+
+        Args:
+            local_dir: Backup directory
+            include: fnmatch patterns of files to upload
+
+        Returns:
+            Sync summary
+        """
+        started = time.monotonic()
+        files = self.list_files(local_dir, include)
+        hashes = self.local_hashes(local_dir, files)
+        remote = self._list_remote()
+
+        small, large, skipped = [], [], []
+        uploaded_bytes = 0
+        for relpath in files:
+            path = os.path.join(local_dir, relpath)
+            size = os.path.getsize(path)
+            key = self._key(relpath)
+            if self._is_unchanged(key, hashes[relpath], remote, size):
+                skipped.append(relpath)
+                continue
+            (large if size > self.part_size else small).append((relpath, path, key, size))
+            uploaded_bytes += size
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="s3-put") as executor:
+            list(executor.map(lambda item: self._put_object(item[1], item[2], hashes[item[0]]), small))
+
+        parts_uploaded = 0
+        for relpath, path, key, size in large:
+            parts_uploaded += self._multipart_upload(path, key, hashes[relpath], size)
+
+        duration = time.monotonic() - started
+        summary = {
+            "bucket": self.bucket,
+            "prefix": self.prefix,
+            "uploaded": len(small) + len(large),
+            "skipped": len(skipped),
+            "multipart": len(large),
+            "parts_uploaded": parts_uploaded,
+            "uploaded_bytes": uploaded_bytes,
+            "duration_seconds": round(duration, 2),
+            "throughput_mb_s": round(uploaded_bytes / (1024 * 1024) / duration, 2) if duration > 0 else None,
+        }
+        logger.info(
+            f"S3 sync to s3://{self.bucket}/{self.prefix}: {summary['uploaded']} uploaded, "
+            f"{summary['skipped']} unchanged, {uploaded_bytes} bytes in {summary['duration_seconds']}s"
+        )
+        return summary
+
+
+def make_client(endpoint_url: Optional[str] = None, region_name: Optional[str] = None) -> Any:
+    """Create an S3 client for the uploader.
+
+    Parts already carry Content-MD5, so botocore's default flexible checksums
+    (aws-chunked bodies, botocore >= 1.36) are turned off where supported;
+    older S3-compatible stand-ins do not decode them.
+
+    Args:
+        endpoint_url: S3-compatible endpoint (e.g. MinIO)
+        region_name: AWS region (defaults to the environment)
+
+    Returns:
+        boto3 S3 client
+    """
+    import boto3
+    from botocore.config import Config
+
+    try:
+        config = Config(request_checksum_calculation="when_required", response_checksum_validation="when_required")
+    except TypeError:
+        config = Config()
+    return boto3.client("s3", endpoint_url=endpoint_url, region_name=region_name, config=config)
+
+
+def parse_s3_uri(uri: str) -> tuple[str, str]:
+    """Split s3://bucket/prefix into (bucket, prefix)."""
+    if not uri.startswith("s3://"):
+        raise ValueError(f"Not an s3:// URI: {uri}")
+    bucket, _, prefix = uri[5:].partition("/")
+    return bucket, prefix.strip("/")
+
+
+def main(argv: List[str]) -> int:
+    """CLI entry point for backup scripts.
+
+    Args:
+        argv: Command line arguments
+
+    Returns:
+        Exit code
+    """
+    parser = argparse.ArgumentParser(description="Parallel multipart S3 backup uploader")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sync = sub.add_parser("sync", help="Upload changed files of a backup directory")
+    sync.add_argument("local_dir")
+    sync.add_argument("destination", help="s3://BUCKET/PREFIX")
+    sync.add_argument("--include", action="append", default=[])
+    sync.add_argument("--part-size-mb", type=int, default=DEFAULT_PART_SIZE // (1024 * 1024))
+    sync.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    sync.add_argument("--journal")
+    sync.add_argument("--endpoint-url", help="S3-compatible endpoint (e.g. MinIO)")
+    sync.add_argument("--storage-class", default="STANDARD")
+    args = parser.parse_args(argv)
+
+    try:
+        client = make_client(args.endpoint_url)
+    except ImportError:
+        print("boto3 is required: pip install boto3", file=sys.stderr)
+        return 2
+
+    bucket, prefix = parse_s3_uri(args.destination)
+    uploader = S3Uploader(
+        client,
+        bucket,
+        prefix,
+        journal_path=args.journal,
+        part_size=args.part_size_mb * 1024 * 1024,
+        concurrency=args.concurrency,
+        storage_class=args.storage_class,
+    )
+    print(json.dumps(uploader.sync(args.local_dir, args.include), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main(sys.argv[1:]))
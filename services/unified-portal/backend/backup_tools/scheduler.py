@@ -0,0 +1,502 @@
+"""Backup job runner with per-step progress, shared with the portal.
+
+The backup scripts need the host (docker, the writable backup HDD), so the
+runner is a host-side sidecar: cron (or a systemd service running `serve`)
+starts pipelines through it, and it records every run as a JSON job file in
+a state directory the portal also sees (the backend directory is bind-mounted
+into the portal container). The portal lists and watches those jobs, and
+queues new runs by dropping request files into the same directory.
+
+Each step runs under ionice (and, when configured, a systemd scope with
+IOReadBandwidthMax/IOWriteBandwidthMax, i.e. cgroup v2 io.max). Bytes are
+sampled from /proc/<pid>/io across the step's process tree; ETA comes from
+the previous successful run of the same step.
+
+Runs hold an exclusive flock on the backup HDD I/O lock for their whole
+duration. scan-mailserver.sh takes the same lock, so a backup never
+overlaps a ClamAV scan of the same disk - whichever starts second waits.
+
+Cron and the systemd service run it on the host:
+
+    python3 -m backup_tools.scheduler run daily
+    python3 -m backup_tools.scheduler serve
+"""
+from __future__ import annotations
+
+import argparse
+import fcntl
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.environ.get("PROJECT_ROOT", "/opt/onprem-infra-system/project-root-infra")
+SCRIPTS_DIR = os.path.join(PROJECT_ROOT, "services", "mailserver", "scripts")
+DEFAULT_STATE_DIR = os.path.join(PROJECT_ROOT, "services", "unified-portal", "backend", "data", "backup_jobs")
+# Same lock as backup-config.sh HDD_IO_LOCK
+DEFAULT_IO_LOCK = "/tmp/backup-hdd-io.lock"
+BACKUP_MOUNTPOINT = "/mnt/backup-hdd"
+# Directory holding the backup_tools package (PYTHONPATH for -m steps)
+TOOLS_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Pipeline → steps, with the schedule the host crontab runs them on
+PIPELINES: Dict[str, Dict[str, Any]] = {
+    "daily": {"schedule": "Daily at 03:00 AM", "steps": ["backup-daily", "verify"]},
+    "weekly": {"schedule": "Sunday at 02:00 AM", "steps": ["backup-weekly", "verify"]},
+    "upload": {"schedule": "Daily at 04:00 AM", "steps": ["upload"]},
+    "verify": {"schedule": None, "steps": ["verify"]},
+}
+
+SAMPLE_INTERVAL = 1.0
+JOB_HISTORY = 200
+
+
+def step_command(step: str, scripts_dir: str = SCRIPTS_DIR) -> List[str]:
+    """Command line for a pipeline step.
+
+    Args:
+        step: Step name
+        scripts_dir: Mailserver scripts directory
+
+    Returns:
+        Command
+    """
+    if step == "backup-daily":
+        return [os.path.join(scripts_dir, "backup-mailserver.sh"), "--daily"]
+    if step == "backup-weekly":
+        return [os.path.join(scripts_dir, "backup-mailserver.sh"), "--weekly"]
+    if step == "upload":
+        return [os.path.join(scripts_dir, "backup-to-s3.sh")]
+    if step == "verify":
+        latest = os.environ.get("LATEST_LINK", os.path.join(BACKUP_MOUNTPOINT, "rental", "mail", "latest"))
+        return [sys.executable, "-m", "backup_tools.manifest", "verify", latest]
+    raise ValueError(f"Unknown step: {step}")
+
+
+def throttle_prefix(
+    io_class: int = 2,
+    io_priority: int = 7,
+    bandwidth_max: Optional[str] = None,
+    device: str = BACKUP_MOUNTPOINT,
+) -> List[str]:
+    """Command prefix applying I/O throttling.
+
+    Args:
+        io_class: ionice class (2 = best-effort, 3 = idle)
+        io_priority: ionice priority within best-effort (0-7)
+        bandwidth_max: Read/write cap for the backup disk (e.g. "50M"), via a
+            systemd scope (cgroup v2 io.max); None leaves bandwidth unlimited
+        device: Path on the throttled block device
+
+    Returns:
+        Prefix to put in front of a step command
+    """
+    prefix: List[str] = []
+    if bandwidth_max and shutil.which("systemd-run"):
+        prefix += [
+            "systemd-run", "--scope", "--quiet", "--collect",
+            "-p", f"IOReadBandwidthMax={device} {bandwidth_max}",
+            "-p", f"IOWriteBandwidthMax={device} {bandwidth_max}",
+        ]
+    if shutil.which("ionice"):
+        prefix += ["ionice", f"-c{io_class}"] + ([f"-n{io_priority}"] if io_class == 2 else [])
+    return prefix
+
+
+def _process_tree(root_pid: int) -> List[int]:
+    """PIDs of a process and all its live descendants."""
+    children: Dict[int, List[int]] = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # Fields after "(comm)": state, ppid, ...
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(name))
+    tree, stack = [], [root_pid]
+    while stack:
+        pid = stack.pop()
+        tree.append(pid)
+        stack.extend(children.get(pid, []))
+    return tree
+
+
+def _process_io(pid: int) -> Optional[Tuple[int, int]]:
+    """Storage (read_bytes, write_bytes) of a process, None if gone."""
+    try:
+        with open(f"/proc/{pid}/io") as f:
+            fields = dict(line.split(": ") for line in f.read().splitlines())
+        return int(fields["read_bytes"]), int(fields["write_bytes"])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+class IOSampler:
+    """Accumulates storage I/O of a process tree.
+
+    Exited processes keep their last sampled counters, so short-lived
+    children (tar, rsync, gzip) still count toward the step.
+    """
+
+    def __init__(self, root_pid: int):
+        self.root_pid = root_pid
+        self._last: Dict[int, Tuple[int, int]] = {}
+
+    def sample(self) -> Tuple[int, int]:
+        """Sample the tree and return total (read_bytes, write_bytes)."""
+        for pid in _process_tree(self.root_pid):
+            counters = _process_io(pid)
+            if counters is not None:
+                self._last[pid] = counters
+        return (
+            sum(read for read, _ in self._last.values()),
+            sum(write for _, write in self._last.values()),
+        )
+
+
+class BackupJobStore:
+    """Job and request files shared by the runner and the portal."""
+
+    def __init__(self, state_dir: str = DEFAULT_STATE_DIR):
+        """Initialize job store.
+
+        Args:
+            state_dir: State directory (jobs/ and queue/ live below it)
+        """
+        self.jobs_dir = os.path.join(state_dir, "jobs")
+        self.queue_dir = os.path.join(state_dir, "queue")
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        os.makedirs(self.queue_dir, exist_ok=True)
+
+    def save(self, job: Dict[str, Any]) -> None:
+        """Write a job file atomically."""
+        path = os.path.join(self.jobs_dir, f"{job['job_id']}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(job, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job by ID.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            Job or None if not found
+        """
+        if not job_id.isalnum():
+            return None
+        try:
+            with open(os.path.join(self.jobs_dir, f"{job_id}.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def list_jobs(self, pipeline: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """List jobs, newest first.
+
+        Args:
+            pipeline: Only jobs of this pipeline
+            limit: Maximum number of jobs
+
+        Returns:
+            Jobs
+        """
+        jobs = []
+        for name in os.listdir(self.jobs_dir):
+            if name.endswith(".json"):
+                job = self.get_job(name[:-5])
+                if job is not None and (pipeline is None or job["pipeline"] == pipeline):
+                    jobs.append(job)
+        jobs.sort(key=lambda job: job["queued_at"], reverse=True)
+        return jobs[:limit]
+
+    def new_job(self, pipeline: str, trigger: str) -> Dict[str, Any]:
+        """Create and save a queued job.
+
+        Args:
+            pipeline: Pipeline name
+            trigger: What started it (cron, portal, cli)
+
+        Returns:
+            Job
+
+        Raises:
+            ValueError: If the pipeline is unknown
+        """
+        if pipeline not in PIPELINES:
+            raise ValueError(f"Unknown pipeline: {pipeline}")
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "pipeline": pipeline,
+            "trigger": trigger,
+            "status": "queued",
+            "queued_at": datetime.now(timezone.utc).isoformat(),
+            "started_at": None,
+            "finished_at": None,
+            "runner_pid": None,
+            "eta_seconds": None,
+            "steps": [
+                {
+                    "name": step,
+                    "status": "pending",
+                    "started_at": None,
+                    "seconds": None,
+                    "read_bytes": 0,
+                    "write_bytes": 0,
+                    "mb_per_s": None,
+                    "eta_seconds": None,
+                    "exit_code": None,
+                }
+                for step in PIPELINES[pipeline]["steps"]
+            ],
+            "error": None,
+        }
+        self.save(job)
+        return job
+
+    def enqueue(self, pipeline: str) -> Dict[str, Any]:
+        """Queue a pipeline run for the runner's serve loop.
+
+        Args:
+            pipeline: Pipeline name
+
+        Returns:
+            Queued job
+        """
+        job = self.new_job(pipeline, "portal")
+        with open(os.path.join(self.queue_dir, f"{job['job_id']}.json"), "w") as f:
+            json.dump({"job_id": job["job_id"], "pipeline": pipeline}, f)
+        return job
+
+    def next_request(self) -> Optional[Dict[str, Any]]:
+        """Claim the oldest queued request (removes it from the queue)."""
+        names = sorted(
+            (name for name in os.listdir(self.queue_dir) if name.endswith(".json")),
+            key=lambda name: os.stat(os.path.join(self.queue_dir, name)).st_mtime,
+        )
+        for name in names:
+            path = os.path.join(self.queue_dir, name)
+            try:
+                with open(path) as f:
+                    request = json.load(f)
+                os.remove(path)
+            except (OSError, ValueError):
+                continue
+            return request
+        return None
+
+    def step_history(self, step: str) -> Optional[Dict[str, Any]]:
+        """Most recent successful run of a step (for ETA)."""
+        for job in self.list_jobs(limit=JOB_HISTORY):
+            for entry in job["steps"]:
+                if entry["name"] == step and entry["status"] == "completed" and entry["seconds"]:
+                    return entry
+        return None
+
+    def prune(self, keep: int = JOB_HISTORY) -> None:
+        """Delete all but the newest job files."""
+        for job in self.list_jobs(limit=sys.maxsize)[keep:]:
+            try:
+                os.remove(os.path.join(self.jobs_dir, f"{job['job_id']}.json"))
+            except OSError:
+                pass
+
+
+def _estimate_eta(step: Dict[str, Any], elapsed: float, history: Optional[Dict[str, Any]]) -> Optional[int]:
+    """Remaining seconds of a running step, from its previous successful run."""
+    if history is None:
+        return None
+    done = step["read_bytes"] + step["write_bytes"]
+    expected = history["read_bytes"] + history["write_bytes"]
+    if expected > 0 and done > 0 and elapsed > 0:
+        return max(0, int((expected - done) / (done / elapsed)))
+    return max(0, int(history["seconds"] - elapsed))
+
+
+class BackupRunner:
+    """Runs pipelines step by step, serialised on the backup HDD I/O lock."""
+
+    def __init__(
+        self,
+        store: BackupJobStore,
+        io_lock: str = DEFAULT_IO_LOCK,
+        throttle: Optional[List[str]] = None,
+        scripts_dir: str = SCRIPTS_DIR,
+    ):
+        """Initialize runner.
+
+        Args:
+            store: Job store
+            io_lock: Lock file shared with scan-mailserver.sh
+            throttle: Command prefix for I/O throttling (see throttle_prefix)
+            scripts_dir: Mailserver scripts directory
+        """
+        self.store = store
+        self.io_lock = io_lock
+        self.throttle = throttle if throttle is not None else throttle_prefix()
+        self.scripts_dir = scripts_dir
+
+    def run(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a queued job to completion.
+
+        Args:
+            job: Job from BackupJobStore.new_job
+
+        Returns:
+            Finished job
+        """
+        job["runner_pid"] = os.getpid()
+        job["status"] = "waiting"
+        self.store.save(job)
+
+        with open(self.io_lock, "a") as lock:
+            # Blocks while a scan (or another run) holds the disk
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            job["status"] = "running"
+            job["started_at"] = datetime.now(timezone.utc).isoformat()
+            self.store.save(job)
+            try:
+                for index, step in enumerate(job["steps"]):
+                    if not self._run_step(job, step, job["steps"][index + 1:]):
+                        job["status"] = "failed"
+                        job["error"] = f"Step {step['name']} exited with {step['exit_code']}"
+                        for pending in job["steps"][index + 1:]:
+                            pending["status"] = "skipped"
+                        break
+                else:
+                    job["status"] = "completed"
+            except Exception as e:
+                job["status"] = "failed"
+                job["error"] = str(e)
+                logger.error(f"Backup job {job['job_id']} failed: {e}")
+            finally:
+                job["eta_seconds"] = None
+                job["finished_at"] = datetime.now(timezone.utc).isoformat()
+                self.store.save(job)
+        self.store.prune()
+        return job
+
+    def _run_step(self, job: Dict[str, Any], step: Dict[str, Any], remaining: List[Dict[str, Any]]) -> bool:
+        """Run one step, sampling progress into the job file."""
+        history = self.store.step_history(step["name"])
+        remaining_history = [self.store.step_history(entry["name"]) for entry in remaining]
+        remaining_seconds = sum(int(entry["seconds"]) for entry in remaining_history if entry)
+
+        step["status"] = "running"
+        step["started_at"] = datetime.now(timezone.utc).isoformat()
+        started = time.monotonic()
+        pythonpath = os.pathsep.join(filter(None, [TOOLS_PATH, os.environ.get("PYTHONPATH")]))
+        env = {**os.environ, "HDD_IO_LOCK_HELD": "1", "PYTHONPATH": pythonpath}
+        process = subprocess.Popen(self.throttle + step_command(step["name"], self.scripts_dir), env=env)
+        sampler = IOSampler(process.pid)
+
+        while True:
+            try:
+                process.wait(timeout=SAMPLE_INTERVAL)
+                finished = True
+            except subprocess.TimeoutExpired:
+                finished = False
+            elapsed = time.monotonic() - started
+            if not finished:
+                step["read_bytes"], step["write_bytes"] = sampler.sample()
+            step["seconds"] = round(elapsed, 1)
+            if elapsed > 0:
+                step["mb_per_s"] = round((step["read_bytes"] + step["write_bytes"]) / (1024 * 1024) / elapsed, 2)
+            step["eta_seconds"] = None if finished else _estimate_eta(step, elapsed, history)
+            if step["eta_seconds"] is not None:
+                job["eta_seconds"] = step["eta_seconds"] + remaining_seconds
+            self.store.save(job)
+            if finished:
+                break
+
+        step["exit_code"] = process.returncode
+        step["status"] = "completed" if process.returncode == 0 else "failed"
+        self.store.save(job)
+        logger.info(
+            f"Backup job {job['job_id']} step {step['name']}: {step['status']} in {step['seconds']}s "
+            f"({step['read_bytes']} read, {step['write_bytes']} written)"
+        )
+        return process.returncode == 0
+
+    def fail_stale_jobs(self) -> None:
+        """Mark jobs whose runner process is gone as failed."""
+        for job in self.store.list_jobs(limit=JOB_HISTORY):
+            if job["status"] not in ("waiting", "running") or job["runner_pid"] is None:
+                continue
+            if not os.path.exists(f"/proc/{job['runner_pid']}"):
+                job["status"] = "failed"
+                job["error"] = "Runner exited before the job finished"
+                job["finished_at"] = datetime.now(timezone.utc).isoformat()
+                self.store.save(job)
+
+    def serve(self, poll_interval: float = 5.0, stop_event: Optional[threading.Event] = None) -> None:
+        """Run portal-queued jobs until stopped.
+
+        Args:
+            poll_interval: Seconds between queue checks
+            stop_event: Stop the loop when set
+        """
+        stop_event = stop_event or threading.Event()
+        self.fail_stale_jobs()
+        while not stop_event.is_set():
+            request = self.store.next_request()
+            if request is None:
+                stop_event.wait(poll_interval)
+                continue
+            job = self.store.get_job(request["job_id"]) or self.store.new_job(request["pipeline"], "portal")
+            self.run(job)
+
+
+def main(argv: List[str]) -> int:
+    """CLI entry point for cron and the systemd service.
+
+    Args:
+        argv: Command line arguments (run PIPELINE | serve)
+
+    Returns:
+        Exit code
+    """
+    parser = argparse.ArgumentParser(prog="python3 -m backup_tools.scheduler")
+    parser.add_argument("--state-dir", default=os.environ.get("BACKUP_JOBS_DIR", DEFAULT_STATE_DIR))
+    parser.add_argument("--io-lock", default=os.environ.get("HDD_IO_LOCK", DEFAULT_IO_LOCK))
+    parser.add_argument("--io-class", type=int, default=int(os.environ.get("BACKUP_IO_CLASS", "2")))
+    parser.add_argument("--io-priority", type=int, default=int(os.environ.get("BACKUP_IO_PRIORITY", "7")))
+    parser.add_argument("--bandwidth-max", default=os.environ.get("BACKUP_IO_BANDWIDTH_MAX") or None)
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run")
+    run.add_argument("pipeline", choices=sorted(PIPELINES))
+    commands.add_parser("serve")
+    args = parser.parse_args(argv)
+
+    runner = BackupRunner(
+        BackupJobStore(args.state_dir),
+        io_lock=args.io_lock,
+        throttle=throttle_prefix(args.io_class, args.io_priority, args.bandwidth_max),
+    )
+    if args.command == "serve":
+        runner.serve()
+        return 0
+
+    job = runner.run(runner.store.new_job(args.pipeline, "cron"))
+    print(json.dumps({key: job[key] for key in ("job_id", "status", "error")}))
+    return 0 if job["status"] == "completed" else 1
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main(sys.argv[1:]))
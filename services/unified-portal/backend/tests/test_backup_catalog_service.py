@@ -0,0 +1,68 @@
+"""Tests for the backup catalogue (against a tmp backup tree)."""
+
+import pytest
+
+from app.services import backup_catalog_service
+from app.services.backup_catalog_service import BackupCatalog
+from app.services.backup_index_service import BackupSizeIndex
+
+
+def make_backup(root, scope, name, mailbox_user="user"):
+    """Create a backup directory holding one maildir."""
+    maildir = root / scope / "daily" / name / "mail" / "example.com" / mailbox_user / "cur"
+    maildir.mkdir(parents=True)
+    (maildir / "1.eml").write_bytes(b"Subject: hello\n\nbody\n")
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    """Catalogue over a tmp backup root with a tmp size index."""
+    index = BackupSizeIndex(db_path=str(tmp_path / "index.sqlite3"))
+    monkeypatch.setattr(backup_catalog_service, "get_backup_size_index", lambda: index)
+    root = tmp_path / "backups"
+    make_backup(root, "mailserver", "2025-11-10")
+    make_backup(root, "rental/mail", "2025-11-11")
+    # A stray maildir copy in a blog backup must never be used for mail restores
+    make_backup(root, "rental/blog", "2025-11-12")
+    catalog = BackupCatalog(db_path=str(tmp_path / "catalog.sqlite3"), backup_root=str(root))
+    catalog.sync(["mailserver", "rental/mail", "rental/blog"])
+    return catalog
+
+
+class TestLatestMailboxBackup:
+    """Tests for mailbox backup lookup."""
+
+    def test_ignores_non_mail_scopes(self, catalog):
+        """Test the newest mail-scope backup wins over a newer blog backup."""
+        run = catalog.latest_mailbox_backup("User@example.com")
+
+        assert (run["scope"], run["backup_date"]) == ("rental/mail", "2025-11-11")
+        assert catalog.latest_mailbox_backup("user@example.com", scopes=["rental/blog"]) is None
+
+    def test_restore_plan_stays_in_scope(self, catalog):
+        """Test a mailbox restore plan only reads backups of the planned scope."""
+        plan = catalog.plan_restore("mailserver", ["mail"], mailboxes=["user@example.com"])
+        blog_plan = catalog.plan_restore("rental/blog", ["mail"], mailboxes=["user@example.com"])
+
+        assert [step["backup_date"] for step in plan["steps"]] == ["2025-11-10"]
+        assert blog_plan["steps"] == [] and blog_plan["missing"] == ["mailbox:user@example.com"]
+
+
+class TestRefreshIfStale:
+    """Tests for syncing the catalogue on read."""
+
+    def test_new_backup_synced_on_read(self, catalog, tmp_path):
+        """Test a backup added after the last sync is catalogued by the next read."""
+        assert catalog.refresh_if_stale() is True
+        assert catalog.refresh_if_stale() is False
+
+        make_backup(tmp_path / "backups", "rental/mail", "2025-11-13")
+
+        assert catalog.refresh_if_stale() is True
+        assert catalog.latest_mailbox_backup("user@example.com")["backup_date"] == "2025-11-13"
+
+    def test_resync_after_max_age(self, catalog):
+        """Test an unchanged tree is re-synced once the last sync is too old."""
+        catalog.refresh_if_stale()
+
+        assert catalog.refresh_if_stale(max_age=0) is True
@@ -0,0 +1,85 @@
+"""Tests for the backup size index (on temporary directory trees)."""
+
+import threading
+
+from app.services import backup_index_service
+from app.services.backup_index_service import BackupSizeIndex, scan_directories, scan_directory
+
+
+def make_backups(root, count):
+    """Create backup directories with one 10-byte file each."""
+    paths = []
+    for i in range(count):
+        path = root / f"2025-01-{i + 1:02d}"
+        (path / "mail").mkdir(parents=True)
+        (path / "mail" / "data").write_bytes(b"x" * 10)
+        paths.append(str(path))
+    return paths
+
+
+class TestScanDirectories:
+    """Tests for the parallel scanner."""
+
+    def test_normal_finish_does_not_set_event(self, tmp_path):
+        """Test a completed scan leaves the cancel event untouched."""
+        event = threading.Event()
+
+        results = list(scan_directories(make_backups(tmp_path, 3), 2, event))
+
+        assert len(results) == 3
+        assert not event.is_set()
+
+    def test_early_exit_sets_event(self, tmp_path):
+        """Test a consumer stopping early cancels the remaining scans."""
+        event = threading.Event()
+        scans = scan_directories(make_backups(tmp_path, 3), 1, event)
+
+        next(scans)
+        scans.close()
+
+        assert event.is_set()
+
+
+class TestBackupSizeIndex:
+    """Tests for concurrent listings and cancellation."""
+
+    def test_concurrent_listings_do_not_cancel_each_other(self, tmp_path, monkeypatch):
+        """Test one listing finishing leaves another listing's scans running."""
+        first_done = threading.Event()
+
+        def slow_scanner(path, cancel_event=None):
+            if path.endswith("-02"):
+                first_done.wait(5)  # Still scanning when the other listing finishes
+            return scan_directory(path, cancel_event)
+
+        index = BackupSizeIndex(db_path=str(tmp_path / "index.sqlite3"), max_workers=2)
+        paths = make_backups(tmp_path / "backups", 2)
+        results = {}
+        monkeypatch.setattr(backup_index_service, "scan_directory", slow_scanner)
+
+        slow = threading.Thread(target=lambda: results.update(index.get_many([paths[1]])))
+        slow.start()
+        results.update(index.get_many([paths[0]]))
+        first_done.set()
+        slow.join(5)
+
+        assert [results[path]["status"] for path in paths] == ["indexed", "indexed"]
+        assert [results[path]["size_bytes"] for path in paths] == [10, 10]
+
+    def test_cancelled_scan_reported_as_pending(self, tmp_path, monkeypatch):
+        """Test cancelled directories are pending, never 0 bytes."""
+        index = BackupSizeIndex(db_path=str(tmp_path / "index.sqlite3"), max_workers=1)
+        paths = make_backups(tmp_path / "backups", 3)
+
+        def cancelling_scanner(path, cancel_event=None):
+            result = scan_directory(path, cancel_event)
+            index.cancel_scan()  # Cancelled from the portal after the first directory
+            return result
+
+        monkeypatch.setattr(backup_index_service, "scan_directory", cancelling_scanner)
+        results = index.get_many(paths)
+
+        statuses = sorted(entry["status"] for entry in results.values())
+        assert statuses == ["indexed", "pending", "pending"]
+        assert all(entry["size_bytes"] is None for entry in results.values() if entry["status"] == "pending")
+        assert index.scan_progress == {"running": False, "done": 0, "total": 0, "last_path": None}
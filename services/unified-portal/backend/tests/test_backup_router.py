@@ -53,3 +53,221 @@ class TestBackupSchedule:
         assert "mailserver_daily" in data
         assert "mailserver_weekly" in data
         assert "s3_replication" in data
+
+
+class TestBackupIndex:
+    """Tests for backup size index endpoints."""
+
+    def test_refresh_backup_index_outside_root(self, client):
+        """Test index refresh rejects paths outside the backup root."""
+        response = client.post("/api/v1/backup/index/refresh", params={"path": "/etc"})
+
+        assert response.status_code == 404
+
+    def test_get_backup_scan_progress(self, client):
+        """Test backup scan progress retrieval."""
+        response = client.get("/api/v1/backup/index/progress")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert "running" in data
+        assert "done" in data
+        assert "total" in data
+
+
+class TestBackupVerify:
+    """Tests for backup verification endpoints."""
+
+    def test_verify_backup_not_found(self, client):
+        """Test verification with invalid backup ID."""
+        response = client.post("/api/v1/backup/nonexistent/backup/verify")
+
+        assert response.status_code == 404
+
+    def test_get_verify_job_not_found(self, client):
+        """Test verification job status with invalid ID."""
+        response = client.get("/api/v1/backup/verify/jobs/nonexistent")
+
+        assert response.status_code == 404
+
+
+class TestDedupStore:
+    """Tests for deduplicating backup store endpoints."""
+
+    def test_create_dedup_snapshot_outside_root(self, client):
+        """Test snapshot rejects sources outside the backup root."""
+        response = client.post("/api/v1/backup/dedup/snapshots", json={"source": "/etc"})
+
+        assert response.status_code == 404
+
+    def test_restore_dedup_snapshot_outside_root(self, client):
+        """Test restore rejects targets outside the restore root."""
+        response = client.post(
+            "/api/v1/backup/dedup/snapshots/abc/restore",
+            json={"target": "../../etc"}
+        )
+
+        assert response.status_code == 400
+
+    def test_get_dedup_job_not_found(self, client):
+        """Test dedup job status with invalid ID."""
+        response = client.get("/api/v1/backup/dedup/jobs/nonexistent")
+
+        assert response.status_code == 404
+
+
+class TestBackupPipeline:
+    """Tests for streaming backup pipeline endpoints."""
+
+    def test_start_tar_pipeline_outside_root(self, client):
+        """Test tar pipeline rejects sources outside the backup root."""
+        response = client.post(
+            "/api/v1/backup/pipeline/runs",
+            json={"kind": "tar", "source": "/etc"}
+        )
+
+        assert response.status_code == 404
+
+    def test_start_pipeline_invalid_kind(self, client):
+        """Test pipeline rejects unknown kinds."""
+        response = client.post(
+            "/api/v1/backup/pipeline/runs",
+            json={"kind": "rsync", "source": "mailserver"}
+        )
+
+        assert response.status_code == 422
+
+    def test_list_backup_pipelines(self, client):
+        """Test pipeline job listing."""
+        response = client.get("/api/v1/backup/pipeline/runs")
+
+        assert response.status_code == 200
+        assert isinstance(response.json(), list)
+
+    def test_get_pipeline_job_not_found(self, client):
+        """Test pipeline job status with invalid ID."""
+        response = client.get("/api/v1/backup/pipeline/runs/nonexistent")
+
+        assert response.status_code == 404
+
+
+class TestBackupCatalog:
+    """Tests for backup catalogue endpoints."""
+
+    def test_sync_backup_catalog(self, client):
+        """Test catalogue sync."""
+        response = client.post("/api/v1/backup/catalog/sync")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert "updated" in data
+        assert "removed" in data
+
+    def test_list_catalog_runs(self, client):
+        """Test catalogue run query."""
+        response = client.get("/api/v1/backup/catalog/runs", params={"scope": "mailserver", "limit": 10})
+
+        assert response.status_code == 200
+        assert isinstance(response.json(), list)
+
+    def test_list_catalog_runs_invalid_date(self, client):
+        """Test catalogue run query rejects malformed dates."""
+        response = client.get("/api/v1/backup/catalog/runs", params={"before": "yesterday"})
+
+        assert response.status_code == 422
+
+    def test_latest_mailbox_backup_not_found(self, client):
+        """Test mailbox lookup with no catalogued backups."""
+        response = client.get("/api/v1/backup/catalog/mailboxes/nobody@example.invalid/latest")
+
+        assert response.status_code == 404
+
+    def test_plan_restore(self, client):
+        """Test restore planning reports components without backups."""
+        response = client.get(
+            "/api/v1/backup/catalog/restore-plan",
+            params={"components": ["mysql"], "mailbox": ["nobody@example.invalid"]}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert "steps" in data
+        assert "mailbox:nobody@example.invalid" in data["missing"]
+
+
+class TestMailboxRestore:
+    """Tests for per-mailbox restore endpoints."""
+
+    def test_restore_mailbox_not_found(self, client):
+        """Test restore of a mailbox with no catalogued backups."""
+        response = client.post(
+            "/api/v1/backup/mailserver/restore",
+            params={"user": "nobody@example.invalid", "folder": "INBOX", "date": "2025-11-10"}
+        )
+
+        assert response.status_code == 404
+
+    def test_restore_mailbox_invalid_user(self, client):
+        """Test restore rejects malformed addresses."""
+        response = client.post("/api/v1/backup/mailserver/restore", params={"user": "../etc"})
+
+        assert response.status_code == 422
+
+    def test_get_restore_job_not_found(self, client):
+        """Test restore job status with invalid ID."""
+        response = client.get("/api/v1/backup/mailserver/restore/jobs/nonexistent")
+
+        assert response.status_code == 404
+
+
+class TestBackupRetention:
+    """Tests for backup retention endpoints."""
+
+    def test_start_retention_dry_run(self, client):
+        """Test retention run defaults to a dry run."""
+        response = client.post("/api/v1/backup/retention/runs", json={})
+
+        assert response.status_code == 202
+        data = response.json()
+        assert data["dry_run"] is True
+        assert "job_id" in data
+
+    def test_retention_apply_rejected(self, client):
+        """Test pruning cannot be started from the portal."""
+        response = client.post("/api/v1/backup/retention/runs", json={"dry_run": False})
+
+        assert response.status_code == 400
+
+    def test_get_retention_job_not_found(self, client):
+        """Test retention job status with invalid ID."""
+        response = client.get("/api/v1/backup/retention/runs/nonexistent")
+
+        assert response.status_code == 404
+
+
+class TestBackupJobs:
+    """Tests for backup job runner endpoints."""
+
+    def test_queue_backup_job(self, client):
+        """Test queuing a pipeline run for the host runner."""
+        response = client.post("/api/v1/backup/jobs", json={"pipeline": "verify"})
+
+        assert response.status_code == 202
+        data = response.json()
+        assert data["status"] == "queued"
+        assert [step["name"] for step in data["steps"]] == ["verify"]
+
+        listed = client.get("/api/v1/backup/jobs", params={"pipeline": "verify"})
+        assert data["job_id"] in [job["job_id"] for job in listed.json()]
+
+    def test_queue_backup_job_invalid_pipeline(self, client):
+        """Test unknown pipelines are rejected."""
+        response = client.post("/api/v1/backup/jobs", json={"pipeline": "format-disk"})
+
+        assert response.status_code == 422
+
+    def test_get_backup_job_not_found(self, client):
+        """Test job status with invalid ID."""
+        response = client.get("/api/v1/backup/jobs/nonexistent")
+
+        assert response.status_code == 404
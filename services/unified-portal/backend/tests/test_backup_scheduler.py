@@ -0,0 +1,33 @@
+"""Tests for the backup job runner's pipeline steps."""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+from backup_tools.scheduler import PIPELINES, step_command
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "..", "mailserver", "scripts")
+
+
+class TestStepCommand:
+    """Tests for step command lines."""
+
+    @pytest.mark.parametrize("step", sorted({step for pipeline in PIPELINES.values() for step in pipeline["steps"]}))
+    def test_step_runnable(self, step):
+        """Test every pipeline step points at a module or script that exists."""
+        command = step_command(step, SCRIPTS_DIR)
+
+        if command[0] == sys.executable:
+            if command[1] == "-m":
+                assert importlib.util.find_spec(command[2]) is not None
+            else:
+                assert os.path.isfile(command[1])
+        else:
+            assert os.path.isfile(command[0])
+
+    def test_unknown_step(self):
+        """Test unknown steps are rejected."""
+        with pytest.raises(ValueError):
+            step_command("backup-hourly", SCRIPTS_DIR)
@@ -0,0 +1,71 @@
+"""Tests for the TLS certificate inventory (against generated certificates)."""
+
+import os
+from datetime import datetime, timedelta, timezone
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from app.services.certificate_inventory_service import CertificateInventory
+
+KEY = ec.generate_private_key(ec.SECP256R1())
+
+
+def write_certificate(path, names, days_valid):
+    """Write a self-signed certificate for names valid for days_valid days."""
+    now = datetime.now(timezone.utc)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, names[0])])
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(KEY.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=days_valid))
+        .add_extension(x509.SubjectAlternativeName([x509.DNSName(n) for n in names]), critical=False)
+        .sign(KEY, hashes.SHA256())
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    return path
+
+
+class TestCertificateInventory:
+    """Tests for scanning, indexing and cache invalidation."""
+
+    def test_index_by_san_and_expiring(self, tmp_path):
+        """Test names are indexed and the expiry window is applied."""
+        write_certificate(tmp_path / "mail" / "tls.crt", ["mail.example.com"], 10)
+        write_certificate(tmp_path / "live" / "example.com" / "fullchain.pem", ["example.com", "*.example.com"], 80)
+        (tmp_path / "mail" / "tls.key").write_bytes(
+            KEY.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                              serialization.NoEncryption())
+        )
+        inventory = CertificateInventory([str(tmp_path)])
+
+        index = inventory.scan()
+        expiring = inventory.expiring(14)
+
+        assert sorted(index.by_name) == ["*.example.com", "example.com", "mail.example.com"]
+        assert [name for name, _ in expiring] == ["mail.example.com"]
+        assert expiring[0][1].status() == "expiring"
+        assert [cert.sans for cert in inventory.lookup("blog.example.com")] == [["example.com", "*.example.com"]]
+
+    def test_renewed_file_reparsed_on_mtime_change(self, tmp_path):
+        """Test only changed files are re-parsed and renewals clear expiry."""
+        path = write_certificate(tmp_path / "tls.crt", ["mail.example.com"], 5)
+        inventory = CertificateInventory([str(tmp_path)])
+        first = inventory.scan()
+
+        assert inventory.scan() is first  # Unchanged files keep the index
+
+        write_certificate(path, ["mail.example.com"], 90)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert inventory.scan() is not first
+        assert inventory.expiring(14) == []
+        assert inventory.lookup("mail.example.com")[0].days_remaining() >= 89
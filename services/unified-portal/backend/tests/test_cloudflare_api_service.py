@@ -0,0 +1,139 @@
+"""Tests for the shared Cloudflare API client (against an httpx mock transport)."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.cloudflare_api_service import (
+    CloudflareAPIError,
+    CloudflareClient,
+    CloudflareNotConfiguredError,
+    CloudflareNotFoundError,
+    CloudflareRateLimitError,
+    TokenBucket,
+)
+
+
+def make_client(handler, max_retries=2):
+    """Create a client whose requests are answered by handler."""
+    return CloudflareClient(
+        api_token="test-token",
+        max_retries=max_retries,
+        backoff_base=0.001,
+        transport=httpx.MockTransport(handler),
+    )
+
+
+def envelope(result, success=True, errors=None):
+    """Build a Cloudflare response envelope."""
+    return {"success": success, "errors": errors or [], "messages": [], "result": result}
+
+
+@pytest.mark.asyncio
+class TestCloudflareClient:
+    """Tests for CloudflareClient requests, errors and retries."""
+
+    async def test_get_returns_result_with_auth(self):
+        """Test results are unwrapped and the token is sent."""
+        seen = []
+
+        def handler(request):
+            seen.append(request)
+            return httpx.Response(200, json=envelope([{"id": "zone-1", "name": "example.com"}]))
+
+        client = make_client(handler)
+        result = await client.get("/zones", params={"name": "example.com"})
+        await client.aclose()
+
+        assert result == [{"id": "zone-1", "name": "example.com"}]
+        assert seen[0].headers["Authorization"] == "Bearer test-token"
+        assert seen[0].url.path == "/client/v4/zones"
+        assert seen[0].url.params["name"] == "example.com"
+
+    async def test_retries_rate_limit_then_succeeds(self):
+        """Test 429 responses are retried."""
+        calls = {"count": 0}
+
+        def handler(request):
+            calls["count"] += 1
+            if calls["count"] == 1:
+                return httpx.Response(429, headers={"Retry-After": "0"}, json=envelope(None, success=False))
+            return httpx.Response(200, json=envelope({"id": "rec-1"}))
+
+        client = make_client(handler)
+        result = await client.post("/zones/zone-1/dns_records", json={"type": "A"})
+        await client.aclose()
+
+        assert result == {"id": "rec-1"}
+        assert calls["count"] == 2
+
+    async def test_rate_limit_exhausted(self):
+        """Test persistent 429 raises a rate limit error."""
+        client = make_client(lambda request: httpx.Response(429, json=envelope(None, success=False)), max_retries=1)
+
+        with pytest.raises(CloudflareRateLimitError):
+            await client.get("/zones")
+        await client.aclose()
+
+    async def test_post_not_retried_on_server_error(self):
+        """Test non-idempotent requests are not replayed after a 5xx."""
+        calls = {"count": 0}
+
+        def handler(request):
+            calls["count"] += 1
+            return httpx.Response(502, text="bad gateway")
+
+        client = make_client(handler)
+        with pytest.raises(CloudflareAPIError) as exc_info:
+            await client.post("/zones/zone-1/dns_records", json={"type": "A"})
+        await client.aclose()
+
+        assert exc_info.value.status_code == 502
+        assert calls["count"] == 1
+
+    async def test_typed_errors(self):
+        """Test 404 and unsuccessful envelopes map to typed errors."""
+        def handler(request):
+            if request.url.path.endswith("/missing"):
+                return httpx.Response(404, json=envelope(None, success=False, errors=[{"code": 7003}]))
+            return httpx.Response(200, json=envelope(None, success=False, errors=[{"code": 1004}]))
+
+        client = make_client(handler)
+        with pytest.raises(CloudflareNotFoundError):
+            await client.get("/zones/missing")
+        with pytest.raises(CloudflareAPIError) as exc_info:
+            await client.get("/zones/zone-1/dns_records")
+        await client.aclose()
+
+        assert exc_info.value.status_code == 400
+        assert exc_info.value.errors == [{"code": 1004}]
+
+    async def test_not_configured(self):
+        """Test requests without a token fail before any network call."""
+        client = CloudflareClient(api_token="your-cloudflare-api-token")
+
+        with pytest.raises(CloudflareNotConfiguredError):
+            await client.get("/zones")
+
+
+@pytest.mark.asyncio
+class TestTokenBucket:
+    """Tests for the request rate limiter."""
+
+    async def test_window_limit(self):
+        """Test burst plus refill never exceeds the window limit."""
+        bucket = TokenBucket.for_window(1200, 300)
+
+        assert bucket.capacity + bucket.rate * 300 == 1200
+
+    async def test_waits_when_empty(self):
+        """Test acquire blocks until a token is refilled."""
+        bucket = TokenBucket(rate=50, capacity=1)
+        loop = asyncio.get_running_loop()
+
+        start = loop.time()
+        await bucket.acquire()
+        await bucket.acquire()
+
+        assert loop.time() - start >= 0.015
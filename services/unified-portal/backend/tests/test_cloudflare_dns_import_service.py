@@ -0,0 +1,114 @@
+"""Tests for the bulk DNS CSV import (against an httpx mock transport)."""
+
+import json
+
+import httpx
+import pytest
+
+from app.services.cloudflare_api_service import CloudflareClient
+from app.services.cloudflare_dns_import_service import DNSBulkImporter, parse_csv, plan_import
+from app.services.cloudflare_dns_service import DNSRecordMirror
+
+CSV = """Type,Name,Content,TTL,Proxied,Priority
+A,@,192.0.2.1,1,Yes,
+A,www,192.0.2.2,300,No,
+MX,@,mail.example.com,1,No,10
+CNAME,blog,example.com,1,Yes,
+"""
+
+
+class FakeZone:
+    """In-memory DNS records API for one zone."""
+
+    def __init__(self, records=None):
+        self.records = {record["id"]: record for record in records or []}
+        self.writes = []
+
+    def handler(self, request):
+        if request.method == "GET":
+            return self.respond(list(self.records.values()), result_info={"page": 1, "total_pages": 1})
+        body = json.loads(request.content)
+        self.writes.append(request.method)
+        if request.method == "POST":
+            record_id = f"rec-{len(self.records) + 1}"
+        else:
+            record_id = request.url.path.rsplit("/", 1)[-1]
+        self.records[record_id] = {"id": record_id, **body}
+        return self.respond(self.records[record_id])
+
+    @staticmethod
+    def respond(result, **extra):
+        return httpx.Response(200, json={"success": True, "errors": [], "result": result, **extra})
+
+
+def make_importer(zone):
+    """Create an importer whose client and mirror talk to zone."""
+    client = CloudflareClient(api_token="test-token", transport=httpx.MockTransport(zone.handler))
+    return DNSBulkImporter(client=client, mirror=DNSRecordMirror(client=client), concurrency=4)
+
+
+class TestParseCsv:
+    """Tests for CSV validation."""
+
+    def test_valid_rows_are_qualified(self):
+        """Test names are expanded to FQDNs and proxied TTLs forced to auto."""
+        rows, errors = parse_csv(CSV.splitlines(), "example.com")
+
+        assert errors == []
+        assert [row.payload["name"] for row in rows] == [
+            "example.com", "www.example.com", "example.com", "blog.example.com",
+        ]
+        assert rows[2].payload["priority"] == 10
+
+    def test_invalid_and_duplicate_rows(self):
+        """Test every invalid row is reported with its line number."""
+        text = (
+            "Type,Name,Content,TTL,Proxied,Priority\n"
+            "A,www,not-an-ip,1,No,\n"
+            "MX,@,mail.example.com,1,No,\n"
+            "TXT,@,hello,1,Yes,\n"
+            "A,api,192.0.2.9,1,No,\n"
+            "A,API.example.com,192.0.2.9,1,No,\n"
+        )
+        rows, errors = parse_csv(text.splitlines(), "example.com")
+
+        assert [row.row for row in rows] == [5]
+        assert [error.row for error in errors] == [2, 3, 4, 6]
+        assert "Duplicate of row 5" in errors[-1].error
+
+
+class TestPlanImport:
+    """Tests for diffing rows against existing records."""
+
+    def test_skip_update_create(self):
+        """Test unchanged records are skipped and changed ones updated."""
+        rows, _ = parse_csv(CSV.splitlines(), "example.com")
+        existing = [
+            {"id": "r1", "type": "A", "name": "example.com", "content": "192.0.2.1", "ttl": 1, "proxied": True},
+            {"id": "r2", "type": "A", "name": "www.example.com", "content": "192.0.2.2", "ttl": 3600,
+             "proxied": False},
+            {"id": "r3", "type": "CNAME", "name": "blog.example.com", "content": "old.example.net", "ttl": 1,
+             "proxied": True},
+        ]
+
+        plan = plan_import(rows, existing)
+
+        assert [row.row for row in plan.skipped] == [2]
+        assert [(row.row, record_id) for row, record_id in plan.updates] == [(3, "r2"), (5, "r3")]
+        assert [row.row for row in plan.creates] == [4]
+
+
+@pytest.mark.asyncio
+class TestDNSBulkImporter:
+    """Tests for applying imports."""
+
+    async def test_import_is_rerunnable(self):
+        """Test a second run of the same file changes nothing."""
+        zone = FakeZone()
+
+        first = await make_importer(zone).run("zone-1", "example.com", CSV.splitlines())
+        second = await make_importer(zone).run("zone-1", "example.com", CSV.splitlines())
+
+        assert (first.created, first.updated, first.skipped, first.errors) == (4, 0, 0, [])
+        assert (second.created, second.updated, second.skipped, second.errors) == (0, 0, 4, [])
+        assert zone.writes == ["POST"] * 4
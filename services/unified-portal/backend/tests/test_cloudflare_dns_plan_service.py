@@ -0,0 +1,201 @@
+"""Tests for declarative DNS zone plan/apply (against an httpx mock transport)."""
+
+import json
+
+import httpx
+import pytest
+
+from app.services import cloudflare_dns_plan_service, site_dns_service
+from app.services.cloudflare_api_service import CloudflareClient
+from app.services.cloudflare_dns_plan_service import DesiredRecord, DNSZoneReconciler, load_zone_file, plan_zone
+from app.services.cloudflare_dns_service import DNSRecordMirror
+from app.services.cloudflare_zone_service import CloudflareZoneCache
+
+SPF = "v=spf1 mx include:sendgrid.net ~all"
+
+
+def record(record_id, record_type, name, content, **extra):
+    """Cloudflare DNS record."""
+    return {"id": record_id, "type": record_type, "name": name, "content": content,
+            "ttl": extra.pop("ttl", 3600), "proxied": extra.pop("proxied", False), **extra}
+
+
+def desired(record_type, name, content, **extra):
+    """Desired record payload."""
+    payload = {"type": record_type, "name": name, "content": content,
+               "ttl": extra.pop("ttl", 3600), "proxied": extra.pop("proxied", False), **extra}
+    return DesiredRecord(payload=payload, source="test")
+
+
+class FakeZone:
+    """In-memory zones and DNS records API for example.com."""
+
+    def __init__(self, records=None):
+        self.records = {item["id"]: item for item in records or []}
+        self.writes = []
+
+    def handler(self, request):
+        if request.url.path.endswith("/zones"):
+            return self.respond([{"id": "zone-1", "name": "example.com", "status": "active"}],
+                                result_info={"page": 1, "total_pages": 1})
+        if request.method == "GET":
+            return self.respond(list(self.records.values()), result_info={"page": 1, "total_pages": 1})
+        record_id = request.url.path.rsplit("/", 1)[-1]
+        self.writes.append((request.method, record_id))
+        if request.method == "DELETE":
+            del self.records[record_id]
+            return self.respond({"id": record_id})
+        if request.method == "POST":
+            record_id = f"rec-new-{len(self.writes)}"
+        self.records[record_id] = {"id": record_id, **json.loads(request.content)}
+        return self.respond(self.records[record_id])
+
+    @staticmethod
+    def respond(result, **extra):
+        return httpx.Response(200, json={"success": True, "errors": [], "result": result, **extra})
+
+
+def make_reconciler(zone, zone_dir):
+    """Create a reconciler whose client, mirror and zone cache talk to zone."""
+    client = CloudflareClient(api_token="test-token", transport=httpx.MockTransport(zone.handler))
+    return DNSZoneReconciler(
+        client=client,
+        mirror=DNSRecordMirror(client=client),
+        zone_cache=CloudflareZoneCache(client=client),
+        zone_dir=str(zone_dir),
+        concurrency=4,
+    )
+
+
+class TestPlanZone:
+    """Tests for the minimal diff."""
+
+    def test_minimal_changes(self):
+        """Test changed records are updated in place and conflicts deleted."""
+        live = [
+            record("mx-old", "MX", "example.com", "mx.old-host.net", priority=10),
+            record("spf", "TXT", "example.com", "v=spf1 mx ~all"),
+            record("verify", "TXT", "example.com", "google-site-verification=abc"),
+            record("blog-a", "A", "blog.example.com", "192.0.2.1"),
+            record("www", "A", "www.example.com", "192.0.2.2"),
+            record("extra", "A", "old.example.com", "192.0.2.3"),
+        ]
+        plan = plan_zone("zone-1", "example.com", [
+            desired("MX", "example.com", "mail.example.com", priority=10),
+            desired("TXT", "example.com", SPF),
+            desired("CNAME", "blog.example.com", "tunnel-1.cfargotunnel.com", ttl=1, proxied=True),
+            desired("A", "www.example.com", "192.0.2.2"),
+        ], live)
+
+        changes = [(change.action, change.existing["id"] if change.existing else change.record["name"])
+                   for change in plan.changes]
+        assert changes == [
+            ("delete", "blog-a"),
+            ("update", "mx-old"),
+            ("update", "spf"),
+            ("create", "blog.example.com"),
+        ]
+        assert plan.unchanged == 1
+
+    def test_prune_deletes_undeclared(self):
+        """Test prune removes records that are not declared."""
+        live = [record("www", "A", "www.example.com", "192.0.2.2"), record("old", "A", "old.example.com", "192.0.2.3")]
+
+        kept = plan_zone("zone-1", "example.com", [desired("A", "www.example.com", "192.0.2.2")], live)
+        pruned = plan_zone("zone-1", "example.com", [desired("A", "www.example.com", "192.0.2.2")], live, prune=True)
+
+        assert kept.changes == []
+        assert [(change.action, change.source, change.existing["id"]) for change in pruned.changes] == [
+            ("delete", "prune", "old"),
+        ]
+
+
+class TestDesiredRecords:
+    """Tests for zone files and generated records."""
+
+    def test_zone_file_overrides_generated(self, tmp_path, monkeypatch):
+        """Test zone file records replace generated ones in the same slot."""
+        monkeypatch.setattr(site_dns_service.settings, "cloudflare_tunnel_id", "tunnel-1")
+        (tmp_path / "example.com.yml").write_text(
+            "records:\n"
+            "  - {type: MX, name: '@', content: mx.example.net, priority: 5}\n"
+            "  - {type: A, name: mail, content: 192.0.2.10, ttl: 300}\n"
+        )
+        reconciler = make_reconciler(FakeZone(), tmp_path)
+
+        records, prune, errors = reconciler.desired_records(
+            "example.com", ["blog.example.com", "other.org"], ["example.com"]
+        )
+
+        assert errors == [] and prune is False
+        assert sorted((item.source, item.payload["type"], item.payload["name"], item.payload["content"])
+                      for item in records) == [
+            ("file", "A", "mail.example.com", "192.0.2.10"),
+            ("file", "MX", "example.com", "mx.example.net"),
+            ("mail:example.com", "TXT", "example.com", SPF),
+            ("wordpress:blog.example.com", "CNAME", "blog.example.com", "tunnel-1.cfargotunnel.com"),
+        ]
+
+    def test_zone_sources(self, tmp_path):
+        """Test the sources a zone needs domains for come from its zone file."""
+        (tmp_path / "example.com.yml").write_text("sources: [wordpress]\nrecords: []\n")
+        reconciler = make_reconciler(FakeZone(), tmp_path)
+
+        assert reconciler.zone_sources("example.com") == ["wordpress"]
+        assert reconciler.zone_sources("other.org") == ["wordpress", "mail"]
+
+    def test_zone_file_errors(self, tmp_path):
+        """Test invalid and duplicate records are reported."""
+        path = tmp_path / "example.com.yml"
+        path.write_text(
+            "prune: true\n"
+            "records:\n"
+            "  - {type: A, name: www, content: 192.0.2.1}\n"
+            "  - {type: A, name: www, content: 192.0.2.1}\n"
+            "  - {type: A, name: bad, content: not-an-ip}\n"
+        )
+
+        records, options, errors = load_zone_file(str(path), "example.com")
+
+        assert len(records) == 1
+        assert options["prune"] is True
+        assert errors == [
+            "Record 2 (A www): Duplicate of record 1",
+            "Record 3 (A bad): Invalid IPv4 address: not-an-ip",
+        ]
+
+    def test_dkim_key_file(self, tmp_path, monkeypatch):
+        """Test DKIM records are read from opendkim selector files."""
+        monkeypatch.setattr(cloudflare_dns_plan_service.settings, "dns_mail_dkim_dir", str(tmp_path))
+        (tmp_path / "example.com").mkdir()
+        (tmp_path / "example.com" / "default.txt").write_text(
+            'default._domainkey\tIN\tTXT\t( "v=DKIM1; k=rsa; "\n\t  "p=MIGfMA0" )  ; ----- DKIM key\n'
+        )
+
+        records = cloudflare_dns_plan_service.mail_domain_records(["example.com"], "example.com")
+
+        assert records[-1].payload["name"] == "default._domainkey.example.com"
+        assert records[-1].payload["content"] == "v=DKIM1; k=rsa; p=MIGfMA0"
+
+
+@pytest.mark.asyncio
+class TestDNSZoneReconciler:
+    """Tests for planning and applying against the API."""
+
+    async def test_plan_then_apply_converges(self, tmp_path, monkeypatch):
+        """Test apply writes the plan and a second plan is empty."""
+        monkeypatch.setattr(site_dns_service.settings, "cloudflare_tunnel_id", "tunnel-1")
+        zone = FakeZone([
+            record("blog-a", "A", "blog.example.com", "192.0.2.1"),
+            record("mx", "MX", "example.com", "mx.old-host.net", priority=10),
+        ])
+        reconciler = make_reconciler(zone, tmp_path)
+
+        plan = await reconciler.plan("example.com", ["blog.example.com"], ["example.com"])
+        result = await reconciler.apply(plan)
+        again = await reconciler.plan("example.com", ["blog.example.com"], ["example.com"])
+
+        assert (result.created, result.updated, result.deleted, result.errors) == (2, 1, 1, [])
+        assert zone.writes[0] == ("DELETE", "blog-a")  # Before the CNAME is created
+        assert again.changes == []
+        assert again.plan_id != plan.plan_id
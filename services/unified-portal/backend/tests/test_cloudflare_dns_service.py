@@ -0,0 +1,133 @@
+"""Tests for the Cloudflare DNS record mirror (against an httpx mock transport)."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.services import cloudflare_dns_service
+from app.services.cloudflare_api_service import CloudflareClient
+from app.services.cloudflare_dns_service import DNSRecordMirror
+
+
+def make_records(count):
+    """Build count A records in example.com."""
+    return [
+        {
+            "id": f"rec-{i}",
+            "type": "A",
+            "name": f"host{i}.example.com",
+            "content": f"192.0.2.{i % 250}",
+            "ttl": 1,
+            "proxied": False,
+            "modified_on": f"2026-01-01T00:00:{i % 60:02d}Z",
+        }
+        for i in range(count)
+    ]
+
+
+def make_mirror(records, calls, ttl=300):
+    """Create a mirror serving records through a paginated mock API."""
+    def handler(request):
+        calls.append(request)
+        page = int(request.url.params["page"])
+        per_page = int(request.url.params["per_page"])
+        total_pages = max(1, -(-len(records) // per_page))
+        return httpx.Response(200, json={
+            "success": True,
+            "errors": [],
+            "result": records[(page - 1) * per_page:page * per_page],
+            "result_info": {"page": page, "per_page": per_page, "total_pages": total_pages},
+        })
+
+    client = CloudflareClient(api_token="test-token", transport=httpx.MockTransport(handler))
+    return DNSRecordMirror(client=client, ttl=ttl)
+
+
+@pytest.mark.asyncio
+class TestDNSRecordMirror:
+    """Tests for record loading, filtering and write-through."""
+
+    async def test_loads_every_page(self, monkeypatch):
+        """Test zones larger than one page are mirrored completely."""
+        monkeypatch.setattr(cloudflare_dns_service, "RECORDS_PER_PAGE", 10)
+        records = make_records(35)
+        calls = []
+        mirror = make_mirror(records, calls)
+
+        listed = await mirror.list_records("zone-1")
+        await mirror.list_records("zone-1", record_type="A")
+
+        assert len(listed) == 35
+        assert sorted(int(request.url.params["page"]) for request in calls) == [1, 2, 3, 4]
+
+    async def test_filters_from_memory(self):
+        """Test type and name filters are applied to the mirror."""
+        records = make_records(3) + [
+            {"id": "mx-1", "type": "MX", "name": "example.com", "content": "mail.example.com",
+             "ttl": 1, "priority": 10, "modified_on": "2026-02-01T00:00:00Z"},
+        ]
+        calls = []
+        mirror = make_mirror(records, calls)
+
+        mx = await mirror.list_records("zone-1", record_type="mx")
+        host = await mirror.list_records("zone-1", name="HOST1.example.com.")
+
+        assert [record["id"] for record in mx] == ["mx-1"]
+        assert [record["id"] for record in host] == ["rec-1"]
+        assert len(calls) == 1
+
+    async def test_write_through_updates_watermark(self):
+        """Test upsert and remove change the mirror and its ETag."""
+        mirror = make_mirror(make_records(2), [])
+        zone = await mirror.get_zone("zone-1")
+        etag = zone.etag
+
+        mirror.upsert("zone-1", {"id": "rec-9", "type": "TXT", "name": "example.com",
+                                 "content": "v=spf1 -all", "ttl": 1, "modified_on": "2026-03-01T00:00:00Z"})
+        assert zone.etag != etag
+        assert zone.modified_on == "2026-03-01T00:00:00Z"
+        assert len(await mirror.list_records("zone-1", record_type="TXT")) == 1
+
+        mirror.remove("zone-1", "rec-9")
+        assert zone.etag == etag
+
+    async def test_stale_zone_reloads_in_background(self):
+        """Test stale records are served while a reload runs."""
+        records = make_records(2)
+        calls = []
+        mirror = make_mirror(records, calls, ttl=0)
+        await mirror.get_zone("zone-1")
+
+        records.append(make_records(3)[2])
+        stale = await mirror.list_records("zone-1")
+        await asyncio.sleep(0.05)
+        fresh = await mirror.list_records("zone-1")
+
+        assert len(stale) == 2
+        assert len(fresh) == 3
+
+    async def test_writes_during_load_are_kept(self):
+        """Test upsert/remove made while a load is in flight survive it."""
+        records = make_records(3)
+        release = asyncio.Event()
+
+        async def handler(request):
+            await release.wait()
+            return httpx.Response(200, json={
+                "success": True, "errors": [], "result": records,
+                "result_info": {"page": 1, "per_page": 100, "total_pages": 1},
+            })
+
+        client = CloudflareClient(api_token="test-token", transport=httpx.MockTransport(handler))
+        mirror = DNSRecordMirror(client=client)
+        load = asyncio.ensure_future(mirror.get_zone("zone-1"))
+        await asyncio.sleep(0.01)
+
+        mirror.upsert("zone-1", {**records[0], "content": "198.51.100.1"})
+        mirror.remove("zone-1", "rec-1")
+        release.set()
+        zone = await load
+
+        assert zone.records["rec-0"]["content"] == "198.51.100.1"
+        assert "rec-1" not in zone.records and "rec-2" in zone.records
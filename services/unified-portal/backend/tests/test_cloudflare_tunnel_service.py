@@ -0,0 +1,88 @@
+"""Tests for batched tunnel ingress updates (against an httpx mock transport)."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.services.cloudflare_api_service import CloudflareClient
+from app.services.cloudflare_tunnel_service import CloudflareTunnelService
+
+CATCH_ALL = {"service": "http_status:404"}
+
+
+class FakeTunnel:
+    """In-memory tunnel configuration API with versioning."""
+
+    def __init__(self, hostnames=()):
+        self.version = 1
+        self.ingress = [{"hostname": hostname, "service": "http://nginx:80"} for hostname in hostnames] + [CATCH_ALL]
+        self.calls = []
+
+    def handler(self, request):
+        self.calls.append(request.method)
+        if request.method == "PUT":
+            self.ingress = json.loads(request.content)["config"]["ingress"]
+            self.version += 1
+        return httpx.Response(200, json={"success": True, "errors": [], "result": self.result()})
+
+    def result(self):
+        return {"tunnel_id": "tunnel-1", "version": self.version, "config": {"ingress": self.ingress}}
+
+    def hostnames(self):
+        return [rule.get("hostname") for rule in self.ingress]
+
+
+def make_service(tunnel):
+    """Create a tunnel service talking to tunnel."""
+    service = CloudflareTunnelService(account_id="account-1", tunnel_id="tunnel-1", api_token="test-token")
+    service.client = CloudflareClient(api_token="test-token", transport=httpx.MockTransport(tunnel.handler))
+    service.config_manager.client = service.client
+    service.config_manager.window = 0.01
+    return service
+
+
+@pytest.mark.asyncio
+class TestTunnelConfigManager:
+    """Tests for serialized, batched ingress changes."""
+
+    async def test_concurrent_adds_batched_into_one_write(self):
+        """Test concurrent adds all land, in one GET and one PUT."""
+        tunnel = FakeTunnel(["existing.example.com"])
+        service = make_service(tunnel)
+
+        await asyncio.gather(*(service.add_public_hostname(f"site{i}.example.com") for i in range(5)))
+
+        assert tunnel.calls == ["GET", "PUT"]
+        assert tunnel.hostnames() == ["existing.example.com"] + [f"site{i}.example.com" for i in range(5)] + [None]
+        assert tunnel.ingress[1]["originRequest"] == {"httpHostHeader": "site0.example.com"}
+
+    async def test_mixed_batch_and_noops(self):
+        """Test adds and removes share a write; no-op batches skip the PUT."""
+        tunnel = FakeTunnel(["old.example.com", "keep.example.com"])
+        service = make_service(tunnel)
+
+        await asyncio.gather(
+            service.add_public_hostname("new.example.com"),
+            service.remove_public_hostname("old.example.com"),
+            service.add_public_hostname("keep.example.com"),
+        )
+        await service.remove_public_hostname("missing.example.com")
+
+        assert tunnel.hostnames() == ["keep.example.com", "new.example.com", None]
+        assert tunnel.calls == ["GET", "PUT", "GET"]
+
+    async def test_rebases_on_outside_change(self):
+        """Test changes made elsewhere since the last write are preserved."""
+        tunnel = FakeTunnel()
+        service = make_service(tunnel)
+        await service.add_public_hostname("a.example.com")
+
+        # Edited in the dashboard meanwhile
+        tunnel.ingress.insert(0, {"hostname": "dashboard.example.com", "service": "http://nginx:80"})
+        tunnel.version += 1
+        result = await service.add_public_hostname("b.example.com")
+
+        assert tunnel.hostnames() == ["dashboard.example.com", "a.example.com", "b.example.com", None]
+        assert result["version"] == tunnel.version
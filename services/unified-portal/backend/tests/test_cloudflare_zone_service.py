@@ -0,0 +1,75 @@
+"""Tests for the Cloudflare zone cache (against an httpx mock transport)."""
+
+import httpx
+import pytest
+
+from app.services.cloudflare_api_service import CloudflareClient, CloudflareNotFoundError
+from app.services.cloudflare_zone_service import CloudflareZoneCache
+
+ZONES = [
+    {"id": "zone-1", "name": "example.com", "status": "active"},
+    {"id": "zone-2", "name": "example.co.uk", "status": "active"},
+    {"id": "zone-3", "name": "shop.example.co.uk", "status": "active"},
+]
+
+
+def make_cache(zones, calls, ttl=3600):
+    """Create a zone cache served two zones per page from zones."""
+    def handler(request):
+        calls.append(request)
+        page = int(request.url.params["page"])
+        total_pages = (len(zones) + 1) // 2
+        return httpx.Response(200, json={
+            "success": True,
+            "errors": [],
+            "result": zones[(page - 1) * 2:page * 2],
+            "result_info": {"page": page, "total_pages": total_pages},
+        })
+
+    client = CloudflareClient(api_token="test-token", transport=httpx.MockTransport(handler))
+    return CloudflareZoneCache(client=client, ttl=ttl)
+
+
+@pytest.mark.asyncio
+class TestCloudflareZoneCache:
+    """Tests for zone loading, lookup and invalidation."""
+
+    async def test_loads_all_pages_once(self):
+        """Test every page is loaded and repeated lookups stay in memory."""
+        calls = []
+        cache = make_cache(ZONES, calls)
+
+        zones = await cache.list_zones()
+        assert await cache.get_zone_id("example.com") == "zone-1"
+        assert await cache.get_zone_id("www.example.com") == "zone-1"
+
+        assert [zone["name"] for zone in zones] == ["example.co.uk", "example.com", "shop.example.co.uk"]
+        assert len(calls) == 2
+
+    async def test_longest_suffix_match(self):
+        """Test nested zones win over their parent zone."""
+        cache = make_cache(ZONES, [])
+
+        assert await cache.get_zone_id("www.shop.example.co.uk") == "zone-3"
+        assert await cache.get_zone_id("blog.example.co.uk") == "zone-2"
+
+    async def test_miss_raises_not_found(self):
+        """Test hostnames outside every zone raise a 404 error."""
+        cache = make_cache(ZONES, [])
+
+        with pytest.raises(CloudflareNotFoundError) as exc_info:
+            await cache.get_zone_id("example.org")
+        assert exc_info.value.status_code == 404
+
+    async def test_invalidate_picks_up_new_zone(self):
+        """Test invalidate() reloads zones on the next lookup."""
+        zones = list(ZONES)
+        calls = []
+        cache = make_cache(zones, calls)
+        await cache.list_zones()
+
+        zones.append({"id": "zone-4", "name": "example.org", "status": "pending"})
+        cache.invalidate()
+
+        assert await cache.get_zone_id("example.org") == "zone-4"
+        assert len(calls) == 4
@@ -0,0 +1,76 @@
+"""Tests for the Cloudflare zone settings cache (against an httpx mock transport)."""
+
+import httpx
+import pytest
+
+from app.services.cloudflare_api_service import CloudflareClient
+from app.services.cloudflare_zone_settings_service import ZoneSettingsCache, summarize_ssl_settings
+
+ZONE_SETTINGS = [
+    {"id": "ssl", "value": "strict"},
+    {"id": "min_tls_version", "value": "1.2"},
+    {"id": "tls_1_3", "value": "zrt"},
+    {"id": "always_use_https", "value": "on"},
+    {"id": "security_header", "value": {"strict_transport_security": {
+        "enabled": True, "max_age": 31536000, "include_subdomains": True, "preload": False,
+    }}},
+]
+
+
+def make_cache(calls, ttl=300):
+    """Create a settings cache backed by a mock bulk /settings endpoint."""
+    def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(200, json={"success": True, "errors": [], "result": ZONE_SETTINGS})
+
+    client = CloudflareClient(api_token="test-token", transport=httpx.MockTransport(handler))
+    return ZoneSettingsCache(client=client, ttl=ttl)
+
+
+class TestSummarizeSSLSettings:
+    """Tests for extracting TLS settings."""
+
+    def test_summary_fields(self):
+        """Test SSL mode, TLS and HSTS fields are extracted."""
+        summary = summarize_ssl_settings({setting["id"]: setting["value"] for setting in ZONE_SETTINGS})
+
+        assert summary == {
+            "ssl_mode": "strict",
+            "min_tls_version": "1.2",
+            "tls_1_3": "zrt",
+            "always_use_https": True,
+            "hsts_enabled": True,
+            "hsts_max_age": 31536000,
+            "hsts_include_subdomains": True,
+            "hsts_preload": False,
+        }
+
+    def test_missing_settings(self):
+        """Test zones without HSTS or SSL settings get defaults."""
+        summary = summarize_ssl_settings({})
+
+        assert summary["ssl_mode"] == "unknown"
+        assert summary["hsts_enabled"] is False
+        assert summary["always_use_https"] is False
+
+
+@pytest.mark.asyncio
+class TestZoneSettingsCache:
+    """Tests for per-zone caching."""
+
+    async def test_one_bulk_request_per_zone(self):
+        """Test settings are fetched once per zone until refresh."""
+        calls = []
+        cache = make_cache(calls)
+
+        first = await cache.get_settings("zone-1")
+        await cache.get_settings("zone-1")
+        await cache.get_settings("zone-2")
+        await cache.get_settings("zone-1", refresh=True)
+
+        assert first["ssl"] == "strict"
+        assert calls == [
+            "/client/v4/zones/zone-1/settings",
+            "/client/v4/zones/zone-2/settings",
+            "/client/v4/zones/zone-1/settings",
+        ]
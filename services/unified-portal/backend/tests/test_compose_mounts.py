@@ -0,0 +1,31 @@
+"""Tests that the paths the portal writes are writable in docker-compose.yml."""
+
+import os
+
+import pytest
+import yaml
+
+from app.config import get_settings
+
+COMPOSE_FILE = os.path.join(os.path.dirname(__file__), "..", "..", "docker-compose.yml")
+
+
+def backend_mount(path):
+    """Return (container path, read-only) of the bind mount a path falls under."""
+    with open(COMPOSE_FILE, encoding="utf-8") as f:
+        volumes = yaml.safe_load(f)["services"]["backend"]["volumes"]
+    best = None
+    for volume in volumes:
+        parts = volume.split(":")
+        target, read_only = parts[1], parts[2:] == ["ro"]
+        if os.path.commonpath([target, path]) == target and (best is None or len(target) > len(best[0])):
+            best = (target, read_only)
+    return best
+
+
+@pytest.mark.parametrize("setting", ["backup_pipeline_root", "backup_restore_root", "dedup_store_path"])
+def test_write_paths_mounted_writable(setting):
+    """Test each output directory lies on a writable bind mount."""
+    mount = backend_mount(getattr(get_settings(), setting))
+
+    assert mount is not None and mount[1] is False
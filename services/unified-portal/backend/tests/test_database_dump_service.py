@@ -0,0 +1,85 @@
+"""Tests for the streaming dump service (against stand-in shell commands)."""
+
+import zlib
+
+import pytest
+
+from app.services.database_dump_service import GZIP_WBITS, DatabaseDumpService
+
+
+class ShellDumpService(DatabaseDumpService):
+    """Dump service running a shell script instead of docker exec."""
+
+    def __init__(self, script):
+        super().__init__(container="test", password="test")
+        self.script = script
+
+    def _docker_cmd(self, *args, stdin=False):
+        return ["sh", "-c", self.script]
+
+
+async def collect(service, compression):
+    """Collect export chunks, returning (data, error)."""
+    data = b""
+    try:
+        async for chunk in service.export_database("wp_test", compression=compression):
+            data += chunk
+    except RuntimeError as e:
+        return data, e
+    return data, None
+
+
+async def chunks(*parts):
+    """Async iterator over upload chunks."""
+    for part in parts:
+        yield part
+
+
+@pytest.mark.asyncio
+class TestDatabaseDumpService:
+    """Tests for export failure handling and import errors."""
+
+    async def test_export_success_is_complete_gzip(self):
+        """Test a clean dump ends with the gzip trailer."""
+        service = ShellDumpService("printf 'CREATE TABLE t (id int);\\n-- Dump completed\\n'")
+
+        data, error = await collect(service, "gzip")
+
+        assert error is None
+        assert zlib.decompress(data, GZIP_WBITS) == b"CREATE TABLE t (id int);\n-- Dump completed\n"
+
+    @pytest.mark.parametrize("compression", ["gzip", "none"])
+    async def test_failed_export_is_not_a_valid_file(self, compression):
+        """Test a failed dump raises and never emits the final chunk."""
+        service = ShellDumpService("head -c 200000 /dev/zero; echo 'Lost connection' >&2; exit 2")
+
+        data, error = await collect(service, compression)
+
+        assert "exit 2" in str(error) and "Lost connection" in str(error)
+        if compression == "gzip":
+            decompressor = zlib.decompressobj(GZIP_WBITS)
+            decompressor.decompress(data)
+            assert not decompressor.eof  # Truncated: no gzip trailer
+        else:
+            assert len(data) < 200000
+
+    async def test_failed_import_reports_stderr(self):
+        """Test a failing mysql import is recorded with its stderr."""
+        service = ShellDumpService("cat >/dev/null; echo 'ERROR 1064 syntax' >&2; exit 1")
+
+        with pytest.raises(RuntimeError, match="ERROR 1064"):
+            await service.import_database("wp_test", chunks(b"SELECT 1;"), compression="none", create=False)
+
+        progress = service.get_import_progress("wp_test")
+        assert progress["status"] == "failed"
+        assert progress["bytes_written"] == len(b"SELECT 1;")
+
+    @pytest.mark.parametrize("db_name", ["mysql", "information_schema", "Performance_Schema", "sys"])
+    async def test_system_schemas_rejected(self, db_name):
+        """Test system schemas cannot be imported into or cloned onto."""
+        service = ShellDumpService("cat >/dev/null")
+
+        with pytest.raises(ValueError, match="System schema not allowed"):
+            await service.import_database(db_name, chunks(b"SELECT 1;"), compression="none", create=False)
+        with pytest.raises(ValueError, match="System schema not allowed"):
+            await service.clone_database("wp_test", db_name)
@@ -76,3 +76,96 @@ class TestDatabaseStats:
         assert "total_databases" in data
         assert "total_size_mb" in data
         assert "mariadb_version" in data
+
+
+class TestDatabasePools:
+    """Tests for GET /api/v1/database/pools endpoint."""
+
+    def test_get_database_pools(self, client):
+        """Test connection pool metrics retrieval."""
+        response = client.get("/api/v1/database/pools")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert "portal" in data
+        assert "blog" in data
+        assert "checked_out" in data["portal"]
+
+
+class TestDatabaseExportImport:
+    """Tests for database export/import streaming endpoints."""
+
+    @pytest.mark.parametrize("method, path", [
+        ("get", "/api/v1/database/wp_example/export"),
+        ("post", "/api/v1/database/wp_example/import"),
+        ("post", "/api/v1/database/wp_example/clone"),
+    ])
+    def test_requires_auth(self, client, method, path):
+        """Test export, import and clone without authentication."""
+        response = getattr(client, method)(path)
+
+        assert response.status_code in (401, 403)
+
+    def test_import_progress_not_found(self, client):
+        """Test import progress when no import has run."""
+        response = client.get("/api/v1/database/nonexistent_db/import/progress")
+
+        assert response.status_code == 404
+
+
+class TestDatabaseProvision:
+    """Tests for POST /api/v1/database/provision endpoint."""
+
+    def test_provision_requires_auth(self, client):
+        """Test provisioning without authentication."""
+        response = client.post(
+            "/api/v1/database/provision",
+            json={"target_system": "blog", "sites": [{"database_name": "wp_example"}], "dry_run": True},
+        )
+
+        assert response.status_code in (401, 403)
+
+
+class TestDatabaseHealth:
+    """Tests for MariaDB health endpoints."""
+
+    def test_get_database_health(self, client):
+        """Test health sample retrieval."""
+        response = client.get("/api/v1/database/health")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert "innodb_buffer_pool_hit_ratio" in data
+        assert "threads_running" in data
+        assert "tmp_disk_table_ratio" in data
+
+    def test_get_database_health_history(self, client):
+        """Test health history retrieval."""
+        client.get("/api/v1/database/health")
+        response = client.get("/api/v1/database/health/history")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert isinstance(data, list)
+        assert len(data) >= 1
+
+
+class TestIndexAdvisor:
+    """Tests for index advisor endpoints."""
+
+    def test_get_index_recommendations(self, client):
+        """Test index recommendation listing."""
+        response = client.get("/api/v1/database/index-advisor")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert isinstance(data, list)
+        if len(data) > 0:
+            assert "ddl" in data[0]
+            assert "LOCK=NONE" in data[0]["ddl"]
+
+    def test_get_index_job_not_found(self, client):
+        """Test index job status with invalid ID."""
+        response = client.get("/api/v1/database/index-advisor/jobs/nonexistent")
+
+        assert response.status_code == 404
@@ -0,0 +1,123 @@
+"""Tests for batched database provisioning."""
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.database import DatabaseProvisionRequest
+from app.services.database_service import DatabaseService
+
+
+class RecordingService(DatabaseService):
+    """Provisioning service that records batches instead of connecting."""
+
+    def __init__(self, existing=()):
+        super().__init__(db=None)
+        self.existing = set(existing)
+        self.batches = []
+        self.stored = None
+
+    def _existing_accounts(self, target, accounts):
+        return {account for account in accounts if account in self.existing}
+
+    def _execute_batch(self, target, statements):
+        self.batches.append(statements)
+
+    def _store_credentials(self, request, passwords):
+        self.stored = dict(passwords)
+
+
+def provision_request(**site):
+    """Provisioning request for one blog site."""
+    return DatabaseProvisionRequest(target_system="blog", sites=[{"database_name": "wp_site", **site}])
+
+
+class TestProvision:
+    """Tests for password handling and request validation."""
+
+    def test_generated_password_never_resets_existing_user(self):
+        """Test re-runs without a password leave existing users alone."""
+        service = RecordingService(existing={("wp_site_user", "%")})
+
+        result = service.provision(provision_request(username="wp_site_user"))
+
+        assert not any(stmt.startswith("ALTER USER") for stmt in result.statements)
+        assert any(stmt.startswith("CREATE USER IF NOT EXISTS") for stmt in result.statements)
+        assert service.stored == {}  # Generated password was never applied
+
+    def test_generated_password_stored_for_new_user(self):
+        """Test a generated password is stored when the user is created."""
+        service = RecordingService()
+
+        service.provision(provision_request(username="wp_site_user"))
+
+        assert list(service.stored) == ["wp_site"]
+
+    def test_explicit_password_is_applied(self):
+        """Test a supplied password is re-applied to an existing user."""
+        service = RecordingService(existing={("wp_site_user", "%")})
+
+        result = service.provision(provision_request(username="wp_site_user", password="s3cret-password"))
+
+        assert "ALTER USER 'wp_site_user'@'%' IDENTIFIED BY '********'" in result.statements
+        assert service.stored == {"wp_site": "s3cret-password"}
+
+    def test_shared_account_gets_one_password(self):
+        """Test sites sharing a user store the password the user was created with."""
+        service = RecordingService()
+        request = DatabaseProvisionRequest(
+            target_system="blog",
+            sites=[
+                {"database_name": "wp_one", "username": "wp_shared"},
+                {"database_name": "wp_two", "username": "wp_shared"},
+                {"database_name": "wp_three", "username": "wp_shared", "password": "s3cret-password"},
+            ],
+        )
+
+        service.provision(request)
+
+        assert service.stored == {name: "s3cret-password" for name in ("wp_one", "wp_two", "wp_three")}
+
+    def test_shared_account_generated_password(self):
+        """Test a generated password is reused for every site of the account."""
+        service = RecordingService()
+        request = DatabaseProvisionRequest(
+            target_system="blog",
+            sites=[
+                {"database_name": "wp_one", "username": "wp_shared"},
+                {"database_name": "wp_two", "username": "wp_shared"},
+            ],
+        )
+
+        service.provision(request)
+
+        assert service.stored["wp_one"] == service.stored["wp_two"]
+
+    def test_conflicting_account_passwords_rejected(self):
+        """Test one account cannot be given two passwords in a request."""
+        with pytest.raises(ValidationError, match="Conflicting passwords for wp_shared@%"):
+            DatabaseProvisionRequest(
+                target_system="blog",
+                sites=[
+                    {"database_name": "wp_one", "username": "wp_shared", "password": "first-password"},
+                    {"database_name": "wp_two", "username": "wp_shared", "password": "other-password"},
+                ],
+            )
+
+    def test_duplicate_database_names_rejected(self):
+        """Test a request naming the same database twice is invalid."""
+        with pytest.raises(ValidationError, match="Duplicate database_name"):
+            DatabaseProvisionRequest(
+                target_system="blog",
+                sites=[{"database_name": "wp_site"}, {"database_name": "wp_site", "username": "other"}],
+            )
+
+    def test_connection_failure_is_value_error(self, monkeypatch):
+        """Test an unreachable server surfaces as ValueError, not a crash."""
+        service = DatabaseService(db=None)
+        monkeypatch.setattr(
+            service, "_connection_params",
+            lambda target: {"host": "127.0.0.1", "port": 1, "user": "root", "password": "", "connect_timeout": 1},
+        )
+
+        with pytest.raises(ValueError, match="Batch execution failed"):
+            service._execute_batch("blog", ["SELECT 1"])
@@ -0,0 +1,54 @@
+"""Tests for the deduplicating backup store."""
+
+import io
+import os
+
+from backup_tools.dedup_store import MAX_CHUNK_SIZE, MIN_CHUNK_SIZE, DedupStore, iter_chunks
+
+
+class TestIterChunks:
+    """Tests for streaming content-defined chunking."""
+
+    def test_boundaries_do_not_depend_on_read_size(self):
+        """Test chunks are the same whatever block size the stream is read in."""
+        data = os.urandom(3 * 1024 * 1024)
+
+        chunks = list(iter_chunks(io.BytesIO(data)))
+
+        assert b"".join(chunks) == data
+        assert all(MIN_CHUNK_SIZE < len(chunk) <= MAX_CHUNK_SIZE for chunk in chunks[:-1])
+        assert list(iter_chunks(io.BytesIO(data), block_size=50_000)) == chunks
+
+    def test_insertion_keeps_later_chunks(self):
+        """Test a prefix insertion only changes the first chunks."""
+        data = os.urandom(2 * 1024 * 1024)
+
+        before = list(iter_chunks(io.BytesIO(data)))
+        after = list(iter_chunks(io.BytesIO(b"new header\n" + data)))
+
+        assert len(set(before) & set(after)) >= len(before) - 2
+
+
+class TestDedupStore:
+    """Tests for snapshot and restore."""
+
+    def test_snapshot_restore_round_trip(self, tmp_path):
+        """Test a second snapshot stores only the changed chunks and both restore."""
+        source = tmp_path / "mail" / "example.com" / "user" / "cur"
+        source.mkdir(parents=True)
+        big = os.urandom(1024 * 1024)
+        (source / "1.eml").write_bytes(big)
+        (source / "2.eml").write_bytes(b"Subject: hello\n\nbody\n")
+        store = DedupStore(str(tmp_path / "store"))
+
+        first = store.snapshot(str(tmp_path / "mail"))
+        (source / "1.eml").write_bytes(big + b"appended")
+        os.utime(source / "1.eml", (1, 1))
+        second = store.snapshot(str(tmp_path / "mail"))
+        store.restore(first["id"], str(tmp_path / "restore"), prefix="example.com/user")
+
+        restored = tmp_path / "restore" / "example.com" / "user" / "cur"
+        assert (restored / "1.eml").read_bytes() == big
+        assert (restored / "2.eml").read_bytes() == b"Subject: hello\n\nbody\n"
+        assert second["file_count"] == 2
+        assert second["new_bytes"] < MAX_CHUNK_SIZE
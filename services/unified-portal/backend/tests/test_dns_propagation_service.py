@@ -0,0 +1,127 @@
+"""Tests for DNS propagation checks (against a local stand-in DoH resolver)."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.dns_propagation_service import DNSPropagationChecker, DNSPropagationWatcher
+
+RESOLVERS = {
+    "Local-1": "http://resolver-1.test/dns-query",
+    "Local-2": "http://resolver-2.test/dns-query",
+    "Local-3": "http://resolver-3.test/dns-query",
+}
+
+
+class StandInResolver:
+    """DoH JSON resolver answering from an in-memory zone."""
+
+    def __init__(self, answers, delay=0.0, lagging=(), ttl=300):
+        self.answers = answers  # (name, type) -> list of data
+        self.ttl = ttl
+        self.delay = delay
+        self.lagging = set(lagging)  # Hosts that have not seen the record yet
+        self.queries = 0
+
+    async def handler(self, request):
+        self.queries += 1
+        await asyncio.sleep(self.delay)
+        if request.url.host in self.lagging:
+            return httpx.Response(200, json={"Status": 3, "Authority": [{"type": 6, "TTL": 1800}]})
+        key = (request.url.params["name"], request.url.params["type"])
+        type_number = {"A": 1, "CNAME": 5, "TXT": 16}[key[1]]
+        return httpx.Response(200, json={
+            "Status": 0,
+            "Answer": [
+                {"name": key[0], "type": type_number, "TTL": self.ttl, "data": data}
+                for data in self.answers.get(key, [])
+            ],
+        })
+
+
+def make_checker(resolver):
+    """Create a checker whose resolvers are all answered by resolver."""
+    return DNSPropagationChecker(
+        resolvers=RESOLVERS, timeout=2.0, transport=httpx.MockTransport(resolver.handler)
+    )
+
+
+@pytest.mark.asyncio
+class TestDNSPropagationChecker:
+    """Tests for concurrent resolver checks."""
+
+    async def test_resolvers_queried_concurrently(self):
+        """Test a check takes about one resolver's latency, not the sum."""
+        resolver = StandInResolver({("www.example.com", "A"): ["192.0.2.1"]}, delay=0.2)
+        loop = asyncio.get_running_loop()
+
+        start = loop.time()
+        result = await make_checker(resolver).check("A", "www.example.com", "192.0.2.1")
+
+        assert loop.time() - start < 0.5
+        assert result["propagated"] is True
+        assert [server["server"] for server in result["servers"]] == list(RESOLVERS)
+
+    async def test_expected_content_normalized(self):
+        """Test trailing dots and TXT quotes do not defeat the comparison."""
+        resolver = StandInResolver({
+            ("blog.example.com", "CNAME"): ["Tunnel.cfargotunnel.com."],
+            ("example.com", "TXT"): ['"v=spf1 -all"'],
+        })
+        checker = make_checker(resolver)
+
+        assert (await checker.check("CNAME", "blog.example.com", "tunnel.cfargotunnel.com"))["propagated"]
+        assert (await checker.check("TXT", "example.com", "v=spf1 -all"))["propagated"]
+
+    async def test_lagging_resolver_not_propagated(self):
+        """Test one resolver without the record fails the check."""
+        resolver = StandInResolver({("www.example.com", "A"): ["192.0.2.1"]}, lagging={"resolver-2.test"})
+
+        result = await make_checker(resolver).check("A", "www.example.com")
+
+        assert result["propagated"] is False
+        assert [server["status"] for server in result["servers"]] == ["success", "failed", "success"]
+
+    async def test_answer_ttl_reported(self):
+        """Test each resolver reports the answer TTL, or the SOA TTL when empty."""
+        resolver = StandInResolver(
+            {("www.example.com", "A"): ["192.0.2.1"]}, lagging={"resolver-2.test"}, ttl=120
+        )
+
+        result = await make_checker(resolver).check("A", "www.example.com")
+
+        assert [server["ttl"] for server in result["servers"]] == [120, 1800, 120]
+
+
+@pytest.mark.asyncio
+class TestDNSPropagationWatcher:
+    """Tests for background watch jobs."""
+
+    async def test_watch_streams_until_propagated(self):
+        """Test subscribers get each check and the final state."""
+        resolver = StandInResolver({("www.example.com", "A"): ["192.0.2.1"]}, lagging={"resolver-3.test"})
+        watcher = DNSPropagationWatcher(make_checker(resolver))
+
+        watch = watcher.start("A", "www.example.com", "192.0.2.1", interval=0.05, timeout=5)
+        events = []
+        async for update in watcher.subscribe(watch["watch_id"]):
+            events.append(update)
+            if update["attempts"] == 2:
+                resolver.lagging.clear()
+
+        assert events[-1]["status"] == "propagated"
+        assert events[-1]["attempts"] == 3
+        assert all(event["status"] == "watching" for event in events[:-1])
+
+    async def test_watch_expires(self):
+        """Test a watch gives up at its deadline."""
+        resolver = StandInResolver({})
+        watcher = DNSPropagationWatcher(make_checker(resolver))
+
+        watch = watcher.start("A", "missing.example.com", interval=0.05, timeout=0.12)
+        events = [update async for update in watcher.subscribe(watch["watch_id"])]
+
+        assert events[-1]["status"] == "expired"
+        assert watcher.get(watch["watch_id"])["finished_at"] is not None
+        assert watcher.active_count() == 0
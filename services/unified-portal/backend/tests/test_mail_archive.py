@@ -0,0 +1,76 @@
+"""Round-trip tests for indexed mail archives (needs the zstd and tar binaries)."""
+
+import shutil
+import subprocess
+
+import pytest
+
+from backup_tools.mail_archive import ARCHIVE_NAME, extract_mailbox, load_index, write_archive
+
+pytestmark = pytest.mark.skipif(shutil.which("zstd") is None, reason="zstd not installed")
+
+
+def make_maildir(root, user, messages):
+    """Create a Maildir++ mailbox with INBOX and a Sent folder."""
+    for folder, name, body in messages:
+        path = root / "example.com" / user / folder / "cur"
+        path.mkdir(parents=True, exist_ok=True)
+        (path / name).write_bytes(body)
+
+
+@pytest.fixture
+def backup_dir(tmp_path):
+    """Backup directory with an indexed archive of two mailboxes."""
+    mail_dir = tmp_path / "mail"
+    make_maildir(mail_dir, "alice", [
+        ("", "1.eml", b"Subject: inbox\n\nalice inbox\n"),
+        (".Sent", "2.eml", b"Subject: sent\n\nalice sent\n"),
+    ])
+    make_maildir(mail_dir, "bob", [("", "3.eml", b"Subject: bob\n\nbob inbox\n")])
+    backup = tmp_path / "backup"
+    backup.mkdir()
+    write_archive(str(mail_dir), str(backup), level=1)
+    return backup
+
+
+class TestMailArchive:
+    """Tests for writing and selectively extracting mail archives."""
+
+    def test_extract_one_mailbox(self, backup_dir, tmp_path):
+        """Test one mailbox is restored from its frame and the other is not touched."""
+        target = tmp_path / "restore"
+
+        result = extract_mailbox(str(backup_dir), "Alice@example.com", str(target))
+
+        restored = sorted(p.relative_to(target).as_posix() for p in target.rglob("*.eml"))
+        assert restored == ["example.com/alice/.Sent/cur/2.eml", "example.com/alice/cur/1.eml"]
+        assert (target / "example.com/alice/cur/1.eml").read_bytes() == b"Subject: inbox\n\nalice inbox\n"
+        assert result["source"] == "archive"
+        assert result["read_bytes"] == load_index(str(backup_dir))["members"]["alice@example.com"]["length"]
+
+    def test_extract_one_folder(self, backup_dir, tmp_path):
+        """Test a folder restore only writes that maildir folder."""
+        target = tmp_path / "restore"
+
+        extract_mailbox(str(backup_dir), "alice@example.com", str(target), folder="Sent")
+
+        assert sorted(p.relative_to(target).as_posix() for p in target.rglob("*.eml")) == [
+            "example.com/alice/.Sent/cur/2.eml",
+        ]
+
+    def test_missing_mailbox(self, backup_dir, tmp_path):
+        """Test an unknown mailbox is reported."""
+        with pytest.raises(KeyError):
+            extract_mailbox(str(backup_dir), "carol@example.com", str(tmp_path / "restore"))
+
+    def test_archive_is_a_plain_tar_zst(self, backup_dir, tmp_path):
+        """Test the concatenated frames still restore as a whole with zstd | tar -i."""
+        target = tmp_path / "full"
+        target.mkdir()
+
+        zstd = subprocess.Popen(["zstd", "-qdc", "--long=27", str(backup_dir / ARCHIVE_NAME)], stdout=subprocess.PIPE)
+        subprocess.run(["tar", "-xif", "-", "-C", str(target)], stdin=zstd.stdout, check=True)
+        zstd.stdout.close()
+
+        assert zstd.wait() == 0
+        assert len(list(target.rglob("*.eml"))) == 3
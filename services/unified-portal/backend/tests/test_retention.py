@@ -0,0 +1,127 @@
+"""Tests for the retention engine (tmp backup tree, fake disk usage)."""
+
+import os
+
+from backup_tools.retention import RetentionPolicy, apply_plan, plan_retention
+
+TOTAL = 10_000
+SIZE = 100
+
+
+class FixedSizes:
+    """Size lookup giving every backup the same size."""
+
+    def size(self, path, root):
+        return SIZE, "test"
+
+
+def make_tree(root, scope="mailserver", **tiers):
+    """Create <root>/<scope>/<tier>/<date> backup directories."""
+    for tier, names in tiers.items():
+        for name in names:
+            os.makedirs(os.path.join(root, scope, tier, name))
+
+
+def plan(root, used, **policy):
+    """Plan against a disk of TOTAL bytes with used bytes in use."""
+    return plan_retention(
+        str(root),
+        RetentionPolicy(**policy),
+        scopes=["mailserver", "rental/blog"],
+        sizes=FixedSizes(),
+        disk_usage=lambda path: (TOTAL, used, TOTAL - used),
+    )
+
+
+def pruned(result, reason=None):
+    """(scope, tier, name) of pruned backups, optionally of one reason."""
+    return [(e["scope"], e["tier"], e["name"]) for e in result["prune"] if reason in (None, e["reason"])]
+
+
+DAILY = ["2025-11-06", "2025-11-07", "2025-11-08", "2025-11-09", "2025-11-10"]
+WEEKLY = ["2025-week-42", "2025-week-43", "2025-week-44"]
+MONTHLY = ["2025-09-01", "2025-10-01", "2025-11-01"]
+
+
+class TestPlanRetention:
+    """Tests for generation and space pruning."""
+
+    def test_generations_per_tier_and_scope(self, tmp_path):
+        """Test each scope/tier keeps its newest N generations."""
+        make_tree(tmp_path, daily=DAILY, weekly=WEEKLY, monthly=MONTHLY)
+        make_tree(tmp_path, scope="rental/blog", daily=DAILY[:2])
+
+        result = plan(tmp_path, used=1000, keep={"daily": 2, "weekly": 1, "monthly": 3})
+
+        assert pruned(result) == [
+            ("mailserver", "daily", "2025-11-06"),
+            ("mailserver", "daily", "2025-11-07"),
+            ("mailserver", "daily", "2025-11-08"),
+            ("mailserver", "weekly", "2025-week-42"),
+            ("mailserver", "weekly", "2025-week-43"),
+        ]
+        assert result["reclaim_bytes"] == 5 * SIZE and result["ceiling_reached"]
+
+    def test_space_prunes_daily_then_weekly_then_monthly_oldest_first(self, tmp_path):
+        """Test space pruning takes the cheapest tier's oldest backups first."""
+        make_tree(tmp_path, daily=DAILY[:3], weekly=WEEKLY[:2], monthly=MONTHLY[:2])
+        policy = {"keep": {"daily": 10, "weekly": 10, "monthly": 10}, "max_usage_percent": 75}
+
+        # Ceiling 7500: each step needs one more 100-byte backup
+        steps = [pruned(plan(tmp_path, used=7500 + n * SIZE, **policy), "space") for n in (0, 1, 2, 3, 4, 5)]
+
+        assert steps == [
+            [],
+            [("mailserver", "daily", "2025-11-06")],
+            [("mailserver", "daily", "2025-11-06"), ("mailserver", "daily", "2025-11-07")],
+            [("mailserver", "daily", "2025-11-06"), ("mailserver", "daily", "2025-11-07"),
+             ("mailserver", "weekly", "2025-week-42")],
+            [("mailserver", "daily", "2025-11-06"), ("mailserver", "daily", "2025-11-07"),
+             ("mailserver", "monthly", "2025-09-01"), ("mailserver", "weekly", "2025-week-42")],
+            # Nothing left but the newest generation of each tier
+            [("mailserver", "daily", "2025-11-06"), ("mailserver", "daily", "2025-11-07"),
+             ("mailserver", "monthly", "2025-09-01"), ("mailserver", "weekly", "2025-week-42")],
+        ]
+
+    def test_min_keep_survives_a_full_disk(self, tmp_path):
+        """Test the newest min_keep generations of every tier are never pruned."""
+        make_tree(tmp_path, daily=DAILY, weekly=WEEKLY, monthly=MONTHLY)
+
+        result = plan(tmp_path, used=TOTAL, keep={"daily": 30, "weekly": 1, "monthly": 12},
+                      max_usage_percent=10, min_keep=2)
+
+        kept = {(e["tier"], e["name"]) for e in result["keep"]}
+        assert kept == {("daily", "2025-11-09"), ("daily", "2025-11-10"), ("weekly", "2025-week-43"),
+                        ("weekly", "2025-week-44"), ("monthly", "2025-10-01"), ("monthly", "2025-11-01")}
+        assert ("mailserver", "weekly", "2025-week-43") not in pruned(result)  # Despite keep weekly=1
+        assert not result["ceiling_reached"]
+
+
+class TestApplyPlan:
+    """Tests for deletion safety."""
+
+    def test_refuses_symlinks_and_paths_outside_root(self, tmp_path):
+        """Test only real directories inside the plan's root are deleted."""
+        root = tmp_path / "backups"
+        outside = tmp_path / "precious"
+        (outside / "data").mkdir(parents=True)
+        make_tree(root, daily=DAILY[:2])
+        link = root / "mailserver" / "daily" / "2025-11-08"
+        link.symlink_to(outside)
+        entry = {"reason": "generations", "size_bytes": SIZE}
+        result = plan(root, used=1000, keep={"daily": 0})
+        result["prune"] += [
+            {**entry, "path": str(link)},
+            {**entry, "path": str(outside)},
+            {**entry, "path": str(root / "mailserver" / ".." / ".." / "precious")},
+            {**entry, "path": str(root)},
+        ]
+
+        applied = apply_plan(result)
+
+        assert applied["deleted"] == 1  # 2025-11-06; min_keep protects 2025-11-07
+        assert not (root / "mailserver" / "daily" / "2025-11-06").exists()
+        assert (root / "mailserver" / "daily" / "2025-11-07").exists()
+        assert (outside / "data").is_dir() and link.is_symlink() and root.is_dir()
+        assert len(applied["errors"]) == 4
+        assert all("outside backup root" in error for error in applied["errors"])
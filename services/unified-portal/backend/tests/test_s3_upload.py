@@ -0,0 +1,91 @@
+"""Tests for the parallel multipart S3 uploader (against moto's S3 stand-in)."""
+
+import os
+
+import pytest
+
+boto3 = pytest.importorskip("boto3")
+moto = pytest.importorskip("moto")
+
+from backup_tools.s3_upload import MIN_PART_SIZE, S3Uploader, make_client  # noqa: E402
+
+BUCKET = "mailserver-backup-test"
+
+
+@pytest.fixture
+def s3_client():
+    """Create a moto-backed S3 client with an empty bucket."""
+    with moto.mock_s3():
+        client = make_client(region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+@pytest.fixture
+def backup_dir(tmp_path):
+    """Create a backup directory with one small and one multipart-sized file."""
+    root = tmp_path / "2025-11-10"
+    (root / "mail").mkdir(parents=True)
+    (root / "mysql").mkdir()
+    (root / "mail" / "msg1").write_bytes(b"hello" * 100)
+    (root / "mysql" / "dump.sql.gz").write_bytes(os.urandom(MIN_PART_SIZE * 2 + 1024))
+    return root
+
+
+class TestS3Uploader:
+    """Tests for S3Uploader.sync."""
+
+    def test_sync_uploads_and_skips_unchanged(self, s3_client, backup_dir, tmp_path):
+        """Test multipart upload and incremental re-sync."""
+        uploader = S3Uploader(
+            s3_client, BUCKET, "mail/daily/2025-11-10",
+            journal_path=str(tmp_path / "journal.json"), part_size=MIN_PART_SIZE,
+        )
+
+        first = uploader.sync(str(backup_dir))
+        assert first["uploaded"] == 2
+        assert first["multipart"] == 1
+        assert first["parts_uploaded"] == 3
+
+        body = s3_client.get_object(Bucket=BUCKET, Key="mail/daily/2025-11-10/mysql/dump.sql.gz")["Body"].read()
+        assert body == (backup_dir / "mysql" / "dump.sql.gz").read_bytes()
+
+        second = uploader.sync(str(backup_dir))
+        assert second["uploaded"] == 0
+        assert second["skipped"] == 2
+
+    def test_sync_include_patterns(self, s3_client, backup_dir, tmp_path):
+        """Test include patterns limit uploaded files."""
+        uploader = S3Uploader(s3_client, BUCKET, journal_path=str(tmp_path / "journal.json"))
+
+        result = uploader.sync(str(backup_dir), include=["mail/*"])
+
+        assert result["uploaded"] == 1
+        keys = [obj["Key"] for obj in s3_client.list_objects_v2(Bucket=BUCKET)["Contents"]]
+        assert keys == ["mail/msg1"]
+
+    def test_sync_resumes_interrupted_upload(self, s3_client, backup_dir, tmp_path):
+        """Test an interrupted multipart upload resumes from the journal."""
+        journal_path = str(tmp_path / "journal.json")
+        uploader = S3Uploader(s3_client, BUCKET, journal_path=journal_path, part_size=MIN_PART_SIZE)
+
+        original_upload_part = s3_client.upload_part
+        calls = {"count": 0}
+
+        def failing_upload_part(**kwargs):
+            calls["count"] += 1
+            if kwargs["PartNumber"] == 3:
+                raise ConnectionError("uplink dropped")
+            return original_upload_part(**kwargs)
+
+        s3_client.upload_part = failing_upload_part
+        with pytest.raises(ConnectionError):
+            uploader.sync(str(backup_dir), include=["mysql/*"])
+
+        s3_client.upload_part = original_upload_part
+        resumed = S3Uploader(s3_client, BUCKET, journal_path=journal_path, part_size=MIN_PART_SIZE)
+        result = resumed.sync(str(backup_dir), include=["mysql/*"])
+
+        assert result["parts_uploaded"] == 1
+        body = s3_client.get_object(Bucket=BUCKET, Key="mysql/dump.sql.gz")["Body"].read()
+        assert body == (backup_dir / "mysql" / "dump.sql.gz").read_bytes()
@@ -0,0 +1,107 @@
+"""Tests for managed site DNS status checks (against httpx mock transports)."""
+
+import httpx
+import pytest
+
+from app.services import site_dns_service
+from app.services.cloudflare_api_service import CloudflareClient
+from app.services.cloudflare_dns_service import DNSRecordMirror
+from app.services.cloudflare_zone_service import CloudflareZoneCache
+from app.services.dns_propagation_service import DNSPropagationChecker
+from app.services.site_dns_service import SiteDNSChecker
+
+TUNNEL_CNAME = "tunnel-1.cfargotunnel.com"
+
+
+def cloudflare_api(records):
+    """Mock Cloudflare API serving one zone (example.com) with records."""
+    def handler(request):
+        if request.url.path.endswith("/zones"):
+            result = [{"id": "zone-1", "name": "example.com", "status": "active"}]
+        else:
+            result = records
+        return httpx.Response(200, json={
+            "success": True, "errors": [], "result": result, "result_info": {"page": 1, "total_pages": 1},
+        })
+
+    return CloudflareClient(api_token="test-token", transport=httpx.MockTransport(handler))
+
+
+def make_checker(answers, records=(), queries=None):
+    """Create a checker with stand-in DoH resolvers and Cloudflare API."""
+    def resolver(request):
+        name = request.url.params["name"]
+        if queries is not None:
+            queries.append(name)
+        if name in answers:
+            ip, ttl = answers[name]
+            return httpx.Response(200, json={"Status": 0, "Answer": [{"name": name, "type": 1, "TTL": ttl, "data": ip}]})
+        return httpx.Response(200, json={"Status": 3, "Authority": [{"type": 6, "TTL": 1800}]})
+
+    client = cloudflare_api(list(records))
+    checker = DNSPropagationChecker(
+        resolvers={"resolver-1": "http://resolver-1.test/dns-query", "resolver-2": "http://resolver-2.test/dns-query"},
+        transport=httpx.MockTransport(resolver),
+    )
+    return SiteDNSChecker(
+        checker=checker,
+        zone_cache=CloudflareZoneCache(client=client),
+        mirror=DNSRecordMirror(client=client),
+    )
+
+
+def cname(name, content):
+    """Cloudflare CNAME record."""
+    return {"id": f"rec-{name}", "type": "CNAME", "name": name, "content": content, "ttl": 1, "proxied": True}
+
+
+@pytest.mark.asyncio
+class TestSiteDNSChecker:
+    """Tests for resolution caching and tunnel CNAME checks."""
+
+    async def test_result_cached_for_record_ttl(self):
+        """Test positive answers are cached for their TTL, negative ones briefly."""
+        queries = []
+        checker = make_checker({"blog.example.com": ("104.16.0.1", 300)}, queries=queries)
+
+        first = await checker.resolve("blog.example.com")
+        await checker.resolve("BLOG.example.com.")
+        missing = await checker.resolve("new.example.com")
+
+        assert first["resolved"] is True
+        assert first["ip_addresses"] == ["104.16.0.1"]
+        assert first["ttl"] == 300
+        assert queries.count("blog.example.com") == 2  # One per resolver, then cached
+        assert missing["resolved"] is False
+        assert missing["ttl"] == site_dns_service.NEGATIVE_CACHE_TTL
+
+    async def test_refresh_bypasses_cache(self):
+        """Test refresh=True resolves again."""
+        queries = []
+        checker = make_checker({"blog.example.com": ("104.16.0.1", 300)}, queries=queries)
+
+        await checker.resolve("blog.example.com")
+        await checker.resolve("blog.example.com", refresh=True)
+
+        assert len(queries) == 4
+
+    async def test_fleet_flags_tunnel_mismatch(self, monkeypatch):
+        """Test sites not pointing at the tunnel CNAME are flagged."""
+        monkeypatch.setattr(site_dns_service.settings, "cloudflare_tunnel_id", "tunnel-1")
+        records = [
+            cname("blog.example.com", TUNNEL_CNAME),
+            cname("shop.example.com", "old-tunnel.cfargotunnel.com"),
+            {"id": "rec-a", "type": "A", "name": "static.example.com", "content": "192.0.2.1", "ttl": 1},
+        ]
+        checker = make_checker({"blog.example.com": ("104.16.0.1", 300)}, records=records)
+
+        statuses = await checker.check_many(
+            ["blog.example.com", "shop.example.com", "static.example.com", "gone.example.com"]
+        )
+
+        assert [status["tunnel_match"] for status in statuses] == [True, False, False, False]
+        assert statuses[0]["issue"] is None
+        assert "old-tunnel" in statuses[1]["issue"]
+        assert statuses[2]["issue"] == "A record instead of tunnel CNAME"
+        assert statuses[3]["issue"] == "No DNS record in Cloudflare"
+        assert all(status["expected_cname"] == TUNNEL_CNAME for status in statuses)
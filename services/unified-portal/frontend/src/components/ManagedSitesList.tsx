@@ -12,7 +12,12 @@ import {
   ChevronDown,
   ChevronRight,
 } from 'lucide-react'
-import { managedSitesAPI, type ManagedWordPressSite, type DNSResolveStatus } from '@/lib/api'
+import {
+  managedSitesAPI,
+  type ManagedWordPressSite,
+  type DNSResolveStatus,
+  type ManagedSiteDNSStatus,
+} from '@/lib/api'
 import { Button } from '@/components/ui/button'
 import { Badge } from '@/components/ui/badge'
 import {
@@ -114,6 +119,19 @@ export default function ManagedSitesList({ searchQuery }: ManagedSitesListProps)
     refetchInterval: 30000,
   })
 
+  // Query: DNS status of all sites in one call (flags tunnel CNAME mismatches)
+  const { data: dnsStatuses } = useQuery({
+    queryKey: ['managed-sites-dns-status'],
+    queryFn: () => managedSitesAPI.checkAllDnsStatus(),
+    refetchInterval: 60000,
+  })
+
+  const dnsStatusBySite = useMemo(() => {
+    const map = new Map<number, ManagedSiteDNSStatus>()
+    dnsStatuses?.forEach((status) => map.set(status.site_id, status))
+    return map
+  }, [dnsStatuses])
+
   // Toggle domain collapse state
   const toggleDomain = (domain: string) => {
     setCollapsedDomains(prev => {
@@ -280,6 +298,16 @@ export default function ManagedSitesList({ searchQuery }: ManagedSitesListProps)
                           </Badge>
                         </div>
                         <SiteDomainLink site={site} />
+                        {dnsStatusBySite.get(site.id)?.tunnel_match === false && (
+                          <Badge
+                            variant="outline"
+                            className="mt-1 text-xs font-normal text-red-600 border-red-300"
+                            title={dnsStatusBySite.get(site.id)?.issue ?? undefined}
+                          >
+                            <AlertCircle className="h-3 w-3 mr-1" />
+                            トンネルDNS不一致
+                          </Badge>
+                        )}
                       </div>
                       <DropdownMenu>
                         <DropdownMenuTrigger asChild>
@@ -384,6 +384,16 @@ export interface DNSResolveStatus {
   checked_at: string
 }
 
+export interface ManagedSiteDNSStatus extends DNSResolveStatus {
+  site_id: number
+  site_name: string
+  ttl: number
+  expected_cname: string | null
+  cname_target: string | null
+  tunnel_match: boolean | null
+  issue: string | null
+}
+
 // ============================================================================
 // Managed WordPress Sites API Functions
 // ============================================================================
@@ -455,6 +465,14 @@ export const managedSitesAPI = {
    */
   checkDnsStatus: (siteId: number) =>
     apiFetch<DNSResolveStatus>(`/api/v1/wordpress/managed-sites/${siteId}/dns-status`),
+
+  /**
+   * Check DNS status of all managed sites (with tunnel CNAME check)
+   */
+  checkAllDnsStatus: (refresh = false) =>
+    apiFetch<ManagedSiteDNSStatus[]>(
+      `/api/v1/wordpress/managed-sites/dns-status${refresh ? '?refresh=true' : ''}`
+    ),
 }
 
 // ============================================================================
@@ -705,6 +723,9 @@ export interface SSLCertificate {
   issuer: string
   valid_until: string
   status: string
+  days_remaining: number | null
+  subject: string | null
+  path: string | null
 }
 
 export interface CloudflareZone {
@@ -712,6 +733,14 @@ export interface CloudflareZone {
   id: string
   ssl_mode: string
   status: string
+  min_tls_version: string | null
+  tls_1_3: string | null
+  always_use_https: boolean | null
+  hsts_enabled: boolean | null
+  hsts_max_age: number | null
+  hsts_include_subdomains: boolean | null
+  hsts_preload: boolean | null
+  error: string | null
 }
 
 export interface CloudflareSSLStatus {
@@ -737,11 +766,17 @@ export interface SecurityStats {
 
 export const securityAPI = {
   /**
-   * List SSL certificates for blog domains
+   * List TLS certificates found on the host (one entry per name)
    */
   listSSLCertificates: () =>
     apiFetch<SSLCertificate[]>('/api/v1/security/ssl/certificates'),
 
+  /**
+   * List names whose newest certificate expires within the given days
+   */
+  listExpiringCertificates: (days = 14) =>
+    apiFetch<SSLCertificate[]>(`/api/v1/security/ssl/certificates/expiring?days=${days}`),
+
   /**
    * Get Cloudflare SSL status for all zones
    */
@@ -767,9 +802,11 @@ export const securityAPI = {
 
 export interface BackupInfo {
   date: string
-  size_mb: number
+  size_mb: number | null  // null while size_status is pending or unknown
   path: string
   type: string  // daily, weekly, blog
+  file_count: number | null
+  size_status: 'indexed' | 'pending' | 'unknown'
 }
 
 export interface MailserverBackups {
@@ -787,6 +824,7 @@ export interface BackupStats {
   last_backup_time: string
   mailserver_backups: number
   blog_backups: number
+  unsized_backups: number
 }
 
 export interface BackupSchedule {
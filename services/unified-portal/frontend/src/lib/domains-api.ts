@@ -78,6 +78,9 @@ export interface DNSRecordImportResult {
   success_count: number
   error_count: number
   errors: DNSRecordImportError[]
+  created_count: number
+  updated_count: number
+  skipped_count: number
 }
 
 export interface DNSVerificationServerResult {
@@ -95,6 +98,49 @@ export interface DNSVerificationResult {
   expected_content: string | null
 }
 
+export interface DNSPropagationWatch {
+  watch_id: string
+  record_type: string
+  name: string
+  expected_content: string | null
+  status: 'watching' | 'propagated' | 'expired' | 'failed'
+  attempts: number
+  started_at: string
+  deadline: string
+  finished_at: string | null
+  result: DNSVerificationResult | null
+  error: string | null
+}
+
+export interface DNSPlannedChange {
+  action: 'create' | 'update' | 'delete'
+  source: string
+  record: Record<string, any>
+  current: DNSRecord | null
+}
+
+export interface DNSZonePlan {
+  zone_id: string
+  zone_name: string
+  plan_id: string
+  prune: boolean
+  changes: DNSPlannedChange[]
+  create_count: number
+  update_count: number
+  delete_count: number
+  unchanged_count: number
+  errors: string[]
+}
+
+export interface DNSZoneApplyResult {
+  plan_id: string
+  created_count: number
+  updated_count: number
+  deleted_count: number
+  error_count: number
+  errors: { change: DNSPlannedChange; error: string }[]
+}
+
 // ============================================================================
 // API Functions
 // ============================================================================
@@ -204,3 +250,71 @@ export async function verifyDNSRecord(
     { method: 'POST' }
   )
 }
+
+/**
+ * Start a background DNS propagation watch
+ */
+export async function startDNSWatch(
+  domain: string,
+  recordType: string,
+  recordName: string,
+  expectedContent?: string
+): Promise<DNSPropagationWatch> {
+  const params = new URLSearchParams({
+    record_type: recordType,
+    record_name: recordName,
+  })
+
+  if (expectedContent) {
+    params.append('expected_content', expectedContent)
+  }
+
+  return apiFetch<DNSPropagationWatch>(
+    `/api/v1/domains/${domain}/dns/verify/watch?${params.toString()}`,
+    { method: 'POST' }
+  )
+}
+
+/**
+ * Follow a DNS propagation watch over server-sent events.
+ * Returns the EventSource; call close() to stop listening.
+ */
+export function subscribeDNSWatch(
+  domain: string,
+  watchId: string,
+  onUpdate: (watch: DNSPropagationWatch) => void
+): EventSource {
+  const source = new EventSource(
+    `${API_BASE_URL}/api/v1/domains/${domain}/dns/verify/watch/${watchId}/events`
+  )
+
+  source.addEventListener('check', (event) => {
+    onUpdate(JSON.parse((event as MessageEvent).data))
+  })
+  source.addEventListener('done', (event) => {
+    onUpdate(JSON.parse((event as MessageEvent).data))
+    source.close()
+  })
+
+  return source
+}
+
+/**
+ * Plan the changes that bring a zone in line with its desired records
+ */
+export async function getDNSPlan(domain: string): Promise<DNSZonePlan> {
+  return apiFetch<DNSZonePlan>(`/api/v1/domains/${domain}/dns/plan`)
+}
+
+/**
+ * Apply a reviewed zone plan (fails with 409 if the zone changed since)
+ */
+export async function applyDNSPlan(
+  domain: string,
+  planId: string
+): Promise<DNSZoneApplyResult> {
+  return apiFetch<DNSZoneApplyResult>(
+    `/api/v1/domains/${domain}/dns/apply?plan_id=${encodeURIComponent(planId)}`,
+    { method: 'POST' }
+  )
+}
@@ -248,7 +248,11 @@ export default function BackupManagement() {
 
                 <div className="flex items-center gap-4">
                   <div className="text-right">
-                    <p className="text-sm font-medium">{backup.size_mb.toFixed(2)} MB</p>
+                    <p className="text-sm font-medium">
+                      {backup.size_mb !== null
+                        ? `${backup.size_mb.toFixed(2)} MB`
+                        : backup.size_status === 'pending' ? 'サイズ集計中' : 'サイズ不明'}
+                    </p>
                     <div className="flex items-center gap-1 text-sm text-green-600 dark:text-green-400">
                       <CheckCircle className="h-4 w-4" />
                       成功
@@ -1,4 +1,4 @@
-import React, { useState } from 'react'
+import React, { useEffect, useRef, useState } from 'react'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import { useNavigate } from 'react-router-dom'
 import { Globe, Plus, RefreshCw, Trash2, Mail, Lock, CheckCircle, AlertCircle, ExternalLink, Edit, Download, Upload, Search } from 'lucide-react'
@@ -18,12 +18,19 @@ import {
   deleteDNSRecord,
   importDNSRecords,
   verifyDNSRecord,
+  startDNSWatch,
+  subscribeDNSWatch,
+  getDNSPlan,
+  applyDNSPlan,
   type Zone,
   type DNSRecord,
   type DNSRecordCreate,
   type DNSRecordUpdate,
   type DNSRecordImportResult,
   type DNSVerificationResult,
+  type DNSPropagationWatch,
+  type DNSZonePlan,
+  type DNSZoneApplyResult,
 } from '@/lib/domains-api'
 
 // Extended domain interface with metadata
@@ -51,9 +58,14 @@ export default function DomainManagement() {
   const [selectedRecords, setSelectedRecords] = useState<Set<string>>(new Set())
   const [showImportModal, setShowImportModal] = useState(false)
   const [importResult, setImportResult] = useState<DNSRecordImportResult | null>(null)
+  const [showPlanModal, setShowPlanModal] = useState(false)
+  const [zonePlan, setZonePlan] = useState<DNSZonePlan | null>(null)
+  const [applyResult, setApplyResult] = useState<DNSZoneApplyResult | null>(null)
   const [showVerifyModal, setShowVerifyModal] = useState(false)
   const [verifyingRecord, setVerifyingRecord] = useState<DNSRecord | null>(null)
   const [verifyResult, setVerifyResult] = useState<DNSVerificationResult | null>(null)
+  const [watchStatus, setWatchStatus] = useState<DNSPropagationWatch['status'] | null>(null)
+  const watchSourceRef = useRef<EventSource | null>(null)
   const [error, setError] = useState<string | null>(null)
 
   const queryClient = useQueryClient()
@@ -133,6 +145,35 @@ export default function DomainManagement() {
     },
   })
 
+  // Plan zone changes mutation
+  const planZoneMutation = useMutation({
+    mutationFn: (domain: string) => getDNSPlan(domain),
+    onSuccess: (plan) => {
+      setZonePlan(plan)
+      setApplyResult(null)
+      setError(null)
+    },
+    onError: (err: any) => {
+      setError(err.message || 'Failed to plan DNS changes')
+      setShowPlanModal(false)
+    },
+  })
+
+  // Apply zone plan mutation
+  const applyPlanMutation = useMutation({
+    mutationFn: ({ domain, planId }: { domain: string; planId: string }) =>
+      applyDNSPlan(domain, planId),
+    onSuccess: (result) => {
+      queryClient.invalidateQueries({ queryKey: ['dns-records', selectedDomain] })
+      setApplyResult(result)
+      setZonePlan(null)
+      setError(null)
+    },
+    onError: (err: any) => {
+      setError(err.message || 'Failed to apply DNS changes')
+    },
+  })
+
   // Verify DNS record mutation
   const verifyRecordMutation = useMutation({
     mutationFn: ({ domain, recordType, recordName, expectedContent }: {
@@ -150,6 +191,41 @@ export default function DomainManagement() {
     },
   })
 
+  // Stop following a propagation watch when the page unmounts
+  useEffect(() => () => watchSourceRef.current?.close(), [])
+
+  const closeVerifyModal = () => {
+    watchSourceRef.current?.close()
+    watchSourceRef.current = null
+    setWatchStatus(null)
+    setShowVerifyModal(false)
+    setVerifyingRecord(null)
+    setVerifyResult(null)
+  }
+
+  // Poll propagation in the background and follow it over SSE
+  const handleWatchDNSRecord = async () => {
+    if (!selectedDomain || !verifyingRecord) return
+
+    try {
+      const watch = await startDNSWatch(
+        selectedDomain,
+        verifyingRecord.type,
+        verifyingRecord.name,
+        verifyingRecord.content
+      )
+      setWatchStatus(watch.status)
+      watchSourceRef.current = subscribeDNSWatch(selectedDomain, watch.watch_id, (update) => {
+        setWatchStatus(update.status)
+        if (update.result) {
+          setVerifyResult(update.result)
+        }
+      })
+    } catch (err: any) {
+      setError(err.message || 'Failed to start DNS watch')
+    }
+  }
+
   // Convert zones to domains with metadata (mock data for now)
   const domains: DomainMetadata[] = zones?.map((zone) => ({
     ...zone,
@@ -297,6 +373,21 @@ export default function DomainManagement() {
     event.target.value = ''
   }
 
+  const handlePlanZone = () => {
+    if (!selectedDomain) return
+
+    setZonePlan(null)
+    setApplyResult(null)
+    setShowPlanModal(true)
+    planZoneMutation.mutate(selectedDomain)
+  }
+
+  const closePlanModal = () => {
+    setShowPlanModal(false)
+    setZonePlan(null)
+    setApplyResult(null)
+  }
+
   const handleVerifyDNSRecord = (record: DNSRecord) => {
     if (!selectedDomain) return
 
@@ -577,6 +668,10 @@ export default function DomainManagement() {
                       CSV取込
                     </Button>
                   </label>
+                  <Button size="sm" variant="outline" onClick={handlePlanZone}>
+                    <RefreshCw className="h-4 w-4 mr-2" />
+                    差分確認
+                  </Button>
                   <Button
                     size="sm"
                     variant="outline"
@@ -1045,6 +1140,9 @@ export default function DomainManagement() {
                   <div className="flex items-center gap-4 p-4 bg-muted rounded-lg">
                     <div className="flex-1">
                       <p className="text-sm font-medium">成功: {importResult.success_count}件</p>
+                      <p className="text-xs text-muted-foreground mt-1">
+                        新規: {importResult.created_count}件 / 更新: {importResult.updated_count}件 / 変更なし: {importResult.skipped_count}件
+                      </p>
                       <p className="text-sm text-muted-foreground mt-1">
                         {importResult.error_count > 0
                           ? `エラー: ${importResult.error_count}件`
@@ -1103,15 +1201,127 @@ export default function DomainManagement() {
         </div>
       )}
 
+      {/* DNS Zone Plan Modal */}
+      {showPlanModal && (
+        <div
+          className="fixed inset-0 bg-black/50 flex items-center justify-center z-50"
+          onClick={closePlanModal}
+        >
+          <Card
+            className="w-full max-w-3xl max-h-[80vh] overflow-y-auto"
+            onClick={(e) => e.stopPropagation()}
+          >
+            <CardHeader>
+              <CardTitle>DNS差分: {selectedDomain}</CardTitle>
+              <CardDescription>
+                ゾーン定義・WordPressサイト・メールドメインから求めたレコードと現在のレコードの差分
+              </CardDescription>
+            </CardHeader>
+            <CardContent className="space-y-4">
+              {(planZoneMutation.isPending || applyPlanMutation.isPending) && (
+                <div className="flex items-center justify-center py-8">
+                  <RefreshCw className="h-8 w-8 animate-spin text-primary" />
+                  <p className="ml-4 text-muted-foreground">
+                    {applyPlanMutation.isPending ? '変更を適用中...' : '差分を計算中...'}
+                  </p>
+                </div>
+              )}
+
+              {zonePlan && !applyPlanMutation.isPending && (
+                <>
+                  <div className="p-4 bg-muted rounded-lg">
+                    <p className="text-sm font-medium">
+                      新規: {zonePlan.create_count}件 / 更新: {zonePlan.update_count}件 / 削除: {zonePlan.delete_count}件 / 変更なし: {zonePlan.unchanged_count}件
+                    </p>
+                    {zonePlan.prune && (
+                      <p className="text-xs text-muted-foreground mt-1">
+                        prune有効: 定義にないレコードは削除されます
+                      </p>
+                    )}
+                  </div>
+
+                  {zonePlan.errors.length > 0 && (
+                    <div className="p-3 bg-red-50 dark:bg-red-900/20 rounded border border-red-200 dark:border-red-800">
+                      <p className="text-sm font-medium text-red-900 dark:text-red-200">ゾーン定義のエラー</p>
+                      {zonePlan.errors.map((planError, idx) => (
+                        <p key={idx} className="text-xs text-red-700 dark:text-red-300 mt-1">{planError}</p>
+                      ))}
+                    </div>
+                  )}
+
+                  {zonePlan.changes.length === 0 ? (
+                    <div className="flex items-center gap-2 text-sm text-muted-foreground">
+                      <CheckCircle className="h-4 w-4 text-green-600" />
+                      差分はありません
+                    </div>
+                  ) : (
+                    <div className="space-y-2 max-h-[300px] overflow-y-auto">
+                      {zonePlan.changes.map((change, idx) => (
+                        <div key={idx} className="p-3 rounded border text-xs font-mono">
+                          <span
+                            className={
+                              change.action === 'create'
+                                ? 'text-green-600'
+                                : change.action === 'delete'
+                                  ? 'text-red-600'
+                                  : 'text-yellow-600'
+                            }
+                          >
+                            {change.action === 'create' ? '+ 新規' : change.action === 'delete' ? '- 削除' : '~ 更新'}
+                          </span>{' '}
+                          {change.record.type} {change.record.name}
+                          {change.current && change.action === 'update' && (
+                            <span className="text-muted-foreground"> {change.current.content} →</span>
+                          )}{' '}
+                          {change.record.content}
+                          <span className="text-muted-foreground"> ({change.source})</span>
+                        </div>
+                      ))}
+                    </div>
+                  )}
+                </>
+              )}
+
+              {applyResult && (
+                <div className="p-4 bg-muted rounded-lg">
+                  <p className="text-sm font-medium">
+                    新規: {applyResult.created_count}件 / 更新: {applyResult.updated_count}件 / 削除: {applyResult.deleted_count}件
+                  </p>
+                  {applyResult.errors.map((applyError, idx) => (
+                    <p key={idx} className="text-xs text-red-700 dark:text-red-300 mt-1">
+                      {applyError.change.record.type} {applyError.change.record.name}: {applyError.error}
+                    </p>
+                  ))}
+                </div>
+              )}
+
+              <div className="flex gap-2 pt-4">
+                {zonePlan && zonePlan.changes.length > 0 && (
+                  <Button
+                    className="flex-1"
+                    disabled={zonePlan.errors.length > 0 || applyPlanMutation.isPending}
+                    onClick={() =>
+                      selectedDomain &&
+                      applyPlanMutation.mutate({ domain: selectedDomain, planId: zonePlan.plan_id })
+                    }
+                  >
+                    適用
+                  </Button>
+                )}
+                <Button className="flex-1" variant="outline" onClick={closePlanModal}>
+                  閉じる
+                </Button>
+              </div>
+            </CardContent>
+          </Card>
+        </div>
+      )}
+
       {/* DNS Verification Modal */}
       {showVerifyModal && verifyingRecord && (
         <div
           className="fixed inset-0 bg-black/50 flex items-center justify-center z-50"
-          onClick={() => {
-            setShowVerifyModal(false)
-            setVerifyingRecord(null)
-            setVerifyResult(null)
-          }}
+          onClick={closeVerifyModal}
         >
           <Card
             className="w-full max-w-3xl max-h-[80vh] overflow-y-auto"
@@ -1226,14 +1436,22 @@ export default function DomainManagement() {
               )}
 
               <div className="flex gap-2 pt-4">
-                <Button
-                  className="flex-1"
-                  onClick={() => {
-                    setShowVerifyModal(false)
-                    setVerifyingRecord(null)
-                    setVerifyResult(null)
-                  }}
-                >
+                {verifyResult && !verifyResult.propagated && (
+                  <Button
+                    variant="outline"
+                    className="flex-1"
+                    onClick={handleWatchDNSRecord}
+                    disabled={watchStatus === 'watching'}
+                  >
+                    <RefreshCw className={`h-4 w-4 mr-2 ${watchStatus === 'watching' ? 'animate-spin' : ''}`} />
+                    {watchStatus === 'watching'
+                      ? '伝播を監視中...'
+                      : watchStatus === 'expired'
+                      ? '監視タイムアウト（再開）'
+                      : '伝播を監視'}
+                  </Button>
+                )}
+                <Button className="flex-1" onClick={closeVerifyModal}>
                   閉じる
                 </Button>
               </div>